@@ -2,6 +2,7 @@
 """
 Configuration pour l'assistant mobilité Rennes
 """
+import os
 
 # Zone géographique ciblée
 RENNES_CITY = "rennes"
@@ -20,3 +21,91 @@ RENNES_RADIUS_KM = 15  # Rayon en km autour du centre
 # Filtres de recherche
 DEFAULT_FUEL_TYPE = "Gazole"
 MAX_RESULTS = 5
+
+# Historique du trafic (profils par tranche de 15 min sur la semaine)
+TRAFFIC_HISTORY_PATH = os.getenv("TRAFFIC_HISTORY_PATH", os.path.join("cache", "traffic_history.npz"))
+TRAFFIC_HISTORY_CAPACITY = 4096  # Nombre max de tronçons suivis
+TRAFFIC_SAMPLING_ENABLED = os.getenv("TRAFFIC_SAMPLING_ENABLED", "1") == "1"
+TRAFFIC_SAMPLING_INTERVAL_S = 15 * 60
+
+# Quartiers : contours officiels optionnels (GeoJSON), sinon approximation par Voronoï
+RENNES_DISTRICTS_GEOJSON = os.getenv("RENNES_DISTRICTS_GEOJSON", os.path.join("cache", "quartiers_rennes.geojson"))
+TRAFFIC_DISTRICT_MAX_AGE_S = 5 * 60  # Âge max des agrégats avant nouvelle collecte
+
+# Flux SSE des changements de trafic
+TRAFFIC_STREAM_POLL_S = 1.0
+TRAFFIC_STREAM_KEEPALIVE_S = 15.0
+
+# Cache des itinéraires OSRM
+ROUTE_CACHE_PATH = os.getenv("ROUTE_CACHE_PATH", os.path.join("cache", "route_cache.json"))
+ROUTE_CACHE_MAX_ENTRIES = 2048
+ROUTE_CACHE_TTL_S = 12 * 3600
+ROUTE_CACHE_GRID_DEG = 0.001  # ~110 m en latitude, ~75 m en longitude à Rennes
+
+# Routage local hors-ligne (graphe routier CSR converti depuis OSM)
+ROUTING_GRAPH_PATH = os.getenv("ROUTING_GRAPH_PATH", os.path.join("cache", "rennes_road_graph.npz"))
+ROUTING_BACKEND = os.getenv("ROUTING_BACKEND", "auto")  # auto | local | osrm
+ROUTING_MAX_SNAP_M = 500  # Distance max d'un point au nœud du graphe le plus proche
+
+# Matrice précalculée des temps de trajet entre lieux connus (RENNES_LOCATIONS)
+LOCATION_MATRIX_PATH = os.getenv("LOCATION_MATRIX_PATH", os.path.join("cache", "location_matrix.npz"))
+
+# Gazetteer d'adresses BAN (répertoire .npy construit par backend/app/gazetteer.py)
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH", os.path.join("cache", "gazetteer"))
+GAZETTEER_DEFAULT_COMMUNE = "rennes"  # Voie homonyme : commune préférée
+GAZETTEER_FUZZY_WINDOW = 64  # Voies voisines (ordre trié) comparées en recherche floue
+
+# Géocodage inverse local (position GPS -> lieu / adresse / quartier)
+REVERSE_GRID_DEG = 0.005  # Taille des cellules de l'index spatial (~550 m x 370 m)
+REVERSE_ADDRESS_MAX_M = 100  # Adresse du gazetteer retenue en deçà
+REVERSE_PLACE_MAX_M = 1000  # "près de <lieu connu>" en deçà
+
+# Détection d'outils : règles (mots-clés) ou classifieur NumPy (n-grammes hachés + softmax)
+DETECTOR_BACKEND = os.getenv("DETECTOR_BACKEND", "rules")  # rules | classifier | auto
+INTENT_MODEL_PATH = os.getenv("INTENT_MODEL_PATH", os.path.join("cache", "intent_model.npz"))
+INTENT_HASH_FEATURES = 2 ** 14  # Colonnes du vecteur de n-grammes hachés
+INTENT_NGRAM_RANGE = (2, 4)  # Longueurs des n-grammes de caractères
+INTENT_MIN_CONFIDENCE = 0.5  # auto : en deçà, la détection par règles décide
+
+# Plusieurs demandes dans un message ("trafic et parkings près de la gare")
+MCP_MAX_INTENTS = 3  # Outils exécutés en parallèle pour un même message
+MCP_DECISION_CACHE_SIZE = 1024  # Messages récents dont (outils, paramètres) sont mémorisés
+TOOL_COALESCE_GRID_DEG = 0.001  # Appels d'outil simultanés regroupés si positions à ~100 m près
+
+# Échéance d'une requête /api/chat, propagée jusqu'aux appels réseau des outils
+CHAT_DEADLINE_S = float(os.getenv("CHAT_DEADLINE_S", "30"))  # Budget total (outils + LLM)
+TOOLS_DEADLINE_S = 10.0  # Part du budget réservée aux outils, le reste revient au LLM
+DEADLINE_MIN_TIMEOUT_S = 0.2  # En deçà, un appel réseau n'est plus tenté
+TRAFFIC_GEOCODE_RESERVE_S = 1.0  # Temps gardé pour répondre : Nominatim s'arrête avant
+
+# Client HTTP sortant : connexions gardées ouvertes par hôte, reprises, disjoncteurs
+HTTP_POOL_MAXSIZE = 16  # Connexions conservées par hôte (appels parallèles + doublons)
+HTTP_RETRIES = 2  # Reprises sur erreur de connexion ou 502/503/504 (GET seulement)
+HTTP_RETRY_BACKOFF_S = 0.25  # Facteur d'attente croissante entre reprises (Retry.backoff_factor)
+HTTP_BREAKER_FAILURES = 5  # Échecs consécutifs avant d'ouvrir le disjoncteur d'un hôte
+HTTP_BREAKER_RESET_S = 30.0  # Durée d'ouverture avant une requête d'essai
+
+# Requêtes HTTP sortantes doublées (hedging) quand elles dépassent le p95 de l'hôte
+HTTP_HEDGING_ENABLED = os.getenv("HTTP_HEDGING_ENABLED", "1") == "1"
+HEDGE_BUDGET_RATIO = 0.05  # Doublons autorisés : 5 % des requêtes...
+HEDGE_BUDGET_BURST = 5.0  # ... avec au plus 5 doublons d'avance
+HEDGE_MIN_SAMPLES = 20  # Latences observées sur l'hôte avant de doubler
+HEDGE_WINDOW = 200  # Latences récentes retenues par hôte pour le p95
+HEDGE_MIN_DELAY_S = 0.05  # Jamais de doublon avant ce délai
+HEDGE_MAX_WORKERS = 16  # Doublons en vol au plus (au-delà : pas de doublon)
+HEDGE_MAX_PRIMARIES = 32  # GET doublables en vol au plus (au-delà : appel direct, sans doublon)
+
+# Autocomplétion des lieux (/api/locations/suggest)
+LOCATION_SUGGEST_DEFAULT_LIMIT = 8
+LOCATION_SUGGEST_MAX_RESULTS = 20  # Suggestions précalculées par nœud du trie
+
+# Simplification Douglas-Peucker des géométries d'itinéraire (mètres)
+ROUTE_SIMPLIFY_TOLERANCE_M = 15.0  # Appariement aux tronçons de trafic
+ROUTE_MATCH_SAMPLE_KM = 0.1  # Pas d'échantillonnage des arêtes pour l'appariement
+
+# Isochrones ("que puis-je atteindre en N minutes ?")
+ISOCHRONE_MAX_MINUTES = 30
+ISOCHRONE_GRID_SIZE = 21  # Points échantillonnés par côté de la grille
+ISOCHRONE_MAX_SPEED_KMH = 70  # Borne le rayon de la grille échantillonnée
+ISOCHRONE_CACHE_GRID_DEG = 0.005  # Origines voisines (~500 m) partagent l'isochrone
+ISOCHRONE_CACHE_TTL_S = 3600
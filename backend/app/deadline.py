@@ -0,0 +1,78 @@
+"""
+Échéance d'une requête, propagée de main.chat jusqu'aux appels réseau
+
+Chaque couche reçoit le même Deadline (instant limite sur l'horloge
+monotone) : les timeouts réseau sont bornés par le temps restant, et un outil
+à court de temps renvoie un résultat dégradé (dernier instantané, prix en
+cache, tronçons sans libellé...) en notant pourquoi, plutôt que de dépasser
+le budget.
+"""
+
+import math
+import threading
+import time
+from typing import List, Optional
+
+import requests
+
+from .config import DEADLINE_MIN_TIMEOUT_S
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """Budget épuisé avant un appel réseau (traité comme un timeout par les scrapers)"""
+
+
+class Deadline:
+    """Instant limite d'une requête et raisons de dégradation de ses résultats."""
+
+    def __init__(self, seconds: Optional[float] = None, expires_at: Optional[float] = None):
+        if expires_at is None:
+            expires_at = math.inf if seconds is None else time.monotonic() + seconds
+        self.expires_at = expires_at
+        self._reasons: List[str] = []
+        self._lock = threading.Lock()
+
+    def child(self, seconds: Optional[float] = None) -> "Deadline":
+        """Sous-échéance (au plus `seconds`, jamais après celle-ci), avec ses propres raisons"""
+        expires_at = self.expires_at
+        if seconds is not None:
+            expires_at = min(expires_at, time.monotonic() + seconds)
+        return Deadline(expires_at=expires_at)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def wait_timeout(self) -> Optional[float]:
+        """Attente maximale pour Event.wait / futures.wait (None : sans échéance)"""
+        remaining = self.remaining()
+        return remaining if math.isfinite(remaining) else None
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def timeout(self, default: float, reserve: float = 0.0) -> float:
+        """
+        Timeout d'un appel réseau : `default`, borné par le temps restant moins `reserve`.
+
+        Lève DeadlineExceeded s'il reste moins de DEADLINE_MIN_TIMEOUT_S.
+        """
+        available = self.remaining() - reserve
+        if available < DEADLINE_MIN_TIMEOUT_S:
+            raise DeadlineExceeded("Délai de la requête dépassé")
+        return min(default, available)
+
+    def degrade(self, reason: str) -> None:
+        """Note qu'un résultat est partiel ou périmé (affiché à l'utilisateur)"""
+        with self._lock:
+            if reason not in self._reasons:
+                self._reasons.append(reason)
+
+    @property
+    def degraded(self) -> bool:
+        return bool(self._reasons)
+
+    @property
+    def reasons(self) -> List[str]:
+        with self._lock:
+            return list(self._reasons)
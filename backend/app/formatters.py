@@ -1,6 +1,22 @@
 """Formateurs de réponse pour les sorties des outils MCP."""
 from typing import Dict
 
+from .reverse_geocoder import reverse_lookup
+
+def _format_station_access(station: Dict) -> str:
+    """Ligne temps de trajet / distance d'une station, vide si inconnue."""
+    if station.get("drive_time_minutes") is not None:
+        return f"   🚗 À {station['drive_time_minutes']:.0f} min en voiture\n"
+    if station.get("distance_km") is not None:
+        return f"   📏 À {station['distance_km']:.1f} km\n"
+    return ""
+
+
+def _position_label(coords) -> str:
+    """Libellé lisible d'une position (lat, lon), sans appel réseau."""
+    return reverse_lookup(coords[0], coords[1])["label"]
+
+
 def format_fuel_results(mcp_result: Dict) -> str:
     """Formate les résultats MCP carburant pour le LLM."""
     tool = mcp_result.get("tool")
@@ -22,8 +38,9 @@ def format_fuel_results(mcp_result: Dict) -> str:
             out += (
                 f"{i}. {s['adresse']}, {s['ville']} ({s['cp']})\n"
                 f"   💰 {s['price']:.3f} €/L\n"
-                f"   🕒 {s['updated']}\n\n"
+                f"   🕒 {s['updated']}\n"
             )
+            out += _format_station_access(s) + "\n"
         return out
 
     if tool == "search_fuel_prices":
@@ -39,8 +56,9 @@ def format_fuel_results(mcp_result: Dict) -> str:
         for i, s in enumerate(stations[:5], 1):
             out += (
                 f"{i}. {s['adresse']}, {s['ville']} ({s['cp']})\n"
-                f"   💰 {s['price']:.3f} €/L\n\n"
+                f"   💰 {s['price']:.3f} €/L\n"
             )
+            out += _format_station_access(s) + "\n"
         return out
 
     if tool == "get_fuel_stats":
@@ -88,6 +106,8 @@ def format_traffic_results(mcp_result: Dict) -> str:
     updated = data.get("updated", "maintenant")
 
     if not roads:
+        if data.get("district"):
+            return f"🟢 {summary} (mis à jour à {updated})"
         return f"🟢 {summary} à Rennes (mis à jour à {updated})"
 
     txt = f"🚦 État du trafic Rennes - {summary} ({updated}):\n\n"
@@ -147,9 +167,13 @@ def format_parking_results(mcp_result: Dict) -> str:
     for p in parkings[:10]:
         txt += f"• {p['name']}\n"
         txt += f"  {p['status']} - {p['available']}/{p['total']} places\n"
-        if p.get('distance_km') is not None:
+        if p.get('drive_time_minutes') is not None:
+            txt += f"  🚗 À {p['drive_time_minutes']:.0f} min en voiture ({p['drive_distance_km']:.1f} km)\n"
+        elif p.get('distance_km') is not None:
             txt += f"  📏 À {p['distance_km']:.1f} km\n"
-        if p.get('location'):
+        if p.get('area'):
+            txt += f"  📍 {p['area']}\n"
+        elif p.get('location'):
             txt += f"  📍 {p['location']}\n"
         pricing = p.get('pricing')
         if pricing:
@@ -178,8 +202,13 @@ def format_drive_time_results(mcp_result: Dict) -> str:
     duration_est = data.get("duration_estimated_minutes", 0)
     affected = data.get("affected_roads", [])
     warning = data.get("warning")
+    departure = data.get("departure_time")
 
     txt = f"🚗 Estimation temps de trajet:\n\n"
+    if len(origin) == 2 and len(destination) == 2:
+        txt += f"  🧭 {_position_label(origin)} → {_position_label(destination)}\n"
+    if departure:
+        txt += f"  🕗 Départ prévu: {departure} (prévision d'après l'historique du trafic)\n"
     txt += f"  📍 Distance: {distance_km} km\n"
     txt += f"  ⏱️ Temps sans trafic: {duration_base:.0f}min\n"
 
@@ -201,5 +230,67 @@ def format_drive_time_results(mcp_result: Dict) -> str:
             txt += f"\n⚠️ {warning}"
     else:
         txt += f"  ✅ Estimation: {duration_est:.0f}min (pas de perturbations)\n"
+        if departure and warning:
+            txt += f"\n⚠️ {warning}"
+
+    return txt
+
+
+def format_best_departure_results(mcp_result: Dict) -> str:
+    """Formate la recommandation d'heure de départ."""
+    data = mcp_result.get("result", {})
+
+    if not data.get("success"):
+        return f"❌ Erreur estimation: {data.get('error', 'Erreur inconnue')}"
+
+    slots = data.get("slots", [])
+    best = data.get("best_departure", "?")
+    best_duration = data.get("best_duration_minutes", 0)
+    worst = data.get("worst_departure", "?")
+    worst_duration = data.get("worst_duration_minutes", 0)
+    warning = data.get("warning")
+
+    txt = f"🕗 Meilleure heure de départ:\n\n"
+    txt += f"  📍 Distance: {data.get('distance_km', 0)} km\n"
+    if slots:
+        txt += f"  🔎 Départs évalués: {slots[0]['departure']} → {slots[-1]['departure']} ({len(slots)} créneaux)\n"
+    txt += f"  ✅ Partir à {best}: {best_duration:.0f}min\n"
+
+    if worst_duration > best_duration:
+        txt += f"  ⚠️ À éviter: {worst} ({worst_duration:.0f}min)\n"
+
+    if warning:
+        txt += f"\n⚠️ {warning}"
+
+    return txt
+
+
+def format_reachable_results(mcp_result: Dict) -> str:
+    """Formate les lieux atteignables en N minutes."""
+    data = mcp_result.get("result", {})
+
+    if not data.get("success"):
+        return f"❌ Erreur: {data.get('error', 'Erreur inconnue')}"
 
+    places = data.get("places", [])
+    minutes = data.get("minutes", 0)
+    origin = data.get("origin_name", "ma position")
+    if origin == "ma position" and data.get("origin"):
+        origin = f"ma position ({_position_label(data['origin'])})"
+
+    if not places:
+        return f"Aucun lieu trouvé à moins de {minutes:.0f} min en voiture depuis {origin}"
+
+    txt = f"🧭 {len(places)} lieu(x) à moins de {minutes:.0f} min depuis {origin} (zone de {data.get('area_km2', 0)} km²):\n\n"
+    for p in places[:10]:
+        icon = "🅿️" if p.get("type") == "parking" else "⛽"
+        txt += f"{icon} {p.get('name', '?')}\n"
+        if p.get("drive_time_minutes") is not None:
+            txt += f"  🚗 {p['drive_time_minutes']:.0f} min en voiture\n"
+        if p.get("type") == "parking":
+            txt += f"  {p.get('status', '')} - {p.get('available', 0)}/{p.get('total', 0)} places\n"
+        elif p.get("price") is not None:
+            txt += f"  💰 {p['fuel_type']}: {p['price']:.3f} €/L\n"
+    if len(places) > 10:
+        txt += f"\n... et {len(places) - 10} autres"
     return txt
@@ -0,0 +1,306 @@
+"""
+Gazetteer d'adresses (Base Adresse Nationale) pour l'Ille-et-Vilaine
+Complète RENNES_LOCATIONS avec les voies et numéros d'un export CSV BAN
+(https://adresse.data.gouv.fr/data/ban/adresses/latest/csv/adresses-35.csv.gz).
+
+Format sur disque (un répertoire de fichiers .npy, ouverts en mmap) :
+- table de chaînes triée des voies normalisées ("rue de la paix rennes"),
+  stockée en un bloc d'octets + offsets : recherche binaire et par préfixe
+- libellés d'affichage, centroïdes des voies (float32)
+- adresses regroupées par voie (indptr), numéro et coordonnées (float32)
+
+Seules les pages lues sont chargées en mémoire : le démarrage est immédiat
+et la RSS reste faible même avec des centaines de milliers d'adresses.
+
+Conversion hors-ligne :
+    python -m backend.app.gazetteer adresses-35.csv cache/gazetteer
+"""
+
+import csv
+import os
+import sys
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .config import GAZETTEER_DEFAULT_COMMUNE, GAZETTEER_FUZZY_WINDOW, GAZETTEER_PATH
+
+_ARRAYS = (
+    "key_blob", "key_offsets", "label_blob", "label_offsets",
+    "street_lat", "street_lon", "addr_indptr", "addr_number", "addr_lat", "addr_lon",
+)
+
+
+def normalize_name(text: str) -> str:
+    """Minuscule, sans accents, ponctuation remplacée par des espaces"""
+    text = unicodedata.normalize('NFD', text.lower())
+    text = ''.join(c for c in text if unicodedata.category(c) != 'Mn')
+    return ' '.join(''.join(c if c.isalnum() else ' ' for c in text).split())
+
+
+class StringTable:
+    """Séquence de chaînes stockée en un bloc UTF-8 + offsets (compatible bisect)"""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+        # Accès élément par élément sans passer par les scalaires NumPy
+        self._blob = memoryview(blob).cast("B") if len(blob) else memoryview(b"")
+        self._offsets = memoryview(np.ascontiguousarray(offsets, dtype=np.uint32)).cast("B").cast("I")
+
+    @classmethod
+    def from_strings(cls, strings: Iterable[str]) -> "StringTable":
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.uint32)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return cls(np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx: int) -> str:
+        return str(self._blob[self._offsets[idx]:self._offsets[idx + 1]], "utf-8")
+
+
+class Gazetteer:
+    """
+    Index des voies et adresses d'un export BAN.
+
+    Les voies sont identifiées par leur clé normalisée "voie commune". Une
+    requête "12 rue de la paix" est résolue par recherche binaire sur la
+    clé, puis par le numéro dans les adresses de la voie.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.keys = StringTable(arrays["key_blob"], arrays["key_offsets"])
+        self.labels = StringTable(arrays["label_blob"], arrays["label_offsets"])
+        self.street_lat = arrays["street_lat"]
+        self.street_lon = arrays["street_lon"]
+        self.addr_indptr = arrays["addr_indptr"]
+        self.addr_number = arrays["addr_number"]
+        self.addr_lat = arrays["addr_lat"]
+        self.addr_lon = arrays["addr_lon"]
+        self.default_commune = GAZETTEER_DEFAULT_COMMUNE
+
+    @property
+    def street_count(self) -> int:
+        return len(self.keys)
+
+    @property
+    def address_count(self) -> int:
+        return len(self.addr_number)
+
+    # ------------------------------------------------------------------
+    # CONSTRUCTION / PERSISTANCE
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_ban_csv(cls, path: str) -> "Gazetteer":
+        """Construit l'index depuis un CSV BAN (séparateur ';')"""
+        streets = defaultdict(list)  # (clé, libellé) -> [(numéro, lat, lon)]
+        with open(path, encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f, delimiter=";"):
+                try:
+                    number = int(row.get("numero") or 0)
+                    lat, lon = float(row["lat"]), float(row["lon"])
+                except (KeyError, ValueError):
+                    continue
+                street, commune = row.get("nom_voie", ""), row.get("nom_commune", "")
+                key = normalize_name(f"{street} {commune}")
+                if not key:
+                    continue
+                label = f"{street}, {row.get('code_postal', '')} {commune}".replace(",  ", ", ")
+                streets[(key, label)].append((number, lat, lon))
+        return cls.from_streets(streets)
+
+    @classmethod
+    def from_streets(cls, streets: Dict[tuple, List[tuple]]) -> "Gazetteer":
+        """Construit l'index depuis {(clé normalisée, libellé): [(numéro, lat, lon)]}"""
+        ordered = sorted(streets.items(), key=lambda item: item[0][0])
+        # Une seule entrée par clé (deux voies homonymes d'une commune fusionnées)
+        merged: Dict[str, tuple] = {}
+        for (key, label), addresses in ordered:
+            merged.setdefault(key, (label, []))[1].extend(addresses)
+
+        keys = list(merged)
+        addr_indptr = np.zeros(len(keys) + 1, dtype=np.uint32)
+        numbers, lats, lons = [], [], []
+        street_lat = np.empty(len(keys), dtype=np.float32)
+        street_lon = np.empty(len(keys), dtype=np.float32)
+        for i, key in enumerate(keys):
+            addresses = sorted(merged[key][1])
+            block = np.array(addresses, dtype=np.float64).reshape(-1, 3)
+            street_lat[i], street_lon[i] = block[:, 1].mean(), block[:, 2].mean()
+            numbers.extend(int(n) for n, _, _ in addresses)
+            lats.extend(block[:, 1])
+            lons.extend(block[:, 2])
+            addr_indptr[i + 1] = len(numbers)
+
+        key_table = StringTable.from_strings(keys)
+        label_table = StringTable.from_strings(merged[key][0] for key in keys)
+        return cls({
+            "key_blob": key_table.blob, "key_offsets": key_table.offsets,
+            "label_blob": label_table.blob, "label_offsets": label_table.offsets,
+            "street_lat": street_lat, "street_lon": street_lon,
+            "addr_indptr": addr_indptr,
+            "addr_number": np.array(numbers, dtype=np.uint32),
+            "addr_lat": np.array(lats, dtype=np.float32),
+            "addr_lon": np.array(lons, dtype=np.float32),
+        })
+
+    @classmethod
+    def load(cls, path: str) -> "Gazetteer":
+        """Ouvre un gazetteer sauvegardé, fichiers projetés en mémoire (mmap)"""
+        return cls({name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in _ARRAYS})
+
+    @classmethod
+    def load_default(cls) -> Optional["Gazetteer"]:
+        """Charge le gazetteer configuré (GAZETTEER_PATH), None s'il est absent"""
+        if not GAZETTEER_PATH or not os.path.isdir(GAZETTEER_PATH):
+            return None
+        try:
+            gazetteer = cls.load(GAZETTEER_PATH)
+            print(f"[Gazetteer] {gazetteer.street_count} voies, {gazetteer.address_count} adresses")
+            return gazetteer
+        except Exception as e:
+            print("[Warning] Erreur lecture gazetteer:", e)
+            return None
+
+    def save(self, path: str) -> None:
+        os.makedirs(path, exist_ok=True)
+        arrays = {
+            "key_blob": self.keys.blob, "key_offsets": self.keys.offsets,
+            "label_blob": self.labels.blob, "label_offsets": self.labels.offsets,
+            "street_lat": self.street_lat, "street_lon": self.street_lon,
+            "addr_indptr": self.addr_indptr, "addr_number": self.addr_number,
+            "addr_lat": self.addr_lat, "addr_lon": self.addr_lon,
+        }
+        for name in _ARRAYS:
+            np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(arrays[name]))
+
+    # ------------------------------------------------------------------
+    # REQUÊTES
+    # ------------------------------------------------------------------
+
+    def find(self, name: str, fuzzy_cutoff: Optional[float] = None) -> Optional[Dict]:
+        """
+        Résout une adresse ("12 rue de la paix", "rue de la paix bruz")
+
+        Args:
+            name: Adresse saisie (casse, accents et ponctuation ignorés)
+            fuzzy_cutoff: Si fourni, tolère les fautes de frappe (similarité min.)
+
+        Returns:
+            {"label", "lat", "lon", "number"} ou None si aucune voie ne correspond
+        """
+        number, text = _split_number(normalize_name(name))
+        if not text:
+            return None
+
+        street = self._find_street(text)
+        if street is None and fuzzy_cutoff is not None:
+            street = self._find_street_fuzzy(text, fuzzy_cutoff)
+        if street is None:
+            return None
+        return self._result(street, number)
+
+    def prefix_range(self, prefix: str) -> tuple:
+        """Intervalle [lo, hi) des voies dont la clé commence par `prefix`"""
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + "\uffff", lo)
+        return lo, hi
+
+    def suggest(self, prefix: str, limit: int = 5) -> List[Dict]:
+        """Voies dont la clé commence par `prefix` (ordre alphabétique)"""
+        number, text = _split_number(normalize_name(prefix))
+        if not text:
+            return []
+        lo, hi = self.prefix_range(text)
+        return [self._result(i, number) for i in range(lo, min(hi, lo + limit))]
+
+    def address(self, idx: int) -> Dict:
+        """Adresse n° `idx` (ordre des tableaux addr_*), même format que find()"""
+        street = int(np.searchsorted(self.addr_indptr, idx, side="right")) - 1
+        number = int(self.addr_number[idx]) or None
+        label = self.labels[street]
+        return {
+            "label": f"{number} {label}" if number else label,
+            "lat": float(self.addr_lat[idx]),
+            "lon": float(self.addr_lon[idx]),
+            "number": number,
+        }
+
+    def _find_street(self, text: str) -> Optional[int]:
+        lo = bisect_left(self.keys, text)
+        if lo < self.street_count and self.keys[lo] == text:
+            return lo
+
+        # "rue de la paix" : voie complète (suivie du nom de commune), de
+        # préférence dans la commune par défaut
+        best = None
+        for i in range(lo, min(self.street_count, lo + GAZETTEER_FUZZY_WINDOW)):
+            key = self.keys[i]
+            if not key.startswith(text):
+                break
+            if key[len(text)] != " ":
+                continue
+            if key[len(text) + 1:] == self.default_commune:
+                return i
+            if best is None:
+                best = i
+        return best
+
+    def _find_street_fuzzy(self, text: str, cutoff: float) -> Optional[int]:
+        # Les clés proches de la requête sont voisines dans l'ordre trié :
+        # seule une fenêtre autour du point d'insertion est comparée
+        pos = bisect_left(self.keys, text)
+        lo = max(0, pos - GAZETTEER_FUZZY_WINDOW)
+        hi = min(self.street_count, pos + GAZETTEER_FUZZY_WINDOW)
+
+        matcher = SequenceMatcher()
+        matcher.set_seq2(text)
+        best, best_score = None, cutoff
+        for i in range(lo, hi):
+            # Comparaison avec le début de clé : le nom de commune est facultatif
+            matcher.set_seq1(self.keys[i][:len(text)])
+            if matcher.real_quick_ratio() < best_score or matcher.quick_ratio() < best_score:
+                continue
+            score = matcher.ratio()
+            if score > best_score or (score == best_score and best is None):
+                best, best_score = i, score
+        return best
+
+    def _result(self, street: int, number: Optional[int]) -> Dict:
+        lat, lon = float(self.street_lat[street]), float(self.street_lon[street])
+        label = self.labels[street]
+        if number:
+            start, end = int(self.addr_indptr[street]), int(self.addr_indptr[street + 1])
+            numbers = self.addr_number[start:end]
+            idx = start + int(np.searchsorted(numbers, number))
+            if idx < end and self.addr_number[idx] == number:
+                lat, lon = float(self.addr_lat[idx]), float(self.addr_lon[idx])
+                label = f"{number} {label}"
+            else:
+                number = None  # numéro absent : centroïde de la voie
+        return {"label": label, "lat": lat, "lon": lon, "number": number or None}
+
+
+def _split_number(text: str) -> tuple:
+    """'12 rue de la paix' -> (12, 'rue de la paix')"""
+    head, _, tail = text.partition(" ")
+    if head.isdigit() and tail:
+        return int(head), tail
+    return None, text
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m backend.app.gazetteer <adresses-35.csv> <répertoire de sortie>")
+        sys.exit(1)
+    gazetteer = Gazetteer.from_ban_csv(sys.argv[1])
+    gazetteer.save(sys.argv[2])
+    print(f"[Success] Gazetteer enregistré: {gazetteer.street_count} voies, {gazetteer.address_count} adresses")
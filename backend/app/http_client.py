@@ -0,0 +1,410 @@
+"""
+Client HTTP sortant des scrapers (Opendatasoft, OSRM, roulez-eco, Nominatim) et du LLM
+
+- Une session par hôte : les connexions keep-alive (HTTP_POOL_MAXSIZE par
+  hôte) sont réutilisées au lieu d'une poignée de main TCP+TLS par appel.
+- Reprises à attente croissante sur erreur de connexion ou 502/503/504, pour
+  les GET seulement (un POST n'est jamais rejoué).
+- Disjoncteur par hôte : après HTTP_BREAKER_FAILURES échecs consécutifs
+  (erreur de connexion ou réponse 5xx), les appels échouent aussitôt (CircuitOpenError, une ConnectionError : les
+  scrapers servent leur repli) pendant HTTP_BREAKER_RESET_S, puis une
+  requête d'essai décide de la refermeture. Un délai de lecture dépassé
+  (toujours levé en ReadTimeout) ne compte pas : le timeout vient souvent de
+  l'échéance raccourcie de l'appelant, pas d'une panne de l'hôte.
+- Requêtes doublées (hedged requests) : un GET encore sans réponse au-delà du
+  p95 observé pour son hôte est relancé une fois, et la première réponse
+  l'emporte. Les doublons sont plafonnés par un budget (HEDGE_BUDGET_RATIO des
+  requêtes, HEDGE_BUDGET_BURST d'avance) pour ne pas amplifier la charge d'un
+  service déjà ralenti. Tentatives initiales et doublons ont chacun leur pool
+  de threads borné, sans file d'attente : pool plein, le GET part directement
+  sur le thread de l'appelant (ou le doublon n'est pas envoyé) au lieu
+  d'attendre un thread libre.
+
+Les métriques par hôte donnent le taux de réutilisation des connexions, la
+durée moyenne d'établissement (handshake), l'état du disjoncteur, et
+comparent la latence de la première tentative (ce qu'on aurait attendu sans
+doublon) à celle servie.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Deque, Dict, Optional
+from urllib.parse import urlsplit
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ReadTimeoutError
+from urllib3.util.retry import Retry
+
+from .config import (
+    HEDGE_BUDGET_BURST,
+    HEDGE_BUDGET_RATIO,
+    HEDGE_MAX_PRIMARIES,
+    HEDGE_MAX_WORKERS,
+    HEDGE_MIN_DELAY_S,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_WINDOW,
+    HTTP_BREAKER_FAILURES,
+    HTTP_BREAKER_RESET_S,
+    HTTP_HEDGING_ENABLED,
+    HTTP_POOL_MAXSIZE,
+    HTTP_RETRIES,
+    HTTP_RETRY_BACKOFF_S,
+)
+
+RETRY_STATUSES = (502, 503, 504)
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Hôte en échec répété : appel refusé sans requête réseau"""
+
+
+class CircuitBreaker:
+    """Disjoncteur d'un hôte : closed -> open (échecs répétés) -> half_open (essai) -> closed"""
+
+    def __init__(self, host: str, max_failures: int = HTTP_BREAKER_FAILURES, reset_s: float = HTTP_BREAKER_RESET_S):
+        self.host = host
+        self.max_failures = max_failures
+        self.reset_s = reset_s
+        self.state = "closed"
+        self.failures = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_request(self) -> None:
+        """Lève CircuitOpenError si l'hôte est en panne ; laisse passer une requête d'essai après reset_s"""
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_s:
+                self.state = "half_open"
+                return
+            if self.state != "closed":
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.host} indisponible (disjoncteur ouvert)")
+
+    def release(self) -> None:
+        """Issue non concluante (délai de l'appelant) : ni succès ni échec ; un essai en cours est rendu"""
+        with self._lock:
+            if self.state == "half_open":
+                # _opened_at inchangé : la requête suivante refait un essai
+                self.state = "open"
+
+    def record(self, success: bool) -> None:
+        with self._lock:
+            if success:
+                self.state = "closed"
+                self.failures = 0
+                return
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.max_failures:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+def _timed_pool(pool_cls: type, stats: "_HostStats") -> type:
+    """Pool urllib3 dont les connexions comptent leur établissement (TCP + TLS)"""
+
+    class TimedConnection(pool_cls.ConnectionCls):
+        def connect(self):
+            start = time.perf_counter()
+            super().connect()
+            stats.connected(time.perf_counter() - start)
+
+    return type(pool_cls.__name__, (pool_cls,), {"ConnectionCls": TimedConnection})
+
+
+class _PooledAdapter(HTTPAdapter):
+    """HTTPAdapter dont les nouvelles connexions sont mesurées"""
+
+    def __init__(self, stats: "_HostStats", **kwargs: Any):
+        self._stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _timed_pool(HTTPConnectionPool, self._stats),
+            "https": _timed_pool(HTTPSConnectionPool, self._stats),
+        }
+
+
+def _is_read_timeout(error: requests.exceptions.RequestException) -> bool:
+    """Délai de lecture dépassé, y compris enveloppé par Retry (MaxRetryError -> ConnectionError)"""
+    if isinstance(error, requests.exceptions.ReadTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, ReadTimeoutError)
+
+
+def _percentile_ms(values: Deque[float], q: float) -> Optional[float]:
+    return round(float(np.percentile(values, q)) * 1000, 1) if values else None
+
+
+class _HostStats:
+    """Session, disjoncteur, latences récentes et compteurs d'un hôte"""
+
+    def __init__(self, host: str, window: int, breaker: CircuitBreaker):
+        self.host = host
+        self.breaker = breaker
+        self.session: Optional[requests.Session] = None
+        self.attempts: Deque[float] = deque(maxlen=window)  # Toutes les tentatives (p95)
+        self.primary: Deque[float] = deque(maxlen=window)  # Tentative initiale seule
+        self.delivered: Deque[float] = deque(maxlen=window)  # Attente de l'appelant
+        self.requests = 0
+        self.sent = 0
+        self.connections = 0
+        self.handshake_s = 0.0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+
+    def connected(self, elapsed: float) -> None:
+        with self._lock:
+            self.connections += 1
+            self.handshake_s += elapsed
+
+
+class HTTPClient:
+    """Sessions par hôte avec reprises, disjoncteurs et GET doublés dans un budget."""
+
+    def __init__(
+        self,
+        hedging: bool = HTTP_HEDGING_ENABLED,
+        budget_ratio: float = HEDGE_BUDGET_RATIO,
+        budget_burst: float = HEDGE_BUDGET_BURST,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+        window: int = HEDGE_WINDOW,
+        min_delay_s: float = HEDGE_MIN_DELAY_S,
+        max_workers: int = HEDGE_MAX_WORKERS,
+        max_primaries: int = HEDGE_MAX_PRIMARIES,
+        pool_maxsize: int = HTTP_POOL_MAXSIZE,
+        retries: int = HTTP_RETRIES,
+        retry_backoff_s: float = HTTP_RETRY_BACKOFF_S,
+        breaker_failures: int = HTTP_BREAKER_FAILURES,
+        breaker_reset_s: float = HTTP_BREAKER_RESET_S,
+    ):
+        self.hedging = hedging
+        self.budget_ratio = budget_ratio
+        self.budget_burst = budget_burst
+        self.min_samples = min_samples
+        self.window = window
+        self.min_delay_s = min_delay_s
+        self.pool_maxsize = pool_maxsize
+        self.retries = retries
+        self.retry_backoff_s = retry_backoff_s
+        self.breaker_failures = breaker_failures
+        self.breaker_reset_s = breaker_reset_s
+        # Un emplacement libre garantit un thread libre : aucune tâche n'attend dans la file
+        self._primary_pool = ThreadPoolExecutor(max_workers=max_primaries, thread_name_prefix="http-primary")
+        self._primary_slots = threading.BoundedSemaphore(max_primaries)
+        self._hedge_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="http-hedge")
+        self._hedge_slots = threading.BoundedSemaphore(max_workers)
+        self._hosts: Dict[str, _HostStats] = {}
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, url: str, hedge: bool = True, **kwargs: Any) -> requests.Response:
+        """
+        GET (arguments de requests), doublé si la réponse tarde.
+
+        Args:
+            hedge: False pour les services qui limitent le débit (Nominatim)
+
+        Les exceptions de requests sont propagées ; avec un doublon, seule
+        une double erreur est levée (celle de la première tentative).
+        """
+        stats = self._stats(url)
+        start = time.perf_counter()
+        with self._lock:
+            stats.requests += 1
+            # Chaque requête crédite une fraction de doublon
+            self._tokens = min(self.budget_burst, self._tokens + self.budget_ratio)
+            delay = self._hedge_delay(stats) if hedge and self.hedging else None
+
+        primary = None
+        if delay is not None:
+            primary = self._submit(self._primary_pool, self._primary_slots, stats, url, kwargs, True)
+        if primary is None:
+            response = self._attempt(stats, "GET", url, kwargs, primary=True)
+            self._delivered(stats, start)
+            return response
+
+        done, _ = wait([primary], timeout=delay)
+        duplicate = None if done else self._hedge(stats, url, kwargs)
+        if duplicate is None:
+            response = primary.result()
+            self._delivered(stats, start)
+            return response
+
+        response = self._first_success(stats, primary, duplicate)
+        self._delivered(stats, start)
+        return response
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        """POST (arguments de requests) : connexion réutilisée, disjoncteur, ni reprise ni doublon"""
+        stats = self._stats(url)
+        start = time.perf_counter()
+        with self._lock:
+            stats.requests += 1
+        response = self._attempt(stats, "POST", url, kwargs, primary=True)
+        self._delivered(stats, start)
+        return response
+
+    def close(self) -> None:
+        with self._lock:
+            sessions = [stats.session for stats in self._hosts.values()]
+        for session in sessions:
+            session.close()
+
+    def _submit(
+        self, pool: ThreadPoolExecutor, slots: threading.BoundedSemaphore,
+        stats: _HostStats, url: str, kwargs: Dict[str, Any], primary: bool,
+    ) -> Optional[Future]:
+        """Lance une tentative GET sur un thread du pool, None si tous sont occupés"""
+        if not slots.acquire(blocking=False):
+            return None
+        future = pool.submit(self._attempt, stats, "GET", url, kwargs, primary)
+        future.add_done_callback(lambda _: slots.release())
+        return future
+
+    def _hedge(self, stats: _HostStats, url: str, kwargs: Dict[str, Any]) -> Optional[Future]:
+        """Envoie le doublon si le budget et le pool le permettent"""
+        if not self._take_token():
+            return None
+        duplicate = self._submit(self._hedge_pool, self._hedge_slots, stats, url, kwargs, False)
+        with self._lock:
+            if duplicate is None:
+                self._tokens += 1.0  # Doublon non envoyé : jeton rendu
+            else:
+                stats.hedged += 1
+        return duplicate
+
+    def _first_success(self, stats: _HostStats, primary: Future, duplicate: Future) -> requests.Response:
+        pending = {primary, duplicate}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is duplicate:
+                        with self._lock:
+                            stats.hedge_wins += 1
+                    return future.result()
+        raise primary.exception()
+
+    def _attempt(
+        self, stats: _HostStats, method: str, url: str, kwargs: Dict[str, Any], primary: bool
+    ) -> requests.Response:
+        stats.breaker.before_request()
+        start = time.perf_counter()
+        try:
+            response = stats.session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException as e:
+            if not _is_read_timeout(e):
+                stats.breaker.record(False)
+                raise
+            # Délai de lecture (souvent borné par l'échéance de l'appelant) : pas une panne de l'hôte
+            stats.breaker.release()
+            if isinstance(e, requests.exceptions.Timeout):
+                raise
+            raise requests.exceptions.ReadTimeout(e, request=e.request) from e
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                stats.sent += 1
+                stats.attempts.append(elapsed)
+                if primary:
+                    stats.primary.append(elapsed)
+        stats.breaker.record(response.status_code < 500)
+        return response
+
+    def _delivered(self, stats: _HostStats, start: float) -> None:
+        with self._lock:
+            stats.delivered.append(time.perf_counter() - start)
+
+    def _hedge_delay(self, stats: _HostStats) -> Optional[float]:
+        """Délai avant doublon (p95 de l'hôte), None si historique ou budget insuffisant"""
+        if len(stats.attempts) < self.min_samples or self._tokens < 1.0:
+            return None
+        return max(self.min_delay_s, float(np.percentile(stats.attempts, 95)))
+
+    def _take_token(self) -> bool:
+        with self._lock:
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+    def _stats(self, url: str) -> _HostStats:
+        host = urlsplit(url).netloc
+        with self._lock:
+            stats = self._hosts.get(host)
+            if stats is None:
+                breaker = CircuitBreaker(host, self.breaker_failures, self.breaker_reset_s)
+                stats = self._hosts[host] = _HostStats(host, self.window, breaker)
+                stats.session = self._new_session(stats)
+            return stats
+
+    def _new_session(self, stats: _HostStats) -> requests.Session:
+        retry = Retry(
+            total=self.retries,
+            read=0,  # Réponse lente : c'est au doublon d'y répondre, pas à une reprise
+            backoff_factor=self.retry_backoff_s,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET"}),
+            respect_retry_after_header=False,  # L'échéance de la requête prime
+            raise_on_status=False,
+        )
+        adapter = _PooledAdapter(stats, pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            hosts = {}
+            for host, stats in self._hosts.items():
+                p99_primary = _percentile_ms(stats.primary, 99)
+                p99_delivered = _percentile_ms(stats.delivered, 99)
+                hosts[host] = {
+                    "requests": stats.requests,
+                    "connections": stats.connections,
+                    "reuse_rate": round(max(0.0, 1 - stats.connections / stats.sent), 3) if stats.sent else 0.0,
+                    "avg_handshake_ms": (
+                        round(stats.handshake_s / stats.connections * 1000, 1) if stats.connections else None
+                    ),
+                    "breaker": {
+                        "state": stats.breaker.state,
+                        "consecutive_failures": stats.breaker.failures,
+                        "rejected": stats.breaker.rejected,
+                    },
+                    "hedged": stats.hedged,
+                    "hedge_rate": round(stats.hedged / stats.requests, 3) if stats.requests else 0.0,
+                    "hedge_wins": stats.hedge_wins,
+                    "p95_ms": _percentile_ms(stats.attempts, 95),
+                    "p99_primary_ms": p99_primary,
+                    "p99_delivered_ms": p99_delivered,
+                    "tail_saved_ms": (
+                        round(p99_primary - p99_delivered, 1)
+                        if p99_primary is not None and p99_delivered is not None else None
+                    ),
+                }
+            return {"hedging": self.hedging, "budget_tokens": round(self._tokens, 2), "hosts": hosts}
+
+
+# Client partagé par les scrapers et le service LLM
+client = HTTPClient()
+
+
+def get(url: str, hedge: bool = True, **kwargs: Any) -> requests.Response:
+    """GET via le client partagé (voir HTTPClient.get)"""
+    return client.get(url, hedge=hedge, **kwargs)
+
+
+def post(url: str, **kwargs: Any) -> requests.Response:
+    """POST via le client partagé (voir HTTPClient.post)"""
+    return client.post(url, **kwargs)
@@ -0,0 +1,368 @@
+"""
+Classifieur d'intentions NumPy : n-grammes de caractères hachés + softmax linéaire
+
+Alternative optionnelle à la détection par mots-clés (tool_detector.py),
+choisie par DETECTOR_BACKEND :
+- rules : ToolDetector seul (défaut)
+- classifier : le modèle décide toujours
+- auto : le modèle décide au-delà de INTENT_MIN_CONFIDENCE, sinon les règles
+
+Représentation : texte sans accents, n-grammes de caractères (INTENT_NGRAM_RANGE)
+hachés (FNV-1a, calculé par tableaux NumPy sur tout le lot) dans
+INTENT_HASH_FEATURES colonnes, poids 1 + log(tf), normalisés L2. Le modèle est
+une régression softmax (descente de gradient Adam, pénalité L2) ; la prédiction
+somme les lignes de poids des n-grammes présents, sans matrice dense.
+
+Entraînement / évaluation (corpus intent_corpus.py) :
+    python -m backend.app.intent_classifier train [cache/intent_model.npz]
+    python -m backend.app.intent_classifier evaluate
+"""
+
+import os
+import re
+import sys
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .config import (
+    DETECTOR_BACKEND,
+    INTENT_HASH_FEATURES,
+    INTENT_MIN_CONFIDENCE,
+    INTENT_MODEL_PATH,
+    INTENT_NGRAM_RANGE,
+)
+from .keyword_matcher import KeywordMatch
+from .normalized_message import NormalizedMessage, fold_text
+from .tool_detector import ToolDetector, merge_intents, split_clauses
+
+Message = Union[str, NormalizedMessage]
+
+_SEPARATORS = re.compile(r"[\W_]+")
+
+# FNV-1a 64 bits (déterministe, contrairement à hash() de Python)
+_FNV_OFFSET = np.uint64(0xCBF29CE484222325)
+_FNV_PRIME = np.uint64(0x100000001B3)
+
+
+class HashedNgrams(NamedTuple):
+    """Lot de messages en représentation creuse (triée par ligne puis colonne)"""
+    rows: np.ndarray    # indice du message
+    cols: np.ndarray    # colonne hachée
+    values: np.ndarray  # poids normalisé
+    n_rows: int
+
+    def row_starts(self) -> np.ndarray:
+        return np.searchsorted(self.rows, np.arange(self.n_rows))
+
+
+def _prepare(message: Message) -> str:
+    """Texte plié (minuscules, sans accents), mots séparés par une espace, bordé d'espaces"""
+    text = message.plain if isinstance(message, NormalizedMessage) else fold_text(message)
+    return " " + _SEPARATORS.sub(" ", text).strip() + " "
+
+
+def hash_ngrams(
+    messages: Sequence[Message],
+    n_features: int = INTENT_HASH_FEATURES,
+    ngram_range: Tuple[int, int] = INTENT_NGRAM_RANGE,
+) -> HashedNgrams:
+    """
+    N-grammes de caractères hachés de tout un lot, en quelques opérations vectorisées.
+
+    Les messages sont concaténés en un tableau de points de code ; les n-grammes
+    qui chevauchent deux messages sont écartés.
+    """
+    texts = [_prepare(m) for m in messages]
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    codes = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    owners = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+
+    # Hachage incrémental : le hachage des n-grammes prolonge celui des (n-1)-grammes
+    keys = []
+    h = np.full(len(codes), _FNV_OFFSET, dtype=np.uint64)
+    for n in range(1, min(ngram_range[1], len(codes)) + 1):
+        count = len(codes) - n + 1
+        h = (h[:count] ^ codes[n - 1:]) * _FNV_PRIME
+        if n < ngram_range[0]:
+            continue
+        inside = owners[:count] == owners[n - 1:]
+        mixed = h[inside]
+        mixed ^= mixed >> np.uint64(32)
+        keys.append(owners[:count][inside] * n_features + (mixed % np.uint64(n_features)).astype(np.int64))
+
+    keys, counts = np.unique(np.concatenate(keys) if keys else np.empty(0, np.int64), return_counts=True)
+    rows, cols = np.divmod(keys, n_features)
+    values = 1.0 + np.log(counts)
+    norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=len(texts)))
+    values /= norms[rows]
+    return HashedNgrams(rows, cols, values.astype(np.float32), len(texts))
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    logits = logits - logits.max(axis=1, keepdims=True)
+    np.exp(logits, out=logits)
+    logits /= logits.sum(axis=1, keepdims=True)
+    return logits
+
+
+class IntentClassifier:
+    """Régression softmax sur n-grammes hachés ; une classe par outil, plus None (hors sujet)."""
+
+    def __init__(
+        self,
+        labels: Sequence[Optional[str]],
+        weights: np.ndarray,
+        bias: np.ndarray,
+        ngram_range: Tuple[int, int] = INTENT_NGRAM_RANGE,
+    ):
+        self.labels = list(labels)
+        self.weights = np.asarray(weights, dtype=np.float32)  # (n_features, n_classes)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.n_features = self.weights.shape[0]
+        self.ngram_range = tuple(int(n) for n in ngram_range)
+
+    # ------------------------------------------------------------------
+    # ENTRAÎNEMENT
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def train(
+        cls,
+        messages: Sequence[Message],
+        tools: Sequence[Optional[str]],
+        n_features: int = INTENT_HASH_FEATURES,
+        ngram_range: Tuple[int, int] = INTENT_NGRAM_RANGE,
+        epochs: int = 300,
+        learning_rate: float = 0.05,
+        l2: float = 1e-4,
+    ) -> "IntentClassifier":
+        """
+        Entraîne le modèle sur des messages étiquetés (outil attendu, None si aucun).
+
+        Seules les colonnes présentes dans le corpus sont optimisées (matrice
+        dense messages x n-grammes actifs) ; les autres gardent un poids nul.
+        """
+        labels = list(dict.fromkeys(tools))
+        targets = np.array([labels.index(tool) for tool in tools])
+        features = hash_ngrams(messages, n_features, ngram_range)
+
+        active, columns = np.unique(features.cols, return_inverse=True)
+        x = np.zeros((features.n_rows, len(active)), dtype=np.float32)
+        x[features.rows, columns] = features.values
+        y = np.zeros((features.n_rows, len(labels)), dtype=np.float32)
+        y[np.arange(features.n_rows), targets] = 1.0
+
+        # Adam sur (poids actifs, biais)
+        params = [np.zeros((len(active), len(labels)), dtype=np.float32), np.zeros(len(labels), dtype=np.float32)]
+        moments = [np.zeros_like(p) for p in params]
+        velocities = [np.zeros_like(p) for p in params]
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        for step in range(1, epochs + 1):
+            error = (_softmax(x @ params[0] + params[1]) - y) / features.n_rows
+            grads = [x.T @ error + l2 * params[0], error.sum(axis=0)]
+            for p, g, m, v in zip(params, grads, moments, velocities):
+                m *= beta1
+                m += (1 - beta1) * g
+                v *= beta2
+                v += (1 - beta2) * g * g
+                p -= learning_rate * (m / (1 - beta1 ** step)) / (np.sqrt(v / (1 - beta2 ** step)) + eps)
+
+        weights = np.zeros((n_features, len(labels)), dtype=np.float32)
+        weights[active] = params[0]
+        return cls(labels, weights, params[1], ngram_range)
+
+    # ------------------------------------------------------------------
+    # PRÉDICTION
+    # ------------------------------------------------------------------
+
+    def predict_proba(self, messages: Sequence[Message]) -> np.ndarray:
+        """Probabilités (n_messages, n_classes), colonnes dans l'ordre de self.labels"""
+        if not len(messages):
+            return np.empty((0, len(self.labels)), dtype=np.float32)
+        features = hash_ngrams(messages, self.n_features, self.ngram_range)
+        contributions = self.weights[features.cols] * features.values[:, None]
+        logits = np.add.reduceat(contributions, features.row_starts(), axis=0) + self.bias
+        return _softmax(logits)
+
+    def predict(self, messages: Sequence[Message]) -> List[Tuple[Optional[str], float]]:
+        """(outil, confiance) pour chaque message du lot"""
+        proba = self.predict_proba(messages)
+        best = proba.argmax(axis=1)
+        return [(self.labels[i], float(p)) for i, p in zip(best, proba[np.arange(len(best)), best])]
+
+    def classify(self, message: Message) -> Tuple[Optional[str], float]:
+        return self.predict([message])[0]
+
+    # ------------------------------------------------------------------
+    # PERSISTANCE
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def load(cls, path: str) -> "IntentClassifier":
+        with np.load(path) as data:
+            labels = [str(label) or None for label in data["labels"]]
+            return cls(labels, data["weights"], data["bias"], tuple(data["ngram_range"]))
+
+    @classmethod
+    def load_default(cls) -> Optional["IntentClassifier"]:
+        """Charge le modèle configuré (INTENT_MODEL_PATH), None s'il est absent"""
+        if not INTENT_MODEL_PATH or not os.path.exists(INTENT_MODEL_PATH):
+            return None
+        try:
+            model = cls.load(INTENT_MODEL_PATH)
+            print(f"[Detector] Classifieur chargé: {len(model.labels)} classes, {model.n_features} n-grammes hachés")
+            return model
+        except Exception as e:
+            print("[Warning] Erreur lecture classifieur d'intentions:", e)
+            return None
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez_compressed(
+            path,
+            labels=np.array([label or "" for label in self.labels]),
+            weights=self.weights,
+            bias=self.bias,
+            ngram_range=np.array(self.ngram_range),
+        )
+
+
+class ClassifierToolDetector:
+    """
+    Détecteur à base de classifieur, même interface que ToolDetector.
+
+    Avec fallback=True (mode auto), une prédiction sous min_confidence est
+    remplacée par la détection par règles. detect_all (catégories de
+    mots-clés) reste fourni par les règles.
+    """
+
+    def __init__(
+        self,
+        classifier: IntentClassifier,
+        rules: Optional[ToolDetector] = None,
+        min_confidence: float = INTENT_MIN_CONFIDENCE,
+        fallback: bool = True,
+    ):
+        self.classifier = classifier
+        self.rules = rules or ToolDetector()
+        self.min_confidence = min_confidence
+        self.fallback = fallback
+
+    def detect(self, message: Message) -> Optional[str]:
+        return self.detect_batch([message])[0]
+
+    def detect_batch(self, messages: Sequence[Message]) -> List[Optional[str]]:
+        """Outil de chaque message, classifiés en un seul lot"""
+        return [
+            self.rules.detect(message) if self.fallback and confidence < self.min_confidence else tool
+            for message, (tool, confidence) in zip(messages, self.classifier.predict(messages))
+        ]
+
+    def detect_all(self, message: Message) -> Dict[str, List[KeywordMatch]]:
+        return self.rules.detect_all(message)
+
+    def detect_intents(self, message: Message) -> List[Tuple[str, NormalizedMessage]]:
+        """Comme ToolDetector.detect_intents, message entier et propositions classés en un lot"""
+        message = NormalizedMessage.of(message)
+        clauses = split_clauses(message)
+        batch = [message]
+        if len(clauses) > 1:
+            batch += [NormalizedMessage(message.original_span(*clause)) for clause in clauses]
+        return merge_intents(message, self.detect_batch(batch), clauses)
+
+
+def train_default() -> IntentClassifier:
+    """Modèle entraîné sur le corpus intégré (intent_corpus.LABELED_MESSAGES)"""
+    from .intent_corpus import LABELED_MESSAGES
+
+    messages, tools = zip(*LABELED_MESSAGES)
+    return IntentClassifier.train(messages, tools)
+
+
+def create_detector(backend: str = DETECTOR_BACKEND):
+    """
+    Détecteur d'outils selon DETECTOR_BACKEND.
+
+    auto sans modèle enregistré : règles seules. classifier sans modèle
+    enregistré : entraînement sur le corpus intégré au démarrage.
+    """
+    if backend == "rules":
+        return ToolDetector()
+    if backend not in ("classifier", "auto"):
+        raise ValueError(f"DETECTOR_BACKEND inconnu: {backend}")
+    model = IntentClassifier.load_default()
+    if model is None:
+        if backend == "auto":
+            return ToolDetector()
+        print("[Detector] Aucun classifieur enregistré, entraînement sur le corpus intégré")
+        model = train_default()
+    return ClassifierToolDetector(model, fallback=backend == "auto")
+
+
+def cross_validate(
+    messages: Sequence[str],
+    tools: Sequence[Optional[str]],
+    groups: Optional[Sequence[int]] = None,
+    folds: int = 5,
+    seed: int = 0,
+    **train_options: Any,
+) -> Dict[str, Any]:
+    """
+    Validation croisée en k blocs : précision du classifieur sur les messages
+    tenus à l'écart, comparée à celle des règles sur les mêmes messages.
+
+    Les messages d'un même groupe (variantes d'un modèle) sont tenus à l'écart
+    ensemble, pour ne pas mesurer la simple mémorisation du modèle.
+    """
+    groups = np.asarray(groups if groups is not None else range(len(messages)))
+    unique_groups = np.unique(groups)
+    fold_of_group = dict(zip(unique_groups.tolist(),
+                             (np.random.default_rng(seed).permutation(len(unique_groups)) % folds).tolist()))
+    fold_of = np.array([fold_of_group[g] for g in groups.tolist()])
+    rules = ToolDetector()
+    correct = rules_correct = 0
+    errors = []
+    for fold in range(folds):
+        held_out = set(np.flatnonzero(fold_of == fold).tolist())
+        train_idx = [i for i in range(len(messages)) if i not in held_out]
+        model = IntentClassifier.train(
+            [messages[i] for i in train_idx], [tools[i] for i in train_idx], **train_options,
+        )
+        test_idx = sorted(held_out)
+        predictions = model.predict([messages[i] for i in test_idx])
+        for i, (tool, confidence) in zip(test_idx, predictions):
+            correct += tool == tools[i]
+            rules_correct += rules.detect(messages[i]) == tools[i]
+            if tool != tools[i]:
+                errors.append({"message": messages[i], "expected": tools[i], "predicted": tool,
+                               "confidence": round(confidence, 3)})
+    return {
+        "messages": len(messages),
+        "folds": folds,
+        "classifier_accuracy": correct / len(messages),
+        "rules_accuracy": rules_correct / len(messages),
+        "errors": errors,
+    }
+
+
+if __name__ == "__main__":
+    from .intent_corpus import LABELED_MESSAGES, MESSAGE_GROUPS
+
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "train":
+        output = sys.argv[2] if len(sys.argv) > 2 else INTENT_MODEL_PATH
+        model = train_default()
+        model.save(output)
+        print(f"[Success] Classifieur entraîné sur {len(LABELED_MESSAGES)} messages, enregistré dans {output}")
+    elif command == "evaluate":
+        messages, tools = zip(*LABELED_MESSAGES)
+        report = cross_validate(messages, tools, MESSAGE_GROUPS)
+        for error in report["errors"]:
+            print(f"  [KO] {error['message']!r}: attendu {error['expected']}, "
+                  f"prédit {error['predicted']} ({error['confidence']})")
+        print(f"[Success] Validation croisée {report['folds']} blocs sur {report['messages']} messages : "
+              f"classifieur {report['classifier_accuracy']:.1%}, règles {report['rules_accuracy']:.1%}")
+    else:
+        print("Usage: python -m backend.app.intent_classifier train [sortie.npz] | evaluate")
+        sys.exit(1)
@@ -0,0 +1,365 @@
+"""
+Corpus étiqueté pour le classifieur d'intentions (intent_classifier.py)
+
+Chaque entrée associe un message utilisateur à l'outil MCP attendu (None :
+hors sujet, aucun outil). On y trouve les exemples de
+tests/integration/examples.py, des formulations courantes pour chaque outil
+et des messages que la détection par mots-clés oriente mal ("prix" d'un
+parking, "route" d'un trajet, "station" de métro...).
+
+Les messages modèles ({lieu}, {carburant}, {minutes}, {heure}) sont déclinés
+en quelques variantes ; MESSAGE_GROUPS rattache chaque variante à son modèle.
+
+Pour enrichir le modèle : ajouter des messages ici, puis
+    python -m backend.app.intent_classifier evaluate
+    python -m backend.app.intent_classifier train
+"""
+
+import itertools
+import re
+import zlib
+from typing import List, Optional, Tuple
+
+_BY_TOOL = {
+    "search_fuel_prices": [
+        "Quel est le prix du gazole à Rennes ?",
+        "prix du {carburant} à {lieu}",
+        "prix du {carburant} à Cesson-Sévigné",
+        "{carburant} à {lieu} ?",
+        "combien coûte le {carburant} à {lieu} ?",
+        "quel est le prix du {carburant} près de {lieu} ?",
+        "stations autour de {lieu}",
+        "je cherche du {carburant}",
+        "tarif {carburant} {lieu}",
+        "combien coûte le diesel en ce moment ?",
+        "tarif de l'essence sp98 à Rennes",
+        "prix du e10 près de chez moi",
+        "où trouver du gpl à Rennes ?",
+        "quelles stations vendent de l'e85 ?",
+        "prix carburant 35000",
+        "le litre de gazole est à combien aujourd'hui ?",
+        "je cherche une station essence à Bruz",
+        "stations service autour de Saint-Grégoire",
+        "y a-t-il une station-service ouverte à Chantepie ?",
+        "carburant à Pacé",
+        "prix du plein à Betton",
+        "combien coûte le sp95-e10 à Villejean ?",
+        "où faire le plein de diesel ?",
+        "je dois mettre de l'essence, des stations près de la gare ?",
+        "les prix à la pompe à Rennes",
+        "le gazole a augmenté ?",
+        "tarifs gpl dans le 35",
+        "donne-moi les prix de l'essence",
+        "station total la plus proche",
+        "où acheter du carburant à Vezin-le-Coquet ?",
+        "prix du diesel code postal 35200",
+        "j'ai besoin de faire le plein",
+    ],
+    "get_cheapest_station": [
+        "trouve les stations les moins chères",
+        "quelle est la station la moins chère de Rennes ?",
+        "où le gazole est-il le moins cher ?",
+        "essence la moins chère",
+        "{carburant} le moins cher à {lieu}",
+        "où trouver le {carburant} le moins cher ?",
+        "station la moins chère près de {lieu}",
+        "le {carburant} le plus économique autour de {lieu}",
+        "meilleur prix pour le {carburant}",
+        "station pas chère pour le sp98",
+        "le carburant le plus économique près de moi",
+        "meilleur prix du diesel à Rennes",
+        "top 3 des stations les moins chères",
+        "où faire le plein pour pas cher ?",
+        "la pompe la moins chère à Cesson",
+        "quelle station a le prix le plus bas pour le e10 ?",
+        "je veux le sp95 le moins cher possible",
+        "station la plus économique autour de la gare",
+        "cheapest diesel in Rennes",
+        "où payer le moins cher mon plein ?",
+        "les 5 stations les moins chères en gazole",
+        "gazole pas cher à Saint-Jacques-de-la-Lande",
+        "le plein le plus économique",
+        "prix le plus bas pour l'essence",
+        "station low cost à Rennes",
+    ],
+    "compare_fuel_prices": [
+        "compare les prix du gazole et du sp95",
+        "comparer le diesel et l'essence",
+        "compare le {carburant} et le sp98",
+        "comparer les prix à {lieu} et à Bruz",
+        "différence de prix entre le {carburant} et le gazole",
+        "comparaison {carburant} / e10",
+        "différence de prix entre sp95 et sp98",
+        "comparaison des prix du carburant entre Rennes et Cesson",
+        "le e10 est-il moins cher que le sp98 ?",
+        "comparez les stations de Bruz et de Chantepie",
+        "quelle différence entre le gazole et le gpl ?",
+        "sp95 ou e10, lequel est le plus avantageux ?",
+        "compare les tarifs des stations autour de moi",
+        "écart de prix entre le diesel et l'essence",
+        "comparatif des prix des carburants",
+        "gazole contre sp95 : qui est le moins cher ?",
+        "compare Leclerc et Total pour le gazole",
+        "différence entre les prix de Pacé et Betton",
+        "comparer les carburants à Rennes",
+    ],
+    "get_fuel_stats": [
+        "donne moi les stats sur le carburant",
+        "prix moyen du gazole à Rennes",
+        "prix moyen du {carburant}",
+        "statistiques du {carburant} à {lieu}",
+        "moyenne des prix du {carburant}",
+        "stats {carburant}",
+        "prix min et max du {carburant} à Rennes",
+        "statistiques des prix de l'essence",
+        "quelle est la moyenne du sp95 ?",
+        "stats du diesel dans le 35",
+        "prix minimum, maximum et moyen du e10",
+        "évolution moyenne des prix du carburant",
+        "médiane du prix du gazole",
+        "moyenne des tarifs sp98 à Rennes",
+        "statistique carburant Rennes",
+        "combien coûte le gazole en moyenne ?",
+        "quel est le prix moyen du plein ?",
+        "stats essence Cesson-Sévigné",
+        "résumé statistique des prix du gpl",
+        "répartition des prix du diesel",
+    ],
+    "get_traffic_status": [
+        "quel est le trafic ?",
+        "trafic à {lieu}",
+        "y a des bouchons vers {lieu} ?",
+        "la circulation est comment à {lieu} ?",
+        "ça bouchonne à {lieu} ?",
+        "état de la circulation près de {lieu}",
+        "accident vers {lieu} ?",
+        "ralentissements à {lieu} ?",
+        "y a des bouchons ?",
+        "y a-t-il des bouchons sur la rocade nord ce soir ?",
+        "accidents sur la rocade ?",
+        "la circulation est-elle fluide à Rennes ?",
+        "état du trafic à Villejean",
+        "est-ce que ça bouchonne porte de Saint-Malo ?",
+        "embouteillages sur la route de Lorient",
+        "Bouchons rue de Saint-Malo ?",
+        "circulation boulevard de la Liberté",
+        "ralentissements sur la rocade sud",
+        "la rocade est-elle chargée ?",
+        "trafic en temps réel à Cesson-Sévigné",
+        "y a-t-il des travaux sur l'avenue Janvier ?",
+        "ça roule bien vers Beaulieu ?",
+        "info trafic Rennes centre",
+        "les routes sont bloquées ?",
+        "congestion à la porte de Nantes",
+        "est-ce que l'autoroute vers Nantes est embouteillée ?",
+        "quelles rues sont saturées en ce moment ?",
+        "circulation difficile quai Lamartine ?",
+        "il y a un accident sur la N136 ?",
+        "le périphérique est bouché ?",
+        "état des routes autour de Rennes",
+        "ça circule mal à Saint-Grégoire ?",
+    ],
+    "get_parking_status": [
+        "où sont les parkings ?",
+        "parking près de {lieu}",
+        "où me garer à {lieu} ?",
+        "places disponibles près de {lieu}",
+        "y a de la place pour se garer à {lieu} ?",
+        "stationnement à {lieu}",
+        "prix du parking près de {lieu}",
+        "Y a des parkings disponibles ?",
+        "y a de la place pour me garer ?",
+        "où me garer près de République ?",
+        "places libres au parking Colombier",
+        "parking disponible près de la gare",
+        "où stationner dans le centre ?",
+        "combien de places au parking Kléber ?",
+        "prix du parking à la gare",
+        "tarif du parking des Lices",
+        "le parking Hoche est-il complet ?",
+        "je cherche une place de stationnement",
+        "il reste de la place au parking Charles de Gaulle ?",
+        "parkings ouverts à Rennes",
+        "où garer ma voiture près du CHU ?",
+        "disponibilité des parkings relais",
+        "parking gratuit à Rennes ?",
+        "se garer à Sainte-Anne",
+        "stationnement près de la place des Lices",
+        "taux d'occupation des parkings",
+        "un parking pas trop cher près de la mairie ?",
+        "places disponibles au parking Vilaine",
+        "parking le plus proche de moi",
+        "combien coûte une heure de stationnement ?",
+        "où laisser ma voiture près du Thabor ?",
+    ],
+    "estimate_drive_time": [
+        "Combien de temps pour aller à la gare ?",
+        "combien de temps pour aller à {lieu} ?",
+        "temps de trajet jusqu'à {lieu}",
+        "de {lieu} à {lieu}",
+        "trajet entre {lieu} et {lieu}",
+        "distance jusqu'à {lieu}",
+        "quelle route pour aller à {lieu} ?",
+        "combien de temps de {lieu} à {lieu} à {heure} ?",
+        "aller à {lieu} en partant de ma position",
+        "combien de temps pour aller à la gare ?",
+        "de la gare à rennes 2",
+        "combien de temps en partant de ma position ?",
+        "Combien de temps pour aller de la gare à Villejean demain à 8h ?",
+        "Combien de temps pour aller à la place Sainte-Anne en partant de ma position ?",
+        "temps de trajet entre Cesson et Bruz",
+        "entre la gare et rennes 2",
+        "aller à la place sainte-anne",
+        "quelle route pour aller à Beaulieu ?",
+        "quelle est la distance jusqu'au CHU ?",
+        "combien de kilomètres jusqu'à Pacé ?",
+        "trajet de République à Villejean",
+        "il faut combien de temps pour rejoindre Saint-Grégoire ?",
+        "durée du trajet vers l'aéroport",
+        "je mets combien de temps pour aller au Roazhon Park ?",
+        "temps de route de Rennes à Vitré",
+        "le trajet jusqu'à la gare dure combien ?",
+        "en combien de temps j'arrive à Cleunay ?",
+        "itinéraire vers le campus de Beaulieu",
+        "quelle route prendre pour aller à Chantepie ?",
+        "combien de temps depuis ici jusqu'aux Champs Libres ?",
+        "distance entre Bruz et Betton",
+        "me rendre à l'hôpital Pontchaillou, ça prend combien ?",
+        "temps pour rejoindre la rocade depuis le centre",
+        "de Villejean à la gare en voiture",
+        "à quelle distance est Saint-Malo ?",
+        "combien de minutes pour aller au Colombier ?",
+    ],
+    "find_best_departure_time": [
+        "à quelle heure partir pour aller au chu ?",
+        "à quelle heure partir pour aller à {lieu} ?",
+        "quand partir pour être à {lieu} à {heure} ?",
+        "meilleure heure pour aller à {lieu} demain",
+        "entre {heure} et 10h, quand partir pour {lieu} ?",
+        "dois-je partir avant {heure} pour aller à {lieu} ?",
+        "quand partir pour arriver à la gare avant 9h ?",
+        "meilleure heure pour aller à Beaulieu",
+        "à quelle heure dois-je partir pour éviter les bouchons ?",
+        "quel est le meilleur moment pour aller à Bruz ?",
+        "faut-il partir avant 8h pour aller à Villejean ?",
+        "entre 7h et 9h, quand partir pour la gare ?",
+        "heure de départ idéale pour aller à Cesson demain",
+        "je dois être au CHU à 9h, je pars quand ?",
+        "devrais-je partir maintenant ou plus tard ?",
+        "quand prendre la route pour éviter le trafic ?",
+        "meilleur créneau pour rejoindre Rennes 2",
+        "à quelle heure partir après 17h pour rentrer ?",
+        "quelle heure de départ pour arriver à l'heure ?",
+        "quand quitter le bureau pour éviter la rocade chargée ?",
+        "c'est mieux de partir à 7h ou à 8h ?",
+        "créneau le plus rapide demain matin pour aller à Pacé",
+        "dois-je partir plus tôt pour aller à la gare ?",
+    ],
+    "get_reachable_places": [
+        "quels parkings puis-je atteindre en 10 minutes ?",
+        "parkings à moins de {minutes} minutes de {lieu}",
+        "stations accessibles en {minutes} min depuis {lieu}",
+        "que puis-je atteindre en {minutes} minutes ?",
+        "quels parkings puis-je atteindre en {minutes} minutes depuis {lieu} ?",
+        "lieux joignables en {minutes} min",
+        "stations essence à moins de 15 min de la gare",
+        "quels parkings puis-je atteindre en 10 minutes depuis ma position ?",
+        "Quels parkings puis-je atteindre en 10 minutes depuis République ?",
+        "stations accessibles en moins de 5 minutes",
+        "ce que je peux rejoindre en 20 minutes de voiture",
+        "parkings à moins de 10 minutes de moi",
+        "stations joignables en 15 min depuis Villejean",
+        "quels lieux sont accessibles en 10 min ?",
+        "parkings dans les 5 minutes autour de moi",
+        "carte des stations à moins de 10 minutes",
+        "tout ce qui est à 15 minutes de la gare",
+        "où puis-je aller en 10 minutes ?",
+        "parkings atteignables rapidement depuis le CHU",
+        "zone accessible en 20 minutes depuis ici",
+        "stations de carburant à 5 min de moi",
+    ],
+    None: [
+        "bonjour",
+        "salut",
+        "bonsoir, comment vas-tu ?",
+        "parle-moi de l'histoire de {lieu}",
+        "que faire à {lieu} ce week-end ?",
+        "un bon restaurant à {lieu} ?",
+        "quelle est la météo à {lieu} ?",
+        "il pleut à Rennes ?",
+        "explique-moi la photosynthèse",
+        "combien font 12 fois 7 ?",
+        "quel âge as-tu ?",
+        "tu connais une bonne série ?",
+        "horaires de la bibliothèque des Champs Libres",
+        "à quelle heure ouvre la mairie ?",
+        "le métro est-il en grève ?",
+        "c'est quoi ton nom ?",
+        "super, merci !",
+        "je m'ennuie",
+        "donne-moi une idée de cadeau",
+        "qui est le maire de Rennes ?",
+        "bonjour, tu peux m'aider ?",
+        "merci beaucoup",
+        "qui es-tu ?",
+        "raconte-moi une blague",
+        "quel temps fait-il demain ?",
+        "quelle est la capitale de la Bretagne ?",
+        "au revoir",
+        "tu fais quoi ?",
+        "comment ça va ?",
+        "donne-moi une recette de crêpes",
+        "qui a gagné le match hier ?",
+        "la ruelle est bloquée ?",
+        "traduis ce texte en anglais",
+        "quelle heure est-il ?",
+        "merci, c'est parfait",
+        "ok",
+        "je ne sais pas",
+        "que peux-tu faire ?",
+        "écris un poème sur Rennes",
+        "horaires du métro ligne b",
+        "quand passe le prochain bus ?",
+    ],
+}
+
+# Valeurs des emplacements {lieu}, {carburant}... des messages modèles
+_SLOTS = {
+    "lieu": [
+        "la gare", "Villejean", "Cesson-Sévigné", "Bruz", "République", "Beaulieu",
+        "le CHU", "Saint-Grégoire", "Pacé", "Chantepie", "Sainte-Anne", "Rennes 2",
+        "Cleunay", "la place des Lices", "Betton", "l'aéroport",
+    ],
+    "carburant": ["gazole", "sp95", "sp98", "e10", "diesel", "gpl", "e85", "sans plomb"],
+    "minutes": ["5", "10", "15", "20", "30"],
+    "heure": ["7h", "8h", "8h30", "9h", "17h", "18h"],
+}
+_SLOT_PATTERN = re.compile(r"\{(\w+)\}")
+_VARIANTS_PER_TEMPLATE = 4
+
+
+def _expand(template: str) -> List[str]:
+    """Variantes d'un message modèle (choix des valeurs déterministe)"""
+    offset = zlib.crc32(template.encode("utf-8"))
+    variants = []
+    for k in range(_VARIANTS_PER_TEMPLATE):
+        occurrence = itertools.count()
+        variants.append(_SLOT_PATTERN.sub(
+            lambda m: _SLOTS[m.group(1)][(offset + 5 * k + 7 * next(occurrence)) % len(_SLOTS[m.group(1)])],
+            template,
+        ))
+    return list(dict.fromkeys(variants))
+
+
+LABELED_MESSAGES: List[Tuple[str, Optional[str]]] = []
+# Indice du message source de chaque entrée : les variantes d'un même modèle
+# restent dans le même bloc de validation croisée
+MESSAGE_GROUPS: List[int] = []
+for _tool, _messages in _BY_TOOL.items():
+    for _message in _messages:
+        _group = len(set(MESSAGE_GROUPS))
+        for _variant in _expand(_message):
+            LABELED_MESSAGES.append((_variant, _tool))
+            MESSAGE_GROUPS.append(_group)
+
+TOOL_LABELS: List[Optional[str]] = list(_BY_TOOL)
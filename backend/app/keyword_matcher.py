@@ -0,0 +1,133 @@
+"""
+Recherche simultanée de mots-clés (automate d'Aho-Corasick)
+
+Toutes les listes de mots-clés sont compilées une fois en un automate ; un
+seul passage sur le texte normalisé renvoie chaque occurrence avec sa
+catégorie et sa position. Le coût d'une recherche dépend de la longueur du
+texte, pas du nombre de mots-clés.
+
+Les occurrences doivent commencer et finir sur une frontière de mot
+("rue" ne correspond pas à "ruelle", "a" pas à "gare"). Pour les mots-clés
+de plus de 3 caractères, les accords -s, -x, -e, -es sont acceptés
+("bouchon" trouve "bouchons", "moins cher" trouve "moins chères"). Un
+mot-clé terminé par "*" est un radical : il accepte toute fin de mot
+("bouchon*" trouve "bouchonne", "bouchonnent").
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Set
+
+
+STEM_MARK = "*"
+
+
+class KeywordMatch(NamedTuple):
+    category: str
+    keyword: str  # Sans la marque de radical
+    start: int
+    end: int
+
+
+def _is_boundary(outside: str, edge: str) -> bool:
+    """Frontière entre un caractère hors du mot-clé et le caractère de bord"""
+    return not outside.isalnum() or outside.isdigit() != edge.isdigit()
+
+
+def _inflection_length(text: str, end: int) -> int:
+    """Longueur d'une terminaison -s, -x, -e ou -es suivie d'une fin de mot, 0 sinon"""
+    for suffix in ("es", "s", "x", "e"):
+        stop = end + len(suffix)
+        if text.startswith(suffix, end) and (stop == len(text) or not text[stop].isalnum()):
+            return len(suffix)
+    return 0
+
+
+class KeywordMatcher:
+    """Automate d'Aho-Corasick sur des mots-clés regroupés par catégorie."""
+
+    def __init__(self, categories: Dict[str, Iterable[str]]):
+        # Nœud i : transitions, lien d'échec, sorties (catégorie, mot-clé, radical)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[tuple]] = [[]]
+
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                self._add(category, keyword)
+        self._build_failure_links()
+
+    def _add(self, category: str, keyword: str):
+        stem = keyword.endswith(STEM_MARK)
+        keyword = keyword.rstrip(STEM_MARK)
+        node = 0
+        for char in keyword:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[node][char] = nxt
+            node = nxt
+        if (category, keyword, stem) not in self._out[node]:
+            self._out[node].append((category, keyword, stem))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                # Les sorties du suffixe le plus long sont héritées
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+        # Transitions complètes (goto + échecs résolus), remplies à la demande
+        # pour chaque caractère rencontré : une seule lecture de dict par caractère
+        self._delta: List[Dict[str, int]] = [dict(edges) for edges in self._goto]
+
+    def _transition(self, node: int, char: str) -> int:
+        state = node
+        while state and char not in self._goto[state]:
+            state = self._fail[state]
+        target = self._goto[state].get(char, 0)
+        self._delta[node][char] = target
+        return target
+
+    def find_all(self, text: str) -> List[KeywordMatch]:
+        """Occurrences (sur frontières de mots) de tous les mots-clés, par position de fin"""
+        delta, out = self._delta, self._out
+        length = len(text)
+        matches = []
+        node = 0
+        for i, char in enumerate(text):
+            nxt = delta[node].get(char)
+            node = self._transition(node, char) if nxt is None else nxt
+            if not out[node]:
+                continue
+            for category, keyword, stem in out[node]:
+                start = i - len(keyword) + 1
+                if start and not _is_boundary(text[start - 1], keyword[0]):
+                    continue
+                end = i + 1
+                if stem:
+                    # Radical : l'occurrence s'étend jusqu'à la fin du mot
+                    while end < length and text[end].isalnum():
+                        end += 1
+                elif end < length and not _is_boundary(text[end], keyword[-1]):
+                    # Accord en genre / nombre ("stations", "moins cheres") pour
+                    # les mots-clés de plus de 3 lettres
+                    suffix = _inflection_length(text, end) if len(keyword) > 3 else 0
+                    if not suffix:
+                        continue
+                    end += suffix
+                matches.append(KeywordMatch(category, keyword, start, end))
+        return matches
+
+    def categories(self, text: str) -> Set[str]:
+        """Catégories ayant au moins une occurrence dans le texte"""
+        return {match.category for match in self.find_all(text)}
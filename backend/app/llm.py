@@ -1,9 +1,10 @@
 # backend/app/llm.py
 from typing import List, Dict
 import os
-import requests
 from dotenv import load_dotenv
 
+from . import http_client
+
 load_dotenv()
 
 class EpitechLLMService:
@@ -22,7 +23,8 @@ class EpitechLLMService:
         self,
         message: str,
         context: str = "",
-        history: List[Dict[str, str]] | None = None
+        history: List[Dict[str, str]] | None = None,
+        timeout: float = 120
     ) -> str:
 
         if history is None:
@@ -47,7 +49,8 @@ class EpitechLLMService:
             "content": message
         })
 
-        response = requests.post(
+        # Connexion gardée ouverte vers l'API LLM (et disjoncteur si elle tombe)
+        response = http_client.post(
             f"{self.api_url}/api/chat",
             headers=self._headers(),
             json={
@@ -55,7 +58,7 @@ class EpitechLLMService:
                 "messages": messages,
                 "stream": False
             },
-            timeout=120
+            timeout=timeout
         )
 
         response.raise_for_status()
@@ -1,17 +1,37 @@
 # backend/app/main.py
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from typing import Optional
+import asyncio
 import traceback
 import json
 
+import requests
+
+from .config import (
+    CHAT_DEADLINE_S,
+    TOOLS_DEADLINE_S,
+    TRAFFIC_SAMPLING_ENABLED,
+    TRAFFIC_SAMPLING_INTERVAL_S,
+    TRAFFIC_STREAM_POLL_S,
+    TRAFFIC_STREAM_KEEPALIVE_S,
+    LOCATION_SUGGEST_DEFAULT_LIMIT,
+    LOCATION_SUGGEST_MAX_RESULTS,
+)
+from . import http_client
+from .deadline import Deadline
 from .llm import EpitechLLMService
 from .mcp_sim import MCPSimulator
 from .models import ChatRequest
+from .rennes_locations import suggest_locations
 from .formatters import (
     format_fuel_results,
     format_traffic_results,
     format_parking_results,
     format_drive_time_results,
+    format_best_departure_results,
+    format_reachable_results,
 )
 
 app = FastAPI(title="API Chatbot IA Local")
@@ -29,8 +49,71 @@ llm_service = EpitechLLMService()
 mcp = MCPSimulator()
 
 
+def _format_context(intent: dict) -> str:
+    """Texte du résultat d'un outil pour le prompt LLM, avec ses limites s'il est dégradé"""
+    tool = intent.get("tool")
+    if tool == "get_traffic_status":
+        text = format_traffic_results(intent)
+    elif tool == "get_parking_status":
+        text = format_parking_results(intent)
+    elif tool == "estimate_drive_time":
+        text = format_drive_time_results(intent)
+    elif tool == "find_best_departure_time":
+        text = format_best_departure_results(intent)
+    elif tool == "get_reachable_places":
+        text = format_reachable_results(intent)
+    else:
+        text = format_fuel_results(intent)
+    reasons = _degraded_reasons(intent)
+    if reasons:
+        text += "\n⚠️ Données partielles: " + "; ".join(reasons)
+    return text
+
+
+def _degraded_reasons(intent: dict) -> list:
+    """Raisons pour lesquelles le résultat d'un outil est partiel ou périmé"""
+    result = intent.get("result")
+    return result.get("degraded_reasons", []) if isinstance(result, dict) else []
+
+
+def _raw_results(intent: dict):
+    """Données brutes affichées par le frontend (stations, lieux), None sinon"""
+    tool = intent.get("tool")
+    data_content = intent.get("result", {})
+    if not data_content.get("success"):
+        return None
+    if tool == "get_cheapest_station":
+        return data_content.get("cheapest_stations", [])
+    if tool == "search_fuel_prices":
+        return data_content.get("results", [])
+    if tool == "get_reachable_places":
+        return data_content.get("places", [])
+    return None
+
+
+@app.on_event("startup")
+async def start_traffic_sampling():
+    # Collecte périodique du trafic pour construire les profils horaires
+    if TRAFFIC_SAMPLING_ENABLED:
+        mcp.executor.traffic_history.start_sampling(
+            mcp.executor.traffic_scraper, TRAFFIC_SAMPLING_INTERVAL_S
+        )
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    mcp.executor.traffic_history.stop_sampling()
+    mcp.executor.traffic_history.save()
+    mcp.executor.drive_time_estimator.route_scraper.cache.save()
+    http_client.client.close()
+
+
 @app.post("/api/chat")
-async def chat(request: ChatRequest):
+def chat(request: ChatRequest):
+    # Fonction synchrone : FastAPI l'exécute dans son pool de threads. Les
+    # appels bloquants (outils, LLM) ne figent pas la boucle d'événements
+    # (flux SSE, autres requêtes) et les requêtes simultanées d'utilisateurs
+    # différents peuvent partager le même appel d'outil (SingleFlight).
     try:
         print(f"📨 Message reçu: {request.message}")
         print(f"📍 Lat/Lon reçues: {request.latitude}, {request.longitude}")
@@ -39,15 +122,20 @@ async def chat(request: ChatRequest):
         else:
             print(f"✗ Position GPS manquante ou None")
 
+        # Échéance de la requête : les outils en ont une part, le LLM le reste
+        deadline = Deadline(CHAT_DEADLINE_S)
+
         # 1. MCP – détection + exécution
         mcp_result = mcp.process_message(
             request.message,
-            user_location=(request.latitude, request.longitude) if request.latitude and request.longitude else None
+            user_location=(request.latitude, request.longitude) if request.latitude and request.longitude else None,
+            deadline=deadline.child(TOOLS_DEADLINE_S)
         )
         tool_used = mcp_result.get("tool")
 
         context = ""
         raw_results = None
+        degraded_reasons = []
 
         # 🔒 Bloquer tout ce qui n’est pas mobilité
         if not tool_used:
@@ -65,28 +153,19 @@ async def chat(request: ChatRequest):
                 "data": None
             }
 
-        # 2. Outils MCP (fuel, traffic, etc.)
+        # 2. Outils MCP (fuel, traffic, etc.) : un bloc de contexte par demande
         if tool_used != "scrape_website":
-            print(f"🔧 Outil MCP détecté: {tool_used}")
-
-            # Format texte pour le LLM
-            if tool_used == "get_traffic_status":
-                context = format_traffic_results(mcp_result)
-            elif tool_used == "get_parking_status":
-                context = format_parking_results(mcp_result)
-            elif tool_used == "estimate_drive_time":
-                context = format_drive_time_results(mcp_result)
-            else:
-                context = format_fuel_results(mcp_result)
-
-            # Extraction données brutes pour le frontend
-            data_content = mcp_result.get("result", {})
-
-            if data_content.get("success"):
-                if tool_used == "get_cheapest_station":
-                    raw_results = data_content.get("cheapest_stations", [])
-                elif tool_used == "search_fuel_prices":
-                    raw_results = data_content.get("results", [])
+            intents = mcp_result.get("intents") or [mcp_result]
+            print(f"🔧 Outils MCP détectés: {[intent['tool'] for intent in intents]}")
+
+            # Format texte pour le LLM (un seul prompt pour toutes les demandes)
+            context = "\n\n".join(_format_context(intent) for intent in intents)
+            degraded_reasons = [reason for intent in intents for reason in _degraded_reasons(intent)]
+
+            # Extraction données brutes pour le frontend (première demande qui en a)
+            raw_results = next(
+                (data for data in map(_raw_results, intents) if data is not None), None
+            )
 
             print(f"📊 Contexte généré: {context[:200]}...")
 
@@ -120,21 +199,32 @@ tu dois répondre :
         else:
             full_message = request.message
 
-        # 5. Appel LLM
+        # 5. Appel LLM, borné par le temps restant ; à défaut, les données brutes
         print("🤖 Appel au LLM...")
-        response = llm_service.chat(
-            message=full_message,
-            context="",
-            history=request.history
-        )
-        print("✅ Réponse générée")
+        try:
+            response = llm_service.chat(
+                message=full_message,
+                context="",
+                history=request.history,
+                timeout=deadline.timeout(120)
+            )
+            print("✅ Réponse générée")
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            if not context:
+                raise
+            print(f"⏱️ LLM hors délai ou indisponible ({e}), réponse avec les données des outils")
+            response = context
+            degraded_reasons.append("Réponse non reformulée (assistant IA trop lent ou indisponible)")
 
         # 6. Réponse API
         return {
             "response": response,
             "tool_used": tool_used,
+            "tools_used": [intent["tool"] for intent in mcp_result.get("intents", [])],
             "data": raw_results,
-            "context": context
+            "context": context,
+            "degraded": bool(degraded_reasons),
+            "degraded_reasons": degraded_reasons
         }
 
     except Exception as e:
@@ -143,13 +233,67 @@ tu dois répondre :
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/traffic/stream")
+async def traffic_stream(request: Request, last_event_id: Optional[str] = Header(default=None)):
+    """
+    Flux Server-Sent Events des changements de trafic (transitions de statut,
+    nouveaux incidents). Le client reprend là où il s'était arrêté grâce à
+    l'en-tête Last-Event-ID envoyé automatiquement par EventSource.
+    """
+    feed = mcp.executor.traffic_changes
+    last_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else feed.last_id
+
+    async def event_stream():
+        nonlocal last_id
+        idle = 0.0
+        yield "retry: 5000\n\n"
+        while not await request.is_disconnected():
+            events = feed.events_since(last_id)
+            for event in events:
+                last_id = event["id"]
+                yield f"id: {event['id']}\nevent: traffic\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+            if events:
+                idle = 0.0
+            elif idle >= TRAFFIC_STREAM_KEEPALIVE_S:
+                # Commentaire SSE : garde la connexion ouverte à travers les proxys
+                yield ": keepalive\n\n"
+                idle = 0.0
+
+            await asyncio.sleep(TRAFFIC_STREAM_POLL_S)
+            idle += TRAFFIC_STREAM_POLL_S
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/locations/suggest")
+def locations_suggest(q: str = "", limit: int = LOCATION_SUGGEST_DEFAULT_LIMIT):
+    # Autocomplétion des lieux connus, sans passer par le LLM
+    limit = max(1, min(limit, LOCATION_SUGGEST_MAX_RESULTS))
+    return {"query": q, "suggestions": suggest_locations(q, limit)}
+
+
 @app.get("/api/health")
 async def health():
     return {
         "status": "ok",
         "api": "api.ia.epitech.bzh",
         "model": "qwen3:30b",
-        "mcp_tools": list(mcp.tools.keys())
+        "mcp_tools": list(mcp.executor.tools.keys())
+    }
+
+
+@app.get("/api/metrics")
+async def metrics():
+    return {
+        "route_cache": mcp.executor.drive_time_estimator.route_scraper.cache.metrics(),
+        "mcp_decisions": mcp.decisions.metrics(),
+        "tool_calls": mcp.executor.inflight.metrics(),
+        "http": http_client.client.metrics(),
     }
 
 
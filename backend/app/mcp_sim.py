@@ -1,60 +1,175 @@
 # backend/app/mcp_sim.py
 """Simulateur MCP - Orchestre la détection, l'extraction et l'exécution des outils."""
-from typing import Optional, Dict, Any
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Optional, Dict, Any, Tuple
 
-from .tool_detector import ToolDetector
+from .config import MCP_DECISION_CACHE_SIZE, MCP_MAX_INTENTS
+from .deadline import Deadline
+from .intent_classifier import create_detector
+from .normalized_message import NormalizedMessage
 from .param_extractor import ParamExtractor
 from .tool_executor import ToolExecutor
 
 
+Decision = Tuple[Tuple[str, Dict[str, Any]], ...]
+
+
+class DecisionCache:
+    """
+    Cache LRU des décisions (outils, paramètres) par texte de message.
+
+    La clé est le message aux blancs près (casse et accents conservés :
+    l'extraction s'en sert pour les noms propres) ; le même texte, blancs
+    réduits, est celui qu'analysent la détection et l'extraction, donc une
+    décision mise en cache est exactement celle que le calcul redonnerait.
+    """
+
+    def __init__(self, max_entries: int = MCP_DECISION_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Decision]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def key_for(user_message: str) -> str:
+        return " ".join(user_message.split())
+
+    def get(self, key: str) -> Optional[Decision]:
+        with self._lock:
+            decision = self._entries.get(key)
+            if decision is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return decision
+
+    def put(self, key: str, decision: Decision) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = decision
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+            }
+
+
 class MCPSimulator:
     """
     Orchestrateur MCP - Coordonne la détection, l'extraction et l'exécution d'outils.
     """
-    
-    def __init__(self):
-        self.detector = ToolDetector()
+
+    def __init__(self, executor: Optional[ToolExecutor] = None):
+        # Règles par mots-clés ou classifieur selon DETECTOR_BACKEND
+        self.detector = create_detector()
         self.extractor = ParamExtractor()
-        self.executor = ToolExecutor()
-    
-    def process_message(self, user_message: str, user_location: Optional[tuple] = None) -> Dict[str, Any]:
+        self.executor = executor if executor is not None else ToolExecutor()
+        # Outils d'un message à plusieurs demandes exécutés en parallèle
+        self.pool = ThreadPoolExecutor(max_workers=MCP_MAX_INTENTS, thread_name_prefix="mcp-tool")
+        # Messages répétés ("parking gare") : seule l'exécution est refaite
+        self.decisions = DecisionCache()
+
+    def process_message(
+        self,
+        user_message: str,
+        user_location: Optional[tuple] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Any]:
         """
-        Traite un message utilisateur : détecte l'outil, extrait les paramètres, et exécute l'outil.
-        
+        Traite un message utilisateur : détecte le ou les outils, extrait les
+        paramètres de chacun, et les exécute (en parallèle s'il y en a plusieurs).
+
         Args:
             user_message: Message de l'utilisateur
             user_location: Position GPS optionnelle (latitude, longitude)
-            
+            deadline: Échéance transmise aux outils ; un outil parallèle qui
+                ne répond pas à temps est abandonné (résultat en erreur, dégradé)
+
         Returns:
-            Résultat contenant l'outil détecté, les paramètres, et le résultat
+            Résultat de l'outil principal (tool, params, result) et, dans
+            "intents", la liste {tool, params, result} de toutes les demandes
         """
         print(f"\n[MCP] Message: {user_message}")
         print(f"[MCP] User location: {user_location}")
-        
-        # 1. Détection de l'outil
-        tool_name = self.detector.detect(user_message)
-        if not tool_name:
+
+        # 1-2. Détection des outils (principal en tête) et extraction de leurs
+        # paramètres, ou décision déjà prise pour le même message
+        key = self.decisions.key_for(user_message)
+        decision = self.decisions.get(key)
+        if decision is None:
+            decision = self._decide(key)
+            self.decisions.put(key, decision)
+        else:
+            print("[MCP] Décision en cache")
+
+        if not decision:
             print("[MCP] Aucun outil détecté")
             return {
                 "tool": None,
                 "params": {},
-                "result": {"error": "Je ne comprends pas votre demande"}
+                "result": {"error": "Je ne comprends pas votre demande"},
+                "intents": [],
             }
-        
-        print(f"[MCP] Outil détecté: {tool_name}")
-        
-        # 2. Extraction des paramètres
-        params = self.extractor.extract(user_message, tool_name)
-        print(f"[MCP] Paramètres extraits: {params}")
-        
-        # 3. Exécution de l'outil avec position GPS
-        result = self.executor.execute(tool_name, params, user_location)
-        print(f"[MCP] Résultat: {result}")
-        
-        return {
-            "tool": tool_name,
-            "params": params,
-            "result": result
-        }
-
- 
\ No newline at end of file
+
+        intents = [{"tool": tool_name, "params": dict(params)} for tool_name, params in decision]
+        print(f"[MCP] Outils détectés: {[intent['tool'] for intent in intents]}")
+        for intent in intents:
+            print(f"[MCP] Paramètres extraits ({intent['tool']}): {intent['params']}")
+
+        # 3. Exécution avec position GPS : latence de l'outil le plus lent, pas la somme
+        deadline = deadline or Deadline()
+        if len(intents) == 1:
+            intents[0]["result"] = self.executor.execute(
+                intents[0]["tool"], intents[0]["params"], user_location, deadline
+            )
+        else:
+            futures = [self.pool.submit(self._execute_safely, intent, user_location, deadline) for intent in intents]
+            wait(futures, timeout=deadline.wait_timeout())
+            for intent, future in zip(intents, futures):
+                if future.done():
+                    intent["result"] = future.result()
+                else:
+                    # L'outil finira en arrière-plan ; la réponse ne l'attend pas
+                    intent["result"] = {
+                        "success": False,
+                        "error": "Délai dépassé",
+                        "degraded": True,
+                        "degraded_reasons": [f"{intent['tool']} : pas de réponse dans le délai"],
+                    }
+        for intent in intents:
+            print(f"[MCP] Résultat ({intent['tool']}): {intent['result']}")
+
+        return {**intents[0], "intents": intents}
+
+    def _decide(self, text: str) -> Decision:
+        """(outil, paramètres) de chaque demande du message"""
+        # Normalisation unique, partagée par la détection et l'extraction
+        message = NormalizedMessage(text)
+        return tuple(
+            (tool_name, self.extractor.extract(intent_text, tool_name))
+            for tool_name, intent_text in self.detector.detect_intents(message)
+        )
+
+    def _execute_safely(
+        self, intent: Dict[str, Any], user_location: Optional[tuple], deadline: Deadline
+    ) -> Dict[str, Any]:
+        """Exécute un outil parmi plusieurs : son échec n'empêche pas les autres de répondre"""
+        try:
+            return self.executor.execute(intent["tool"], intent["params"], user_location, deadline)
+        except Exception as e:
+            print(f"[MCP] Erreur outil {intent['tool']}: {e}")
+            return {"success": False, "error": str(e)}
@@ -0,0 +1,120 @@
+"""
+Message utilisateur normalisé une seule fois pour tout le pipeline MCP
+(détection d'outil puis extraction de paramètres).
+
+Formes disponibles :
+- original : texte brut (majuscules conservées pour les noms propres)
+- lower    : minuscules, accents conservés
+- plain    : minuscules sans accents (recherche de mots-clés)
+- tokens   : mots alphanumériques de `plain` avec leurs positions
+- words    : tokens joints par des espaces (ponctuation retirée)
+
+Les formes `plain`, `tokens`, `words` et la table de positions ne sont
+calculées qu'au premier accès.
+`plain` peut être plus court ou plus long que l'original (décomposition des
+caractères) : `to_original()` convertit une position de `plain` en position
+dans le texte brut, pour extraire un nom propre repéré sur la forme normalisée.
+"""
+
+import re
+import unicodedata
+from typing import List, NamedTuple, Tuple, Union
+
+_TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+
+class _FoldTable(dict):
+    """Table str.translate : caractère -> minuscule sans accent, remplie à la demande"""
+
+    def __missing__(self, code: int) -> str:
+        nfd = unicodedata.normalize('NFD', chr(code).lower())
+        folded = ''.join(c for c in nfd if unicodedata.category(c) != 'Mn')
+        self[code] = folded
+        return folded
+
+
+_FOLD_TABLE = _FoldTable()
+
+
+def fold_char(char: str) -> str:
+    """Minuscule sans accent d'un caractère (mémorisé)"""
+    return _FOLD_TABLE[ord(char)]
+
+
+def fold_text(text: str) -> str:
+    """Minuscules sans accents"""
+    return text.translate(_FOLD_TABLE)
+
+
+class Token(NamedTuple):
+    text: str
+    start: int
+    end: int
+
+
+class NormalizedMessage:
+    """Formes normalisées d'un message, calculées une fois à la construction."""
+
+    __slots__ = ("original", "lower", "_plain", "_tokens", "_words", "_offsets")
+
+    def __init__(self, text: str):
+        self.original = text
+        self.lower = text.lower()
+        self._plain = None
+        self._tokens = None
+        self._words = None
+        self._offsets = None
+
+    @property
+    def plain(self) -> str:
+        if self._plain is None:
+            # Texte ASCII (cas courant) : rien à retirer, positions identiques
+            self._plain = self.lower if self.original.isascii() else fold_text(self.original)
+        return self._plain
+
+    @property
+    def tokens(self) -> List[Token]:
+        if self._tokens is None:
+            self._tokens = [
+                Token(m.group(), m.start(), m.end()) for m in _TOKEN_PATTERN.finditer(self.plain)
+            ]
+        return self._tokens
+
+    @property
+    def words(self) -> str:
+        if self._words is None:
+            self._words = ' '.join(token.text for token in self.tokens)
+        return self._words
+
+    def _offset_table(self) -> List[int]:
+        """Position dans `plain` -> position dans `original` (calculée à la demande)"""
+        if self._offsets is None:
+            offsets = []
+            for i, char in enumerate(self.original):
+                offsets.extend([i] * len(fold_char(char)))
+            offsets.append(len(self.original))
+            self._offsets = offsets
+        return self._offsets
+
+    @classmethod
+    def of(cls, message: Union[str, "NormalizedMessage"]) -> "NormalizedMessage":
+        """Accepte un texte brut ou un message déjà normalisé"""
+        return message if isinstance(message, cls) else cls(message)
+
+    def to_original(self, start: int, end: int) -> Tuple[int, int]:
+        """Intervalle [start, end) de `plain` -> intervalle dans `original`"""
+        offsets = self._offset_table()
+        if start >= end:
+            return offsets[start], offsets[start]
+        return offsets[start], offsets[end - 1] + 1
+
+    def original_span(self, start: int, end: int) -> str:
+        """Texte brut correspondant à un intervalle de `plain`"""
+        start, end = self.to_original(start, end)
+        return self.original[start:end]
+
+    def __str__(self) -> str:
+        return self.original
+
+    def __repr__(self) -> str:
+        return f"NormalizedMessage({self.original!r})"
@@ -1,24 +1,238 @@
-"""Extraction de paramètres pour les outils MCP."""
+"""
+Extraction de paramètres pour les outils MCP.
+
+Les motifs sont compilés une fois au chargement du module. Les lieux
+(origine / destination d'un trajet, origine d'une isochrone) sont extraits
+par une petite grammaire : le message est découpé une seule fois en tokens
+(mots, blancs, ponctuation) en indexant les mots-repères ("de", "à", "entre",
+"aller", "depuis"...), puis chaque règle part de ces repères et ne compare
+que des tokens. Plus de quantificateurs paresseux `.+?` sur tout le message :
+le coût reste linéaire, même sur un message long ou construit pour piéger
+les expressions régulières.
+"""
 import re
-from typing import Dict, Any
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+from .normalized_message import NormalizedMessage
+from .rennes_districts import match_district
+
+# Heure de départ : "à 8h", "vers 17h30", "pour 8:15"
+DEPARTURE_TIME_PATTERN = re.compile(
+    r"(?:\b(?:à|a|vers|pour)\s+)?\b([01]?\d|2[0-3])\s*(?:h|:)\s*([0-5]\d)?(?![\w:])",
+    re.IGNORECASE,
+)
+# Fenêtre de départ : "entre 7h et 9h", "avant 9h", "après 17h30"
+DEPARTURE_WINDOW_PATTERN = re.compile(
+    r"\bentre\s+([01]?\d|2[0-3])\s*h(?:\s*([0-5]\d))?\s+et\s+([01]?\d|2[0-3])\s*h\s*([0-5]\d)?(?![\w:])",
+    re.IGNORECASE,
+)
+DEPARTURE_BOUND_PATTERN = re.compile(
+    r"\b(avant|apr[eè]s|[aà] partir de)\s+([01]?\d|2[0-3])\s*h\s*([0-5]\d)?(?![\w:])",
+    re.IGNORECASE,
+)
+# Budget de temps d'une isochrone : "en 10 minutes", "moins de 15 min"
+REACHABLE_MINUTES_PATTERN = re.compile(r"\b(\d{1,3})\s*min(?:ute)?s?\b", re.IGNORECASE)
+DEPARTURE_DAY_PATTERN = re.compile(
+    r"\b(apr[eè]s[\s-]demain|demain|lundi|mardi|mercredi|jeudi|vendredi|samedi|dimanche)\b",
+    re.IGNORECASE,
+)
+POSTAL_CODE_PATTERN = re.compile(r'\b\d{5}\b')
+CITY_PATTERNS = [
+    re.compile(r'(?:à|dans|sur)\s+([A-Z][a-zéèêàâôù\-]+(?:\s+[A-Z][a-zéèêàâôù\-]+)*)'),
+    re.compile(r'\b([A-Z][a-zéèêàâôù]{3,})\b'),
+]
+STREET_PATTERNS = [
+    re.compile(
+        r"(?:rue|avenue|av\.?|boulevard|bd\.?|quai|route|chemin|allee|impasse|place)\s+([A-Za-zÀ-ÿ'\- ]{3,})",
+        re.IGNORECASE,
+    ),
+    re.compile(r'"([^"]{3,})"'),
+]
+
+# --- Grammaire des lieux -----------------------------------------------------
+
+# Un token : mot (\w+), suite de blancs, ou un caractère de ponctuation
+_LEXER = re.compile(r"\w+|\s+|.", re.DOTALL)
+_WORD, _SPACE, _PUNCT = 0, 1, 2
+
+
+class _CharKinds(dict):
+    """Nature d'un token d'après son premier caractère (mémorisée)"""
+
+    def __missing__(self, char: str) -> int:
+        kind = _WORD if char.isalnum() or char == '_' else _SPACE if char.isspace() else _PUNCT
+        self[char] = kind
+        return kind
+
+
+_KIND = _CharKinds()
+# Mots-repères indexés au découpage (point de départ des règles)
+_ANCHOR_WORDS = (
+    'de', 'à', 'a', 'entre', 'et', 'aller', 'rendre', 'en', 'pour', 'depuis', 'd', 'autour', 'partir',
+)
+_ANCHOR_PATTERN = re.compile(r"(?<!\w)(?:%s)(?!\w)" % '|'.join(_ANCHOR_WORDS))
+_ARTICLES = frozenset({'la', 'le', 'les', 'une', 'un', 'des'})
+_TO = frozenset({'à', 'a', 'vers', 'au'})
+# Fin d'un nom de lieu dans une isochrone : "... en 10 min", "... à pied", "... dans"
+_REACHABLE_STOP_WORDS = frozenset({'en', 'à', 'a', 'dans'})
+# Mots qui terminent une destination : "aller à X en voiture / pour 8h / depuis..."
+_DESTINATION_STOP_WORDS = frozenset({'en', 'pour', 'depuis'})
+
+_PLACE_INITIAL = re.compile(r"[a-zà-ÿ]", re.IGNORECASE)
+# "de l'X à" / "de la X à" / "de X à" (sur le message en minuscules)
+_ORIGIN_WORD = re.compile(r"[a-zéèêàâôù][\w'\-]{2,}")
+_ORIGIN_BARE_WORD = re.compile(r"[a-zA-Z][a-zéèêàâôù\-0-9]{2,}")
+# Destination en tête de ce qui suit "à" (motifs gloutons ancrés : linéaires)
+_DESTINATION_PATTERNS = [
+    re.compile(r"l'([a-zéèêàâôù][\w\s'\-]{2,})"),
+    re.compile(r"(?:la|le|les|une|un|des)\s+([a-zéèêàâôù][\w\s'\-]{2,})"),
+    re.compile(r"([a-zA-Z][a-zéèêàâôù\s'\-0-9]{2,})"),
+]
+# Mots commençant par une majuscule (ou une lettre accentuée), dernier recours
+_CAPITALIZED_WORD = re.compile(r"\b[A-ZÀ-ÿ]\w*")
+
+_MY_POSITION = ['ma position', 'position actuelle', 'où je suis', 'ici']
+
+
+class _Sentence:
+    """
+    Message découpé en tokens pour la grammaire des lieux.
+
+    Le découpage puis, à la demande, les tables dérivées (fin de la suite
+    courante de mots, blancs, ' et -, prochaine fin possible d'un lieu
+    d'isochrone) sont calculés en une passe chacun ; les règles n'ont ensuite
+    que des accès directs ou des recherches dichotomiques dans les repères.
+    """
+
+    __slots__ = ('text', 'words', 'starts', 'anchors', '_run_end', '_reachable_stops')
+
+    def __init__(self, text: str):
+        self.text = text
+        lower = text.lower()
+        if len(lower) != len(text):  # minuscule de longueur différente (rare) : token par token
+            lower = ''.join(piece.lower() if len(piece.lower()) == len(piece) else piece
+                            for piece in _LEXER.findall(text))
+        # Tokens en minuscules ; ils couvrent tout le texte, bout à bout
+        self.words: List[str] = _LEXER.findall(lower)
+        self.starts: List[int] = list(accumulate(map(len, self.words), initial=0))
+        self.anchors: Dict[str, List[int]] = {}
+        for m in _ANCHOR_PATTERN.finditer(lower):
+            self.anchors.setdefault(m.group(), []).append(bisect_left(self.starts, m.start()))
+        self._run_end = None
+        self._reachable_stops = None
+
+    @property
+    def run_end(self) -> List[int]:
+        """run_end[i] : premier token >= i qui n'est ni mot, ni blanc, ni ' ou -"""
+        if self._run_end is None:
+            n = len(self.words)
+            run_end = [n] * (n + 1)
+            for i in range(n - 1, -1, -1):
+                outside = _KIND[self.words[i][0]] == _PUNCT and self.words[i] not in "'-"
+                run_end[i] = i if outside else run_end[i + 1]
+            self._run_end = run_end
+        return self._run_end
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def is_word(self, i: int, choices=None) -> bool:
+        return (0 <= i < len(self.words) and _KIND[self.words[i][0]] == _WORD
+                and (choices is None or self.words[i] in choices))
+
+    def is_space(self, i: int) -> bool:
+        return 0 <= i < len(self.words) and _KIND[self.words[i][0]] == _SPACE
+
+    def is_punct(self, i: int, chars: str) -> bool:
+        return 0 <= i < len(self.words) and _KIND[self.words[i][0]] == _PUNCT and self.words[i] in chars
+
+    def span(self, i: int, j: int) -> str:
+        """Texte brut des tokens [i, j)"""
+        return self.text[self.starts[i]:self.starts[j]]
+
+    def anchor_positions(self, *words: str) -> List[int]:
+        """Positions (triées) des mots-repères donnés"""
+        if len(words) == 1:
+            return self.anchors.get(words[0], [])
+        return sorted(i for word in words for i in self.anchors.get(word, []))
+
+    def place_starts(self, i: int, articles=_ARTICLES, space_after_elision: bool = True) -> List[int]:
+        """
+        Débuts possibles d'un nom de lieu en position i : après l'article
+        éventuel ("la ", "les ", "l'"), sinon en i (article pris dans le nom)
+        """
+        if self.is_word(i, articles) and self.is_space(i + 1):
+            return [i + 2, i]
+        if self.is_word(i, ('l',)) and self.is_punct(i + 1, "'"):
+            return [i + 3 if space_after_elision and self.is_space(i + 2) else i + 2, i]
+        return [i]
+
+    def place_length(self, first: int, stop: int) -> int:
+        """
+        Longueur maximale d'un lieu d'isochrone commençant en `first` et fini
+        en `stop` : les blancs avant une ponctuation ou la fin du message
+        peuvent en faire partie, un seul doit rester avant "en", "à"...
+        """
+        length = self.starts[stop] - self.starts[first]
+        if self.is_space(stop):
+            length += self.starts[stop + 1] - self.starts[stop] - self.is_word(stop + 1)
+        return length
+
+    def ends_sentence(self, i: int, chars: str = '?!.') -> bool:
+        """Fin du texte ou ponctuation de fin en position i"""
+        return i == len(self.words) or self.is_punct(i, chars)
+
+    def is_place_start(self, i: int) -> bool:
+        return self.is_word(i) and _PLACE_INITIAL.match(self.words[i]) is not None
+
+    def reachable_stop(self, i: int) -> int:
+        """Premier token >= i où peut s'arrêter l'origine d'une isochrone"""
+        if self._reachable_stops is None:
+            n = len(self.words)
+            stops = [n] * (n + 1)
+            for e in range(n - 1, -1, -1):
+                if self.is_space(e):
+                    stop = (e + 1 == n or self.is_punct(e + 1, '?!.,')
+                            or self.is_word(e + 1, _REACHABLE_STOP_WORDS))
+                else:
+                    stop = self.is_punct(e, '?!.,')
+                stops[e] = e if stop else stops[e + 1]
+            self._reachable_stops = stops
+        return self._reachable_stops[i]
 
 
 class ParamExtractor:
     """Extrait les paramètres des messages utilisateur pour des outils spécifiques."""
     
-    def extract(self, message: str, tool_name: str) -> Dict[str, Any]:
+    def extract(self, message: Union[str, NormalizedMessage], tool_name: str) -> Dict[str, Any]:
         """
         Extrait les paramètres du message selon l'outil détecté.
         
         Args:
-            message: Message de l'utilisateur
+            message: Message de l'utilisateur (texte brut ou déjà normalisé
+                par le simulateur MCP, pour ne pas refaire la normalisation)
             tool_name: Nom de l'outil détecté
             
         Returns:
             Dictionnaire des paramètres extraits
         """
-        message_lower = message.lower()
         params = {}
+        normalized = NormalizedMessage.of(message)
+        message = normalized.original
+        
+        # Heure de départ (retirée du message pour ne pas polluer les lieux)
+        if tool_name == 'estimate_drive_time':
+            departure, message = self._extract_departure_time(message)
+            params.update(departure)
+        elif tool_name == 'find_best_departure_time':
+            window, message = self._extract_departure_window(message)
+            params.update(window)
+        
+        if message != normalized.original:
+            normalized = NormalizedMessage(message)
+        message_lower = normalized.lower
         
         # Extraction commune : fuel_type
         params.update(self._extract_fuel_type(message_lower))
@@ -27,10 +241,12 @@ class ParamExtractor:
         params.update(self._extract_location(message))
         
         # Extraction spécifique selon l'outil
-        if tool_name == 'estimate_drive_time':
-            params.update(self._extract_drive_time_params(message, message_lower))
+        if tool_name in ('estimate_drive_time', 'find_best_departure_time'):
+            params.update(self._extract_drive_time_params(_Sentence(message), message_lower))
         elif tool_name == 'get_traffic_status':
-            params.update(self._extract_traffic_params(message))
+            params.update(self._extract_traffic_params(message, normalized.words))
+        elif tool_name == 'get_reachable_places':
+            params.update(self._extract_reachable_params(_Sentence(message), message_lower))
         
         # Extraction limite de résultats
         params.update(self._extract_result_limit(message_lower))
@@ -60,18 +276,13 @@ class ParamExtractor:
         params = {}
         
         # Chercher un code postal (5 chiffres)
-        cp_match = re.search(r'\b\d{5}\b', message)
+        cp_match = POSTAL_CODE_PATTERN.search(message)
         if cp_match:
             params['code_postal'] = cp_match.group()
         
         # Chercher une ville (mot en majuscule ou après "à", "dans")
-        ville_patterns = [
-            r'(?:à|dans|sur)\s+([A-Z][a-zéèêàâôù\-]+(?:\s+[A-Z][a-zéèêàâôù\-]+)*)',
-            r'\b([A-Z][a-zéèêàâôù]{3,})\b'
-        ]
-        
-        for pattern in ville_patterns:
-            ville_match = re.search(pattern, message)
+        for pattern in CITY_PATTERNS:
+            ville_match = pattern.search(message)
             if ville_match:
                 params['ville'] = ville_match.group(1)
                 break
@@ -83,27 +294,127 @@ class ParamExtractor:
         
         return params
     
-    def _extract_traffic_params(self, message: str) -> Dict[str, str]:
+    def _extract_traffic_params(self, message: str, words: str) -> Dict[str, str]:
         """Extrait les paramètres pour le trafic (nom de rue)."""
         params = {}
         
-        street_patterns = [
-            r"(?:rue|avenue|av\.?|boulevard|bd\.?|quai|route|chemin|allee|impasse|place)\s+([A-Za-zÀ-ÿ'\- ]{3,})",
-            r'"([^"]{3,})"',
-        ]
-        
-        for pat in street_patterns:
-            m = re.search(pat, message, flags=re.IGNORECASE)
+        for pattern in STREET_PATTERNS:
+            m = pattern.search(message)
             if m:
                 params['street_query'] = m.group(1).strip()
                 break
         
+        # Quartier ou commune de la métropole
+        district = match_district(words)
+        if district:
+            params['district'] = district
+        
         return params
     
-    def _extract_drive_time_params(self, message: str, message_lower: str) -> Dict[str, str]:
+    def _extract_reachable_params(self, sentence: _Sentence, message_lower: str) -> Dict[str, Any]:
+        """Extrait la durée, le type de lieux et l'origine éventuelle d'une isochrone."""
+        params: Dict[str, Any] = {'minutes': 10, 'category': 'all'}
+        
+        m = REACHABLE_MINUTES_PATTERN.search(sentence.text)
+        if m:
+            params['minutes'] = int(m.group(1))
+        
+        wants_parking = any(word in message_lower for word in ['parking', 'garer', 'stationner'])
+        wants_station = any(word in message_lower for word in ['station', 'essence', 'carburant', 'gazole', 'plein'])
+        if wants_parking and not wants_station:
+            params['category'] = 'parking'
+        elif wants_station and not wants_parking:
+            params['category'] = 'station'
+        
+        origin = self._reachable_origin(sentence)
+        if origin and origin.lower() not in ['ma position', 'position actuelle', 'ici', 'moi', 'chez moi']:
+            params['origin_name'] = origin
+        
+        return params
+    
+    def _reachable_origin(self, sentence: _Sentence) -> Optional[str]:
+        """
+        Origine d'une isochrone : "depuis X", "autour de X", "à partir de X".
+        X s'arrête avant "en", "à", "dans", une ponctuation ou la fin du message.
+        """
+        starts = []
+        for i in sentence.anchor_positions('depuis'):
+            starts.append((i, i + 1))
+        for i in sentence.anchor_positions('autour'):
+            if sentence.words[i + 1:i + 2] == [' '] and sentence.is_word(i + 2, ('de',)):
+                starts.append((i, i + 3))
+        for i in sentence.anchor_positions('partir'):
+            if (sentence.words[i - 1:i] == [' '] and sentence.is_word(i - 2, ('à', 'a'))
+                    and sentence.words[i + 1:i + 2] == [' '] and sentence.is_word(i + 2, ('de',))):
+                starts.append((i - 2, i + 3))
+        
+        for _, after in sorted(starts):
+            if not sentence.is_space(after):
+                continue
+            for first in sentence.place_starts(after + 1, ('la', 'le', 'les'), space_after_elision=False):
+                if not sentence.is_place_start(first):
+                    continue
+                # Première fin possible laissant au moins 3 caractères au lieu
+                stop = sentence.reachable_stop(first + 1)
+                while stop < len(sentence) and sentence.place_length(first, stop) < 3:
+                    stop = sentence.reachable_stop(stop + 1)
+                if sentence.place_length(first, stop) >= 3 and stop <= sentence.run_end[first]:
+                    return sentence.span(first, stop).strip()
+        return None
+    
+    def _extract_departure_time(self, message: str) -> Tuple[Dict[str, str], str]:
+        """
+        Extrait l'heure (et le jour) de départ souhaités.
+        
+        Returns:
+            ({'departure_time': 'HH:MM', 'departure_day': 'demain'|'lundi'|...}, message sans ces mentions)
+        """
+        params = {}
+        
+        m = DEPARTURE_TIME_PATTERN.search(message)
+        if m:
+            params['departure_time'] = f"{int(m.group(1)):02d}:{m.group(2) or '00'}"
+            message = message[:m.start()] + message[m.end():]
+            
+            day = DEPARTURE_DAY_PATTERN.search(message)
+            if day:
+                params['departure_day'] = day.group(1).lower().replace('è', 'e').replace(' ', '-')
+                message = message[:day.start()] + message[day.end():]
+        
+        return params, ' '.join(message.split())
+    
+    def _extract_departure_window(self, message: str) -> Tuple[Dict[str, str], str]:
+        """
+        Extrait la fenêtre de départ envisagée.
+        
+        Returns:
+            ({'window_start': 'HH:MM', 'window_end': 'HH:MM', 'departure_day': ...}, message nettoyé)
+        """
+        params = {}
+        
+        m = DEPARTURE_WINDOW_PATTERN.search(message)
+        if m:
+            params['window_start'] = f"{int(m.group(1)):02d}:{m.group(2) or '00'}"
+            params['window_end'] = f"{int(m.group(3)):02d}:{m.group(4) or '00'}"
+            message = message[:m.start()] + message[m.end():]
+        else:
+            for m in DEPARTURE_BOUND_PATTERN.finditer(message):
+                key = 'window_end' if m.group(1).lower() == 'avant' else 'window_start'
+                params[key] = f"{int(m.group(2)):02d}:{m.group(3) or '00'}"
+            message = DEPARTURE_BOUND_PATTERN.sub('', message)
+        
+        day = DEPARTURE_DAY_PATTERN.search(message)
+        if day:
+            params['departure_day'] = day.group(1).lower().replace('è', 'e').replace(' ', '-')
+            message = message[:day.start()] + message[day.end():]
+        
+        return params, ' '.join(message.split())
+    
+    def _extract_drive_time_params(self, sentence: _Sentence, message_lower: str) -> Dict[str, str]:
         """
         Extrait les paramètres pour l'estimation du temps de trajet.
-        Utilise 6 variantes de patterns pour capturer origin_name et destination_name.
+        Utilise 6 variantes (règles de la grammaire des lieux) pour capturer
+        origin_name et destination_name.
         """
         params = {}
         
@@ -112,121 +423,186 @@ class ParamExtractor:
             'ma position', 'position actuelle', 'où je suis', 'ici', 'd\'ici', 'depuis d\'ici'
         ])
         
-        # Variante 1: Pattern "de X à Y" - split par "à" d'abord
-        if ' à ' in message_lower or ' a ' in message_lower:
-            parts = re.split(r'\s+(?:à|a)\s+', message_lower, maxsplit=1)
-            if len(parts) == 2:
-                before_a, after_a = parts
-                
-                # Chercher "de X" à la FIN de "before_a"
-                de_patterns = [
-                    r'(?:^|\s)de\s+l\'([a-zéèêàâôù][\w\'\-0-9]{2,}?)\s*$',
-                    r'(?:^|\s)de\s+(?:la|le|les|une|un|des)\s+([a-zéèêàâôù][\w\'\-0-9]{2,}?)\s*$',
-                    r'(?:^|\s)de\s+([a-zA-Z][a-zéèêàâôù\-0-9]{2,}?)\s*$',
-                ]
-                
-                origin = None
-                for pattern in de_patterns:
-                    m = re.search(pattern, before_a)
-                    if m:
-                        origin = m.group(1).strip()
-                        break
-                
-                # Extraire destination
-                if origin:
-                    dest_patterns = [
-                        r'^l\'([a-zéèêàâôù][\w\s\'\-0-9]{2,})',
-                        r'^(?:la|le|les|une|un|des)\s+([a-zéèêàâôù][\w\s\'\-0-9]{2,})',
-                        r'^([a-zA-Z][a-zéèêàâôù\s\'\-0-9]{2,})',
-                    ]
-                    
-                    dest = None
-                    for pattern in dest_patterns:
-                        m = re.match(pattern, after_a)
-                        if m:
-                            dest = m.group(1).strip()
-                            break
-                    
-                    if dest:
-                        params['origin_name'] = origin
-                        params['destination_name'] = dest
+        # Variante 1: Pattern "de X à Y" - coupure au premier "à"
+        route = self._from_to(sentence)
+        if route:
+            params['origin_name'], params['destination_name'] = route
         
         # Variante 2: "entre X et Y"
         if 'origin_name' not in params:
-            pattern_entre = r'entre\s+([a-zÀ-ÿA-Z][\w\s\'\-]+?)\s+et\s+(?:la|le|les|l\'|une|un|des)?\s*([a-zÀ-ÿA-Z][\w\s\'\-]+?)(?:\s*[\?!.]|$)'
-            m = re.search(pattern_entre, message, re.IGNORECASE)
-            if m:
-                origin = m.group(1).strip()
-                if origin.lower() in ['ma position', 'position actuelle', 'où je suis', 'ici']:
-                    params['origin_name'] = 'ma position'
-                else:
-                    params['origin_name'] = origin
-                params['destination_name'] = m.group(2).strip()
-        
-        # Variante 3: "aller à X en partant de ma position"
-        if 'origin_name' not in params and has_my_position:
-            pattern_en_partant = r'aller\s+(?:à|a|vers|au)\s+(?:la|le|les|l\'|une|un|des)?\s*(.+?)\s+en\s+partant'
-            m = re.search(pattern_en_partant, message, re.IGNORECASE)
-            if m:
-                dest = m.group(1).strip()
-                params['origin_name'] = 'ma position'
+            route = self._between(sentence)
+            if route:
+                origin, dest = route
+                params['origin_name'] = 'ma position' if origin.lower() in _MY_POSITION else origin
                 params['destination_name'] = dest
         
+        # Variante 3: "aller à X en partant de ma position"
         # Variante 4: "aller à X depuis ma position"
         if 'origin_name' not in params and has_my_position:
-            pattern_depuis = r'aller\s+(?:à|a|vers|au)\s+(?:la|le|les|l\'|une|un|des)?\s*(.+?)\s+depuis'
-            m = re.search(pattern_depuis, message, re.IGNORECASE)
-            if m:
-                dest = m.group(1).strip()
+            dest = self._go_to_before(sentence, self._en_partant_markers(sentence))
+            if dest is None:
+                dest = self._go_to_before(sentence, [
+                    i - 1 for i in sentence.anchor_positions('depuis') if sentence.is_space(i - 1)
+                ])
+            if dest is not None:
                 params['origin_name'] = 'ma position'
                 params['destination_name'] = dest
         
         # Variante 5: Simple "aller à X"
         if 'destination_name' not in params:
-            pattern_aller = r'(?:combien de temps|temps|duree|pour)?\s*(?:aller|se rendre|me rendre)\s+(?:à|a|vers|au)\s+(?:la|le|les|l\'|une|un|des)?\s*([a-zéèêàâôùA-ZÀ-ÿ][\w\s\'\-]{2,})(?:\s*[\?!.]|$)'
-            m = re.search(pattern_aller, message, re.IGNORECASE)
-            if m:
-                dest = m.group(1).strip()
-                # Nettoyer les artifacts
-                for word in ['en', 'pour', 'depuis', 'd\'']:
-                    if ' ' + word in dest.lower():
-                        dest = dest.split(word, 1)[0].strip()
+            dest = self._go_to(sentence)
+            if dest is not None:
                 params['destination_name'] = dest
                 # Si pas d'origine spécifiée, utiliser "ma position" par défaut
                 if 'origin_name' not in params:
                     params['origin_name'] = 'ma position'
         
-        # Variante 6: Fallback - chercher 2 mots en majuscule
+        # Variante 6: Fallback - deux premiers mots en majuscule (s'il y en a au moins 4)
         if 'origin_name' not in params and 'destination_name' not in params:
             excluded_words = [
                 'combien', 'pourquoi', 'comment', 'quand', 'où', 'quel', 'quelle', 'quels', 'quelles',
                 'qu\'est', 'est-ce', 'c\'est', 'y', 'a', 'la', 'le', 'les', 'un', 'une', 'des'
             ]
             
-            pattern_caps = r'\b([A-ZÀ-ÿ][\w\s]*?)\b.*?\b([A-ZÀ-ÿ][\w\s]*?)\b'
-            matches = re.findall(pattern_caps, message)
-            if len(matches) >= 2:
-                if isinstance(matches[0], tuple):
-                    word1 = matches[0][0].strip().lower()
-                    word2 = matches[0][1].strip().lower()
-                    
-                    if word1 not in excluded_words:
-                        params['origin_name'] = matches[0][0].strip()
-                    
-                    if word2 not in excluded_words:
-                        params['destination_name'] = matches[0][1].strip()
-                else:
-                    word1 = matches[0].strip().lower()
-                    if word1 not in excluded_words:
-                        params['origin_name'] = matches[0].strip()
-                    
-                    if len(matches) > 1:
-                        word2 = matches[1].strip().lower()
-                        if word2 not in excluded_words:
-                            params['destination_name'] = matches[1].strip()
+            capitalized = _CAPITALIZED_WORD.findall(sentence.text)
+            if len(capitalized) >= 4:
+                if capitalized[0].lower() not in excluded_words:
+                    params['origin_name'] = capitalized[0]
+                if capitalized[1].lower() not in excluded_words:
+                    params['destination_name'] = capitalized[1]
         
         return params
     
+    def _from_to(self, sentence: _Sentence) -> Optional[Tuple[str, str]]:
+        """
+        "de X à Y" : X est le dernier mot avant le premier "à" isolé, précédé de
+        "de", "de l'" ou "de la/le/les..." ; Y est ce qui suit "à" (en minuscules).
+        """
+        cut = next((i for i in sentence.anchor_positions('à', 'a')
+                    if sentence.is_space(i - 1) and sentence.is_space(i + 1)), None)
+        if cut is None:
+            return None
+        
+        # Dernier groupe sans blanc avant "à" et ce qui le précède
+        last = cut - 2
+        space = last
+        while space >= 0 and not sentence.is_space(space):
+            space -= 1
+        if space < 0:
+            return None
+        word = sentence.span(space + 1, cut - 1).lower()
+        
+        def follows_de(i: int) -> bool:
+            return sentence.is_word(i, ('de',)) and (i == 0 or sentence.is_space(i - 1))
+        
+        origin = None
+        if follows_de(space - 1) and sentence.is_word(space + 1, ('l',)) and sentence.is_punct(space + 2, "'"):
+            origin = _ORIGIN_WORD.fullmatch(sentence.span(space + 3, cut - 1).lower())
+        elif (sentence.is_word(space - 1, _ARTICLES) and sentence.is_space(space - 2)
+                and follows_de(space - 3)):
+            origin = _ORIGIN_WORD.fullmatch(word)
+        elif follows_de(space - 1):
+            origin = _ORIGIN_BARE_WORD.fullmatch(word)
+        if not origin:
+            return None
+        
+        after = sentence.text[sentence.starts[cut + 2]:].lower()
+        for pattern in _DESTINATION_PATTERNS:
+            m = pattern.match(after)
+            if m:
+                return origin.group().strip(), m.group(1).strip()
+        return None
+    
+    def _between(self, sentence: _Sentence) -> Optional[Tuple[str, str]]:
+        """"entre X et Y" : Y va jusqu'à la ponctuation de fin (ou la fin du message)."""
+        if 'entre' not in sentence.anchors:
+            return None
+        # Positions de "et" suivies d'une destination valide
+        valid, dest_starts = [], {}
+        for i in sentence.anchor_positions('et'):
+            if not (sentence.is_space(i - 1) and sentence.is_space(i + 1)):
+                continue
+            end = sentence.run_end[i]
+            if not sentence.ends_sentence(end):
+                continue
+            for first in sentence.place_starts(i + 2):
+                if (first < end and sentence.is_place_start(first)
+                        and sentence.starts[end] - sentence.starts[first] >= 2):
+                    valid.append(i)
+                    dest_starts[i] = first
+                    break
+        
+        for i in sentence.anchor_positions('entre'):
+            first = i + 2
+            if not (sentence.is_space(i + 1) and sentence.is_place_start(first)):
+                continue
+            k = bisect_right(valid, first)
+            while k < len(valid) and valid[k] < sentence.run_end[first]:
+                et = valid[k]
+                origin = sentence.span(first, et - 1)
+                if len(origin) >= 2:
+                    dest = sentence.span(dest_starts[et], sentence.run_end[et])
+                    return origin.strip(), dest.strip()
+                k += 1
+        return None
+    
+    def _en_partant_markers(self, sentence: _Sentence) -> List[int]:
+        """Blancs précédant "en partant" """
+        return [
+            i - 1 for i in sentence.anchor_positions('en')
+            if sentence.is_space(i - 1) and sentence.is_space(i + 1)
+            and sentence.is_word(i + 2) and sentence.words[i + 2].startswith('partant')
+        ]
+    
+    def _destination_starts(self, sentence: _Sentence, verbs: Tuple[str, ...]) -> List[List[int]]:
+        """
+        Débuts possibles de X dans "<verbe> à|vers|au X" ("aller", "se rendre",
+        "me rendre"), pour chaque occurrence du verbe
+        """
+        positions = list(sentence.anchor_positions('aller')) if 'aller' in verbs else []
+        positions += [
+            i for i in sentence.anchor_positions('rendre')
+            if sentence.words[i - 1:i] == [' '] and sentence.is_word(i - 2)
+            and f"{sentence.words[i - 2]} rendre" in verbs
+        ]
+        return [
+            sentence.place_starts(i + 4) for i in sorted(positions)
+            if sentence.is_space(i + 1) and sentence.is_word(i + 2, _TO) and sentence.is_space(i + 3)
+        ]
+    
+    def _go_to_before(self, sentence: _Sentence, markers: List[int]) -> Optional[str]:
+        """X dans "aller à X <marqueur>" ("en partant", "depuis")"""
+        if not markers:
+            return None
+        for candidates in self._destination_starts(sentence, ('aller',)):
+            for first in candidates:
+                k = bisect_right(markers, first)
+                if k < len(markers):
+                    return sentence.span(first, markers[k]).strip()
+        return None
+    
+    def _go_to(self, sentence: _Sentence) -> Optional[str]:
+        """
+        X dans "aller à X" jusqu'à la ponctuation de fin, coupé avant
+        "en", "pour", "depuis" ou "d'" ("aller à la gare en voiture").
+        """
+        verbs = ('aller', 'se rendre', 'me rendre')
+        candidates = [first for starts in self._destination_starts(sentence, verbs) for first in starts]
+        for first in candidates:
+            end = sentence.run_end[first]
+            if not (sentence.is_place_start(first) and sentence.ends_sentence(end)):
+                continue
+            if sentence.starts[end] - sentence.starts[first] < 3:
+                continue
+            for i in range(first + 1, end):
+                if sentence.is_space(i - 1) and (
+                        sentence.is_word(i, _DESTINATION_STOP_WORDS)
+                        or (sentence.is_word(i, ('d',)) and sentence.is_punct(i + 1, "'"))):
+                    end = i
+                    break
+            return sentence.span(first, end).strip()
+        return None
+    
     def _extract_result_limit(self, message_lower: str) -> Dict[str, int]:
         """Extrait la limite de résultats."""
         if any(word in message_lower for word in ['top 3', '3 premiers', 'trois']):
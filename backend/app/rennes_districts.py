@@ -0,0 +1,162 @@
+"""
+Quartiers de Rennes et communes de la métropole
+Index spatial (point dans polygone) pour rattacher une coordonnée GPS à un secteur.
+
+Par défaut les polygones sont approchés par les cellules de Voronoï des
+centres de secteurs (chaque point est rattaché au centre le plus proche).
+Si un GeoJSON des contours officiels est disponible localement
+(RENNES_DISTRICTS_GEOJSON), il est utilisé à la place.
+
+Features:
+- DistrictIndex.locate(): secteur contenant un point
+- DistrictIndex.locate_many(): version vectorisée pour un lot de points
+- find_district(): secteur mentionné dans un texte libre
+- match_district(): idem sur un texte déjà normalisé (NormalizedMessage.words)
+"""
+
+import json
+import os
+import unicodedata
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from shapely import STRtree, points
+from shapely.geometry import MultiPoint, Point, box, shape
+from shapely.ops import voronoi_diagram
+
+from .config import RENNES_DISTRICTS_GEOJSON
+
+# Centres approximatifs (latitude, longitude) et noms usuels de chaque secteur
+RENNES_DISTRICTS = {
+    # Les 12 quartiers de Rennes
+    'Centre': ((48.1113, -1.6800), ['centre', 'centre ville', 'hypercentre']),
+    'Thabor - Saint-Hélier': ((48.1110, -1.6560), ['thabor', 'saint helier', 'alphonse guerin']),
+    'Bourg-l\'Évêque - La Touche': ((48.1170, -1.7000), ['bourg l eveque', 'la touche', 'moulin du comte']),
+    'Saint-Martin': ((48.1240, -1.6800), ['saint martin']),
+    'Maurepas - Bellangerais': ((48.1280, -1.6560), ['maurepas', 'bellangerais']),
+    'Jeanne d\'Arc - Longs-Champs - Beaulieu': ((48.1220, -1.6360), ['jeanne d arc', 'longs champs', 'beaulieu']),
+    'Francisco Ferrer - Landry - Poterie': ((48.0990, -1.6440), ['francisco ferrer', 'landry', 'poterie']),
+    'Sud-Gare': ((48.0960, -1.6740), ['sud gare']),
+    'Cleunay - Arsenal - Redon': ((48.1040, -1.7050), ['cleunay', 'arsenal']),
+    'Villejean - Beauregard': ((48.1270, -1.7070), ['villejean', 'beauregard']),
+    'Le Blosne': ((48.0850, -1.6580), ['blosne', 'le blosne']),
+    'Bréquigny': ((48.0870, -1.6880), ['brequigny']),
+
+    # Communes de la métropole
+    'Saint-Grégoire': ((48.1510, -1.6860), ['saint gregoire']),
+    'Betton': ((48.1800, -1.6430), ['betton']),
+    'Cesson-Sévigné': ((48.1210, -1.6030), ['cesson', 'cesson sevigne']),
+    'Thorigné-Fouillard': ((48.1600, -1.5800), ['thorigne', 'thorigne fouillard']),
+    'Chantepie': ((48.0880, -1.6160), ['chantepie']),
+    'Vern-sur-Seiche': ((48.0450, -1.6020), ['vern', 'vern sur seiche']),
+    'Saint-Jacques-de-la-Lande': ((48.0650, -1.7200), ['saint jacques', 'saint jacques de la lande']),
+    'Chartres-de-Bretagne': ((48.0400, -1.7050), ['chartres de bretagne']),
+    'Bruz': ((48.0250, -1.7460), ['bruz']),
+    'Le Rheu': ((48.1010, -1.7960), ['le rheu']),
+    'Pacé': ((48.1480, -1.7740), ['pace']),
+    'Vezin-le-Coquet': ((48.1180, -1.7550), ['vezin', 'vezin le coquet']),
+    'Acigné': ((48.1330, -1.5360), ['acigne']),
+    'Mordelles': ((48.0750, -1.8430), ['mordelles']),
+}
+
+# Emprise de la métropole (lon_min, lat_min, lon_max, lat_max)
+METRO_BOUNDS = (-1.95, 47.95, -1.40, 48.28)
+
+
+def _normalize(text: str) -> str:
+    """Minuscule, sans accents, ponctuation remplacée par des espaces"""
+    nfd = unicodedata.normalize('NFD', text.lower())
+    text = ''.join(char for char in nfd if unicodedata.category(char) != 'Mn')
+    return ' '.join(''.join(c if c.isalnum() else ' ' for c in text).split())
+
+
+class DistrictIndex:
+    """Index point-dans-polygone des secteurs de Rennes Métropole."""
+
+    def __init__(self, polygons: Dict[str, object]):
+        self.names: List[str] = list(polygons.keys())
+        self.polygons = list(polygons.values())
+        self._tree = STRtree(self.polygons)
+
+    @classmethod
+    def from_centers(cls, centers: Dict[str, tuple] = None) -> "DistrictIndex":
+        """Polygones approchés par les cellules de Voronoï des centres"""
+        centers = centers or {name: center for name, (center, _) in RENNES_DISTRICTS.items()}
+        seeds = {name: Point(lon, lat) for name, (lat, lon) in centers.items()}
+        envelope = box(*METRO_BOUNDS)
+        cells = voronoi_diagram(MultiPoint(list(seeds.values())), envelope=envelope)
+
+        polygons = {}
+        for cell in cells.geoms:
+            for name, seed in seeds.items():
+                if cell.contains(seed):
+                    polygons[name] = cell.intersection(envelope)
+                    break
+        return cls(polygons)
+
+    @classmethod
+    def from_geojson(cls, path: str, name_property: str = "nom") -> "DistrictIndex":
+        """Contours officiels depuis un fichier GeoJSON (FeatureCollection)"""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        polygons = {}
+        for feature in data.get("features", []):
+            name = feature.get("properties", {}).get(name_property)
+            if name and feature.get("geometry"):
+                polygons[name] = shape(feature["geometry"])
+        return cls(polygons)
+
+    @classmethod
+    def default(cls) -> "DistrictIndex":
+        if RENNES_DISTRICTS_GEOJSON and os.path.exists(RENNES_DISTRICTS_GEOJSON):
+            try:
+                return cls.from_geojson(RENNES_DISTRICTS_GEOJSON)
+            except Exception as e:
+                print("[Warning] Erreur lecture contours des quartiers:", e)
+        return cls.from_centers()
+
+    def locate(self, lat: float, lon: float) -> Optional[str]:
+        """Nom du secteur contenant le point, None hors métropole"""
+        idx = self.locate_many([lat], [lon])[0]
+        return self.names[idx] if idx >= 0 else None
+
+    def locate_many(self, lats: Sequence[float], lons: Sequence[float]) -> np.ndarray:
+        """Index du secteur (dans self.names) de chaque point, -1 si aucun"""
+        pts = points(np.asarray(lons, dtype=np.float64), np.asarray(lats, dtype=np.float64))
+        result = np.full(len(pts), -1, dtype=np.intp)
+        point_idx, poly_idx = self._tree.query(pts, predicate="within")
+        # En cas de chevauchement de contours, le premier secteur l'emporte
+        result[point_idx[::-1]] = poly_idx[::-1]
+        return result
+
+
+# Alias normalisés -> nom du secteur, du plus long au plus court
+_DISTRICT_ALIASES = sorted(
+    (
+        (_normalize(alias), name)
+        for name, (_, aliases) in RENNES_DISTRICTS.items()
+        for alias in aliases + [name]
+    ),
+    key=lambda item: len(item[0]),
+    reverse=True,
+)
+
+
+def find_district(text: str) -> Optional[str]:
+    """
+    Cherche un quartier ou une commune mentionné dans un texte.
+
+    Examples:
+        >>> find_district("Comment est la circulation à Villejean ?")
+        'Villejean - Beauregard'
+    """
+    return match_district(_normalize(text))
+
+
+def match_district(words: str) -> Optional[str]:
+    """find_district() sur un texte déjà normalisé (mots sans accents séparés par un espace)"""
+    padded = f" {words} "
+    for alias, name in _DISTRICT_ALIASES:
+        if f" {alias} " in padded:
+            return name
+    return None
@@ -7,10 +7,21 @@ Features:
 - find_location(): Recherche exacte (rapide)
 - find_location_fuzzy(): Recherche floue avec tolérance aux typos/accents
 - get_suggestions(): Suggestions intelligentes par fuzzy matching
+- get_location_id(): Identifiant canonique d'un lieu (alias regroupés par coordonnées)
+- LocationIndex: index construit une fois à l'import (clés normalisées, trigrammes)
+- suggest_locations(): autocomplétion par préfixe (trie), classée par popularité
+- GAZETTEER: adresses BAN optionnelles (voir gazetteer.py), consultées pour les
+  noms absents de RENNES_LOCATIONS
 """
 
-from difflib import get_close_matches
+from collections import defaultdict
+from difflib import SequenceMatcher
+from heapq import nlargest
 import unicodedata
+from typing import Optional
+
+from .config import LOCATION_SUGGEST_MAX_RESULTS
+from .gazetteer import Gazetteer, normalize_name as _normalize_name
 
 # Dictionnaire principal avec tous les lieux de Rennes Métropole
 RENNES_LOCATIONS = {
@@ -139,6 +150,205 @@ RENNES_LOCATIONS = {
 }
 
 
+# Lieux canoniques : les alias partageant les mêmes coordonnées ont le même
+# identifiant (indice dans LOCATION_COORDS, dans l'ordre de la table)
+LOCATION_COORDS = list(dict.fromkeys(RENNES_LOCATIONS.values()))
+LOCATION_NAMES = [
+    next(name for name, coords in RENNES_LOCATIONS.items() if coords == canonical)
+    for canonical in LOCATION_COORDS
+]
+_LOCATION_IDS = {coords: idx for idx, coords in enumerate(LOCATION_COORDS)}
+
+# Lieux les plus demandés, par ordre de popularité (suggestions par défaut)
+POPULAR_PLACES = [
+    'rennes', 'gare', 'république', 'place des lices',
+    'université rennes 1', 'université rennes 2', 'chu',
+    'centre ville', 'villejean', 'beaulieu'
+]
+
+
+def get_location_id(coords: tuple) -> Optional[int]:
+    """
+    Identifiant canonique du lieu situé exactement à ces coordonnées
+
+    Returns:
+        Indice dans LOCATION_COORDS, ou None si ce n'est pas un lieu connu (ex: position GPS)
+    """
+    return _LOCATION_IDS.get(tuple(coords))
+
+
+def _remove_accents(text: str) -> str:
+    """Supprime les accents d'une chaîne"""
+    nfd = unicodedata.normalize('NFD', text)
+    return ''.join(char for char in nfd if unicodedata.category(char) != 'Mn')
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class LocationIndex:
+    """
+    Index des noms de lieux, construit une seule fois.
+
+    - clés exactes (minuscules) et normalisées (sans accents ni ponctuation)
+      en dictionnaires : recherche en O(1)
+    - index inversé de trigrammes : la recherche floue et les sous-chaînes ne
+      comparent que les candidats partageant des trigrammes avec la requête
+    """
+
+    def __init__(self, locations: dict):
+        self.locations = locations
+        self.keys = list(locations.keys())
+        self._normalized = {}
+        for key in self.keys:
+            self._normalized.setdefault(_normalize_name(key), key)
+
+        self._postings = defaultdict(list)
+        for idx, key in enumerate(self.keys):
+            for gram in _trigrams(key):
+                self._postings[gram].append(idx)
+
+    def find(self, name: str, threshold: float = 0.75) -> tuple:
+        """Coordonnées du lieu : exact, puis sans accents, puis flou"""
+        coords = self.lookup(name)
+        if coords is not None:
+            return coords
+        return self.find_close(name, threshold)
+
+    def lookup(self, name: str) -> tuple:
+        """Coordonnées du lieu : exact, puis sans accents (sans recherche floue)"""
+        clean_name = name.lower().strip()
+        if clean_name in self.locations:
+            return self.locations[clean_name]
+
+        key = self._normalized.get(_normalize_name(clean_name))
+        return self.locations[key] if key is not None else None
+
+    def find_close(self, name: str, threshold: float = 0.75) -> tuple:
+        """Coordonnées du lieu le plus proche orthographiquement"""
+        matches = self.close_matches(name.lower().strip(), n=1, cutoff=threshold)
+        return self.locations[matches[0]] if matches else None
+
+    def close_matches(self, word: str, n: int = 3, cutoff: float = 0.6) -> list:
+        """
+        Équivalent de difflib.get_close_matches limité aux clés partageant
+        au moins un trigramme avec `word` (même score, mêmes départages)
+        """
+        candidates = set()
+        for gram in _trigrams(word):
+            candidates.update(self._postings.get(gram, ()))
+
+        matcher = SequenceMatcher()
+        matcher.set_seq2(word)
+        scored = []
+        for idx in candidates:
+            key = self.keys[idx]
+            matcher.set_seq1(key)
+            if (matcher.real_quick_ratio() >= cutoff and matcher.quick_ratio() >= cutoff
+                    and matcher.ratio() >= cutoff):
+                scored.append((matcher.ratio(), key))
+        return [key for _, key in nlargest(n, scored)]
+
+    def containing(self, partial: str) -> list:
+        """Clés contenant `partial` (sous-chaîne), via l'intersection des trigrammes"""
+        if len(partial) < 3:
+            return [key for key in self.keys if partial in key]
+
+        grams = [partial[i:i + 3] for i in range(len(partial) - 2)]
+        postings = sorted((self._postings.get(g, []) for g in grams), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        return [self.keys[idx] for idx in sorted(candidates) if partial in self.keys[idx]]
+
+
+LOCATION_INDEX = LocationIndex(RENNES_LOCATIONS)
+
+
+class LocationTrie:
+    """
+    Trie des préfixes de noms normalisés pour l'autocomplétion.
+
+    Chaque nom (et chaque alias) est inséré en entier et à partir de chacun de
+    ses mots ("lices" trouve "place des lices"). Chaque nœud conserve ses
+    `top_k` meilleurs lieux distincts, calculés à la construction : une
+    requête se résume à descendre le trie, sans parcourir les sous-arbres.
+
+    Classement : lieux de POPULAR_PLACES d'abord, puis correspondance en début
+    de nom, lieux ayant le plus d'alias, nom le plus court, puis ordre de la
+    table (la graphie accentuée précède la variante sans accent).
+    """
+
+    def __init__(self, locations: dict, popular: list = POPULAR_PLACES,
+                 top_k: int = LOCATION_SUGGEST_MAX_RESULTS):
+        self.locations = locations
+        self.top_k = top_k
+
+        # Alias regroupés par coordonnées (comme LOCATION_COORDS)
+        coord_ids = {coords: idx for idx, coords in enumerate(dict.fromkeys(locations.values()))}
+        ids = {key: coord_ids[coords] for key, coords in locations.items()}
+        alias_counts = defaultdict(int)
+        for location_id in ids.values():
+            alias_counts[location_id] += 1
+        popular_rank = {}
+        for rank, name in enumerate(popular):
+            popular_rank.setdefault(ids[name], rank)
+
+        # Nœud : (enfants, entrées) ; entrées = [(rang, id du lieu, nom)]
+        self._root = ({}, [])
+        for order, (key, location_id) in enumerate(ids.items()):
+            words = _normalize_name(key).split()
+            popularity = popular_rank.get(location_id, len(popular))
+            for position in range(len(words)):
+                rank = (popularity, position > 0, -alias_counts[location_id], len(key), order)
+                self._insert(' '.join(words[position:]), (rank, location_id, key))
+
+        self._finalize(self._root)
+
+    def _insert(self, text: str, entry: tuple):
+        node = self._root
+        for char in text:
+            node = node[0].setdefault(char, ({}, []))
+            node[1].append(entry)
+
+    def _finalize(self, root: tuple):
+        # Tri et déduplication par lieu : un seul alias (le mieux classé) par lieu
+        stack = [root]
+        while stack:
+            children, entries = stack.pop()
+            entries.sort()
+            best, seen = [], set()
+            for _, location_id, key in entries:
+                if location_id not in seen:
+                    seen.add(location_id)
+                    best.append(key)
+                    if len(best) == self.top_k:
+                        break
+            entries[:] = best
+            stack.extend(children.values())
+
+    def suggest(self, prefix: str, limit: int = 8) -> list:
+        """Noms de lieux dont un mot commence par `prefix` (accents et casse ignorés)"""
+        text = _normalize_name(prefix)
+        if not text:
+            return []
+        if prefix[-1:].isspace():
+            text += ' '  # "gare " ne doit pas proposer "garenne"
+
+        node = self._root
+        for char in text:
+            node = node[0].get(char)
+            if node is None:
+                return []
+        return node[1][:limit]
+
+
+LOCATION_TRIE = LocationTrie(RENNES_LOCATIONS)
+
+# Adresses BAN (None si le gazetteer n'a pas été construit)
+GAZETTEER = Gazetteer.load_default()
+
+
 def find_location(location_name: str) -> tuple:
     """
     Recherche une localisation par son nom (insensible à la casse)
@@ -151,12 +361,6 @@ def find_location(location_name: str) -> tuple:
     return RENNES_LOCATIONS.get(location_name.lower())
 
 
-def _remove_accents(text: str) -> str:
-    """Supprime les accents d'une chaîne"""
-    nfd = unicodedata.normalize('NFD', text)
-    return ''.join(char for char in nfd if unicodedata.category(char) != 'Mn')
-
-
 def find_location_fuzzy(location_name: str, threshold: float = 0.75) -> tuple:
     """
     Recherche floue d'une localisation avec tolérance aux typos/accents
@@ -164,7 +368,9 @@ def find_location_fuzzy(location_name: str, threshold: float = 0.75) -> tuple:
     Stratégie:
     1. Essayer un match exact d'abord (rapide)
     2. Essayer sans accents
-    3. Fuzzy matching sur les clés
+    3. Adresse exacte du gazetteer ("12 rue de la paix"), s'il est chargé
+    4. Fuzzy matching sur les clés
+    5. Fuzzy matching sur les voies du gazetteer
     
     Args:
         location_name: Nom du lieu recherché (peut contenir typos)
@@ -183,27 +389,44 @@ def find_location_fuzzy(location_name: str, threshold: float = 0.75) -> tuple:
         >>> find_location_fuzzy("garr")  # Typo
         (48.1039, -1.6720)  # la gare
     """
-    clean_name = location_name.lower().strip()
-    
-    # 1. Match exact
-    if clean_name in RENNES_LOCATIONS:
-        return RENNES_LOCATIONS[clean_name]
-    
-    # 2. Match sans accents
-    clean_no_accents = _remove_accents(clean_name)
-    for key, coords in RENNES_LOCATIONS.items():
-        if _remove_accents(key) == clean_no_accents:
-            return coords
-    
-    # 3. Fuzzy matching sur les clés
-    all_keys = list(RENNES_LOCATIONS.keys())
-    closest_matches = get_close_matches(clean_name, all_keys, n=1, cutoff=threshold)
-    
-    if closest_matches:
-        matched_key = closest_matches[0]
-        return RENNES_LOCATIONS[matched_key]
-    
-    return None
+    coords = LOCATION_INDEX.lookup(location_name)
+    if coords is not None:
+        return coords
+
+    if GAZETTEER is not None:
+        address = GAZETTEER.find(location_name)
+        if address is not None:
+            return address["lat"], address["lon"]
+
+    coords = LOCATION_INDEX.find_close(location_name, threshold)
+    if coords is None and GAZETTEER is not None:
+        address = GAZETTEER.find(location_name, fuzzy_cutoff=threshold)
+        if address is not None:
+            return address["lat"], address["lon"]
+    return coords
+
+
+def suggest_locations(prefix: str, limit: int = 8) -> list:
+    """
+    Autocomplétion des lieux connus (saisie au clavier)
+
+    Args:
+        prefix: Début de saisie de l'utilisateur
+        limit: Nombre maximum de suggestions (borné par LOCATION_SUGGEST_MAX_RESULTS)
+
+    Returns:
+        Liste de {"name", "latitude", "longitude"}, un seul alias par lieu,
+        complétée par les voies du gazetteer s'il est chargé
+    """
+    results = []
+    for name in LOCATION_TRIE.suggest(prefix, limit):
+        lat, lon = RENNES_LOCATIONS[name]
+        results.append({"name": name, "latitude": lat, "longitude": lon})
+
+    if GAZETTEER is not None and len(results) < limit:
+        for address in GAZETTEER.suggest(prefix, limit - len(results)):
+            results.append({"name": address["label"], "latitude": address["lat"], "longitude": address["lon"]})
+    return results
 
 
 def get_known_locations() -> list:
@@ -236,28 +459,19 @@ def get_suggestions(partial_name: str, limit: int = 5) -> list:
     partial_lower = partial_name.lower().strip()
     
     # 1. Recherche par sous-chaîne
-    substring_matches = [
-        name for name in RENNES_LOCATIONS.keys()
-        if partial_lower in name
-    ]
+    substring_matches = LOCATION_INDEX.containing(partial_lower)
     
     if len(substring_matches) >= limit:
         return sorted(substring_matches)[:limit]
     
     # 2. Fuzzy matching si pas assez de résultats
-    all_keys = list(RENNES_LOCATIONS.keys())
-    fuzzy_matches = get_close_matches(partial_lower, all_keys, n=limit, cutoff=0.6)
+    fuzzy_matches = LOCATION_INDEX.close_matches(partial_lower, n=limit, cutoff=0.6)
     
     # Combiner et dédupliquer
     combined = list(dict.fromkeys(substring_matches + fuzzy_matches))
     
     # 3. Si toujours aucun résultat, suggérer les lieux les plus populaires
     if not combined:
-        popular_places = [
-            'rennes', 'gare', 'république', 'place des lices', 
-            'université rennes 1', 'université rennes 2', 'chu',
-            'centre ville', 'villejean', 'beaulieu'
-        ]
-        return popular_places[:limit]
+        return POPULAR_PLACES[:limit]
     
     return sorted(combined)[:limit]
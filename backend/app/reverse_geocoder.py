@@ -0,0 +1,199 @@
+"""
+Géocodage inverse local : position GPS -> lieu connu, adresse et quartier
+Sans réseau : index spatial en grille sur RENNES_LOCATIONS et, s'il est
+chargé, sur les adresses du gazetteer BAN ; quartier via DistrictIndex.
+
+Features:
+- GridIndex: plus proche voisin par cellules de grille (anneaux concentriques)
+- ReverseGeocoder.lookup(): lieu, adresse et quartier d'un point
+- reverse_lookup(): raccourci sur l'instance par défaut
+- lookup_district(): quartier seul, sans recherche de lieu ni d'adresse
+"""
+
+import math
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import REVERSE_ADDRESS_MAX_M, REVERSE_GRID_DEG, REVERSE_PLACE_MAX_M
+from .rennes_districts import DistrictIndex
+from .rennes_locations import GAZETTEER, LOCATION_COORDS, LOCATION_NAMES
+
+EARTH_RADIUS_M = 6_371_000
+M_PER_DEG = math.radians(1) * EARTH_RADIUS_M
+
+
+class GridIndex:
+    """
+    Plus proche voisin sur une grille régulière en degrés.
+
+    Les points sont triés par cellule ; chaque cellule occupe une tranche
+    contiguë des tableaux. Une requête parcourt les anneaux de cellules
+    autour du point jusqu'à ce qu'aucun anneau suivant ne puisse contenir
+    de point plus proche.
+    """
+
+    def __init__(self, lats: Sequence[float], lons: Sequence[float], cell_deg: float = REVERSE_GRID_DEG):
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        self.cell_deg = cell_deg
+
+        keys = self._cell_key(np.floor(lats / cell_deg), np.floor(lons / cell_deg))
+        self._order = np.argsort(keys, kind="stable")
+        self._lat = lats[self._order]
+        self._lon = lons[self._order]
+        self._lat_view = memoryview(self._lat)
+        self._lon_view = memoryview(self._lon)
+        cells, starts = np.unique(keys[self._order], return_index=True)
+        ends = np.append(starts[1:], len(keys))
+        self._cells = dict(zip(cells.tolist(), zip(starts.tolist(), ends.tolist())))
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    @staticmethod
+    def _cell_key(row, col):
+        return row * 1_000_000 + col
+
+    def nearest(self, lat: float, lon: float, max_m: float) -> Optional[Tuple[int, float]]:
+        """Indice (ordre d'origine) et distance (m) du point le plus proche, None au-delà de max_m"""
+        if not self._cells:
+            return None
+        row, col = math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg)
+        cos_lat = math.cos(math.radians(lat))
+        cell_m = self.cell_deg * M_PER_DEG * min(1.0, cos_lat)
+        max_ring = int(max_m // cell_m) + 1
+
+        best_idx, best_m = -1, math.inf
+        for ring in range(max_ring + 1):
+            for r, c in _ring_cells(row, col, ring):
+                span = self._cells.get(self._cell_key(r, c))
+                if span is None:
+                    continue
+                idx, dist_m = self._nearest_in(span, lat, lon, cos_lat)
+                if dist_m < best_m:
+                    best_idx, best_m = idx, dist_m
+            # Tout point hors des anneaux parcourus est à plus de ring * cell_m
+            if best_m <= ring * cell_m:
+                break
+
+        if best_idx < 0 or best_m > max_m:
+            return None
+        return int(self._order[best_idx]), best_m
+
+    def _nearest_in(self, span: Tuple[int, int], lat: float, lon: float, cos_lat: float) -> Tuple[int, float]:
+        start, end = span
+        if end - start > 32:
+            dist = np.hypot((self._lon[start:end] - lon) * cos_lat, self._lat[start:end] - lat)
+            i = int(np.argmin(dist))
+            return start + i, float(dist[i]) * M_PER_DEG
+        # Cellule peu peuplée : boucle Python plus rapide que NumPy
+        lats, lons = self._lat_view, self._lon_view
+        best_i, best_d = start, math.inf
+        for i in range(start, end):
+            d = math.hypot((lons[i] - lon) * cos_lat, lats[i] - lat)
+            if d < best_d:
+                best_i, best_d = i, d
+        return best_i, best_d * M_PER_DEG
+
+
+def _ring_cells(row: int, col: int, ring: int):
+    if ring == 0:
+        yield row, col
+        return
+    for c in range(col - ring, col + ring + 1):
+        yield row - ring, c
+        yield row + ring, c
+    for r in range(row - ring + 1, row + ring):
+        yield r, col - ring
+        yield r, col + ring
+
+
+class ReverseGeocoder:
+    """Lieu connu, adresse et quartier les plus proches d'une position."""
+
+    def __init__(self, place_coords: Sequence[Tuple[float, float]], place_names: Sequence[str],
+                 gazetteer=None, district_index: Optional[DistrictIndex] = None):
+        coords = np.asarray(place_coords, dtype=np.float64).reshape(-1, 2)
+        self.place_names = list(place_names)
+        self.places = GridIndex(coords[:, 0], coords[:, 1])
+        self.gazetteer = gazetteer
+        self.addresses = None
+        if gazetteer is not None and gazetteer.address_count:
+            self.addresses = GridIndex(gazetteer.addr_lat, gazetteer.addr_lon)
+        self.district_index = district_index or DistrictIndex.default()
+
+    @classmethod
+    def default(cls) -> "ReverseGeocoder":
+        return cls(LOCATION_COORDS, LOCATION_NAMES, GAZETTEER)
+
+    def lookup(self, lat: float, lon: float) -> Dict[str, Any]:
+        """
+        Décrit une position GPS
+
+        Returns:
+            {
+                "label": str (adresse, "près de <lieu>", quartier ou coordonnées),
+                "place": str | None,
+                "place_distance_m": float | None,
+                "address": str | None,
+                "district": str | None
+            }
+        """
+        result = {
+            "label": None,
+            "place": None,
+            "place_distance_m": None,
+            "address": None,
+            "district": self.district_index.locate(lat, lon),
+        }
+
+        nearest = self.places.nearest(lat, lon, REVERSE_PLACE_MAX_M)
+        if nearest is not None:
+            idx, distance_m = nearest
+            result["place"] = self.place_names[idx]
+            result["place_distance_m"] = round(distance_m)
+
+        if self.addresses is not None:
+            nearest = self.addresses.nearest(lat, lon, REVERSE_ADDRESS_MAX_M)
+            if nearest is not None:
+                result["address"] = self.gazetteer.address(nearest[0])["label"]
+
+        if result["address"]:
+            label = result["address"]
+        elif result["place"]:
+            label = f"près de {result['place']}"
+        else:
+            label = None
+
+        district = result["district"]
+        if label and district:
+            result["label"] = f"{label} ({district})"
+        else:
+            result["label"] = label or district or f"{lat:.5f}, {lon:.5f}"
+        return result
+
+
+REVERSE_GEOCODER = ReverseGeocoder.default()
+
+
+def reverse_lookup(lat: float, lon: float) -> Dict[str, Any]:
+    """
+    Géocodage inverse local (voir ReverseGeocoder.lookup)
+
+    Examples:
+        >>> reverse_lookup(48.1040, -1.6722)["label"]
+        'près de gare (Sud-Gare)'
+    """
+    return REVERSE_GEOCODER.lookup(lat, lon)
+
+
+def lookup_district(lat: float, lon: float) -> Optional[str]:
+    """
+    Quartier d'une position, sans la recherche de lieu et d'adresse de reverse_lookup()
+
+    Examples:
+        >>> lookup_district(48.1040, -1.6722)
+        'Sud-Gare'
+    """
+    return REVERSE_GEOCODER.district_index.locate(lat, lon)
@@ -0,0 +1,83 @@
+"""
+Regroupement des appels identiques simultanés (single-flight)
+
+Le premier appelant d'une clé exécute le calcul ; ceux qui arrivent pendant
+qu'il est en cours l'attendent et reçoivent le même résultat (ou la même
+exception) au lieu de relancer la requête en amont. Rien n'est conservé une
+fois le calcul terminé : la mise en cache reste l'affaire de l'appelant.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    """Calcul en cours partagé entre les appelants d'une même clé"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Une seule exécution en cours par clé, partagée par les appelants simultanés."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._executions = 0
+        self._coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None) -> Tuple[Any, bool]:
+        """
+        Exécute fn, ou attend l'exécution déjà en cours pour la même clé.
+
+        Args:
+            timeout: Attente maximale d'un appelant qui rejoint un calcul en
+                cours (None : jusqu'à la fin du calcul)
+
+        Returns:
+            (résultat, partagé) : partagé vaut True si le résultat vient de
+            l'exécution lancée par un autre appelant
+
+        Raises:
+            TimeoutError si le calcul rejoint ne s'achève pas dans `timeout` ;
+            l'exception de fn sinon, transmise à tous les appelants
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._executions += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            if not call.event.wait(timeout):
+                raise TimeoutError("Calcul partagé toujours en cours")
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = self._executions + self._coalesced
+            return {
+                "in_flight": len(self._calls),
+                "executions": self._executions,
+                "coalesced": self._coalesced,
+                "coalesced_rate": round(self._coalesced / calls, 3) if calls else 0.0,
+            }
@@ -1,18 +1,94 @@
 """Détection d'outils pour le simulateur MCP."""
 import re
-import unicodedata
-from typing import Optional
+from typing import Dict, List, Optional, Tuple, Union
+
+from .config import MCP_MAX_INTENTS
+from .keyword_matcher import KeywordMatch, KeywordMatcher
+from .normalized_message import NormalizedMessage, fold_text
+from .rennes_districts import match_district
+
+# "en 10 minutes", "à moins de 15 min", "dans les 5 min"
+REACHABLE_TIME_PATTERN = re.compile(r"\b(?:en|a|dans(?: les)?)\s+(?:moins de\s+)?\d{1,3}\s*min(?:ute)?s?\b")
+
+# "entre Cleunay et Bruz" : deux lieux (pas deux heures, "entre 7h et 9h")
+ROUTE_BETWEEN_PATTERN = re.compile(r"\bentre\s+(?!\d)\S.*?\s+et\s+(?!\d)\S")
+
+# Coordinations qui séparent deux demandes ("trafic et parkings près de la gare")
+CLAUSE_SEPARATOR_PATTERN = re.compile(r"\s+(?:et|puis|ainsi que|mais aussi)\s+|\s*[;?!]\s*")
+
+# Outils d'une même famille : une seule demande par famille ("compare le gazole
+# et le sp95" reste une comparaison, pas une comparaison plus une recherche)
+TOOL_FAMILIES = {
+    "search_fuel_prices": "fuel",
+    "get_cheapest_station": "fuel",
+    "compare_fuel_prices": "fuel",
+    "get_fuel_stats": "fuel",
+    "estimate_drive_time": "route",
+    "find_best_departure_time": "route",
+    "get_traffic_status": "traffic",
+    "get_parking_status": "parking",
+    "get_reachable_places": "reachable",
+}
+
+
+def split_clauses(message: Union[str, NormalizedMessage]) -> List[Tuple[int, int]]:
+    """Positions (dans NormalizedMessage.plain) des propositions séparées par "et", "puis", ";"..."""
+    plain = NormalizedMessage.of(message).plain
+    spans, start = [], 0
+    for separator in CLAUSE_SEPARATOR_PATTERN.finditer(plain):
+        if separator.start() > start:
+            spans.append((start, separator.start()))
+        start = separator.end()
+    if start < len(plain):
+        spans.append((start, len(plain)))
+    return spans
+
+
+def merge_intents(
+    message: Union[str, NormalizedMessage],
+    tools: List[Optional[str]],
+    clauses: List[Tuple[int, int]],
+    max_tools: int = MCP_MAX_INTENTS,
+) -> List[Tuple[str, NormalizedMessage]]:
+    """
+    Demandes du message : [(outil, texte dont extraire ses paramètres)].
+    
+    tools[0] est l'outil du message entier, tools[1:] celui de chaque
+    proposition. Un outil par famille, au plus max_tools, outil principal en
+    tête. S'il y a plusieurs demandes, chacune garde les propositions qui ne
+    relèvent pas d'une autre ("trafic et parkings près de la gare" : la
+    destination d'un trajet ne déborde pas sur la question des parkings).
+    """
+    message = NormalizedMessage.of(message)
+    kept: Dict[str, str] = {}
+    for tool in tools:
+        if tool and len(kept) < max_tools:
+            kept.setdefault(TOOL_FAMILIES.get(tool, tool), tool)
+    if len(kept) <= 1:
+        return [(tool, message) for tool in kept.values()]
+    
+    owners = [TOOL_FAMILIES.get(tool, tool) for tool in tools[1:]]
+    intents = []
+    for family, tool in kept.items():
+        if family not in owners:
+            intents.append((tool, message))
+            continue
+        parts, previous = [], None
+        for i, (start, end) in enumerate(clauses):
+            if owners[i] in kept and owners[i] != family:
+                continue
+            if parts:
+                # Séparateur d'origine entre propositions voisines
+                parts.append(message.original_span(clauses[i - 1][1], start) if previous == i - 1 else ", ")
+            parts.append(message.original_span(start, end))
+            previous = i
+        intents.append((tool, NormalizedMessage("".join(parts))))
+    return intents
 
 
 class ToolDetector:
     """Détecte quel outil utiliser en fonction du message utilisateur."""
     
-    @staticmethod
-    def _remove_accents(text: str) -> str:
-        """Supprime les accents d'une chaîne"""
-        nfd = unicodedata.normalize('NFD', text)
-        return ''.join(char for char in nfd if unicodedata.category(char) != 'Mn')
-    
     def __init__(self):
         # Mots-clés pour chaque catégorie d'outil
         self.fuel_keywords = [
@@ -21,53 +97,110 @@ class ToolDetector:
         ]
         
         self.traffic_keywords = [
-            'traffic', 'bouchons', 'congestion', 'embouteillage',
-            'circulation', 'route', 'routes', 'autoroute', 'voie', 'rue', 'boulevard',
+            'traffic', 'congestion', 'embouteillage',
+            'circulation', 'route', 'routes', 'autoroute', 'voie', 'rue', 'rues', 'boulevard',
             'péage', 'temps de trajet', 'ralentissement', 'accident',
-            'tfic', 'trafic', 'bouchon', 'ralenti',
+            'tfic', 'trafic', 'bouchon*', 'ralenti',
         ]
         
         self.drive_keywords = [
             'temps', 'trajet', 'combien de temps', 'temps de route',
-            'duree', 'aller a', 'me rendre', 'aller de', 'depuis', 'vers',
+            'duree', 'aller a', 'aller au', 'aller aux', 'me rendre', 'aller de', 'depuis', 'vers',
             'comment', 'long', 'dure', 'quelle heure', 'arriver', 'parcourir',
             'distance', 'km'
         ]
         
+        self.departure_keywords = [
+            'quand partir', 'heure partir', 'heure de depart', 'meilleure heure',
+            'meilleur moment', 'dois-je partir', 'faut-il partir', 'devrais-je partir',
+        ]
+        
+        self.reachable_keywords = [
+            'atteindre', 'accessible', 'joignable', 'autour de moi', 'proche',
+        ]
+        
         self.parking_keywords = [
             'parking', 'parkings', 'stationner', 'stationnement',
             'place', 'places', 'garer', 'garage', 'park'
         ]
+        
+        # Toutes les listes (et les sous-cas utilisés par detect) compilées en
+        # un seul automate : une passe sur le message donne toutes les catégories
+        keyword_tables = {
+            'fuel': self.fuel_keywords,
+            'cheapest': ['moins cher', 'cheapest', 'economique', 'pas cher'],
+            'compare': ['compare', 'comparer', 'comparez', 'comparaison', 'difference'],
+            'stats': ['statistique', 'moyenne', 'stats'],
+            'departure': self.departure_keywords,
+            'traffic': self.traffic_keywords,
+            'drive': self.drive_keywords,
+            'drive_only': ['combien de temps', 'temps de trajet', 'aller a', 'aller au', 'aller aux', 'aller de'],
+            # Une destination ("à", "vers", "au"...), une origine ("de", "depuis"),
+            # deux lieux ("entre") ou la position de l'utilisateur
+            'drive_anchor': ['a', 'vers', 'de', 'au', 'aux', 'depuis', 'entre', 'ma position', 'mon emplacement'],
+            'reachable': self.reachable_keywords,
+            'reachable_fuel': ['station', 'essence', 'carburant', 'gazole'],
+            'parking': self.parking_keywords,
+        }
+        self.matcher = KeywordMatcher({
+            category: [fold_text(keyword) for keyword in keywords]
+            for category, keywords in keyword_tables.items()
+        })
     
-    def detect(self, user_message: str) -> Optional[str]:
+    def detect_all(self, user_message: Union[str, NormalizedMessage]) -> Dict[str, List[KeywordMatch]]:
+        """
+        Toutes les catégories de mots-clés présentes dans le message, avec
+        leurs occurrences (positions dans NormalizedMessage.plain)
+        """
+        found: Dict[str, List[KeywordMatch]] = {}
+        for match in self.matcher.find_all(NormalizedMessage.of(user_message).plain):
+            found.setdefault(match.category, []).append(match)
+        return found
+    
+    def detect(self, user_message: Union[str, NormalizedMessage]) -> Optional[str]:
         """
         Détecte quel outil MCP utiliser basé sur le message utilisateur.
         
         Args:
-            user_message: Message de l'utilisateur
+            user_message: Message de l'utilisateur (texte brut ou déjà normalisé)
             
         Returns:
             Nom de l'outil à utiliser ou None
         """
-        message_lower = user_message.lower()
-        message_no_accents = self._remove_accents(message_lower)
+        message = NormalizedMessage.of(user_message)
+        message_no_accents = message.plain
+        found = self.matcher.categories(message_no_accents)
+        
+        # LOGIQUE POUR LES REQUETES "QUE PUIS-JE ATTEINDRE EN N MINUTES ?"
+        if REACHABLE_TIME_PATTERN.search(message_no_accents):
+            if found & {'parking', 'reachable', 'reachable_fuel'}:
+                return "get_reachable_places"
         
         # LOGIQUE POUR LES REQUETES CARBURANT
-        if any(keyword in message_no_accents for keyword in self.fuel_keywords):
+        if 'fuel' in found:
             # Déterminer le type de requête carburant
-            if any(word in message_no_accents for word in ['moins cher', 'cheapest', 'economique', 'pas cher']):
+            if 'cheapest' in found:
                 return "get_cheapest_station"
-            elif any(word in message_no_accents for word in ['compare', 'comparaison', 'difference']):
+            elif 'compare' in found:
                 return "compare_fuel_prices"
-            elif any(word in message_no_accents for word in ['statistique', 'moyenne', 'stats']):
+            elif 'stats' in found:
                 return "get_fuel_stats"
             else:
                 return "search_fuel_prices"
         
+        # LOGIQUE POUR LES REQUETES "QUAND PARTIR ?"
+        if 'departure' in found:
+            return "find_best_departure_time"
+        
+        # LOGIQUE POUR LE TRAFIC D'UN QUARTIER ("circulation à Villejean")
+        if 'traffic' in found and match_district(message.words):
+            if 'drive_only' not in found:
+                return "get_traffic_status"
+        
         # LOGIQUE POUR LES REQUETES TRAJET/TEMPS DE ROUTE
-        if any(word in message_no_accents for word in self.drive_keywords):
+        if 'drive' in found:
             # Vérifier qu'on a au moins 2 localisations ou une position personnelle
-            if any(phrase in message_no_accents for phrase in ['a', 'vers', 'de', 'au', 'ma position', 'mon emplacement']):
+            if 'drive_anchor' in found:
                 return "estimate_drive_time"
         
         # Fallback: pattern "de X a Y" sans keywords spécifiques
@@ -75,11 +208,31 @@ class ToolDetector:
             return "estimate_drive_time"
         
         # LOGIQUE POUR LES REQUETES TRAFIC
-        if any(word in message_no_accents for word in self.traffic_keywords):
+        if 'traffic' in found:
             return "get_traffic_status"
         
         # LOGIQUE POUR LES REQUETES PARKING
-        if any(word in message_no_accents for word in self.parking_keywords):
+        if 'parking' in found:
             return "get_parking_status"
         
+        # Fallback: "entre X et Y" seul ("parkings entre la gare et le centre" reste parking)
+        if ROUTE_BETWEEN_PATTERN.search(message_no_accents):
+            return "estimate_drive_time"
+        
         return None
+    
+    def detect_intents(self, user_message: Union[str, NormalizedMessage]) -> List[Tuple[str, NormalizedMessage]]:
+        """
+        Toutes les demandes du message, outil principal (detect) en tête, avec
+        pour chacune le texte dont extraire ses paramètres (voir merge_intents).
+        
+        Chaque proposition ("trafic" / "parkings près de la gare") est détectée
+        séparément ; une proposition ne fait qu'ajouter une famille d'outils
+        absente du message entier.
+        """
+        message = NormalizedMessage.of(user_message)
+        clauses = split_clauses(message)
+        tools = [self.detect(message)]
+        if len(clauses) > 1:
+            tools += [self.detect(NormalizedMessage(message.original_span(*clause))) for clause in clauses]
+        return merge_intents(message, tools, clauses)
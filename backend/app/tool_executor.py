@@ -1,11 +1,23 @@
 """Exécution d'outils pour le simulateur MCP."""
-from typing import Dict, Any, Optional, Tuple
+import json
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
 
+from .config import TRAFFIC_HISTORY_PATH, TRAFFIC_DISTRICT_MAX_AGE_S, TOOL_COALESCE_GRID_DEG
+from .deadline import Deadline
+from .singleflight import SingleFlight
 from .tools.fuel_scraper import FuelPriceScraper, calculate_distance
 from .tools.traffic_scraper import TrafficScraper
+from .tools.traffic_history import TrafficHistory
+from .tools.traffic_districts import TrafficDistrictAggregator
+from .tools.traffic_changes import TrafficChangeFeed
 from .tools.parking_scraper import ParkingScraper
 from .tools.drive_time_estimator import DriveTimeEstimator
-from .rennes_locations import find_location_fuzzy, get_suggestions
+from .tools.location_matrix import LocationMatrix
+from .tools.isochrone import IsochroneBuilder, places_within
+from .rennes_locations import find_location_fuzzy, get_location_id, get_suggestions
+
+WEEKDAYS = ['lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi', 'samedi', 'dimanche']
 
 
 class ToolExecutor:
@@ -15,7 +27,28 @@ class ToolExecutor:
         self.fuel_scraper = FuelPriceScraper(restrict_to_rennes=True)
         self.traffic_scraper = TrafficScraper()
         self.parking_scraper = ParkingScraper()
-        self.drive_time_estimator = DriveTimeEstimator()
+        
+        # Chaque instantané de trafic alimente les profils horaires
+        self.traffic_history = TrafficHistory(storage_path=TRAFFIC_HISTORY_PATH)
+        self.traffic_scraper.add_snapshot_listener(self.traffic_history.record_snapshot)
+        
+        # ... et les agrégats par quartier / commune
+        self.traffic_districts = TrafficDistrictAggregator()
+        self.traffic_scraper.add_snapshot_listener(self.traffic_districts.ingest_snapshot)
+        
+        # ... et le flux des changements poussé en SSE
+        self.traffic_changes = TrafficChangeFeed()
+        self.traffic_scraper.add_snapshot_listener(self.traffic_changes.ingest_snapshot)
+        self.drive_time_estimator = DriveTimeEstimator(traffic_history=self.traffic_history)
+        
+        # Temps de trajet précalculés entre lieux connus (optionnel)
+        self.location_matrix = LocationMatrix.load_default()
+        
+        # Zones atteignables en N minutes (cache par origine arrondie)
+        self.isochrones = IsochroneBuilder(self.drive_time_estimator.route_scraper)
+        
+        # Appels identiques simultanés ("parkings à Rennes" en rafale) : une exécution
+        self.inflight = SingleFlight()
         
         # Mapping des outils disponibles
         self.tools = {
@@ -26,10 +59,18 @@ class ToolExecutor:
             "get_traffic_status": self._get_traffic_status,
             "get_parking_status": self._get_parking_status,
             "estimate_drive_time": self._estimate_drive_time,
+            "find_best_departure_time": self._find_best_departure_time,
+            "get_reachable_places": self._get_reachable_places,
             "scrape_website": self._detect_scraping,
         }
     
-    def execute(self, tool_name: str, params: Dict[str, Any], user_location: Optional[Tuple[float, float]] = None) -> Dict[str, Any]:
+    def execute(
+        self,
+        tool_name: str,
+        params: Dict[str, Any],
+        user_location: Optional[Tuple[float, float]] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Any]:
         """
         Exécute un outil MCP avec les paramètres donnés.
         
@@ -37,15 +78,67 @@ class ToolExecutor:
             tool_name: Nom de l'outil à exécuter
             params: Paramètres extraits du message
             user_location: Tuple (latitude, longitude) de l'utilisateur (optionnel)
+            deadline: Échéance de la requête ; les appels réseau de l'outil
+                sont bornés par le temps restant
             
         Returns:
-            Résultat de l'exécution de l'outil
+            Résultat de l'exécution de l'outil, avec "degraded" et
+            "degraded_reasons" si des données partielles ou périmées ont
+            été servies pour tenir l'échéance
+        
+        Un appel identique (même outil, mêmes paramètres, position à
+        TOOL_COALESCE_GRID_DEG près) déjà en cours n'est pas relancé : son
+        résultat est partagé, calculé avec la position du premier appelant.
         """
-        if tool_name in self.tools:
-            return self.tools[tool_name](params, user_location)
-        return {"error": f"Outil {tool_name} inconnu"}
+        if tool_name not in self.tools:
+            return {"error": f"Outil {tool_name} inconnu"}
+        # Même échéance, raisons de dégradation propres à cet outil
+        budget = (deadline or Deadline()).child()
+        try:
+            result, _ = self.inflight.do(
+                self.call_key(tool_name, params, user_location),
+                lambda: self._run(tool_name, params, user_location, budget),
+                timeout=budget.wait_timeout(),
+            )
+        except TimeoutError:
+            return {
+                "success": False,
+                "error": "Délai dépassé",
+                "degraded": True,
+                "degraded_reasons": [f"{tool_name} : pas de réponse dans le délai"],
+            }
+        # Copie par appelant : le résultat est partagé entre appels regroupés
+        return dict(result) if isinstance(result, dict) else result
+    
+    def _run(
+        self,
+        tool_name: str,
+        params: Dict[str, Any],
+        user_location: Optional[Tuple[float, float]],
+        deadline: Deadline,
+    ) -> Dict[str, Any]:
+        result = self.tools[tool_name](params, user_location, deadline)
+        if deadline.degraded and isinstance(result, dict):
+            result["degraded"] = True
+            result["degraded_reasons"] = deadline.reasons
+        return result
     
-    def _search_fuel_prices(self, params: Dict[str, Any], user_location: Optional[Tuple[float, float]] = None) -> Dict[str, Any]:
+    @staticmethod
+    def call_key(
+        tool_name: str, params: Dict[str, Any], user_location: Optional[Tuple[float, float]] = None
+    ) -> str:
+        """Clé de regroupement : outil, paramètres (ordre des clés ignoré), position arrondie"""
+        location = ""
+        if user_location:
+            location = ",".join(str(round(c / TOOL_COALESCE_GRID_DEG)) for c in user_location)
+        return "|".join([tool_name, json.dumps(params, sort_keys=True, ensure_ascii=False, default=str), location])
+    
+    def _search_fuel_prices(
+        self,
+        params: Dict[str, Any],
+        user_location: Optional[Tuple[float, float]] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Any]:
         """Recherche les prix de carburant."""
         ville = params.get('ville')
         code_postal = params.get('code_postal')
@@ -53,27 +146,17 @@ class ToolExecutor:
         
         try:
             if code_postal:
-                results = self.fuel_scraper.search_by_postal_code(code_postal, fuel_type)
+                results = self.fuel_scraper.search_by_postal_code(code_postal, fuel_type, deadline)
             elif ville:
-                results = self.fuel_scraper.search_by_city(ville, fuel_type)
+                results = self.fuel_scraper.search_by_city(ville, fuel_type, deadline)
             else:
                 return {"error": "Ville ou code postal requis"}
             
-            # 📍 Ajouter les distances si position GPS disponible
+            # 📍 Ajouter distances et temps de trajet si position GPS disponible
             if user_location:
-                station_data = self.fuel_scraper.fetch_daily_prices()
-                for result in results:
-                    # Chercher les coordonnées de la station
-                    for station in station_data["stations"]:
-                        if (station["adresse"] == result["adresse"] and 
-                            station["cp"] == result["cp"]):
-                            if "latitude" in station and "longitude" in station:
-                                distance = calculate_distance(
-                                    user_location[0], user_location[1],
-                                    station["latitude"], station["longitude"]
-                                )
-                                result["distance_km"] = distance
-                            break
+                self._attach_station_distances(results, user_location, deadline)
+                # Les plus rapides à rejoindre d'abord
+                results.sort(key=self._drive_time_sort_key)
             
             return {
                 "success": True,
@@ -85,7 +168,12 @@ class ToolExecutor:
         except Exception as e:
             return {"error": str(e)}
     
-    def _get_cheapest_station(self, params: Dict[str, Any], user_location: Optional[Tuple[float, float]] = None) -> Dict[str, Any]:
+    def _get_cheapest_station(
+        self,
+        params: Dict[str, Any],
+        user_location: Optional[Tuple[float, float]] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Any]:
         """Trouve les stations les moins chères."""
         ville = params.get('ville')
         code_postal = params.get('code_postal')
@@ -94,27 +182,15 @@ class ToolExecutor:
         
         try:
             if code_postal:
-                results = self.fuel_scraper.search_by_postal_code(code_postal, fuel_type)
+                results = self.fuel_scraper.search_by_postal_code(code_postal, fuel_type, deadline)
             elif ville:
-                results = self.fuel_scraper.get_cheapest_in_city(ville, fuel_type, limit)
+                results = self.fuel_scraper.get_cheapest_in_city(ville, fuel_type, limit, deadline)
             else:
                 return {"error": "Ville ou code postal requis"}
             
-            # 📍 Ajouter les distances si position GPS disponible
+            # 📍 Ajouter distances et temps de trajet (l'ordre reste celui des prix)
             if user_location:
-                station_data = self.fuel_scraper.fetch_daily_prices()
-                for result in results:
-                    # Chercher les coordonnées de la station
-                    for station in station_data["stations"]:
-                        if (station["adresse"] == result["adresse"] and 
-                            station["cp"] == result["cp"]):
-                            if "latitude" in station and "longitude" in station:
-                                distance = calculate_distance(
-                                    user_location[0], user_location[1],
-                                    station["latitude"], station["longitude"]
-                                )
-                                result["distance_km"] = distance
-                            break
+                self._attach_station_distances(results, user_location, deadline)
             
             return {
                 "success": True,
@@ -125,14 +201,85 @@ class ToolExecutor:
         except Exception as e:
             return {"error": str(e)}
     
-    def _compare_fuel_prices(self, params: Dict[str, Any], user_location: Optional[Tuple[float, float]] = None) -> Dict[str, Any]:
+    def _attach_station_distances(
+        self,
+        results: List[Dict[str, Any]],
+        user_location: Tuple[float, float],
+        deadline: Optional[Deadline] = None,
+    ) -> None:
+        """Ajoute coordonnées, distance à vol d'oiseau et temps de trajet aux stations."""
+        station_data = self.fuel_scraper.fetch_daily_prices(deadline=deadline)
+        coords = {
+            (station["adresse"], station["cp"]): (station["latitude"], station["longitude"])
+            for station in station_data["stations"]
+            if "latitude" in station and "longitude" in station
+        }
+        for result in results:
+            position = coords.get((result["adresse"], result["cp"]))
+            if position:
+                result["lat"], result["lon"] = position
+                result["distance_km"] = calculate_distance(
+                    user_location[0], user_location[1], position[0], position[1]
+                )
+        self._attach_drive_times(results, user_location, deadline)
+
+    def _attach_drive_times(
+        self,
+        items: List[Dict[str, Any]],
+        user_location: Tuple[float, float],
+        deadline: Optional[Deadline] = None,
+    ) -> None:
+        """
+        Ajoute drive_time_minutes / drive_distance_km aux éléments géolocalisés
+        (clés "lat" / "lon"), en un seul calcul de matrice de temps de trajet.
+        Sans matrice (service lent ou indisponible), les éléments restent
+        classés à vol d'oiseau et le résultat est marqué dégradé.
+        """
+        located = [item for item in items if item.get("lat") is not None and item.get("lon") is not None]
+        if not located:
+            return
+        table = self.drive_time_estimator.route_scraper.get_table(
+            user_location, [(item["lat"], item["lon"]) for item in located], deadline
+        )
+        if not table.get("success"):
+            print(f"[Warning] Temps de trajet indisponibles: {table.get('error')}")
+            if deadline is not None:
+                deadline.degrade("Temps de trajet non calculés (distances à vol d'oiseau)")
+            return
+        for item, duration, distance in zip(located, table["durations_seconds"], table["distances_km"]):
+            if duration is not None:
+                item["drive_time_minutes"] = round(duration / 60, 1)
+                item["drive_distance_km"] = distance
+
+    @staticmethod
+    def _drive_time_sort_key(item: Dict[str, Any]) -> Tuple[bool, float, float]:
+        """Tri par temps de trajet, puis distance à vol d'oiseau à défaut"""
+        drive_time = item.get("drive_time_minutes")
+        distance = item.get("distance_km")
+        return (
+            drive_time is None,
+            drive_time if drive_time is not None else 0.0,
+            distance if distance is not None else 1e9,
+        )
+
+    def _compare_fuel_prices(
+        self,
+        params: Dict[str, Any],
+        user_location: Optional[Tuple[float, float]] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Any]:
         """Compare les prix entre plusieurs villes."""
         return {"info": "Comparaison non implémentée"}
     
-    def _get_fuel_stats(self, params: Dict[str, Any], user_location: Optional[Tuple[float, float]] = None) -> Dict[str, Any]:
+    def _get_fuel_stats(
+        self,
+        params: Dict[str, Any],
+        user_location: Optional[Tuple[float, float]] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Any]:
         """Retourne les statistiques globales."""
         try:
-            stats = self.fuel_scraper.get_stats()
+            stats = self.fuel_scraper.get_stats(deadline)
             return {
                 "success": True,
                 "stats": stats
@@ -140,55 +287,272 @@ class ToolExecutor:
         except Exception as e:
             return {"error": str(e)}
     
-    def _estimate_drive_time(self, params: Dict[str, Any], user_location: Optional[Tuple[float, float]] = None) -> Dict[str, Any]:
+    def _resolve_route_endpoints(
+        self, params: Dict[str, Any], user_location: Optional[Tuple[float, float]] = None
+    ) -> Tuple[Optional[Tuple[float, float]], Optional[Tuple[float, float]], Optional[Dict[str, Any]]]:
+        """
+        Résout les coordonnées d'origine et de destination d'un trajet.
+        
+        Returns:
+            (origine, destination, None) ou (None, None, réponse d'erreur)
+        """
+        origin_name = params.get('origin_name', 'Rennes Centre')
+        destination_name = params.get('destination_name', 'Rennes')
+        
+        print(f"[DRIVE TIME DEBUG] origin_name='{origin_name}', user_location={user_location}")
+        
+        # Déterminer les coordonnées d'origine
+        if user_location and origin_name.lower() in ['ma position', 'position actuelle', 'où je suis', 'ici']:
+            origin_coords = user_location
+            print(f"[DRIVE TIME] ✓ Utilisant position GPS de l'utilisateur: {origin_coords}")
+        else:
+            print(f"[DRIVE TIME] ✗ user_location={user_location}, origin_name.lower()='{origin_name.lower()}'")
+            origin_coords = find_location_fuzzy(origin_name)
+            if not origin_coords:
+                suggestions = get_suggestions(origin_name, limit=3)
+                suggestion_text = f" Vouliez-vous dire: {', '.join(suggestions[:3])} ?" if suggestions else ""
+                return None, None, {
+                    "success": False,
+                    "error": f"Lieu de départ '{origin_name}' inconnu.{suggestion_text}"
+                }
+        
+        # Déterminer les coordonnées de destination
+        dest_coords = find_location_fuzzy(destination_name)
+        if not dest_coords:
+            suggestions = get_suggestions(destination_name, limit=3)
+            suggestion_text = f" Vouliez-vous dire: {', '.join(suggestions[:3])} ?" if suggestions else ""
+            return None, None, {
+                "success": False,
+                "error": f"Lieu d'arrivée '{destination_name}' inconnu.{suggestion_text}"
+            }
+        
+        return origin_coords, dest_coords, None
+    
+    def _estimate_drive_time(
+        self,
+        params: Dict[str, Any],
+        user_location: Optional[Tuple[float, float]] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Any]:
         """Estime le temps de trajet en tenant compte du trafic."""
         try:
-            origin_name = params.get('origin_name', 'Rennes Centre')
-            destination_name = params.get('destination_name', 'Rennes')
+            origin_coords, dest_coords, error = self._resolve_route_endpoints(params, user_location)
+            if error:
+                return error
             
-            print(f"[DRIVE TIME DEBUG] origin_name='{origin_name}', user_location={user_location}")
+            departure_time = self._resolve_departure_time(params)
             
-            # Déterminer les coordonnées d'origine
-            if user_location and origin_name.lower() in ['ma position', 'position actuelle', 'où je suis', 'ici']:
-                origin_coords = user_location
-                print(f"[DRIVE TIME] ✓ Utilisant position GPS de l'utilisateur: {origin_coords}")
-            else:
-                print(f"[DRIVE TIME] ✗ user_location={user_location}, origin_name.lower()='{origin_name.lower()}'")
-                origin_coords = find_location_fuzzy(origin_name)
-                if not origin_coords:
-                    suggestions = get_suggestions(origin_name, limit=3)
-                    suggestion_text = f" Vouliez-vous dire: {', '.join(suggestions[:3])} ?" if suggestions else ""
-                    return {
-                        "success": False,
-                        "error": f"Lieu de départ '{origin_name}' inconnu.{suggestion_text}"
-                    }
-            
-            # Déterminer les coordonnées de destination
-            dest_coords = find_location_fuzzy(destination_name)
-            if not dest_coords:
-                suggestions = get_suggestions(destination_name, limit=3)
-                suggestion_text = f" Vouliez-vous dire: {', '.join(suggestions[:3])} ?" if suggestions else ""
-                return {
-                    "success": False,
-                    "error": f"Lieu d'arrivée '{destination_name}' inconnu.{suggestion_text}"
-                }
+            # Trajet entre deux lieux connus, départ immédiat : lecture directe de la matrice
+            if departure_time is None and self.location_matrix is not None:
+                origin_id = get_location_id(origin_coords)
+                dest_id = get_location_id(dest_coords)
+                if origin_id is not None and dest_id is not None:
+                    found = self.location_matrix.lookup(origin_id, dest_id)
+                    if found:
+                        duration_s, distance_km = found
+                        return self.drive_time_estimator.base_estimate(
+                            origin_coords, dest_coords,
+                            round(distance_km, 2), round(duration_s / 60, 1)
+                        )
             
             result = self.drive_time_estimator.estimate_drive_time(
-                origin_coords, dest_coords
+                origin_coords, dest_coords,
+                departure_time=departure_time,
+                deadline=deadline,
             )
             return result
             
         except Exception as e:
             return {"error": str(e)}
     
-    def _get_traffic_status(self, params: Dict[str, Any], user_location: Optional[Tuple[float, float]] = None) -> Dict[str, Any]:
+    def _find_best_departure_time(
+        self,
+        params: Dict[str, Any],
+        user_location: Optional[Tuple[float, float]] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Any]:
+        """Cherche l'heure de départ la plus rapide d'après l'historique du trafic."""
+        try:
+            origin_coords, dest_coords, error = self._resolve_route_endpoints(params, user_location)
+            if error:
+                return error
+            
+            step_minutes = 15
+            window_start, window_end = self._resolve_departure_window(params, step_minutes=step_minutes)
+            
+            slots = min(96, int((window_end - window_start).total_seconds() // (step_minutes * 60)) + 1)
+            return self.drive_time_estimator.best_departure_time(
+                origin_coords, dest_coords, window_start, slots=slots, step_minutes=step_minutes,
+                deadline=deadline,
+            )
+            
+        except Exception as e:
+            return {"error": str(e)}
+    
+    @classmethod
+    def _resolve_departure_window(
+        cls, params: Dict[str, Any], now: Optional[datetime] = None, step_minutes: int = 15
+    ) -> Tuple[datetime, datetime]:
+        """
+        Fenêtre de départ (début, fin) de window_start/window_end/departure_day.
+        
+        La fin est placée le même jour que le début ("entre 7h et 9h" à 8h :
+        demain de 7h à 9h), le lendemain si elle le précède (fenêtre de nuit).
+        """
+        now = now or datetime.now()
+        day = params.get('departure_day')
+        window_start = cls._resolve_departure_time(
+            {'departure_time': params.get('window_start') or ('06:00' if day else None), 'departure_day': day}, now
+        )
+        if window_start is None:
+            # Par défaut : à partir du prochain quart d'heure
+            now = now.replace(second=0, microsecond=0)
+            window_start = now + timedelta(minutes=-now.minute % step_minutes)
+        
+        end_time = params.get('window_end')
+        if not end_time:
+            return window_start, window_start + timedelta(hours=12)
+        hour, minute = (int(part) for part in end_time.split(':'))
+        window_end = window_start.replace(hour=hour, minute=minute)
+        if window_end <= window_start:
+            window_end += timedelta(days=1)
+        return window_start, window_end
+    
+    @staticmethod
+    def _resolve_departure_time(params: Dict[str, Any], now: Optional[datetime] = None) -> Optional[datetime]:
+        """Convertit departure_time/departure_day en datetime (prochaine occurrence)."""
+        departure_time = params.get('departure_time')
+        if not departure_time:
+            return None
+        
+        now = now or datetime.now()
+        hour, minute = (int(part) for part in departure_time.split(':'))
+        departure = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        
+        day = params.get('departure_day')
+        if day == 'demain':
+            departure += timedelta(days=1)
+        elif day == 'apres-demain':
+            departure += timedelta(days=2)
+        elif day in WEEKDAYS:
+            departure += timedelta(days=(WEEKDAYS.index(day) - now.weekday()) % 7)
+        
+        # Heure déjà passée aujourd'hui : on vise la prochaine occurrence
+        if departure < now:
+            departure += timedelta(days=7 if day in WEEKDAYS else 1)
+        return departure
+    
+    def _get_traffic_status(
+        self,
+        params: Dict[str, Any],
+        user_location: Optional[Tuple[float, float]] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Any]:
         """Retourne l'état du trafic pour Rennes Métropole."""
-        return self.traffic_scraper.get_traffic_status(params.get("street_query"))
+        district = params.get("district")
+        if district and not params.get("street_query"):
+            # Réponse depuis les agrégats précalculés, collecte seulement s'ils sont périmés
+            if not self.traffic_districts.is_fresh(TRAFFIC_DISTRICT_MAX_AGE_S):
+                try:
+                    self.traffic_scraper.fetch_snapshot(deadline)
+                except Exception as e:
+                    print(f"[Warning] Collecte trafic impossible: {e}")
+                    if deadline is not None:
+                        deadline.degrade("Trafic : agrégats du dernier relevé (collecte impossible)")
+            return self.traffic_districts.get_district_status(district)
+        
+        return self.traffic_scraper.get_traffic_status(params.get("street_query"), deadline)
     
-    def _get_parking_status(self, params: Dict[str, Any], user_location: Optional[Tuple[float, float]] = None) -> Dict[str, Any]:
+    def _get_parking_status(
+        self,
+        params: Dict[str, Any],
+        user_location: Optional[Tuple[float, float]] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Any]:
         """Retourne la disponibilité des parkings à Rennes."""
-        return self.parking_scraper.get_parking_status(user_location)
+        result = self.parking_scraper.get_parking_status(user_location, deadline)
+        if result.get("success") and user_location:
+            # Classement par temps de trajet réel plutôt qu'à vol d'oiseau
+            self._attach_drive_times(result["parkings"], user_location, deadline)
+            result["parkings"].sort(key=self._drive_time_sort_key)
+        return result
+    
+    def _get_reachable_places(
+        self,
+        params: Dict[str, Any],
+        user_location: Optional[Tuple[float, float]] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Any]:
+        """Stations et parkings atteignables en voiture en N minutes."""
+        try:
+            origin_name = params.get('origin_name')
+            if origin_name:
+                origin = find_location_fuzzy(origin_name)
+                if not origin:
+                    suggestions = get_suggestions(origin_name, limit=3)
+                    suggestion_text = f" Vouliez-vous dire: {', '.join(suggestions[:3])} ?" if suggestions else ""
+                    return {"success": False, "error": f"Lieu de départ '{origin_name}' inconnu.{suggestion_text}"}
+            elif user_location:
+                origin = user_location
+            else:
+                return {"success": False, "error": "Position GPS ou lieu de départ requis"}
+            
+            area = self.isochrones.reachable_area(origin, params.get('minutes', 10), deadline)
+            if not area.get("success"):
+                return area
+            minutes = area["minutes"]
+            category = params.get('category', 'all')
+            fuel_type = params.get('fuel_type', 'Gazole')
+            
+            places = []
+            if category in ('all', 'parking'):
+                parking = self.parking_scraper.get_parking_status(deadline=deadline)
+                if parking.get("success"):
+                    for p in places_within(area["polygon"], parking["parkings"]):
+                        places.append({**p, "type": "parking"})
+                elif deadline is not None:
+                    deadline.degrade("Parkings absents (service indisponible)")
+            
+            if category in ('all', 'station'):
+                stations = self.fuel_scraper.fetch_daily_prices(deadline=deadline)["stations"]
+                for s in places_within(area["polygon"], stations, lat_key="latitude", lon_key="longitude"):
+                    if fuel_type in s["prices"]:
+                        places.append({
+                            "type": "station",
+                            "name": f"{s['adresse']}, {s['ville']}",
+                            "adresse": s["adresse"],
+                            "ville": s["ville"],
+                            "cp": s["cp"],
+                            "lat": s["latitude"],
+                            "lon": s["longitude"],
+                            "fuel_type": fuel_type,
+                            "price": s["prices"][fuel_type]["price"],
+                        })
+            
+            # La zone est échantillonnée : temps exacts pour les seuls candidats
+            self._attach_drive_times(places, origin, deadline)
+            places = [p for p in places if p.get("drive_time_minutes") is None or p["drive_time_minutes"] <= minutes]
+            places.sort(key=self._drive_time_sort_key)
+            
+            return {
+                "success": True,
+                "origin": origin,
+                "origin_name": origin_name or "ma position",
+                "minutes": minutes,
+                "category": category,
+                "area_km2": area["area_km2"],
+                "places": places,
+                "count": len(places),
+            }
+            
+        except Exception as e:
+            return {"error": str(e)}
     
-    def _detect_scraping(self, params: Dict[str, Any], user_location: Optional[Tuple[float, float]] = None) -> bool:
+    def _detect_scraping(
+        self,
+        params: Dict[str, Any],
+        user_location: Optional[Tuple[float, float]] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> bool:
         """Détecte si scraping nécessaire."""
         return True
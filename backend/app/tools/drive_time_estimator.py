@@ -3,10 +3,23 @@ Estimateur de temps de trajet avec intégration du trafic
 Estime le temps de trajet en tenant compte des conditions de trafic
 """
 
-from typing import Dict, List, Any, Tuple
-from shapely.geometry import LineString, Point
+import math
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+from shapely import STRtree, points
+
 from .route_scraper import RouteScraper
-from .traffic_scraper import TrafficScraper
+from .traffic_scraper import TrafficScraper, TRAFFIC_STATUSES
+from .traffic_history import TrafficHistory, bucket_of
+from .polyline import simplify_coordinates
+from ..config import RENNES_LAT, ROUTE_MATCH_SAMPLE_KM, ROUTE_SIMPLIFY_TOLERANCE_M
+from ..deadline import Deadline
+
+# Projection locale (équirectangulaire) en km autour de Rennes
+KM_PER_DEG_LAT = 110.574
+KM_PER_DEG_LON = 111.320 * math.cos(math.radians(RENNES_LAT))
 
 
 class DriveTimeEstimator:
@@ -14,9 +27,10 @@ class DriveTimeEstimator:
     Estime le temps de trajet en intégrant les données de trafic
     """
 
-    def __init__(self):
+    def __init__(self, traffic_history: Optional[TrafficHistory] = None):
         self.route_scraper = RouteScraper()
         self.traffic_scraper = TrafficScraper()
+        self.traffic_history = traffic_history
 
         # Multiplicateurs de temps selon l'état du trafic
         self.traffic_multipliers = {
@@ -30,16 +44,28 @@ class DriveTimeEstimator:
         # Buffer pour considérer qu'une perturbation affecte la route (en km)
         self.impact_buffer_km = 0.5
 
+        # Index spatial des tronçons historisés (reconstruit quand il en apparaît)
+        self._segment_tree: Optional[STRtree] = None
+        self._segment_rows = np.empty(0, dtype=np.intp)
+        self._segment_tree_size = -1
+
     def estimate_drive_time(
-        self, origin: Tuple[float, float], destination: Tuple[float, float]
+        self,
+        origin: Tuple[float, float],
+        destination: Tuple[float, float],
+        departure_time: Optional[datetime] = None,
+        deadline: Optional[Deadline] = None,
     ) -> Dict[str, Any]:
         """
         Estime le temps de trajet entre deux points en tenant compte du trafic
-        
+
         Args:
             origin: (lat, lon)
             destination: (lat, lon)
-        
+            departure_time: Heure de départ souhaitée ; si fournie, l'impact du
+                trafic est prédit à partir des profils historiques
+            deadline: Borne le calcul d'itinéraire OSRM
+
         Returns:
             {
                 "success": bool,
@@ -49,13 +75,15 @@ class DriveTimeEstimator:
                 "duration_base_minutes": float,
                 "traffic_impact_minutes": float,
                 "duration_estimated_minutes": float,
-                "affected_roads": [{"street", "status", "impact_min"}],
+                "affected_roads": [{"street", "status", "impact_minutes"}],
                 "warning": str (si problèmes majeurs)
             }
         """
         try:
-            # 1) Récupérer l'itinéraire
-            route = self.route_scraper.get_route(origin, destination)
+            # 1) Récupérer l'itinéraire : la géométrie n'est utile qu'à la prévision,
+            # complète pour que l'appariement aux tronçons suive bien la chaussée
+            detail = "summary" if departure_time is None else "full"
+            route = self.route_scraper.get_route(origin, destination, detail=detail, deadline=deadline)
             if not route.get("success"):
                 return {
                     "success": False,
@@ -63,26 +91,249 @@ class DriveTimeEstimator:
                 }
 
             distance_km = route["distance_km"]
-            duration_base_sec = route["duration_seconds"]
             duration_base_min = route["duration_minutes"]
-            coordinates = route["coordinates"]  # [[lon, lat], ...]
 
-            # 2) Pour maintenant, retourner estimation sans trafic (traffic_scraper est trop lent)
-            # À FAIRE: Optimiser le traffic scraper avec cache et requêtes parallèles
+            # 2) Départ différé : prévision à partir de l'historique
+            if departure_time is not None:
+                return self._predict_from_history(route, departure_time)
+
+            # 3) Départ immédiat : estimation sans trafic
+            return self.base_estimate(origin, destination, distance_km, duration_base_min)
+
+        except Exception as e:
             return {
+                "success": False,
+                "error": f"Erreur estimation: {str(e)}"
+            }
+
+    @staticmethod
+    def base_estimate(
+        origin: Tuple[float, float],
+        destination: Tuple[float, float],
+        distance_km: float,
+        duration_base_min: float,
+    ) -> Dict[str, Any]:
+        """Réponse d'estimation sans impact du trafic (itinéraire calculé ou précalculé)"""
+        return {
+            "success": True,
+            "origin": origin,
+            "destination": destination,
+            "distance_km": distance_km,
+            "duration_base_minutes": duration_base_min,
+            "traffic_impact_minutes": 0,
+            "duration_estimated_minutes": duration_base_min,
+            "affected_roads": [],
+            "warning": "Trafic non disponible (service en optimisation)"
+        }
+
+    def best_departure_time(
+        self,
+        origin: Tuple[float, float],
+        destination: Tuple[float, float],
+        window_start: datetime,
+        slots: int = 48,
+        step_minutes: int = 15,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Any]:
+        """
+        Cherche l'heure de départ la plus rapide dans une fenêtre.
+
+        L'itinéraire n'est calculé qu'une fois : toutes les tranches sont
+        évaluées en un seul produit matriciel sur les profils historiques.
+
+        Args:
+            origin: (lat, lon)
+            destination: (lat, lon)
+            window_start: Premier départ envisagé
+            slots: Nombre de départs évalués
+            step_minutes: Écart entre deux départs
+
+        Returns:
+            {
+                "success": bool,
+                "distance_km": float,
+                "duration_base_minutes": float,
+                "best_departure": str (YYYY-MM-DD HH:MM),
+                "best_duration_minutes": float,
+                "worst_departure": str,
+                "worst_duration_minutes": float,
+                "slots": [{"departure": str, "duration_minutes": float}],
+                "history_samples": int,
+                "warning": str (si historique insuffisant)
+            }
+        """
+        try:
+            route = self.route_scraper.get_route(origin, destination, detail="full", deadline=deadline)
+            if not route.get("success"):
+                return {
+                    "success": False,
+                    "error": route.get("error", "Erreur OSRM")
+                }
+
+            departures = [window_start + timedelta(minutes=step_minutes * i) for i in range(slots)]
+            buckets = [bucket_of(d) for d in departures]
+            rows, shares = self._route_segments(route["coordinates"])
+            durations, _, samples = self._predict_durations(route, rows, shares, buckets)
+
+            minutes = np.round(durations / 60, 1)
+            # À durée égale, on privilégie le départ le plus tôt (argmin prend le premier)
+            best = int(np.argmin(minutes))
+            worst = int(np.argmax(minutes))
+
+            result = {
                 "success": True,
-                "origin": origin,
-                "destination": destination,
-                "distance_km": distance_km,
-                "duration_base_minutes": duration_base_min,
-                "traffic_impact_minutes": 0,
-                "duration_estimated_minutes": duration_base_min,
-                "affected_roads": [],
-                "warning": "Trafic non disponible (service en optimisation)"
+                "origin": route["origin"],
+                "destination": route["destination"],
+                "distance_km": route["distance_km"],
+                "duration_base_minutes": route["duration_minutes"],
+                "best_departure": departures[best].strftime("%Y-%m-%d %H:%M"),
+                "best_duration_minutes": float(minutes[best]),
+                "worst_departure": departures[worst].strftime("%Y-%m-%d %H:%M"),
+                "worst_duration_minutes": float(minutes[worst]),
+                "slots": [
+                    {"departure": d.strftime("%Y-%m-%d %H:%M"), "duration_minutes": float(m)}
+                    for d, m in zip(departures, minutes)
+                ],
+                "history_samples": int(samples.sum()),
             }
+            if not samples.any():
+                result["warning"] = "Historique de trafic insuffisant : toutes les heures se valent"
+            return result
 
         except Exception as e:
             return {
                 "success": False,
                 "error": f"Erreur estimation: {str(e)}"
             }
+
+    # ------------------------------------------------------------------
+    # PRÉVISION À PARTIR DES PROFILS HISTORIQUES
+    # ------------------------------------------------------------------
+
+    def _predict_from_history(self, route: Dict[str, Any], departure_time: datetime) -> Dict[str, Any]:
+        """Construit la réponse d'estimation pour un départ à `departure_time`"""
+        bucket = bucket_of(departure_time)
+        rows, shares = self._route_segments(route["coordinates"])
+        durations, multipliers, samples = self._predict_durations(route, rows, shares, [bucket])
+
+        duration_base_min = route["duration_minutes"]
+        duration_est_min = round(float(durations[0]) / 60, 1)
+
+        affected_roads = []
+        if len(rows):
+            probas, _ = self.traffic_history.status_probabilities([bucket], rows)
+            for i, row in enumerate(rows):
+                impact_min = duration_base_min * shares[i] * (multipliers[i, 0] - 1)
+                if impact_min < 0.1:
+                    continue
+                # Statut perturbé le plus probable sur ce tronçon
+                level = 1 + int(np.argmax(probas[i, 0, 1:]))
+                affected_roads.append({
+                    "street": self.traffic_history.segment_label(row),
+                    "status": f"{TRAFFIC_STATUSES[level]} probable ({probas[i, 0, level]:.0%})",
+                    "impact_minutes": round(float(impact_min), 1),
+                })
+            affected_roads.sort(key=lambda r: r["impact_minutes"], reverse=True)
+
+        result = {
+            "success": True,
+            "origin": route["origin"],
+            "destination": route["destination"],
+            "distance_km": route["distance_km"],
+            "duration_base_minutes": duration_base_min,
+            "traffic_impact_minutes": round(duration_est_min - duration_base_min, 1),
+            "duration_estimated_minutes": duration_est_min,
+            "affected_roads": affected_roads,
+            "departure_time": departure_time.strftime("%Y-%m-%d %H:%M"),
+            "prediction": "historique",
+            "history_samples": int(samples.sum()),
+        }
+        if not samples.any():
+            result["warning"] = "Historique de trafic insuffisant pour cette heure : estimation sans trafic"
+        return result
+
+    def _predict_durations(
+        self,
+        route: Dict[str, Any],
+        rows: np.ndarray,
+        shares: np.ndarray,
+        buckets: Sequence[int],
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Durées prévues (secondes) pour chaque tranche horaire, en un seul calcul matriciel.
+
+        Returns:
+            (durées (n_tranches,), multiplicateurs (n_tronçons, n_tranches),
+             échantillons (n_tronçons, n_tranches))
+        """
+        base_s = float(route["duration_seconds"])
+        if not len(rows):
+            empty = np.empty((0, len(buckets)), dtype=np.float32)
+            return np.full(len(buckets), base_s), empty, empty
+
+        level_multipliers = [self.traffic_multipliers[status] for status in TRAFFIC_STATUSES]
+        multipliers, samples = self.traffic_history.expected_multipliers(level_multipliers, buckets, rows)
+        # Chaque tronçon allonge sa part du trajet de (multiplicateur - 1)
+        durations = base_s * (1.0 + shares @ (multipliers - 1.0))
+        return durations, multipliers, samples
+
+    def _route_segments(self, coordinates: Any) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Tronçons historisés longeant l'itinéraire.
+
+        Chaque arête de l'itinéraire est échantillonnée tous les
+        `ROUTE_MATCH_SAMPLE_KM` ; chaque point porte une fraction égale de la
+        longueur de l'arête et est rattaché au tronçon le plus proche situé à
+        moins de `impact_buffer_km`. Une longue arête se répartit ainsi entre
+        tous les tronçons qu'elle longe.
+
+        Returns:
+            (lignes des tronçons dans l'historique, part du trajet couverte (0-1))
+        """
+        empty = (np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float64))
+        if self.traffic_history is None or self.traffic_history.size == 0:
+            return empty
+
+        # Géométrie complète simplifiée localement : écart < 15 m
+        coords = simplify_coordinates(coordinates, ROUTE_SIMPLIFY_TOLERANCE_M)  # [lon, lat]
+        if len(coords) < 2:
+            return empty
+
+        xy = coords * np.array([KM_PER_DEG_LON, KM_PER_DEG_LAT])
+        edges = np.diff(xy, axis=0)
+        edge_lengths = np.hypot(*edges.T)
+        total = edge_lengths.sum()
+        tree = self._get_segment_tree()
+        if total <= 0 or tree is None:
+            return empty
+
+        # Points au milieu de n sous-arêtes égales de chaque arête
+        counts = np.maximum(1, np.ceil(edge_lengths / ROUTE_MATCH_SAMPLE_KM)).astype(np.intp)
+        edge_of = np.repeat(np.arange(len(edges)), counts)
+        rank = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        t = (rank + 0.5) / counts[edge_of]
+        samples = xy[edge_of] + t[:, None] * edges[edge_of]
+        weights = (edge_lengths / counts)[edge_of] / total
+
+        sample_idx, tree_idx = tree.query_nearest(points(samples), max_distance=self.impact_buffer_km)
+        # Un point équidistant de deux tronçons n'est compté qu'une fois
+        sample_idx, first = np.unique(sample_idx, return_index=True)
+        tree_idx = tree_idx[first]
+
+        rows = self._segment_rows[tree_idx]
+        unique_rows, inverse = np.unique(rows, return_inverse=True)
+        shares = np.bincount(inverse, weights=weights[sample_idx])
+        return unique_rows, shares
+
+    def _get_segment_tree(self) -> Optional[STRtree]:
+        size = self.traffic_history.size
+        if size != self._segment_tree_size:
+            lat, lon = self.traffic_history.segment_positions()
+            valid = ~(np.isnan(lat) | np.isnan(lon))
+            self._segment_rows = np.flatnonzero(valid)
+            self._segment_tree = (
+                STRtree(points(lon[valid] * KM_PER_DEG_LON, lat[valid] * KM_PER_DEG_LAT))
+                if valid.any() else None
+            )
+            self._segment_tree_size = size
+        return self._segment_tree
@@ -10,6 +10,9 @@ import zipfile
 import io
 import math
 
+from ..deadline import Deadline
+from .. import http_client
+
 # Codes postaux Rennes Métropole
 RENNES_METRO_POSTAL_CODES = [
     "35000", "35200", "35700",  # Rennes
@@ -69,7 +72,8 @@ class FuelPriceScraper:
     # CACHE
     # ------------------------------------------------------------------
 
-    def _get_cache(self) -> Optional[Dict]:
+    def _get_cache(self, max_age: Optional[timedelta] = timedelta(hours=24)) -> Optional[Dict]:
+        """Données en cache, si plus récentes que max_age (None : quel que soit leur âge)"""
         if not os.path.exists(self.cache_file):
             return None
 
@@ -78,7 +82,7 @@ class FuelPriceScraper:
                 cache = json.load(f)
 
             timestamp = datetime.fromisoformat(cache["timestamp"])
-            if datetime.now() - timestamp < timedelta(hours=24):
+            if max_age is None or datetime.now() - timestamp < max_age:
                 print(f"[Cache] Cache valide ({timestamp})")
                 return cache["data"]
 
@@ -104,7 +108,12 @@ class FuelPriceScraper:
     # FETCH
     # ------------------------------------------------------------------
 
-    def fetch_daily_prices(self, force_refresh: bool = False) -> Dict:
+    def fetch_daily_prices(self, force_refresh: bool = False, deadline: Optional[Deadline] = None) -> Dict:
+        """
+        Prix du jour (cache de 24 h). Si le téléchargement échoue ou dépasse
+        le deadline, le dernier cache est servi quel que soit son âge et le
+        repli est noté dans deadline.reasons.
+        """
         if not force_refresh:
             cached = self._get_cache()
             if cached:
@@ -113,7 +122,7 @@ class FuelPriceScraper:
         print("[Download] Telechargement des prix carburants...")
 
         try:
-            response = requests.get(self.base_url, timeout=30)
+            response = http_client.get(self.base_url, timeout=deadline.timeout(30) if deadline else 30)
             response.raise_for_status()
 
             # ----------------------------------------------------------
@@ -178,9 +187,11 @@ class FuelPriceScraper:
 
         except Exception as e:
             print("[Error] Erreur recuperation carburants:", e)
-            cached = self._get_cache()
+            cached = self._get_cache(max_age=None)
             if cached:
                 print("[Warning] Utilisation du cache existant")
+                if deadline is not None:
+                    deadline.degrade(f"Prix carburant du {cached['date']} (téléchargement impossible)")
                 return cached
             raise
 
@@ -189,9 +200,9 @@ class FuelPriceScraper:
     # ------------------------------------------------------------------
 
     def search_by_city(
-        self, ville: str, fuel_type: str = "Gazole"
+        self, ville: str, fuel_type: str = "Gazole", deadline: Optional[Deadline] = None
     ) -> List[Dict]:
-        data = self.fetch_daily_prices()
+        data = self.fetch_daily_prices(deadline=deadline)
         ville_original = ville
         ville = ville.lower()
 
@@ -223,9 +234,9 @@ class FuelPriceScraper:
         return results
 
     def search_by_postal_code(
-        self, cp: str, fuel_type: str = "Gazole"
+        self, cp: str, fuel_type: str = "Gazole", deadline: Optional[Deadline] = None
     ) -> List[Dict]:
-        data = self.fetch_daily_prices()
+        data = self.fetch_daily_prices(deadline=deadline)
 
         # 🔒 RESTRICTION Ille-et-Vilaine (35) si activée
         if self.restrict_to_rennes:
@@ -257,16 +268,16 @@ class FuelPriceScraper:
         return results
 
     def get_cheapest_in_city(
-        self, ville: str, fuel_type: str = "Gazole", limit: int = 5
+        self, ville: str, fuel_type: str = "Gazole", limit: int = 5, deadline: Optional[Deadline] = None
     ) -> List[Dict]:
-        return self.search_by_city(ville, fuel_type)[:limit]
+        return self.search_by_city(ville, fuel_type, deadline)[:limit]
 
     # ------------------------------------------------------------------
     # STATS
     # ------------------------------------------------------------------
 
-    def get_stats(self) -> Dict:
-        data = self.fetch_daily_prices()
+    def get_stats(self, deadline: Optional[Deadline] = None) -> Dict:
+        data = self.fetch_daily_prices(deadline=deadline)
 
         # 🔒 RESTRICTION RENNES si activée
         stations = data["stations"]
@@ -0,0 +1,118 @@
+"""
+Isochrones : zone atteignable en voiture en N minutes depuis une origine
+Une grille de points autour de l'origine est évaluée en une seule requête de
+matrice (RouteScraper.get_table) ; les cellules atteintes sont fusionnées en
+polygone, puis croisées avec les stations et parkings.
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import shapely
+from shapely.geometry import box
+
+from .route_cache import RouteCache
+from ..config import (
+    ISOCHRONE_CACHE_GRID_DEG,
+    ISOCHRONE_CACHE_TTL_S,
+    ISOCHRONE_GRID_SIZE,
+    ISOCHRONE_MAX_MINUTES,
+    ISOCHRONE_MAX_SPEED_KMH,
+)
+from ..deadline import Deadline
+
+KM_PER_DEG_LAT = 110.574
+
+
+class IsochroneBuilder:
+    """
+    Calcule (et met en cache) les isochrones à partir d'un RouteScraper.
+
+    Le cache regroupe les origines sur une grille d'environ 500 m : les
+    questions répétées depuis le centre-ville ne refont pas la matrice.
+    """
+
+    def __init__(self, route_scraper, grid_size: int = ISOCHRONE_GRID_SIZE):
+        self.route_scraper = route_scraper
+        self.grid_size = grid_size
+        self.cache = RouteCache(
+            max_entries=256, ttl_s=ISOCHRONE_CACHE_TTL_S, grid_deg=ISOCHRONE_CACHE_GRID_DEG
+        )
+
+    def reachable_area(
+        self, origin: Tuple[float, float], minutes: float, deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        """
+        Zone atteignable depuis `origin` (lat, lon) en `minutes`
+
+        Returns:
+            {
+                "success": bool,
+                "minutes": float,
+                "polygon": shapely (Multi)Polygon en (lon, lat),
+                "area_km2": float,
+                "sampled_points": int,
+                "reached_points": int,
+                "error": str (si erreur)
+            }
+        """
+        minutes = min(float(minutes), ISOCHRONE_MAX_MINUTES)
+        if minutes <= 0:
+            return {"success": False, "error": "Durée invalide"}
+
+        key = self.cache.key_for(origin, origin, "isochrone", minutes)
+        return self.cache.get_or_compute(key, lambda: self._compute(origin, minutes, deadline))
+
+    def _compute(
+        self, origin: Tuple[float, float], minutes: float, deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        lat0, lon0 = origin
+        km_per_deg_lon = KM_PER_DEG_LAT * math.cos(math.radians(lat0))
+
+        # Grille carrée bornée par la distance franchissable à vitesse max
+        radius_km = ISOCHRONE_MAX_SPEED_KMH * minutes / 60
+        offsets = np.linspace(-radius_km, radius_km, self.grid_size)
+        step_km = offsets[1] - offsets[0]
+        dx, dy = np.meshgrid(offsets, offsets)
+        inside = np.hypot(dx, dy) <= radius_km + step_km / 2
+        lats = lat0 + dy[inside] / KM_PER_DEG_LAT
+        lons = lon0 + dx[inside] / km_per_deg_lon
+
+        table = self.route_scraper.get_table(origin, list(zip(lats.tolist(), lons.tolist())), deadline)
+        if not table.get("success"):
+            return {"success": False, "error": table.get("error", "Matrice de temps indisponible")}
+
+        durations = np.array([np.inf if d is None else d for d in table["durations_seconds"]], dtype=np.float64)
+        reached = durations <= minutes * 60
+
+        # Une cellule par point atteint, plus celle de l'origine
+        half_lat = step_km / 2 / KM_PER_DEG_LAT
+        half_lon = step_km / 2 / km_per_deg_lon
+        cells = [box(lon0 - half_lon, lat0 - half_lat, lon0 + half_lon, lat0 + half_lat)]
+        cells += [
+            box(lon - half_lon, lat - half_lat, lon + half_lon, lat + half_lat)
+            for lat, lon in zip(lats[reached], lons[reached])
+        ]
+        polygon = shapely.union_all(cells)
+        area_km2 = polygon.area * KM_PER_DEG_LAT * km_per_deg_lon
+
+        return {
+            "success": True,
+            "minutes": minutes,
+            "polygon": polygon,
+            "area_km2": round(float(area_km2), 1),
+            "sampled_points": int(len(lats)),
+            "reached_points": int(reached.sum()),
+        }
+
+
+def places_within(polygon, places: Sequence[Dict[str, Any]], lat_key: str = "lat", lon_key: str = "lon") -> List[Dict[str, Any]]:
+    """Éléments géolocalisés situés dans le polygone (test vectorisé)"""
+    located = [p for p in places if p.get(lat_key) is not None and p.get(lon_key) is not None]
+    if not located:
+        return []
+    lats = np.array([p[lat_key] for p in located], dtype=np.float64)
+    lons = np.array([p[lon_key] for p in located], dtype=np.float64)
+    mask = shapely.contains_xy(polygon, lons, lats)
+    return [p for p, keep in zip(located, mask) if keep]
@@ -0,0 +1,462 @@
+"""
+Routage local hors-ligne sur le graphe routier de Rennes Métropole
+Le graphe (extrait OSM converti) est stocké en tableaux CSR compacts (.npz)
+et interrogé en mémoire par A* bidirectionnel, sans appel réseau.
+
+Construction du graphe à partir d'un extrait OSM XML :
+    python -m backend.app.tools.local_router rennes-metropole.osm cache/rennes_road_graph.npz
+"""
+
+import heapq
+import math
+import os
+import sys
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .polyline import simplify_coordinates
+from ..reverse_geocoder import GridIndex
+from ..config import ROUTE_SIMPLIFY_TOLERANCE_M, ROUTING_GRAPH_PATH, ROUTING_MAX_SNAP_M
+
+EARTH_RADIUS_M = 6371000.0
+
+# Vitesses par défaut (km/h) selon le type de voie OSM, si maxspeed est absent
+HIGHWAY_SPEEDS_KMH = {
+    "motorway": 110, "motorway_link": 60,
+    "trunk": 90, "trunk_link": 50,
+    "primary": 70, "primary_link": 40,
+    "secondary": 60, "secondary_link": 40,
+    "tertiary": 50, "tertiary_link": 30,
+    "unclassified": 40,
+    "residential": 30,
+    "living_street": 15,
+    "service": 20,
+}
+
+
+def _equirect_m(lat1, lon1, lat2, lon2):
+    """Distance approchée en mètres (équirectangulaire, vectorisable)"""
+    x = np.radians(lon2 - lon1) * np.cos(np.radians((lat1 + lat2) / 2))
+    y = np.radians(lat2 - lat1)
+    return EARTH_RADIUS_M * np.hypot(x, y)
+
+
+class LocalRoadGraph:
+    """
+    Graphe routier orienté en représentation CSR.
+
+    Les arcs sortants du nœud u sont indices[indptr[u]:indptr[u + 1]],
+    avec leur durée (s) dans edge_time et leur longueur (m) dans edge_length.
+    Le graphe inverse (arcs entrants) est dérivé au chargement pour la
+    recherche arrière de l'A* bidirectionnel.
+    """
+
+    def __init__(
+        self,
+        node_lat: np.ndarray,
+        node_lon: np.ndarray,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        edge_time: np.ndarray,
+        edge_length: np.ndarray,
+    ):
+        self.node_lat = np.asarray(node_lat, dtype=np.float64)
+        self.node_lon = np.asarray(node_lon, dtype=np.float64)
+        self.indptr = np.ascontiguousarray(indptr, dtype=np.int64)
+        self.indices = np.ascontiguousarray(indices, dtype=np.int32)
+        self.edge_time = np.ascontiguousarray(edge_time, dtype=np.float32)
+        self.edge_length = np.ascontiguousarray(edge_length, dtype=np.float32)
+
+        n_edges = len(self.indices)
+        self.edge_src = np.repeat(np.arange(self.node_count, dtype=np.int32), np.diff(self.indptr))
+
+        # Graphe inverse : arcs regroupés par nœud d'arrivée
+        order = np.argsort(self.indices, kind="stable")
+        self.rev_edges = order.astype(np.int32)
+        self.rev_indptr = np.zeros(self.node_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.indices, minlength=self.node_count), out=self.rev_indptr[1:])
+
+        # Vitesse max du graphe : garantit une heuristique admissible
+        with np.errstate(divide="ignore", invalid="ignore"):
+            speeds = np.where(self.edge_time > 0, self.edge_length / self.edge_time, 0)
+        self.max_speed_ms = float(speeds.max()) if n_edges else 1.0
+
+        # Index spatial des nœuds : rattachement d'un point sans parcourir tout le graphe
+        self._node_index = GridIndex(self.node_lat, self.node_lon)
+
+        # Vues mémoire : accès élément par élément rapide sans copier en listes
+        self._indptr = memoryview(self.indptr)
+        self._indices = memoryview(self.indices)
+        self._time = memoryview(self.edge_time)
+        self._src = memoryview(self.edge_src)
+        self._rev_indptr = memoryview(self.rev_indptr)
+        self._rev_edges = memoryview(self.rev_edges)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_lat)
+
+    # ------------------------------------------------------------------
+    # CONSTRUCTION / PERSISTANCE
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_edges(
+        cls,
+        node_lat: Sequence[float],
+        node_lon: Sequence[float],
+        src: Sequence[int],
+        dst: Sequence[int],
+        edge_length: Sequence[float],
+        edge_time: Sequence[float],
+    ) -> "LocalRoadGraph":
+        """Construit le CSR à partir d'une liste d'arcs (src -> dst)"""
+        src = np.asarray(src, dtype=np.int64)
+        order = np.argsort(src, kind="stable")
+        indptr = np.zeros(len(node_lat) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=len(node_lat)), out=indptr[1:])
+        return cls(
+            node_lat, node_lon, indptr,
+            np.asarray(dst)[order],
+            np.asarray(edge_time)[order],
+            np.asarray(edge_length)[order],
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "LocalRoadGraph":
+        with np.load(path) as data:
+            return cls(
+                data["node_lat"], data["node_lon"], data["indptr"],
+                data["indices"], data["edge_time"], data["edge_length"],
+            )
+
+    @classmethod
+    def load_default(cls) -> Optional["LocalRoadGraph"]:
+        """Charge le graphe configuré (ROUTING_GRAPH_PATH), None s'il est absent"""
+        if not ROUTING_GRAPH_PATH or not os.path.exists(ROUTING_GRAPH_PATH):
+            return None
+        try:
+            graph = cls.load(ROUTING_GRAPH_PATH)
+            print(f"[Routing] Graphe local chargé ({graph.node_count} nœuds, {len(graph.indices)} arcs)")
+            return graph
+        except Exception as e:
+            print("[Warning] Erreur lecture graphe routier local:", e)
+            return None
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez_compressed(
+            path,
+            node_lat=self.node_lat,
+            node_lon=self.node_lon,
+            indptr=self.indptr,
+            indices=self.indices,
+            edge_time=self.edge_time,
+            edge_length=self.edge_length,
+        )
+
+    # ------------------------------------------------------------------
+    # REQUÊTES
+    # ------------------------------------------------------------------
+
+    def nearest_node(self, lat: float, lon: float, max_m: float = ROUTING_MAX_SNAP_M) -> Optional[Tuple[int, float]]:
+        """Nœud le plus proche d'un point et distance (m), None au-delà de max_m"""
+        return self._node_index.nearest(lat, lon, max_m)
+
+    def route(
+        self,
+        origin: Tuple[float, float],
+        destination: Tuple[float, float],
+        max_snap_m: float = ROUTING_MAX_SNAP_M,
+        detail: str = "full",
+    ) -> Dict[str, Any]:
+        """
+        Itinéraire le plus rapide entre deux points (lat, lon).
+
+        Même format de réponse que RouteScraper.get_route (mêmes niveaux de détail).
+        """
+        source = self.nearest_node(*origin, max_m=max_snap_m)
+        target = self.nearest_node(*destination, max_m=max_snap_m)
+        if source is None or target is None:
+            return {"success": False, "error": "Point hors du graphe routier local"}
+
+        found = self.shortest_path(source[0], target[0])
+        if found is None:
+            return {"success": False, "error": "Aucun itinéraire dans le graphe local"}
+
+        nodes, edges, duration_s = found
+        distance_m = float(self.edge_length[edges].sum()) if len(edges) else 0.0
+        if detail == "summary":
+            coordinates = np.empty((0, 2), dtype=np.float64)
+        else:
+            coordinates = np.column_stack((self.node_lon[nodes], self.node_lat[nodes]))
+            if detail == "simplified":
+                coordinates = simplify_coordinates(coordinates, ROUTE_SIMPLIFY_TOLERANCE_M)
+        coordinates.flags.writeable = False
+
+        result = {
+            "success": True,
+            "distance_km": round(distance_m / 1000, 2),
+            "duration_seconds": int(duration_s),
+            "duration_minutes": round(duration_s / 60, 1),
+            "coordinates": coordinates,  # [[lon, lat], ...]
+            "origin": origin,
+            "destination": destination,
+            "detail": detail,
+            "source": "local",
+        }
+        if detail == "full":
+            result["annotations"] = {
+                "duration": self.edge_time[edges].tolist(),
+                "distance": self.edge_length[edges].tolist(),
+            }
+        return result
+
+    def table(
+        self,
+        origin: Tuple[float, float],
+        destinations: Sequence[Tuple[float, float]],
+        max_snap_m: float = ROUTING_MAX_SNAP_M,
+    ) -> Dict[str, Any]:
+        """
+        Durées et distances d'une origine vers plusieurs destinations (lat, lon).
+
+        Même format de réponse que RouteScraper.get_table ; une destination
+        hors graphe ou injoignable vaut None.
+        """
+        source = self.nearest_node(*origin, max_m=max_snap_m)
+        if source is None:
+            return {"success": False, "error": "Point hors du graphe routier local"}
+
+        targets = []
+        for lat, lon in destinations:
+            node = self.nearest_node(lat, lon, max_m=max_snap_m)
+            targets.append(node[0] if node is not None else -1)
+
+        reached = self.one_to_many(source[0], [t for t in targets if t >= 0])
+        durations: List[Optional[float]] = []
+        distances: List[Optional[float]] = []
+        for node in targets:
+            found = reached.get(node) if node >= 0 else None
+            durations.append(round(found[0], 1) if found else None)
+            distances.append(round(found[1] / 1000, 2) if found else None)
+
+        return {
+            "success": True,
+            "durations_seconds": durations,
+            "distances_km": distances,
+            "source": "local",
+        }
+
+    def one_to_many(self, source: int, targets: Sequence[int]) -> Dict[int, Tuple[float, float]]:
+        """
+        Dijkstra depuis `source`, arrêté dès que toutes les cibles sont atteintes.
+
+        Returns:
+            {nœud cible: (durée en s, longueur en m)} pour les cibles joignables
+        """
+        remaining = set(targets)
+        indptr, indices, time_s = self._indptr, self._indices, self._time
+        length_m = memoryview(self.edge_length)
+
+        dist = {source: 0.0}
+        length = {source: 0.0}
+        heap = [(0.0, source)]
+        settled = set()
+        found: Dict[int, Tuple[float, float]] = {}
+
+        while heap and remaining:
+            du, u = heapq.heappop(heap)
+            if u in settled:
+                continue
+            settled.add(u)
+            if u in remaining:
+                remaining.discard(u)
+                found[u] = (du, length[u])
+            for e in range(indptr[u], indptr[u + 1]):
+                v = indices[e]
+                nd = du + time_s[e]
+                if nd < dist.get(v, math.inf):
+                    dist[v] = nd
+                    length[v] = length[u] + length_m[e]
+                    heapq.heappush(heap, (nd, v))
+        return found
+
+    def shortest_path(self, source: int, target: int) -> Optional[Tuple[List[int], List[int], float]]:
+        """
+        A* bidirectionnel (potentiel moyen) sur les durées.
+
+        Le potentiel p(v) = (h_t(v) - h_s(v)) / 2, avec h la distance à vol
+        d'oiseau divisée par la vitesse max du graphe, est cohérent pour les
+        deux directions ; la recherche s'arrête dès que la somme des deux
+        sommets de tas dépasse le meilleur trajet trouvé.
+
+        Returns:
+            (nœuds du chemin, arcs du chemin, durée en s) ou None si injoignable
+        """
+        if source == target:
+            return [source], [], 0.0
+
+        lat_s, lon_s = self.node_lat[source], self.node_lon[source]
+        lat_t, lon_t = self.node_lat[target], self.node_lon[target]
+        h_t = _equirect_m(self.node_lat, self.node_lon, lat_t, lon_t)
+        h_s = _equirect_m(self.node_lat, self.node_lon, lat_s, lon_s)
+        potential = memoryview((h_t - h_s) / (2 * self.max_speed_ms))
+
+        indptr, indices, time_s, src = self._indptr, self._indices, self._time, self._src
+        rev_indptr, rev_edges = self._rev_indptr, self._rev_edges
+
+        dist_f = {source: 0.0}
+        dist_r = {target: 0.0}
+        parent_f = {source: -1}
+        parent_r = {target: -1}
+        heap_f = [(potential[source], source)]
+        heap_r = [(-potential[target], target)]
+        settled_f = set()
+        settled_r = set()
+        best = math.inf
+        meeting = -1
+
+        while heap_f and heap_r:
+            if heap_f[0][0] + heap_r[0][0] >= best:
+                break
+
+            if heap_f[0][0] <= heap_r[0][0]:
+                _, u = heapq.heappop(heap_f)
+                if u in settled_f:
+                    continue
+                settled_f.add(u)
+                du = dist_f[u]
+                for e in range(indptr[u], indptr[u + 1]):
+                    v = indices[e]
+                    nd = du + time_s[e]
+                    if nd < dist_f.get(v, math.inf):
+                        dist_f[v] = nd
+                        parent_f[v] = e
+                        heapq.heappush(heap_f, (nd + potential[v], v))
+                        if v in dist_r and nd + dist_r[v] < best:
+                            best = nd + dist_r[v]
+                            meeting = v
+            else:
+                _, u = heapq.heappop(heap_r)
+                if u in settled_r:
+                    continue
+                settled_r.add(u)
+                du = dist_r[u]
+                for k in range(rev_indptr[u], rev_indptr[u + 1]):
+                    e = rev_edges[k]
+                    v = src[e]
+                    nd = du + time_s[e]
+                    if nd < dist_r.get(v, math.inf):
+                        dist_r[v] = nd
+                        parent_r[v] = e
+                        heapq.heappush(heap_r, (nd - potential[v], v))
+                        if v in dist_f and nd + dist_f[v] < best:
+                            best = nd + dist_f[v]
+                            meeting = v
+
+        if meeting < 0:
+            return None
+
+        # Reconstruction : source -> rencontre, puis rencontre -> cible
+        edges_f = []
+        node = meeting
+        while parent_f[node] >= 0:
+            e = parent_f[node]
+            edges_f.append(e)
+            node = src[e]
+        edges = edges_f[::-1]
+
+        node = meeting
+        while parent_r[node] >= 0:
+            e = parent_r[node]
+            edges.append(e)
+            node = indices[e]
+
+        nodes = [source] + [indices[e] for e in edges]
+        return nodes, edges, best
+
+
+# ----------------------------------------------------------------------
+# CONVERSION D'UN EXTRAIT OSM
+# ----------------------------------------------------------------------
+
+def _way_speed_kmh(tags: Dict[str, str]) -> Optional[float]:
+    highway = tags.get("highway")
+    if highway not in HIGHWAY_SPEEDS_KMH:
+        return None
+    maxspeed = tags.get("maxspeed", "")
+    if maxspeed.isdigit():
+        return float(maxspeed)
+    return float(HIGHWAY_SPEEDS_KMH[highway])
+
+
+def build_graph_from_osm(path: str) -> LocalRoadGraph:
+    """
+    Convertit un extrait OSM XML en graphe CSR (voies carrossables uniquement).
+
+    Deux passes en streaming : les voies d'abord (pour connaître les nœuds
+    utiles), puis les coordonnées de ces seuls nœuds.
+    """
+    ways = []
+    used_nodes = set()
+    for _, elem in ET.iterparse(path, events=("end",)):
+        if elem.tag == "way":
+            tags = {t.get("k"): t.get("v") for t in elem.findall("tag")}
+            speed = _way_speed_kmh(tags)
+            if speed is not None:
+                refs = [int(nd.get("ref")) for nd in elem.findall("nd")]
+                oneway = tags.get("oneway", "")
+                if oneway in ("yes", "1", "true") or tags.get("junction") == "roundabout" or tags.get("highway") == "motorway":
+                    direction = 1
+                elif oneway == "-1":
+                    direction = -1
+                else:
+                    direction = 0
+                ways.append((refs, speed, direction))
+                used_nodes.update(refs)
+            elem.clear()
+        elif elem.tag == "node":
+            elem.clear()
+
+    node_index: Dict[int, int] = {}
+    lats: List[float] = []
+    lons: List[float] = []
+    for _, elem in ET.iterparse(path, events=("end",)):
+        if elem.tag == "node":
+            osm_id = int(elem.get("id"))
+            if osm_id in used_nodes:
+                node_index[osm_id] = len(lats)
+                lats.append(float(elem.get("lat")))
+                lons.append(float(elem.get("lon")))
+            elem.clear()
+
+    node_lat = np.array(lats)
+    node_lon = np.array(lons)
+    src: List[int] = []
+    dst: List[int] = []
+    speeds: List[float] = []
+    for refs, speed, direction in ways:
+        ids = [node_index[r] for r in refs if r in node_index]
+        for a, b in zip(ids, ids[1:]):
+            if direction >= 0:
+                src.append(a); dst.append(b); speeds.append(speed)
+            if direction <= 0:
+                src.append(b); dst.append(a); speeds.append(speed)
+
+    src_arr = np.array(src, dtype=np.int64)
+    dst_arr = np.array(dst, dtype=np.int64)
+    lengths = _equirect_m(node_lat[src_arr], node_lon[src_arr], node_lat[dst_arr], node_lon[dst_arr])
+    times = lengths / (np.array(speeds) / 3.6)
+    return LocalRoadGraph.from_edges(node_lat, node_lon, src_arr, dst_arr, lengths, times)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m backend.app.tools.local_router <extrait.osm> <graphe.npz>")
+        sys.exit(1)
+    graph = build_graph_from_osm(sys.argv[1])
+    graph.save(sys.argv[2])
+    print(f"[Success] Graphe enregistré: {graph.node_count} nœuds, {len(graph.indices)} arcs")
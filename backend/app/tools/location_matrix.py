@@ -0,0 +1,88 @@
+"""
+Matrice précalculée des temps de trajet entre les lieux connus de Rennes
+Durées (s) et distances (km) en float32, indexées par identifiant canonique
+(rennes_locations.LOCATION_COORDS) : un trajet entre deux lieux nommés se lit
+en O(1), sans routage.
+
+Calcul hors-ligne (une requête de matrice par lieu d'origine) :
+    python -m backend.app.tools.location_matrix cache/location_matrix.npz
+"""
+
+import os
+import sys
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..config import LOCATION_MATRIX_PATH
+from ..rennes_locations import LOCATION_COORDS
+
+
+class LocationMatrix:
+    """Durées / distances lieu à lieu ; NaN quand aucun itinéraire n'a été trouvé."""
+
+    def __init__(self, coords: np.ndarray, durations: np.ndarray, distances: np.ndarray):
+        self.coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        self.durations = np.asarray(durations, dtype=np.float32)
+        self.distances = np.asarray(distances, dtype=np.float32)
+
+    @classmethod
+    def build(cls, route_scraper, coords: Sequence[Tuple[float, float]] = LOCATION_COORDS) -> "LocationMatrix":
+        """Calcule la matrice complète via RouteScraper.get_table (une ligne par origine)"""
+        n = len(coords)
+        durations = np.full((n, n), np.nan, dtype=np.float32)
+        distances = np.full((n, n), np.nan, dtype=np.float32)
+        for i, origin in enumerate(coords):
+            table = route_scraper.get_table(origin, coords)
+            if not table.get("success"):
+                print(f"[Warning] Ligne {i} de la matrice non calculée: {table.get('error')}")
+                continue
+            durations[i] = [np.nan if d is None else d for d in table["durations_seconds"]]
+            distances[i] = [np.nan if d is None else d for d in table["distances_km"]]
+        return cls(np.array(coords), durations, distances)
+
+    @classmethod
+    def load(cls, path: str) -> "LocationMatrix":
+        with np.load(path) as data:
+            return cls(data["coords"], data["durations"], data["distances"])
+
+    @classmethod
+    def load_default(cls) -> Optional["LocationMatrix"]:
+        """
+        Charge la matrice configurée (LOCATION_MATRIX_PATH).
+
+        Retourne None si elle est absente ou si la table des lieux a changé
+        depuis son calcul (identifiants décalés).
+        """
+        if not LOCATION_MATRIX_PATH or not os.path.exists(LOCATION_MATRIX_PATH):
+            return None
+        try:
+            matrix = cls.load(LOCATION_MATRIX_PATH)
+        except Exception as e:
+            print("[Warning] Erreur lecture matrice des lieux:", e)
+            return None
+        if matrix.coords.shape != (len(LOCATION_COORDS), 2) or not np.allclose(matrix.coords, LOCATION_COORDS):
+            print("[Warning] Matrice des lieux obsolète (table des lieux modifiée), à recalculer")
+            return None
+        return matrix
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez_compressed(path, coords=self.coords, durations=self.durations, distances=self.distances)
+
+    def lookup(self, origin_id: int, destination_id: int) -> Optional[Tuple[float, float]]:
+        """(durée en s, distance en km) entre deux lieux, None si inconnue"""
+        duration = self.durations[origin_id, destination_id]
+        if np.isnan(duration):
+            return None
+        return float(duration), float(self.distances[origin_id, destination_id])
+
+
+if __name__ == "__main__":
+    from .route_scraper import RouteScraper
+
+    output = sys.argv[1] if len(sys.argv) > 1 else LOCATION_MATRIX_PATH
+    matrix = LocationMatrix.build(RouteScraper())
+    matrix.save(output)
+    missing = int(np.isnan(matrix.durations).sum())
+    print(f"[Success] Matrice {len(matrix.coords)}x{len(matrix.coords)} enregistrée ({missing} trajets manquants)")
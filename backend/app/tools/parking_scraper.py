@@ -4,6 +4,9 @@ import requests
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 from .fuel_scraper import calculate_distance
+from ..deadline import Deadline
+from .. import http_client
+from ..reverse_geocoder import lookup_district
 
 
 class ParkingScraper:
@@ -15,11 +18,21 @@ class ParkingScraper:
     def __init__(self):
         self.base_url = "https://data.rennesmetropole.fr/api/records/1.0/search/"
         self.dataset = "export-api-parking-citedia"
+        # Derniers enregistrements reçus (heure HH:MM, records) : repli si l'API est trop lente
+        self._last_records: Optional[Tuple[str, List[Dict[str, Any]]]] = None
 
-    def get_parking_status(self, user_location: Optional[Tuple[float, float]] = None) -> Dict[str, Any]:
+    def get_parking_status(
+        self,
+        user_location: Optional[Tuple[float, float]] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Any]:
         """
         Récupère les disponibilités des parkings de Rennes
         
+        Avec un deadline : si l'API ne répond pas à temps, les derniers
+        enregistrements reçus sont réutilisés et le repli est noté dans
+        deadline.reasons.
+        
         Returns:
             {
                 "success": bool,
@@ -30,6 +43,9 @@ class ParkingScraper:
                         "total": int,
                         "status": str,
                         "location": str,
+                        "area": str | None (quartier / commune),
+                        "lat": float | None,
+                        "lon": float | None,
                         "distance_km": float | None
                     }
                 ],
@@ -38,18 +54,13 @@ class ParkingScraper:
             }
         """
         try:
-            response = requests.get(
-                self.base_url,
-                params={
-                    "dataset": self.dataset,
-                    "rows": 100
-                },
-                timeout=10
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            records = data.get("records", [])
+            try:
+                updated, records = self._fetch_records(deadline)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+                if self._last_records is None or deadline is None:
+                    raise
+                updated, records = self._last_records
+                deadline.degrade(f"Parkings : disponibilités de {updated} (service trop lent)")
             parkings = []
 
             for rec in records:
@@ -108,6 +119,9 @@ class ParkingScraper:
                     "total": total,
                     "status": status,
                     "location": location,
+                    "area": lookup_district(geo[0], geo[1]) if len(geo) == 2 else None,
+                    "lat": geo[0] if len(geo) == 2 else None,
+                    "lon": geo[1] if len(geo) == 2 else None,
                     "occupancy_rate": round((total - available) / total * 100, 1) if total > 0 else 0,
                     "distance_km": distance_km,
                 }
@@ -127,7 +141,7 @@ class ParkingScraper:
             return {
                 "success": True,
                 "parkings": parkings,
-                "updated": self._get_current_time(),
+                "updated": updated,
                 "total_parkings": len(parkings)
             }
 
@@ -147,6 +161,20 @@ class ParkingScraper:
                 "error": f"Erreur récupération parkings: {str(e)}"
             }
 
+    def _fetch_records(self, deadline: Optional[Deadline] = None) -> Tuple[str, List[Dict[str, Any]]]:
+        """Enregistrements bruts de l'API (heure HH:MM, records), mémorisés pour le repli"""
+        response = http_client.get(
+            self.base_url,
+            params={
+                "dataset": self.dataset,
+                "rows": 100
+            },
+            timeout=deadline.timeout(10) if deadline else 10
+        )
+        response.raise_for_status()
+        self._last_records = (self._get_current_time(), response.json().get("records", []))
+        return self._last_records
+
     @staticmethod
     def _get_current_time() -> str:
         """Retourne l'heure actuelle formatée HH:MM"""
@@ -0,0 +1,103 @@
+"""
+Polylines encodées (format Google / OSRM) et simplification de géométrie
+Le décodage est vectorisé avec NumPy : tableau contigu (n, 2) de [lon, lat]
+au lieu d'une liste de listes construite caractère par caractère.
+"""
+
+import math
+from typing import List, Sequence
+
+import numpy as np
+import shapely
+from shapely.geometry import LineString
+
+METERS_PER_DEG_LAT = 110574.0
+
+
+def decode_polyline(polyline: str, precision: int = 6) -> np.ndarray:
+    """
+    Décode une polyline encodée (polyline6 par défaut pour OSRM)
+
+    Returns:
+        Tableau float64 (n, 2) de coordonnées [lon, lat]
+    """
+    if not polyline:
+        return np.empty((0, 2), dtype=np.float64)
+
+    chunks = np.frombuffer(polyline.encode("ascii"), dtype=np.uint8).astype(np.int64) - 63
+    # Un caractère sans le bit 0x20 termine la valeur en cours
+    ends = np.flatnonzero(chunks < 0x20)
+    if len(ends) < 2:
+        return np.empty((0, 2), dtype=np.float64)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+
+    # Position de chaque caractère dans sa valeur -> décalage de 5 bits par rang
+    chunks = chunks[: ends[-1] + 1]
+    value_of_char = np.repeat(np.arange(len(ends)), ends - starts + 1)
+    rank = np.arange(len(chunks)) - starts[value_of_char]
+    values = np.add.reduceat((chunks & 0x1F) << (5 * rank), starts)
+
+    # Décodage zigzag puis cumul des deltas (lat, lon alternés)
+    deltas = (values >> 1) ^ -(values & 1)
+    points = np.cumsum(deltas[: len(deltas) // 2 * 2].reshape(-1, 2), axis=0) / 10.0 ** precision
+    return np.ascontiguousarray(points[:, ::-1])
+
+
+def decode_polyline_py(polyline: str, precision: int = 6) -> List[List[float]]:
+    """Décodeur de référence en Python pur (liste de [lon, lat])"""
+    coords = []
+    index, lat, lng = 0, 0, 0
+    factor = 10.0 ** precision
+
+    while index < len(polyline):
+        deltas = []
+        for _ in range(2):
+            result, shift = 0, 0
+            while True:
+                byte = ord(polyline[index]) - 63
+                index += 1
+                result |= (byte & 0x1f) << shift
+                shift += 5
+                if not byte >= 0x20:
+                    break
+            deltas.append(~result >> 1 if result & 1 else result >> 1)
+        lat += deltas[0]
+        lng += deltas[1]
+        coords.append([lng / factor, lat / factor])
+
+    return coords
+
+
+def encode_polyline(coordinates: Sequence[Sequence[float]], precision: int = 6) -> str:
+    """Encode une liste de [lon, lat] (inverse de decode_polyline)"""
+    factor = 10 ** precision
+    out = []
+    prev_lat = prev_lng = 0
+    for lng, lat in coordinates:
+        lat_i, lng_i = int(round(lat * factor)), int(round(lng * factor))
+        for delta in (lat_i - prev_lat, lng_i - prev_lng):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                out.append(chr((0x20 | (value & 0x1f)) + 63))
+                value >>= 5
+            out.append(chr(value + 63))
+        prev_lat, prev_lng = lat_i, lng_i
+    return "".join(out)
+
+
+def simplify_coordinates(coordinates, tolerance_m: float) -> np.ndarray:
+    """
+    Simplification Douglas-Peucker d'une géométrie [lon, lat]
+
+    La tolérance est exprimée en mètres : les coordonnées sont projetées
+    localement (équirectangulaire) avant simplification.
+    """
+    coords = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+    if len(coords) < 3 or tolerance_m <= 0:
+        return coords
+
+    scale = np.array([METERS_PER_DEG_LAT * math.cos(math.radians(coords[:, 1].mean())), METERS_PER_DEG_LAT])
+    line = shapely.simplify(LineString(coords * scale), tolerance_m, preserve_topology=False)
+    return np.asarray(line.coords) / scale
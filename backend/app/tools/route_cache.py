@@ -0,0 +1,181 @@
+"""
+Cache des itinéraires OSRM
+LRU + TTL, clés calculées sur une grille de coordonnées, requêtes
+simultanées identiques regroupées (single-flight) et persistance optionnelle
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from ..config import (
+    ROUTE_CACHE_GRID_DEG,
+    ROUTE_CACHE_MAX_ENTRIES,
+    ROUTE_CACHE_TTL_S,
+)
+from ..singleflight import SingleFlight
+
+
+def _to_json(value: Any) -> Any:
+    """Géométries NumPy -> listes pour la sauvegarde JSON"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Type non sérialisable: {type(value).__name__}")
+
+
+def _from_json(value: Dict[str, Any]) -> Dict[str, Any]:
+    """Géométrie relue du disque -> tableau NumPy en lecture seule, comme un résultat frais"""
+    if "coordinates" in value:
+        coordinates = np.asarray(value["coordinates"], dtype=np.float64).reshape(-1, 2)
+        coordinates.flags.writeable = False
+        value["coordinates"] = coordinates
+    return value
+
+
+class RouteCache:
+    """
+    Cache LRU à expiration pour les réponses de RouteScraper.
+
+    Les extrémités sont arrondies sur une grille (~100 m par défaut) : deux
+    positions GPS voisines partagent l'itinéraire, et les lieux de
+    RENNES_LOCATIONS (coordonnées fixes) retombent toujours sur la même clé.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = ROUTE_CACHE_MAX_ENTRIES,
+        ttl_s: float = ROUTE_CACHE_TTL_S,
+        grid_deg: float = ROUTE_CACHE_GRID_DEG,
+        storage_path: Optional[str] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.grid_deg = grid_deg
+        self.storage_path = storage_path
+
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight = SingleFlight()
+        self._lock = threading.Lock()
+
+        # Métriques
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._miss_latency_s = 0.0
+        self._latency_saved_s = 0.0
+
+        if storage_path and os.path.exists(storage_path):
+            self.load(storage_path)
+
+    def key_for(self, origin: Tuple[float, float], destination: Tuple[float, float], *extra: Any) -> str:
+        """Clé de cache : extrémités arrondies sur la grille (+ discriminants éventuels)"""
+        def snap(point):
+            return f"{round(point[0] / self.grid_deg)},{round(point[1] / self.grid_deg)}"
+
+        return "|".join([snap(origin), snap(destination), *(str(e) for e in extra)])
+
+    def get_or_compute(self, key: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Retourne la valeur en cache ou la calcule une seule fois.
+
+        Les appels concurrents sur une clé absente attendent le calcul en
+        cours au lieu de le relancer. Seuls les résultats "success" sont
+        conservés : une erreur OSRM n'est pas mise en cache.
+        """
+        cached = self._lookup(key)
+        if cached is not None:
+            return dict(cached)
+
+        result, shared = self._inflight.do(key, lambda: self._compute(key, compute))
+        if shared:
+            with self._lock:
+                self._coalesced += 1
+        return dict(result)
+
+    def _lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Valeur en cache non expirée (compte un succès), None sinon"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            self._latency_saved_s += self._avg_miss_latency()
+            return entry[1]
+
+    def _compute(self, key: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        # Un calcul a pu aboutir entre la lecture du cache et ce calcul
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        start = time.perf_counter()
+        result = compute()
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._misses += 1
+            self._miss_latency_s += elapsed
+            if result.get("success"):
+                self._store(key, result)
+        return result
+
+    def _store(self, key: str, value: Dict[str, Any], expires: Optional[float] = None) -> None:
+        self._entries[key] = (expires or time.time() + self.ttl_s, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _avg_miss_latency(self) -> float:
+        return self._miss_latency_s / self._misses if self._misses else 0.0
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses + self._coalesced
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "coalesced": self._coalesced,
+                "hit_rate": round((self._hits + self._coalesced) / lookups, 3) if lookups else 0.0,
+                "avg_miss_latency_ms": round(self._avg_miss_latency() * 1000, 1),
+                "latency_saved_s": round(self._latency_saved_s, 3),
+            }
+
+    # ------------------------------------------------------------------
+    # PERSISTANCE
+    # ------------------------------------------------------------------
+
+    def save(self, path: Optional[str] = None) -> None:
+        path = path or self.storage_path
+        if not path:
+            return
+        now = time.time()
+        with self._lock:
+            entries = {key: [expires, value] for key, (expires, value) in self._entries.items() if expires > now}
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(entries, f, ensure_ascii=False, default=_to_json)
+            print(f"[Cache] Cache itinéraires sauvegardé ({len(entries)} routes)")
+        except Exception as e:
+            print("[Warning] Erreur sauvegarde cache itinéraires:", e)
+
+    def load(self, path: str) -> None:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            now = time.time()
+            with self._lock:
+                for key, (expires, value) in entries.items():
+                    if expires > now:
+                        self._store(key, _from_json(value), expires)
+            print(f"[Cache] Cache itinéraires chargé ({len(self._entries)} routes)")
+        except Exception as e:
+            print("[Warning] Erreur lecture cache itinéraires:", e)
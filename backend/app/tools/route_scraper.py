@@ -1,12 +1,26 @@
 """
 Scraper de routes utilisant OSRM (Open Source Routing Machine)
 Fournit le routage et l'estimation du temps de trajet
+Le graphe routier local (LocalRoadGraph) est utilisé en priorité s'il est disponible
 """
 
 import requests
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 from datetime import datetime
 
+from .local_router import LocalRoadGraph
+from .polyline import decode_polyline
+from .route_cache import RouteCache
+from ..config import ROUTE_CACHE_PATH, ROUTING_BACKEND
+from ..deadline import Deadline
+from .. import http_client
+
+# Niveaux de détail d'un itinéraire, du plus léger au plus complet :
+# - summary : distance et durée seules (pas de géométrie)
+# - simplified : géométrie simplifiée (overview=simplified d'OSRM)
+# - full : géométrie complète + annotations durée/distance par arête
+ROUTE_DETAIL_LEVELS = ("summary", "simplified", "full")
+
 
 class RouteScraper:
     """
@@ -14,57 +28,39 @@ class RouteScraper:
     Utilise l'API publique OSRM pour calculer les routes
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        cache: Optional[RouteCache] = None,
+        local_graph: Optional[LocalRoadGraph] = None,
+        backend: str = ROUTING_BACKEND,
+    ):
         # API OSRM publique (https://router.project-osm.org/)
         self.osrm_url = "https://router.project-osrm.org/route/v1/driving"
+        self.osrm_table_url = "https://router.project-osrm.org/table/v1/driving"
+        # Le serveur public limite le nombre de coordonnées par requête /table
+        self.table_chunk_size = 99
+        self.cache = cache if cache is not None else RouteCache(storage_path=ROUTE_CACHE_PATH)
 
-    @staticmethod
-    def _decode_polyline(polyline: str) -> List[Tuple[float, float]]:
-        """
-        Décode une polyline encodée (format polyline6)
-        Retourne une liste de coordonnées [lon, lat]
-        """
-        coords = []
-        index, lat, lng = 0, 0, 0
-        
-        while index < len(polyline):
-            result = 0
-            shift = 0
-            
-            while True:
-                byte = ord(polyline[index]) - 63
-                index += 1
-                result |= (byte & 0x1f) << shift
-                shift += 5
-                if not byte >= 0x20:
-                    break
-            
-            dlat = ~result >> 1 if result & 1 else result >> 1
-            lat += dlat
-            
-            result = 0
-            shift = 0
-            
-            while True:
-                byte = ord(polyline[index]) - 63
-                index += 1
-                result |= (byte & 0x1f) << shift
-                shift += 5
-                if not byte >= 0x20:
-                    break
-            
-            dlng = ~result >> 1 if result & 1 else result >> 1
-            lng += dlng
-            
-            coords.append([lng / 1e6, lat / 1e6])
-        
-        return coords
+        # auto : graphe local puis repli OSRM ; local : graphe seul ; osrm : réseau seul
+        self.backend = backend
+        if local_graph is None and backend != "osrm":
+            local_graph = LocalRoadGraph.load_default()
+        self.local_graph = local_graph
 
     def get_route(
-        self, origin: Tuple[float, float], destination: Tuple[float, float]
+        self,
+        origin: Tuple[float, float],
+        destination: Tuple[float, float],
+        detail: str = "full",
+        deadline: Optional[Deadline] = None,
     ) -> Dict[str, Any]:
         """
-        Récupère un itinéraire entre deux points (lat, lon)
+        Récupère un itinéraire entre deux points (lat, lon), via le cache
+        
+        Args:
+            detail: "summary", "simplified" ou "full" (voir ROUTE_DETAIL_LEVELS) ;
+                chaque niveau est mis en cache séparément
+            deadline: borne l'appel OSRM (échec "Timeout" si épuisé, non mis en cache)
         
         Returns:
             {
@@ -72,22 +68,63 @@ class RouteScraper:
                 "distance_km": float,
                 "duration_seconds": int,
                 "duration_minutes": float,
-                "coordinates": [[lon, lat], ...],
+                "coordinates": np.ndarray (n, 2) de [lon, lat] (vide en "summary"),
+                "annotations": {"duration": [...], "distance": [...]} (en "full"),
+                "detail": str,
                 "error": str (si erreur)
             }
         """
+        if detail not in ROUTE_DETAIL_LEVELS:
+            raise ValueError(f"Niveau de détail inconnu: {detail}")
+        key = self.cache.key_for(origin, destination, detail)
+        route = self.cache.get_or_compute(key, lambda: self._fetch_route(origin, destination, detail, deadline))
+        if route.get("success"):
+            # Extrémités exactes de l'appelant, pas celles de la route mise en cache
+            route["origin"] = origin
+            route["destination"] = destination
+        return route
+
+    def _fetch_route(
+        self,
+        origin: Tuple[float, float],
+        destination: Tuple[float, float],
+        detail: str = "full",
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Any]:
+        """Calcul d'itinéraire sans cache : graphe local, sinon OSRM"""
+        if self.local_graph is not None and self.backend != "osrm":
+            route = self.local_graph.route(origin, destination, detail=detail)
+            if route.get("success") or self.backend == "local":
+                return route
+        elif self.backend == "local":
+            return {"success": False, "error": "Graphe routier local non disponible"}
+        return self._fetch_osrm_route(origin, destination, detail, deadline)
+
+    def _fetch_osrm_route(
+        self,
+        origin: Tuple[float, float],
+        destination: Tuple[float, float],
+        detail: str = "full",
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Any]:
+        """Appel OSRM /route (sans cache), au niveau de détail demandé"""
         try:
             # OSRM utilise (lon, lat) contrairement à (lat, lon)
             coords = f"{origin[1]},{origin[0]};{destination[1]},{destination[0]}"
 
-            response = requests.get(
+            params = {"steps": "false"}
+            if detail == "summary":
+                params["overview"] = "false"  # Ni géométrie ni annotations
+            else:
+                params["overview"] = detail  # "simplified" ou "full"
+                params["geometries"] = "polyline6"
+            if detail == "full":
+                params["annotations"] = "duration,distance"
+
+            response = http_client.get(
                 f"{self.osrm_url}/{coords}",
-                params={
-                    "overview": "full",  # Retourner les coordonnées complètes
-                    "steps": "false",
-                    "annotations": "duration,distance"
-                },
-                timeout=10
+                params=params,
+                timeout=deadline.timeout(10) if deadline else 10
             )
             response.raise_for_status()
             data = response.json()
@@ -103,21 +140,127 @@ class RouteScraper:
             duration_s = int(route.get("duration", 0))
             
             # La géométrie est une polyline encodée (string), pas un dict
-            geometry = route.get("geometry", "")
+            geometry = route.get("geometry") or ""
             if isinstance(geometry, str):
-                coordinates = self._decode_polyline(geometry)
+                coordinates = decode_polyline(geometry)
+                # Partagé par les entrées du cache : lecture seule
+                coordinates.flags.writeable = False
             else:
                 # Repli si le format est différent
                 coordinates = geometry.get("coordinates", [])
 
-            return {
+            result = {
                 "success": True,
                 "distance_km": round(distance_m / 1000, 2),
                 "duration_seconds": duration_s,
                 "duration_minutes": round(duration_s / 60, 1),
                 "coordinates": coordinates,  # [[lon, lat], ...]
                 "origin": origin,
-                "destination": destination
+                "destination": destination,
+                "detail": detail,
+                "source": "osrm"
+            }
+            if detail == "full":
+                annotation = (route.get("legs") or [{}])[0].get("annotation", {})
+                result["annotations"] = {
+                    "duration": annotation.get("duration", []),
+                    "distance": annotation.get("distance", []),
+                }
+            return result
+
+        except requests.exceptions.Timeout:
+            return {
+                "success": False,
+                "error": "Timeout OSRM: serveur trop lent"
+            }
+        except requests.exceptions.ConnectionError:
+            return {
+                "success": False,
+                "error": "Erreur connexion OSRM"
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Erreur OSRM: {str(e)}"
+            }
+
+    def get_table(
+        self,
+        origin: Tuple[float, float],
+        destinations: Sequence[Tuple[float, float]],
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Any]:
+        """
+        Temps de trajet d'une origine vers plusieurs destinations (lat, lon), en un appel
+
+        Returns:
+            {
+                "success": bool,
+                "durations_seconds": [float | None, ...],  # même ordre que destinations
+                "distances_km": [float | None, ...],
+                "source": "local" | "osrm",
+                "error": str (si erreur)
+            }
+        """
+        if not destinations:
+            return {"success": True, "durations_seconds": [], "distances_km": [], "source": "local"}
+
+        if self.local_graph is not None and self.backend != "osrm":
+            table = self.local_graph.table(origin, destinations)
+            if table.get("success") or self.backend == "local":
+                return table
+        elif self.backend == "local":
+            return {"success": False, "error": "Graphe routier local non disponible"}
+
+        durations: List[Optional[float]] = []
+        distances: List[Optional[float]] = []
+        for start in range(0, len(destinations), self.table_chunk_size):
+            chunk = self._fetch_osrm_table(origin, destinations[start:start + self.table_chunk_size], deadline)
+            if not chunk.get("success"):
+                return chunk
+            durations.extend(chunk["durations_seconds"])
+            distances.extend(chunk["distances_km"])
+
+        return {
+            "success": True,
+            "durations_seconds": durations,
+            "distances_km": distances,
+            "source": "osrm",
+        }
+
+    def _fetch_osrm_table(
+        self,
+        origin: Tuple[float, float],
+        destinations: Sequence[Tuple[float, float]],
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Any]:
+        """Appel OSRM /table pour une origine et un lot de destinations"""
+        try:
+            coords = ";".join(f"{lon},{lat}" for lat, lon in [origin, *destinations])
+            response = http_client.get(
+                f"{self.osrm_table_url}/{coords}",
+                params={
+                    "sources": "0",
+                    "destinations": ";".join(str(i) for i in range(1, len(destinations) + 1)),
+                    "annotations": "duration,distance",
+                },
+                timeout=deadline.timeout(10) if deadline else 10
+            )
+            response.raise_for_status()
+            data = response.json()
+
+            if data.get("code") != "Ok":
+                return {
+                    "success": False,
+                    "error": f"OSRM erreur: {data.get('code', 'Unknown')}"
+                }
+
+            durations = (data.get("durations") or [[None] * len(destinations)])[0]
+            distances = (data.get("distances") or [[None] * len(destinations)])[0]
+            return {
+                "success": True,
+                "durations_seconds": durations,
+                "distances_km": [round(d / 1000, 2) if d is not None else None for d in distances],
             }
 
         except requests.exceptions.Timeout:
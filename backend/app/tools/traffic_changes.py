@@ -0,0 +1,55 @@
+"""
+Flux des changements de trafic
+Conserve les évolutions entre instantanés successifs du TrafficScraper,
+numérotées pour être poussées aux clients (Server-Sent Events)
+"""
+
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from .traffic_scraper import TrafficScraper
+
+
+class TrafficChangeFeed:
+    """
+    Journal borné des changements de trafic, identifiés par un numéro croissant.
+    """
+
+    def __init__(self, max_events: int = 1000):
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self._last_id = 0
+        self._previous: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def ingest_snapshot(self, snapshot: Dict[str, Any]) -> int:
+        """
+        Compare l'instantané au précédent et journalise les changements
+        (listener du TrafficScraper). Le premier instantané sert de référence.
+
+        Returns:
+            Nombre de changements ajoutés
+        """
+        with self._lock:
+            previous, self._previous = self._previous, snapshot
+            if previous is None:
+                return 0
+
+            changes = TrafficScraper.diff_snapshots(previous, snapshot)
+            timestamp = (snapshot.get("timestamp") or datetime.now()).isoformat(timespec="seconds")
+            for change in changes:
+                self._last_id += 1
+                self._events.append({"id": self._last_id, "timestamp": timestamp, **change})
+            return len(changes)
+
+    def events_since(self, last_id: int, limit: int = 500) -> List[Dict[str, Any]]:
+        """Changements de numéro strictement supérieur à `last_id`"""
+        with self._lock:
+            if last_id >= self._last_id:
+                return []
+            return [event for event in self._events if event["id"] > last_id][:limit]
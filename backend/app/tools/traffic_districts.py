@@ -0,0 +1,136 @@
+"""
+Agrégats de trafic par quartier / commune
+Calculés une fois à l'ingestion de chaque instantané du TrafficScraper,
+pour répondre aux questions de secteur sans recollecte ni appariement flou
+"""
+
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .traffic_scraper import TRAFFIC_STATUSES, STATUS_DISPLAY
+from ..rennes_districts import DistrictIndex
+
+
+class TrafficDistrictAggregator:
+    """
+    Table des comptes par statut et des tronçons les plus perturbés par secteur.
+    """
+
+    def __init__(self, district_index: Optional[DistrictIndex] = None, worst_per_district: int = 5):
+        self.district_index = district_index or DistrictIndex.default()
+        self.worst_per_district = worst_per_district
+        self._table: Dict[str, Dict[str, Any]] = {}
+        self._updated: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    def ingest_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        """Recalcule la table à partir d'un instantané (listener du TrafficScraper)"""
+        segments = [s for s in snapshot.get("segments", []) if s.get("lat") is not None and s.get("lon") is not None]
+        names = self.district_index.names
+        table: Dict[str, Dict[str, Any]] = {}
+
+        if segments:
+            lats = np.array([s["lat"] for s in segments], dtype=np.float64)
+            lons = np.array([s["lon"] for s in segments], dtype=np.float64)
+            levels = np.array([TRAFFIC_STATUSES.index(s["status"]) for s in segments], dtype=np.intp)
+            districts = self.district_index.locate_many(lats, lons)
+
+            inside = districts >= 0
+            n_levels = len(TRAFFIC_STATUSES)
+            counts = np.bincount(
+                districts[inside] * n_levels + levels[inside],
+                minlength=len(names) * n_levels,
+            ).reshape(len(names), n_levels)
+
+            # Tronçons triés du plus perturbé au moins perturbé
+            order = np.argsort(-levels, kind="stable")
+            worst: Dict[int, List[Dict[str, Any]]] = {}
+            for i in order:
+                d = districts[i]
+                if d < 0 or levels[i] == 0:
+                    continue
+                bucket = worst.setdefault(int(d), [])
+                if len(bucket) < self.worst_per_district:
+                    seg = segments[i]
+                    bucket.append({
+                        "street": seg["troncon"],
+                        "status": seg["status"],
+                        "lat": seg["lat"],
+                        "lon": seg["lon"],
+                    })
+
+            for d in np.flatnonzero(counts.sum(axis=1)):
+                table[names[d]] = {
+                    "counts": dict(zip(TRAFFIC_STATUSES, (int(c) for c in counts[d]))),
+                    "worst": worst.get(int(d), []),
+                }
+
+        with self._lock:
+            self._table = table
+            self._updated = snapshot.get("timestamp") or datetime.now()
+
+    def is_fresh(self, max_age_s: float) -> bool:
+        with self._lock:
+            return self._updated is not None and (datetime.now() - self._updated).total_seconds() <= max_age_s
+
+    def get_district_status(self, district: str) -> Dict[str, Any]:
+        """
+        État du trafic d'un secteur, au format de TrafficScraper.get_traffic_status
+
+        Returns:
+            {
+                "success": bool,
+                "district": str,
+                "roads": [{"street", "area", "lat", "lon", "status", "priority"}],
+                "counts": {"fluide": int, "denso": int, "congestion": int, "incident": int},
+                "summary": str,
+                "updated": str (HH:MM),
+                "total_monitored": int
+            }
+        """
+        with self._lock:
+            entry = self._table.get(district)
+            updated = self._updated
+
+        if updated is None:
+            return {"success": False, "error": "Aucune donnée de trafic collectée pour le moment"}
+
+        counts = entry["counts"] if entry else dict.fromkeys(TRAFFIC_STATUSES, 0)
+        roads = []
+        for seg in (entry["worst"] if entry else []):
+            label, priority = STATUS_DISPLAY[seg["status"]]
+            roads.append({
+                "street": seg["street"],
+                "raw_street": seg["street"],
+                "area": district,
+                "lat": seg["lat"],
+                "lon": seg["lon"],
+                "status": label,
+                "priority": priority,
+            })
+
+        return {
+            "success": True,
+            "district": district,
+            "roads": roads,
+            "counts": counts,
+            "summary": self._summary(district, counts),
+            "updated": updated.strftime("%H:%M"),
+            "total_monitored": sum(counts.values()),
+        }
+
+    @staticmethod
+    def _summary(district: str, counts: Dict[str, int]) -> str:
+        parts = []
+        if counts["incident"]:
+            parts.append(f"{counts['incident']} incident(s)")
+        if counts["congestion"]:
+            parts.append(f"{counts['congestion']} congestion(s)")
+        if counts["denso"]:
+            parts.append(f"{counts['denso']} zone(s) dense(s)")
+        if not parts:
+            return f"Trafic fluide à {district}"
+        return f"Trafic à {district}: " + ", ".join(parts)
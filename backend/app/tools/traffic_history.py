@@ -0,0 +1,252 @@
+"""
+Historique du trafic de Rennes Métropole
+Agrège les instantanés du TrafficScraper en profils horaires par tronçon
+(probabilité de chaque statut par tranche de 15 minutes sur la semaine)
+"""
+
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .traffic_scraper import TRAFFIC_STATUSES
+from ..config import (
+    TRAFFIC_HISTORY_CAPACITY,
+    TRAFFIC_SAMPLING_INTERVAL_S,
+)
+
+BUCKET_MINUTES = 15
+BUCKETS_PER_DAY = 24 * 60 // BUCKET_MINUTES
+BUCKETS_PER_WEEK = 7 * BUCKETS_PER_DAY
+
+
+def bucket_of(moment: datetime) -> int:
+    """Index de la tranche de 15 min (lundi 00:00 = 0) contenant `moment`"""
+    minutes = moment.hour * 60 + moment.minute
+    return moment.weekday() * BUCKETS_PER_DAY + minutes // BUCKET_MINUTES
+
+
+class TrafficHistory:
+    """
+    Profils de trafic par tronçon et par tranche horaire hebdomadaire.
+
+    Les compteurs sont stockés dans un tableau de taille fixe
+    (capacité, 672 tranches, 4 statuts) en uint16 : un tronçon occupe une
+    ligne, chaque instantané incrémente la case du statut observé.
+    """
+
+    def __init__(
+        self,
+        capacity: int = TRAFFIC_HISTORY_CAPACITY,
+        storage_path: Optional[str] = None,
+        min_record_interval_s: float = 300,
+    ):
+        self.capacity = capacity
+        self.storage_path = storage_path
+        # Un instantané par tranche de 5 min suffit : évite de sur-pondérer
+        # les heures où les utilisateurs interrogent souvent le trafic
+        self.min_record_interval_s = min_record_interval_s
+
+        self._counts = np.zeros((capacity, BUCKETS_PER_WEEK, len(TRAFFIC_STATUSES)), dtype=np.uint16)
+        self._lat = np.full(capacity, np.nan, dtype=np.float64)
+        self._lon = np.full(capacity, np.nan, dtype=np.float64)
+        self._labels: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._last_recorded: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+        self._stop_event = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+        if storage_path and os.path.exists(storage_path):
+            self.load(storage_path)
+
+    # ------------------------------------------------------------------
+    # INGESTION
+    # ------------------------------------------------------------------
+
+    @property
+    def size(self) -> int:
+        """Nombre de tronçons suivis"""
+        return len(self._labels)
+
+    def record_snapshot(self, snapshot: Dict[str, Any]) -> int:
+        """
+        Ajoute un instantané du TrafficScraper aux profils.
+
+        Returns:
+            Nombre de tronçons comptabilisés (0 si l'instantané est ignoré)
+        """
+        moment = snapshot.get("timestamp") or datetime.now()
+        with self._lock:
+            if (
+                self._last_recorded is not None
+                and 0 <= (moment - self._last_recorded).total_seconds() < self.min_record_interval_s
+            ):
+                return 0
+
+            bucket = bucket_of(moment)
+            rows = []
+            levels = []
+            for segment in snapshot.get("segments", []):
+                row = self._row_for(segment)
+                if row is None:
+                    continue
+                rows.append(row)
+                levels.append(TRAFFIC_STATUSES.index(segment["status"]))
+
+            if not rows:
+                return 0
+
+            rows_arr = np.asarray(rows, dtype=np.intp)
+            levels_arr = np.asarray(levels, dtype=np.intp)
+            cells = self._counts[rows_arr, bucket, levels_arr]
+            # Saturation plutôt que débordement du uint16
+            self._counts[rows_arr, bucket, levels_arr] = np.where(cells < np.iinfo(np.uint16).max, cells + 1, cells)
+            self._last_recorded = moment
+            return len(rows)
+
+    def _row_for(self, segment: Dict[str, Any]) -> Optional[int]:
+        """Ligne du tronçon (créée au besoin), None si la capacité est atteinte"""
+        seg_id = segment["id"]
+        row = self._index.get(seg_id)
+        if row is not None:
+            return row
+        if len(self._labels) >= self.capacity:
+            return None
+
+        row = len(self._labels)
+        self._index[seg_id] = row
+        self._labels.append(segment.get("troncon") or seg_id)
+        if segment.get("lat") is not None and segment.get("lon") is not None:
+            self._lat[row] = segment["lat"]
+            self._lon[row] = segment["lon"]
+        return row
+
+    # ------------------------------------------------------------------
+    # LECTURE DES PROFILS
+    # ------------------------------------------------------------------
+
+    def segment_positions(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Latitudes et longitudes des tronçons suivis (NaN si inconnues)"""
+        n = self.size
+        return self._lat[:n], self._lon[:n]
+
+    def segment_label(self, row: int) -> str:
+        return self._labels[row]
+
+    def status_probabilities(
+        self, buckets: Sequence[int], rows: Optional[Sequence[int]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Probabilité de chaque statut par tronçon et par tranche.
+
+        Args:
+            buckets: Tranches horaires à évaluer
+            rows: Tronçons à évaluer (tous par défaut)
+
+        Returns:
+            (probas (n_tronçons, n_tranches, 4), échantillons (n_tronçons, n_tranches))
+            Les tranches sans observation ont des probabilités nulles.
+        """
+        buckets_arr = np.asarray(buckets, dtype=np.intp)
+        with self._lock:
+            rows_arr = np.arange(self.size) if rows is None else np.asarray(rows, dtype=np.intp)
+            counts = self._counts[rows_arr[:, None], buckets_arr[None, :], :].astype(np.float32)
+        samples = counts.sum(axis=2)
+        probas = np.divide(counts, samples[..., None], out=np.zeros_like(counts), where=samples[..., None] > 0)
+        return probas, samples
+
+    def expected_multipliers(
+        self,
+        level_multipliers: Sequence[float],
+        buckets: Sequence[int],
+        rows: Optional[Sequence[int]] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Multiplicateur de temps espéré par tronçon et par tranche.
+
+        Args:
+            level_multipliers: Multiplicateur associé à chaque statut de TRAFFIC_STATUSES
+            buckets: Tranches horaires à évaluer
+            rows: Tronçons à évaluer (tous par défaut)
+
+        Returns:
+            (multiplicateurs (n_tronçons, n_tranches), échantillons (n_tronçons, n_tranches))
+            Les tranches sans observation valent 1.0 (trafic supposé fluide).
+        """
+        probas, samples = self.status_probabilities(buckets, rows)
+        multipliers = probas @ np.asarray(level_multipliers, dtype=np.float32)
+        multipliers[samples == 0] = 1.0
+        return multipliers, samples
+
+    # ------------------------------------------------------------------
+    # PERSISTANCE
+    # ------------------------------------------------------------------
+
+    def save(self, path: Optional[str] = None) -> None:
+        path = path or self.storage_path
+        if not path:
+            return
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._lock:
+            n = self.size
+            np.savez_compressed(
+                path,
+                counts=self._counts[:n],
+                lat=self._lat[:n],
+                lon=self._lon[:n],
+                ids=np.asarray(list(self._index.keys()), dtype=object),
+                labels=np.asarray(self._labels, dtype=object),
+            )
+
+    def load(self, path: str) -> None:
+        try:
+            with np.load(path, allow_pickle=True) as data:
+                ids = list(data["ids"])
+                n = min(len(ids), self.capacity)
+                with self._lock:
+                    self._counts[:n] = data["counts"][:n]
+                    self._lat[:n] = data["lat"][:n]
+                    self._lon[:n] = data["lon"][:n]
+                    self._labels = [str(label) for label in data["labels"][:n]]
+                    self._index = {str(seg_id): row for row, seg_id in enumerate(ids[:n])}
+            print(f"[Cache] Historique trafic chargé ({n} tronçons)")
+        except Exception as e:
+            print("[Warning] Erreur lecture historique trafic:", e)
+
+    # ------------------------------------------------------------------
+    # ÉCHANTILLONNAGE PÉRIODIQUE
+    # ------------------------------------------------------------------
+
+    def start_sampling(self, traffic_scraper, interval_s: float = TRAFFIC_SAMPLING_INTERVAL_S) -> None:
+        """
+        Lance un thread qui déclenche un instantané toutes les `interval_s` secondes.
+
+        L'historique doit être abonné au scraper (add_snapshot_listener) :
+        le thread se contente de provoquer la collecte puis de sauvegarder.
+        """
+        if self._sampler and self._sampler.is_alive():
+            return
+
+        self._stop_event.clear()
+
+        def _loop():
+            while not self._stop_event.is_set():
+                try:
+                    traffic_scraper.fetch_snapshot()
+                    self.save()
+                except Exception as e:
+                    print(f"[Warning] Échantillonnage trafic impossible: {e}")
+                self._stop_event.wait(interval_s)
+
+        self._sampler = threading.Thread(target=_loop, name="traffic-sampler", daemon=True)
+        self._sampler.start()
+
+    def stop_sampling(self) -> None:
+        self._stop_event.set()
+        if self._sampler:
+            self._sampler.join(timeout=1)
+            self._sampler = None
@@ -1,11 +1,26 @@
 # backend/app/tools/traffic_scraper.py
 
 import requests
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 import unicodedata
 from difflib import SequenceMatcher
 from datetime import datetime
 
+from ..config import TRAFFIC_GEOCODE_RESERVE_S
+from ..deadline import Deadline, DeadlineExceeded
+from .. import http_client
+from ..reverse_geocoder import reverse_lookup
+
+# Statuts normalisés, du plus fluide au plus perturbé
+TRAFFIC_STATUSES = ("fluide", "denso", "congestion", "incident")
+
+# Libellé et priorité affichés pour chaque statut perturbé
+STATUS_DISPLAY = {
+    "denso": ("📍 Dense", "moyen"),
+    "congestion": ("⚠️ Congestion", "haute"),
+    "incident": ("🚨 Incident", "critique"),
+}
+
 
 class TrafficScraper:
     """
@@ -17,11 +32,19 @@ class TrafficScraper:
         self.base_url = "https://rennes-metropole.opendatasoft.com/api/records/1.0/search/"
         self.dataset = "etat-du-trafic-en-temps-reel"
         self._geocode_cache: Dict[str, Dict[str, str]] = {}
+        self._snapshot_listeners: List[Callable[[Dict[str, Any]], None]] = []
+        # Dernier instantané reçu : réponse de repli si l'API est trop lente
+        self._last_snapshot: Optional[Dict[str, Any]] = None
 
-    def get_traffic_status(self, street_query: str | None = None) -> Dict[str, Any]:
+    def get_traffic_status(self, street_query: str | None = None, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         """
         Récupère et formate les données de trafic pour Rennes Métropole
         
+        Avec un deadline : si l'API ne répond pas à temps, le dernier
+        instantané est réutilisé, et le géocodage Nominatim s'arrête avant
+        l'échéance (tronçons laissés sans adresse) ; chaque repli est noté
+        dans deadline.reasons.
+        
         Returns:
             {
                 "success": bool,
@@ -37,83 +60,50 @@ class TrafficScraper:
                 "total_monitored": int
             }
         """
+        deadline = deadline or Deadline()
         try:
-            # 1) Récupérer les données
-            response = requests.get(
-                self.base_url,
-                params={
-                    "dataset": self.dataset,
-                    "rows": 5000
-                },
-                timeout=10
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            # 2) Parser et classifier par statut
-            records = data.get("records", [])
-            
-            traffic_by_status = {
-                "fluide": [],
-                "denso": [],
-                "congestion": [],
-                "incident": []
+            # 1) Récupérer et classifier l'instantané courant (ou le dernier connu)
+            try:
+                snapshot = self.fetch_snapshot(deadline)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+                snapshot = self._last_snapshot
+                if snapshot is None:
+                    raise
+                deadline.degrade(f"Trafic : dernier relevé de {snapshot['timestamp']:%H:%M} (service trop lent)")
+
+            traffic_by_status: Dict[str, List[Dict[str, Any]]] = {
+                status: [] for status in TRAFFIC_STATUSES
             }
+            for segment in snapshot["segments"]:
+                traffic_by_status[segment["status"]].append(segment)
 
-            for rec in records:
-                fields = rec.get("fields", {})
-
-                # Les libellés de tronçon peuvent se trouver dans plusieurs champs selon l'API
-                troncon = (
-                    fields.get("predefinedlocationreference")
-                    or fields.get("predefinedlocationrerefence")  # faute courante dans l'API
-                    or fields.get("linearreferencename")
-                    or fields.get("roadname")
-                    or fields.get("segmentname")
-                    or "Voie non identifiée"
-                )
-
-                # Coordonnées si disponibles
-                location = fields.get("geo_point_2d") or fields.get("geo_shape", {}).get("coordinates")
-                lat = None
-                lon = None
-                if isinstance(location, list) and len(location) == 2:
-                    lat, lon = location[0], location[1]
-
-                status_raw = str(fields.get("trafficstatus", "")).lower()
-
-                # Normaliser le statut
-                if "fluide" in status_raw or "free" in status_raw:
-                    status = "fluide"
-                elif "dense" in status_raw or "dens" in status_raw:
-                    status = "denso"
-                elif "congestion" in status_raw or "congested" in status_raw:
-                    status = "congestion"
-                else:
-                    status = "incident"
-
-                traffic_by_status[status].append({
-                    "troncon": troncon,
-                    "lat": lat,
-                    "lon": lon
-                })
-
-            # 3) Structurer pour le LLM - synthèse par statut
+            # 2) Structurer pour le LLM - synthèse par statut
             road_summary = []
 
-            # Budget de géocodage pour éviter la lenteur (max 30 requêtes par appel)
+            # Budget de géocodage Nominatim pour éviter la lenteur (max 30 requêtes par appel)
             geocode_budget = 30
+            unlabelled = 0
 
-            # Fonction auxiliaire pour le géocodage + enrichissement
-            def _enrich(entry: Dict[str, Any], status_label: str, priority: str, can_geocode: bool) -> Dict[str, Any]:
+            # Fonction auxiliaire pour le géocodage + enrichissement :
+            # quartier et adresse en local, Nominatim seulement si aucune adresse locale
+            def _enrich(entry: Dict[str, Any], status_label: str, priority: str) -> Dict[str, Any]:
+                nonlocal geocode_budget, unlabelled
                 lat = entry.get("lat")
                 lon = entry.get("lon")
-                geocoded = {}
-                if can_geocode and lat is not None and lon is not None:
-                    geocoded = self._reverse_geocode(lat, lon) or {}
-
-                display = geocoded.get("label") or entry.get("troncon")
-                area = geocoded.get("area")
+                local, geocoded = {}, {}
+                if lat is not None and lon is not None:
+                    local = reverse_lookup(lat, lon)
+                    if not local.get("address") and geocode_budget > 0:
+                        try:
+                            timeout = deadline.timeout(5, reserve=TRAFFIC_GEOCODE_RESERVE_S)
+                        except DeadlineExceeded:
+                            unlabelled += 1
+                        else:
+                            geocode_budget -= 1
+                            geocoded = self._reverse_geocode(lat, lon, timeout) or {}
+
+                display = local.get("address") or geocoded.get("label") or entry.get("troncon")
+                area = geocoded.get("area") or local.get("district")
                 return {
                     "street": display,
                     "raw_street": entry.get("troncon"),
@@ -126,28 +116,22 @@ class TrafficScraper:
 
             # Routes en congestion/incident (priorité haute)
             for entry in traffic_by_status["congestion"]:
-                can_geo = geocode_budget > 0
-                road_summary.append(_enrich(entry, "⚠️ Congestion", "haute", can_geo))
-                if can_geo:
-                    geocode_budget -= 1
+                road_summary.append(_enrich(entry, *STATUS_DISPLAY["congestion"]))
 
             for entry in traffic_by_status["incident"]:
-                can_geo = geocode_budget > 0
-                road_summary.append(_enrich(entry, "🚨 Incident", "critique", can_geo))
-                if can_geo:
-                    geocode_budget -= 1
+                road_summary.append(_enrich(entry, *STATUS_DISPLAY["incident"]))
 
             # Routes denses (priorité moyenne) - limiter à 5
             for entry in traffic_by_status["denso"][:5]:
-                can_geo = geocode_budget > 0
-                road_summary.append(_enrich(entry, "📍 Dense", "moyen", can_geo))
-                if can_geo:
-                    geocode_budget -= 1
+                road_summary.append(_enrich(entry, *STATUS_DISPLAY["denso"]))
 
             # Si l'utilisateur a donné un nom de rue, tenter un appariement flou
             if street_query:
                 road_summary = self._filter_best_match(road_summary, street_query)
 
+            if unlabelled:
+                deadline.degrade(f"Trafic : {unlabelled} tronçon(s) sans adresse (délai de réponse)")
+
             # Générer résumé
             summary = self._generate_summary(traffic_by_status)
 
@@ -156,7 +140,7 @@ class TrafficScraper:
                 "roads": road_summary,
                 "summary": summary,
                 "updated": self._get_current_time(),
-                "total_monitored": len(records)
+                "total_monitored": snapshot["total_monitored"]
             }
 
         except requests.exceptions.Timeout:
@@ -175,6 +159,151 @@ class TrafficScraper:
                 "error": f"Erreur lors de la récupération du trafic: {str(e)}"
             }
 
+    def add_snapshot_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Enregistre une fonction appelée à chaque nouvel instantané de trafic"""
+        self._snapshot_listeners.append(listener)
+
+    def fetch_snapshot(self, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """
+        Récupère l'état brut du trafic et le classe par tronçon.
+
+        Chaque instantané est diffusé aux listeners enregistrés (historique,
+        agrégats, ...) avant d'être renvoyé. Les exceptions réseau sont
+        propagées à l'appelant (DeadlineExceeded, un Timeout, si le deadline
+        est épuisé avant l'appel).
+
+        Returns:
+            {
+                "timestamp": datetime,
+                "segments": [
+                    {"id": str, "troncon": str, "lat": float | None,
+                     "lon": float | None, "status": str}
+                ],
+                "total_monitored": int
+            }
+        """
+        response = http_client.get(
+            self.base_url,
+            params={
+                "dataset": self.dataset,
+                "rows": 5000
+            },
+            timeout=deadline.timeout(10) if deadline else 10
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        records = data.get("records", [])
+        segments = []
+
+        for rec in records:
+            fields = rec.get("fields", {})
+
+            # Les libellés de tronçon peuvent se trouver dans plusieurs champs selon l'API
+            troncon = (
+                fields.get("predefinedlocationreference")
+                or fields.get("predefinedlocationrerefence")  # faute courante dans l'API
+                or fields.get("linearreferencename")
+                or fields.get("roadname")
+                or fields.get("segmentname")
+                or "Voie non identifiée"
+            )
+
+            # Coordonnées si disponibles
+            location = fields.get("geo_point_2d") or fields.get("geo_shape", {}).get("coordinates")
+            lat = None
+            lon = None
+            if isinstance(location, list) and len(location) == 2:
+                lat, lon = location[0], location[1]
+
+            segments.append({
+                "id": self._segment_id(troncon, lat, lon),
+                "troncon": troncon,
+                "lat": lat,
+                "lon": lon,
+                "status": self._classify_status(fields.get("trafficstatus", ""))
+            })
+
+        snapshot = {
+            "timestamp": datetime.now(),
+            "segments": segments,
+            "total_monitored": len(records)
+        }
+
+        self._last_snapshot = snapshot
+        for listener in self._snapshot_listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                print(f"[Warning] Listener trafic en erreur: {e}")
+
+        return snapshot
+
+    @staticmethod
+    def diff_snapshots(previous: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Compare deux instantanés tronçon par tronçon.
+
+        Returns:
+            Liste de changements :
+            - "new_incident": tronçon passé (ou apparu) en incident
+            - "status_change": transition entre deux statuts
+            - "segment_cleared": tronçon perturbé qui n'est plus remonté par l'API
+        """
+        before = {seg["id"]: seg for seg in previous.get("segments", [])}
+        changes = []
+
+        for seg in current.get("segments", []):
+            old = before.pop(seg["id"], None)
+            old_status = old["status"] if old else None
+            if old_status == seg["status"]:
+                continue
+            if old is None and seg["status"] != "incident":
+                continue  # Nouveau tronçon sans incident : pas une évolution
+
+            changes.append({
+                "type": "new_incident" if seg["status"] == "incident" else "status_change",
+                "segment_id": seg["id"],
+                "street": seg["troncon"],
+                "from": old_status,
+                "to": seg["status"],
+                "lat": seg["lat"],
+                "lon": seg["lon"],
+            })
+
+        for seg in before.values():
+            if seg["status"] != "fluide":
+                changes.append({
+                    "type": "segment_cleared",
+                    "segment_id": seg["id"],
+                    "street": seg["troncon"],
+                    "from": seg["status"],
+                    "to": None,
+                    "lat": seg["lat"],
+                    "lon": seg["lon"],
+                })
+
+        return changes
+
+    @staticmethod
+    def _classify_status(status_raw: Any) -> str:
+        """Normalise le statut brut de l'API en fluide/denso/congestion/incident"""
+        status_raw = str(status_raw).lower()
+        if "fluide" in status_raw or "free" in status_raw:
+            return "fluide"
+        if "dense" in status_raw or "dens" in status_raw:
+            return "denso"
+        if "congestion" in status_raw or "congested" in status_raw:
+            return "congestion"
+        return "incident"
+
+    @staticmethod
+    def _segment_id(troncon: str, lat: Optional[float], lon: Optional[float]) -> str:
+        """Identifiant stable d'un tronçon d'une collecte à l'autre"""
+        if lat is None or lon is None:
+            return troncon
+        return f"{troncon}@{lat:.5f},{lon:.5f}"
+
     def _generate_summary(self, traffic_by_status: Dict[str, list]) -> str:
         """Génère un résumé textuel du trafic"""
         incidents = len(traffic_by_status["incident"])
@@ -199,15 +328,17 @@ class TrafficScraper:
         """Retourne l'heure actuelle formatée HH:MM"""
         return datetime.now().strftime("%H:%M")
 
-    def _reverse_geocode(self, lat: float, lon: float) -> Dict[str, str]:
+    def _reverse_geocode(self, lat: float, lon: float, timeout: float = 5) -> Dict[str, str]:
         """Géocodage inverse via Nominatim (OSM) avec cache simple, Rennes uniquement"""
         key = f"{lat:.5f},{lon:.5f}"
         if key in self._geocode_cache:
             return self._geocode_cache[key]
 
         try:
-            resp = requests.get(
+            # Nominatim limite le débit : pas de requête doublée
+            resp = http_client.get(
                 "https://nominatim.openstreetmap.org/reverse",
+                hedge=False,
                 params={
                     "lat": lat,
                     "lon": lon,
@@ -216,7 +347,7 @@ class TrafficScraper:
                     "addressdetails": 1
                 },
                 headers={"User-Agent": "FuelBot-Rennes/1.0"},
-                timeout=5
+                timeout=timeout
             )
             resp.raise_for_status()
             data = resp.json()
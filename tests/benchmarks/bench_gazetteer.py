@@ -0,0 +1,81 @@
+"""
+Benchmark du gazetteer d'adresses : chargement mmap et résolution à grande échelle
+Gazetteer synthétique de la taille de l'export BAN d'Ille-et-Vilaine.
+
+Usage:
+    python -m tests.benchmarks.bench_gazetteer [nombre de voies]
+"""
+import sys
+import os
+import resource
+import tempfile
+import time
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from backend.app.gazetteer import Gazetteer
+
+STREET_TYPES = ["rue", "avenue", "boulevard", "allee", "impasse", "place", "chemin", "square"]
+NAMES = ["de la paix", "victor hugo", "jean jaures", "des lilas", "du moulin", "de brest",
+         "pasteur", "de la gare", "des ecoles", "saint martin", "du stade", "de nantes"]
+COMMUNES = ["rennes", "bruz", "cesson sevigne", "betton", "vitre", "fougeres", "saint malo",
+            "dinard", "redon", "pace", "chantepie", "acigne", "mordelles", "vern sur seiche"]
+
+
+def synthetic_streets(count: int, seed: int = 0) -> dict:
+    """~count voies, ~8 adresses chacune, autour de Rennes"""
+    rng = np.random.default_rng(seed)
+    streets = {}
+    for i in range(count):
+        street = f"{STREET_TYPES[i % len(STREET_TYPES)]} {NAMES[(i // 8) % len(NAMES)]} {i // 96}"
+        commune = COMMUNES[i % len(COMMUNES)]
+        lat, lon = 48.11 + rng.normal(0, 0.2), -1.68 + rng.normal(0, 0.3)
+        addresses = [(n, lat + n * 1e-5, lon) for n in range(1, 17, 2)]
+        streets[(f"{street} {commune}", f"{street.title()}, {commune.title()}")] = addresses
+    return streets
+
+
+def _rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    streets = synthetic_streets(count)
+    queries = [key for key, _ in list(streets)[::max(1, count // 200)]]
+    numbered = [f"7 {q.rsplit(' ', 1)[0]}" for q in queries]
+    typos = [q[:5] + q[6:] for q in queries]
+
+    with tempfile.TemporaryDirectory() as path:
+        start = time.perf_counter()
+        Gazetteer.from_streets(streets).save(path)
+        build_s = time.perf_counter() - start
+        size_mb = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)) / 1e6
+        del streets
+
+        rss_before = _rss_mb()
+        start = time.perf_counter()
+        gazetteer = Gazetteer.load(path)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{gazetteer.street_count} voies, {gazetteer.address_count} adresses, "
+              f"{size_mb:.1f} Mo sur disque (construction {build_s:.1f} s)")
+        print(f"chargement mmap : {load_ms:.2f} ms\n")
+
+        for name, func, batch in (
+            ("voie exacte", lambda q: gazetteer.find(q), queries),
+            ("numéro + voie", lambda q: gazetteer.find(q), numbered),
+            ("voie avec faute", lambda q: gazetteer.find(q, fuzzy_cutoff=0.75), typos),
+            ("préfixe (5)", lambda q: gazetteer.suggest(q[:8]), queries),
+        ):
+            best = min(timeit.repeat(lambda: [func(q) for q in batch], number=5, repeat=3))
+            found = sum(func(q) not in (None, []) for q in batch)
+            print(f"{name:<18} {best / 5 / len(batch) * 1e6:>8.1f} µs/requête  ({found}/{len(batch)} trouvées)")
+        print(f"\nRSS max après requêtes : +{_rss_mb() - rss_before:.1f} Mo")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark des requêtes doublées (hedging) contre un serveur local lent par moments
+- 3 % des réponses tardent 400 ms, les autres ~2 ms
+- p50 / p99 / max de la latence servie, sans puis avec doublons (budget 5 %)
+- connexions établies (keep-alive : une par requête simultanée, pas par appel)
+
+Usage:
+    python -m tests.benchmarks.bench_http_hedging
+"""
+import sys
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from backend.app.http_client import HTTPClient
+
+SLOW_RATE = 0.03
+SLOW_DELAY_S = 0.4
+REQUESTS = 600
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        time.sleep(SLOW_DELAY_S if self.server.rng.random() < SLOW_RATE else 0.002)
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _run(client, url):
+    latencies = []
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        client.get(url, timeout=5)
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies[50:]) * 1000  # Hors mise en route (p95 encore inconnu)
+
+
+def main():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.rng = random.Random(0)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{httpd.server_address[1]}/"
+
+    print(f"{'':>12} {'p50 (ms)':>9} {'p99 (ms)':>9} {'max (ms)':>9} {'doublons':>9} {'connexions':>11}")
+    for label, enabled in (("sans", False), ("avec", True)):
+        httpd.rng.seed(0)
+        client = HTTPClient(hedging=enabled, min_delay_s=0.01)
+        latencies = _run(client, url)
+        (host,) = client.metrics()["hosts"].values()
+        print(f"{label + ' hedging':>12} {np.percentile(latencies, 50):>9.1f} "
+              f"{np.percentile(latencies, 99):>9.1f} {latencies.max():>9.1f} {host['hedged'] / REQUESTS:>9.1%} "
+              f"{host['connections']:>11}")
+    httpd.shutdown()
+
+
+if __name__ == "__main__":
+    main()
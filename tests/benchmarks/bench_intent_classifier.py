@@ -0,0 +1,49 @@
+"""
+Benchmark du classifieur d'intentions : entraînement, précision et latence
+- validation croisée par modèle de message (classifieur vs règles)
+- µs par message selon la taille du lot, comparés à ToolDetector.detect
+
+Usage:
+    python -m tests.benchmarks.bench_intent_classifier
+"""
+import sys
+import os
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from backend.app.intent_classifier import cross_validate, train_default
+from backend.app.intent_corpus import LABELED_MESSAGES, MESSAGE_GROUPS
+from backend.app.tool_detector import ToolDetector
+
+
+def _us_per_message(func, messages, total=2048) -> float:
+    number = max(1, total // len(messages))
+    best = min(timeit.repeat(lambda: func(messages), number=number, repeat=5))
+    return best / number / len(messages) * 1e6
+
+
+def main():
+    messages, tools = zip(*LABELED_MESSAGES)
+
+    start = time.perf_counter()
+    model = train_default()
+    print(f"Entraînement : {time.perf_counter() - start:.2f} s ({len(messages)} messages, {len(model.labels)} classes)")
+
+    report = cross_validate(messages, tools, MESSAGE_GROUPS)
+    print(f"Validation croisée ({report['folds']} blocs) : classifieur {report['classifier_accuracy']:.1%}, "
+          f"règles {report['rules_accuracy']:.1%}\n")
+
+    detector = ToolDetector()
+    pool = list(messages) * (1024 // len(messages) + 1)
+    print(f"{'lot':>6} {'classifieur (µs/msg)':>22} {'règles (µs/msg)':>16}")
+    for size in (1, 8, 64, 256, 1024):
+        batch = pool[:size]
+        classifier = _us_per_message(model.predict, batch)
+        rules = _us_per_message(lambda ms: [detector.detect(m) for m in ms], batch)
+        print(f"{size:>6} {classifier:>22.1f} {rules:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
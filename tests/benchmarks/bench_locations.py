@@ -0,0 +1,82 @@
+"""
+Benchmark de la résolution de lieux : index précalculé vs implémentation d'origine,
+et autocomplétion par préfixe (une requête par frappe au clavier)
+
+Usage:
+    python -m tests.benchmarks.bench_locations
+"""
+import sys
+import os
+import timeit
+from difflib import get_close_matches
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from backend.app.rennes_locations import (
+    RENNES_LOCATIONS, _remove_accents, find_location_fuzzy, get_suggestions, suggest_locations,
+)
+
+QUERIES = [
+    "gare", "République", "universite rennes 2", "garr", "villejan", "place des lice",
+    "brequigny", "saint helier", "cesson sevign", "inconnu total", "rennes 2", "chu pontchaillou",
+]
+
+
+def legacy_find_location_fuzzy(location_name: str, threshold: float = 0.75) -> tuple:
+    """Implémentation d'origine (parcours linéaire à chaque appel)"""
+    clean_name = location_name.lower().strip()
+    if clean_name in RENNES_LOCATIONS:
+        return RENNES_LOCATIONS[clean_name]
+    clean_no_accents = _remove_accents(clean_name)
+    for key, coords in RENNES_LOCATIONS.items():
+        if _remove_accents(key) == clean_no_accents:
+            return coords
+    closest_matches = get_close_matches(clean_name, list(RENNES_LOCATIONS.keys()), n=1, cutoff=threshold)
+    return RENNES_LOCATIONS[closest_matches[0]] if closest_matches else None
+
+
+def legacy_get_suggestions(partial_name: str, limit: int = 5) -> list:
+    partial_lower = partial_name.lower().strip()
+    substring_matches = [name for name in RENNES_LOCATIONS.keys() if partial_lower in name]
+    if len(substring_matches) >= limit:
+        return sorted(substring_matches)[:limit]
+    fuzzy_matches = get_close_matches(partial_lower, list(RENNES_LOCATIONS.keys()), n=limit, cutoff=0.6)
+    combined = list(dict.fromkeys(substring_matches + fuzzy_matches))
+    if not combined:
+        return [
+            'rennes', 'gare', 'république', 'place des lices',
+            'université rennes 1', 'université rennes 2', 'chu',
+            'centre ville', 'villejean', 'beaulieu'
+        ][:limit]
+    return sorted(combined)[:limit]
+
+
+# Saisie progressive de chaque requête : "g", "ga", "gar", "gare"...
+KEYSTROKES = [q[:i] for q in QUERIES for i in range(1, len(q) + 1)]
+
+
+def _us_per_query(func, queries=QUERIES) -> float:
+    number = 50
+    best = min(timeit.repeat(lambda: [func(q) for q in queries], number=number, repeat=5))
+    return best / number / len(queries) * 1e6
+
+
+def main():
+    print(f"{len(RENNES_LOCATIONS)} lieux, {len(QUERIES)} requêtes (exactes, sans accent, fautes, inconnues)\n")
+    print(f"{'fonction':<22} {'origine (µs)':>13} {'index (µs)':>11} {'gain':>6}")
+    for name, legacy, current in (
+        ("find_location_fuzzy", legacy_find_location_fuzzy, find_location_fuzzy),
+        ("get_suggestions", legacy_get_suggestions, get_suggestions),
+    ):
+        before, after = _us_per_query(legacy), _us_per_query(current)
+        print(f"{name:<22} {before:>13.1f} {after:>11.1f} {before / after:>5.1f}x")
+
+    print(f"\nautocomplétion : {len(KEYSTROKES)} frappes")
+    before = _us_per_query(get_suggestions, KEYSTROKES)
+    after = _us_per_query(suggest_locations, KEYSTROKES)
+    print(f"{'get_suggestions':<22} {before:>13.1f} µs")
+    print(f"{'suggest_locations':<22} {after:>13.1f} µs ({before / after:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
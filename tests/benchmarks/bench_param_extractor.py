@@ -0,0 +1,64 @@
+"""
+Benchmark de l'extraction de paramètres
+- messages courants : µs par message pour chaque outil
+- pire cas : messages longs construits pour faire revenir en arrière les
+  expressions régulières ("aller à aller à ...", longues suites de blancs).
+  Le temps doit doubler quand la longueur double (coût linéaire).
+
+Usage:
+    python -m tests.benchmarks.bench_param_extractor
+"""
+import sys
+import os
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from backend.app.param_extractor import ParamExtractor
+
+MESSAGES = [
+    ("Combien de temps pour aller de la gare à Villejean demain à 8h ?", "estimate_drive_time"),
+    ("à quelle heure partir entre 7h et 9h pour aller au CHU ?", "find_best_departure_time"),
+    ("entre la gare et rennes 2", "estimate_drive_time"),
+    ("aller à la place Sainte-Anne en partant de ma position", "estimate_drive_time"),
+    ("quels parkings puis-je atteindre en 10 minutes depuis République ?", "get_reachable_places"),
+    ("Bouchons rue de Saint-Malo ?", "get_traffic_status"),
+    ("Quel est le prix du gazole à Rennes ?", "search_fuel_prices"),
+]
+
+# Messages pathologiques (longueur ~ n * motif)
+WORST_CASES = [
+    ("aller à " * 2, " ma position", "estimate_drive_time"),
+    ("entre ", "", "estimate_drive_time"),
+    ("de ", "à la gare", "estimate_drive_time"),
+    ("depuis a ", ";", "get_reachable_places"),
+    (" ", "x", "find_best_departure_time"),  # "entre 8h" + blancs
+]
+
+
+def _worst_message(motif: str, suffix: str, tool: str, length: int) -> str:
+    prefix = "entre 8h" if tool == "find_best_departure_time" else ""
+    return prefix + motif * (length // len(motif)) + suffix
+
+
+def main():
+    extractor = ParamExtractor()
+    best = min(timeit.repeat(lambda: [extractor.extract(m, t) for m, t in MESSAGES], number=200, repeat=5))
+    print(f"extract() : {best / 200 / len(MESSAGES) * 1e6:.1f} µs/message\n")
+
+    lengths = (2000, 4000, 8000, 16000)
+    print(f"{'pire cas':<22}" + ''.join(f"{n:>10}" for n in lengths) + "   (ms)")
+    for motif, suffix, tool in WORST_CASES:
+        timings = []
+        for length in lengths:
+            message = _worst_message(motif, suffix, tool, length)
+            start = time.perf_counter()
+            extractor.extract(message, tool)
+            timings.append((time.perf_counter() - start) * 1000)
+        label = repr(motif.strip() or "blancs")[:20]
+        print(f"{label:<22}" + ''.join(f"{ms:>10.1f}" for ms in timings))
+
+
+if __name__ == "__main__":
+    main()
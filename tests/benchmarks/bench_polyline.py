@@ -0,0 +1,45 @@
+"""
+Benchmark du décodage de polylines et de la simplification de géométrie
+
+Usage:
+    python -m tests.benchmarks.bench_polyline
+"""
+import sys
+import os
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from backend.app.tools.polyline import (
+    decode_polyline, decode_polyline_py, encode_polyline, simplify_coordinates,
+)
+
+
+def synthetic_route(points: int, seed: int = 0) -> np.ndarray:
+    """Trajet aléatoire autour de Rennes, pas de ~10 m comme une géométrie OSRM"""
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0, 0.0001, (points, 2))
+    return np.cumsum(steps, axis=0) + [-1.6778, 48.1173]
+
+
+def _best_ms(stmt, number: int) -> float:
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1000
+
+
+def main():
+    print(f"{'points':>8} {'python (ms)':>12} {'numpy (ms)':>11} {'gain':>6} {'DP 15 m (ms)':>13} {'points DP':>10}")
+    for points in (100, 1_000, 10_000, 50_000):
+        encoded = encode_polyline(synthetic_route(points))
+        number = max(1, 20_000 // points)
+        py_ms = _best_ms(lambda: decode_polyline_py(encoded), number)
+        np_ms = _best_ms(lambda: decode_polyline(encoded), number)
+        coords = decode_polyline(encoded)
+        dp_ms = _best_ms(lambda: simplify_coordinates(coords, 15.0), number)
+        kept = len(simplify_coordinates(coords, 15.0))
+        print(f"{points:>8} {py_ms:>12.3f} {np_ms:>11.3f} {py_ms / np_ms:>5.1f}x {dp_ms:>13.3f} {kept:>10}")
+
+
+if __name__ == "__main__":
+    main()
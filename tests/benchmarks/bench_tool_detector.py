@@ -0,0 +1,58 @@
+"""
+Benchmark de la détection d'outils : automate d'Aho-Corasick vs recherche par sous-chaînes
+Le coût de l'automate ne dépend que de la longueur du message ; celui des
+parcours `any(keyword in message)` croît avec le nombre de mots-clés.
+
+Usage:
+    python -m tests.benchmarks.bench_tool_detector
+"""
+import sys
+import os
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from backend.app.keyword_matcher import KeywordMatcher
+from backend.app.normalized_message import NormalizedMessage
+from backend.app.tool_detector import ToolDetector
+
+MESSAGES = [
+    "Quel est le prix du gazole à Rennes ?",
+    "Combien de temps pour aller de la gare à Villejean demain à 8h ?",
+    "Où puis-je me garer près de République ?",
+    "Y a-t-il des bouchons sur la rocade nord ce soir ?",
+    "quels parkings puis-je atteindre en 10 minutes depuis ma position ?",
+    "bonjour, tu peux m'aider ?",
+]
+
+
+def _us_per_message(func, messages=MESSAGES) -> float:
+    best = min(timeit.repeat(lambda: [func(m) for m in messages], number=200, repeat=5))
+    return best / 200 / len(messages) * 1e6
+
+
+def main():
+    detector = ToolDetector()
+    tables = {
+        name: getattr(detector, f"{name}_keywords")
+        for name in ("fuel", "traffic", "drive", "departure", "reachable", "parking")
+    }
+    normalized = [NormalizedMessage(m).plain for m in MESSAGES]
+
+    print(f"detect() : {_us_per_message(detector.detect):.1f} µs/message\n")
+    print(f"{'mots-clés':>10} {'sous-chaînes (µs)':>18} {'automate (µs)':>14}")
+    for factor in (1, 10, 50):
+        # Tables agrandies avec des mots-clés synthétiques absents des messages
+        scaled = {
+            name: keywords + [f"{kw}zq{i}" for i in range(factor - 1) for kw in keywords]
+            for name, keywords in tables.items()
+        }
+        keywords = [kw for kws in scaled.values() for kw in kws]
+        matcher = KeywordMatcher(scaled)
+        naive = _us_per_message(lambda m: {n for n, kws in scaled.items() if any(k in m for k in kws)}, normalized)
+        automaton = _us_per_message(matcher.categories, normalized)
+        print(f"{len(keywords):>10} {naive:>18.1f} {automaton:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Tests de l'API sur un serveur uvicorn local : chats simultanés, flux SSE pendant un chat"""
+import sys
+import os
+import threading
+import time
+
+import pytest
+import requests
+import uvicorn
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from backend.app import main
+
+
+PARKING_MESSAGE = "Où y a-t-il des places de parking libres ?"
+
+
+def _start_server() -> uvicorn.Server:
+    # lifespan="off" : pas de collecte périodique du trafic pendant les tests
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=0, lifespan="off",
+                                           log_level="warning", timeout_graceful_shutdown=1))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def _stop_server(server: uvicorn.Server) -> None:
+    server.should_exit = True
+
+
+def _url(server, path):
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return f"http://127.0.0.1:{port}{path}"
+
+
+@pytest.fixture(scope="module")
+def api_server():
+    server = _start_server()
+    yield server
+    _stop_server(server)
+
+
+def _fake_services(monkeypatch, calls, delay):
+    def slow_parking(params, user_location=None, deadline=None):
+        calls.append(user_location)
+        time.sleep(delay)
+        return {"success": True, "parkings": []}
+
+    monkeypatch.setitem(main.mcp.executor.tools, "get_parking_status", slow_parking)
+    monkeypatch.setattr(main.llm_service, "chat", lambda message, context="", history=None, timeout=None: "ok")
+
+
+def _post_chat(server):
+    return requests.post(_url(server, "/api/chat"), json={"message": PARKING_MESSAGE}, timeout=10)
+
+
+def test_concurrent_chats_share_tool_call(api_server, monkeypatch):
+    """Requêtes simultanées identiques : traitées en parallèle, un seul appel d'outil"""
+    print("\n[TEST] API - Chats simultanés")
+    calls = []
+    _fake_services(monkeypatch, calls, delay=0.5)
+
+    responses = []
+    threads = [threading.Thread(target=lambda: responses.append(_post_chat(api_server))) for _ in range(5)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    assert [r.status_code for r in responses] == [200] * 5
+    assert all(r.json()["response"] == "ok" for r in responses)
+    assert len(calls) == 1, f"{len(calls)} appels d'outil pour 5 requêtes"
+    assert elapsed < 2.0
+    print(f"  [OK] 5 requêtes en {elapsed:.2f} s, {len(calls)} appel d'outil")
+
+
+def test_stream_keepalive_during_chat(api_server, monkeypatch):
+    """Le flux SSE reçoit ses keepalives pendant qu'une requête chat est en cours"""
+    print("\n[TEST] API - Flux SSE pendant un chat")
+    monkeypatch.setattr(main, "TRAFFIC_STREAM_POLL_S", 0.05)
+    monkeypatch.setattr(main, "TRAFFIC_STREAM_KEEPALIVE_S", 0.1)
+    _fake_services(monkeypatch, [], delay=1.0)
+
+    keepalives, stop = [], threading.Event()
+    stream = requests.get(_url(api_server, "/api/traffic/stream"), stream=True, timeout=5)
+
+    def read_stream():
+        for line in stream.iter_lines():
+            if line == b": keepalive":
+                keepalives.append(time.perf_counter())
+            if stop.is_set():
+                break
+
+    reader = threading.Thread(target=read_stream)
+    reader.start()
+    time.sleep(0.3)  # Flux établi
+
+    start = time.perf_counter()
+    assert _post_chat(api_server).status_code == 200
+    end = time.perf_counter()
+    stop.set()
+    reader.join(timeout=5)
+    stream.close()
+
+    during = [t for t in keepalives if start < t < end]
+    assert len(during) >= 3, f"{len(during)} keepalive(s) pendant {end - start:.2f} s de chat"
+    print(f"  [OK] {len(during)} keepalives pendant {end - start:.2f} s de chat")
+
+
+if __name__ == "__main__":
+    server = _start_server()
+    try:
+        with pytest.MonkeyPatch.context() as mp:
+            test_concurrent_chats_share_tool_call(server, mp)
+        with pytest.MonkeyPatch.context() as mp:
+            test_stream_keepalive_during_chat(server, mp)
+    finally:
+        _stop_server(server)
+    print("\n[OK] Tous les tests de l'API chat réussis !")
@@ -0,0 +1,88 @@
+"""Tests unitaires pour Deadline et les replis des scrapers hors délai"""
+import sys
+import os
+import json
+import time
+from datetime import datetime, timedelta
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from backend.app.deadline import Deadline, DeadlineExceeded
+from backend.app import http_client
+from backend.app.tools.fuel_scraper import FuelPriceScraper
+from backend.app.tools.traffic_scraper import TrafficScraper
+
+
+def test_deadline_budget():
+    """Timeouts bornés par le temps restant, sous-échéances jamais plus tardives"""
+    print("\n[TEST] Deadline - Budget")
+    unbounded = Deadline()
+    assert unbounded.timeout(10) == 10 and not unbounded.expired
+
+    deadline = Deadline(1.0)
+    assert 0.9 < deadline.timeout(10) <= 1.0
+    assert deadline.timeout(0.5) == 0.5
+    assert deadline.timeout(10, reserve=0.5) <= 0.5
+    assert deadline.child(5).expires_at == deadline.expires_at
+    assert deadline.child(0.1).expires_at < deadline.expires_at
+
+    expired = Deadline(0)
+    assert expired.expired
+    try:
+        expired.timeout(10)
+        assert False, "timeout accordé après l'échéance"
+    except requests.exceptions.Timeout as e:
+        assert isinstance(e, DeadlineExceeded)
+
+    child = deadline.child()
+    child.degrade("prix en cache")
+    child.degrade("prix en cache")
+    assert child.reasons == ["prix en cache"] and not deadline.degraded
+    print("  [OK] timeouts et sous-échéances")
+
+
+def test_fuel_stale_cache_fallback(tmp_path, monkeypatch):
+    """Téléchargement hors délai : prix du dernier cache, même périmé, signalés"""
+    print("\n[TEST] Deadline - Prix carburant en cache")
+    scraper = FuelPriceScraper(cache_dir=str(tmp_path))
+    data = {"date": "2026-01-02", "total_stations": 0, "stations": []}
+    with open(scraper.cache_file, "w", encoding="utf-8") as f:
+        json.dump({"timestamp": (datetime.now() - timedelta(days=3)).isoformat(), "data": data}, f)
+
+    def slow_get(*args, timeout=None, **kwargs):
+        assert timeout <= 1.0
+        raise requests.exceptions.Timeout()
+
+    monkeypatch.setattr(http_client, "get", slow_get)
+    deadline = Deadline(1.0)
+    assert scraper.fetch_daily_prices(deadline=deadline) == data
+    assert deadline.reasons and "2026-01-02" in deadline.reasons[0]
+    print(f"  [OK] {deadline.reasons}")
+
+
+def test_traffic_last_snapshot_fallback(monkeypatch):
+    """Échéance dépassée : dernier instantané, tronçons laissés sans adresse"""
+    print("\n[TEST] Deadline - Dernier instantané de trafic")
+    scraper = TrafficScraper()
+    scraper._last_snapshot = {
+        "timestamp": datetime(2026, 1, 2, 8, 15),
+        "segments": [{"troncon": "Boulevard Solférino", "lat": 48.1040, "lon": -1.6722, "status": "congestion"}],
+        "total_monitored": 1,
+    }
+    monkeypatch.setattr(scraper, "_reverse_geocode", lambda *args: (_ for _ in ()).throw(AssertionError("Nominatim appelé")))
+
+    deadline = Deadline(0)
+    start = time.perf_counter()
+    result = scraper.get_traffic_status(deadline=deadline)
+    assert time.perf_counter() - start < 0.5
+    assert result["success"] and result["roads"][0]["street"] == "Boulevard Solférino"
+    assert any("08:15" in reason for reason in deadline.reasons)
+    assert any("sans adresse" in reason for reason in deadline.reasons)
+    print(f"  [OK] {deadline.reasons}")
+
+
+if __name__ == "__main__":
+    test_deadline_budget()
+    print("\n[OK] Tous les tests Deadline réussis !")
@@ -0,0 +1,82 @@
+"""Tests unitaires pour le gazetteer d'adresses BAN"""
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from backend.app.gazetteer import Gazetteer, StringTable
+from backend.app import rennes_locations
+
+BAN_HEADER = "id;numero;rep;nom_voie;code_postal;nom_commune;lon;lat\n"
+BAN_ROWS = [
+    "35238_1;1;;Rue de la Paix;35000;Rennes;-1.6790;48.1110",
+    "35238_2;12;;Rue de la Paix;35000;Rennes;-1.6800;48.1120",
+    "35047_1;3;;Rue de la Paix;35170;Bruz;-1.7500;48.0250",
+    "35238_3;5;bis;Boulevard de la Liberté;35000;Rennes;-1.6770;48.1060",
+    "35238_4;;;Lieu-dit Le Hameau;35000;Rennes;-1.7000;48.1300",
+    "35238_5;7;;Rue de la Paixelle;35000;Rennes;-1.6600;48.1000",
+]
+
+
+def _write_csv(tmp_path):
+    path = tmp_path / "adresses-35.csv"
+    path.write_text(BAN_HEADER + "\n".join(BAN_ROWS) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_string_table_bisect():
+    """La table de chaînes se comporte comme une liste triée"""
+    print("\n[TEST] Gazetteer - Table de chaînes")
+    table = StringTable.from_strings(["abc", "abd", "b", "été"])
+    assert len(table) == 4 and table[3] == "été"
+    assert [table[i] for i in range(len(table))] == ["abc", "abd", "b", "été"]
+
+
+def test_build_save_and_find(tmp_path):
+    """Construction depuis le CSV, rechargement mmap, voie / numéro / commune / fautes"""
+    print("\n[TEST] Gazetteer - Résolution d'adresses")
+    out = str(tmp_path / "gazetteer")
+    Gazetteer.from_ban_csv(_write_csv(tmp_path)).save(out)
+    gazetteer = Gazetteer.load(out)
+    assert gazetteer.street_count == 5 and gazetteer.address_count == 6
+
+    numbered = gazetteer.find("12, rue de la Paix")
+    assert numbered["label"] == "12 Rue de la Paix, 35000 Rennes" and numbered["number"] == 12
+    assert abs(numbered["lat"] - 48.1120) < 1e-4 and abs(numbered["lon"] + 1.6800) < 1e-4
+
+    # Voie seule : commune par défaut, centroïde des adresses
+    street = gazetteer.find("rue de la paix")
+    assert street["label"] == "Rue de la Paix, 35000 Rennes" and street["number"] is None
+    assert abs(street["lat"] - 48.1115) < 1e-4
+
+    assert gazetteer.find("rue de la paix bruz")["label"] == "Rue de la Paix, 35170 Bruz"
+    assert gazetteer.find("boulevard de la liberte")["lat"] > 48.10
+    assert gazetteer.find("99 rue de la paix")["number"] is None  # numéro inconnu
+    assert gazetteer.find("rue de la pa") is None  # préfixe seul : pas de résolution
+    assert gazetteer.find("rue de la pqix") is None
+    assert gazetteer.find("rue de la pqix", fuzzy_cutoff=0.75)["label"].startswith("Rue de la Paix")
+
+    assert [s["label"] for s in gazetteer.suggest("rue de la pai")] == [
+        "Rue de la Paix, 35170 Bruz", "Rue de la Paix, 35000 Rennes", "Rue de la Paixelle, 35000 Rennes",
+    ]
+
+
+def test_find_location_uses_gazetteer(tmp_path, monkeypatch):
+    """Les lieux connus restent prioritaires, les adresses viennent du gazetteer"""
+    print("\n[TEST] Gazetteer - Intégration rennes_locations")
+    gazetteer = Gazetteer.from_ban_csv(_write_csv(tmp_path))
+    monkeypatch.setattr(rennes_locations, "GAZETTEER", gazetteer)
+
+    assert rennes_locations.find_location_fuzzy("gare") == rennes_locations.RENNES_LOCATIONS["gare"]
+    assert rennes_locations.find_location_fuzzy("garr") == rennes_locations.RENNES_LOCATIONS["gare"]
+    lat, lon = rennes_locations.find_location_fuzzy("12 rue de la paix")
+    assert abs(lat - 48.1120) < 1e-4
+    names = [s["name"] for s in rennes_locations.suggest_locations("rue de la pai", limit=2)]
+    assert names == ["Rue de la Paix, 35170 Bruz", "Rue de la Paix, 35000 Rennes"]
+
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_string_table_bisect()
+    test_build_save_and_find(pathlib.Path(tempfile.mkdtemp()))
+    print("\n[OK] Tous les tests gazetteer réussis !")
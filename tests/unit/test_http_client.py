@@ -0,0 +1,211 @@
+"""Tests unitaires pour le client HTTP sortant (connexions, reprises, disjoncteur, doublons), sur un serveur local"""
+import sys
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from backend.app.http_client import CircuitOpenError, HTTPClient
+
+
+class _DelayedHandler(BaseHTTPRequestHandler):
+    """Répond après le délai suivant de server.delays, avec le statut suivant de server.statuses"""
+
+    protocol_version = "HTTP/1.1"  # Connexions keep-alive
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.hits += 1
+            delay = self.server.delays.pop(0) if self.server.delays else 0.0
+            status = self.server.statuses.pop(0) if self.server.statuses else 200
+        time.sleep(delay)
+        body = f"{delay}".encode()
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _start_server() -> ThreadingHTTPServer:
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _DelayedHandler)
+    httpd.delays, httpd.statuses, httpd.hits, httpd.lock = [], [], 0, threading.Lock()
+    threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    return httpd
+
+
+def _stop_server(httpd: ThreadingHTTPServer) -> None:
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    httpd = _start_server()
+    yield httpd
+    _stop_server(httpd)
+
+
+def _url(httpd):
+    return f"http://127.0.0.1:{httpd.server_address[1]}/records"
+
+
+def _warm_up(client, httpd, count=5):
+    for _ in range(count):
+        client.get(_url(httpd), timeout=5)
+
+
+def _host(client, httpd):
+    return client.metrics()["hosts"][f"127.0.0.1:{httpd.server_address[1]}"]
+
+
+def test_connections_reused(server):
+    """Appels successifs vers un hôte : une seule connexion établie"""
+    print("\n[TEST] HTTP - Connexions réutilisées")
+    client = HTTPClient(hedging=False)
+    _warm_up(client, server, count=10)
+    host = _host(client, server)
+    assert host["requests"] == 10 and host["connections"] == 1
+    assert host["reuse_rate"] == 0.9 and host["avg_handshake_ms"] is not None
+    print(f"  [OK] {host['connections']} connexion, réutilisation {host['reuse_rate']:.0%}")
+
+
+def test_retry_on_unavailable(server):
+    """503 passager : reprise transparente pour un GET"""
+    print("\n[TEST] HTTP - Reprise")
+    client = HTTPClient(hedging=False, retries=2, retry_backoff_s=0.01)
+    server.statuses = [503]
+    response = client.get(_url(server), timeout=5)
+    assert response.status_code == 200 and server.hits == 2
+    assert _host(client, server)["breaker"]["consecutive_failures"] == 0
+    print("  [OK] 503 puis 200")
+
+
+def test_circuit_breaker(server):
+    """Échecs répétés : appels refusés sans requête, puis essai et refermeture"""
+    print("\n[TEST] HTTP - Disjoncteur")
+    client = HTTPClient(hedging=False, retries=0, breaker_failures=2, breaker_reset_s=0.2)
+    server.statuses = [503, 503]
+    assert client.get(_url(server), timeout=5).status_code == 503
+    assert client.get(_url(server), timeout=5).status_code == 503
+    hits = server.hits
+    with pytest.raises(CircuitOpenError):
+        client.get(_url(server), timeout=5)
+    assert server.hits == hits and _host(client, server)["breaker"]["state"] == "open"
+
+    time.sleep(0.25)
+    assert client.get(_url(server), timeout=5).status_code == 200
+    breaker = _host(client, server)["breaker"]
+    assert breaker == {"state": "closed", "consecutive_failures": 0, "rejected": 1}
+    print(f"  [OK] {breaker}")
+
+
+def test_read_timeout_not_counted_as_failure(server):
+    """Délai de lecture dépassé (échéance de l'appelant) : le disjoncteur ne s'ouvre pas"""
+    print("\n[TEST] HTTP - Délai de l'appelant")
+    client = HTTPClient(hedging=False, retries=0, breaker_failures=1, breaker_reset_s=0.2)
+    server.delays = [0.3, 0.3]
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            client.get(_url(server), timeout=0.05)
+    assert _host(client, server)["breaker"]["state"] == "closed"
+
+    # Requête d'essai hors délai : l'essai suivant est autorisé et referme le disjoncteur
+    server.statuses = [503]
+    client.get(_url(server), timeout=5)
+    time.sleep(0.25)
+    server.delays = [0.3]
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        client.get(_url(server), timeout=0.05)
+    assert client.get(_url(server), timeout=5).status_code == 200
+    assert _host(client, server)["breaker"]["state"] == "closed"
+    print("  [OK] disjoncteur fermé")
+
+
+def test_slow_request_is_hedged(server):
+    """Réponse au-delà du p95 : doublon, la première réponse l'emporte"""
+    print("\n[TEST] HTTP - Requête doublée")
+    client = HTTPClient(hedging=True, budget_ratio=1.0, budget_burst=2, min_samples=5, min_delay_s=0.05)
+    _warm_up(client, server)
+
+    server.delays = [0.6]  # Seule la tentative initiale est lente
+    start = time.perf_counter()
+    response = client.get(_url(server), timeout=5)
+    elapsed = time.perf_counter() - start
+
+    assert response.status_code == 200 and response.text == "0.0"
+    assert elapsed < 0.4, f"doublon non envoyé ? {elapsed:.2f} s"
+    host = _host(client, server)
+    assert host["requests"] == 6 and host["hedged"] == 1 and host["hedge_wins"] == 1
+    time.sleep(0.7)  # La tentative initiale finit en arrière-plan
+    assert _host(client, server)["tail_saved_ms"] > 0
+    print(f"  [OK] réponse en {elapsed:.2f} s, {host}")
+
+
+def test_hedge_budget_and_opt_out(server):
+    """Sans budget, ou avec hedge=False, la requête lente est attendue sans doublon"""
+    print("\n[TEST] HTTP - Budget des doublons")
+    client = HTTPClient(hedging=True, budget_ratio=0.0, min_samples=5, min_delay_s=0.05)
+    _warm_up(client, server)
+    server.delays = [0.3]
+    start = time.perf_counter()
+    client.get(_url(server), timeout=5)
+    assert time.perf_counter() - start >= 0.3
+
+    client = HTTPClient(hedging=True, budget_ratio=1.0, min_samples=5, min_delay_s=0.05)
+    _warm_up(client, server)
+    hits = server.hits
+    server.delays = [0.3]
+    client.get(_url(server), hedge=False, timeout=5)
+    assert server.hits == hits + 1
+    assert all(host["hedged"] == 0 for host in client.metrics()["hosts"].values())
+    print("  [OK] pas de doublon hors budget")
+
+
+def test_primaries_never_queue(server):
+    """Pool des tentatives plein : le GET suivant part aussitôt sur le thread de l'appelant"""
+    print("\n[TEST] HTTP - Pas de file d'attente")
+    client = HTTPClient(hedging=True, budget_ratio=1.0, min_samples=5, min_delay_s=1.0,
+                        max_primaries=1, max_workers=1)
+    _warm_up(client, server)
+
+    server.delays = [0.5]  # Occupe le seul thread des tentatives initiales
+    slow = threading.Thread(target=lambda: client.get(_url(server), timeout=5))
+    slow.start()
+    time.sleep(0.1)
+    start = time.perf_counter()
+    assert client.get(_url(server), timeout=5).status_code == 200
+    elapsed = time.perf_counter() - start
+    slow.join()
+    assert elapsed < 0.3, f"GET en attente d'un thread ? {elapsed:.2f} s"
+    print(f"  [OK] réponse en {elapsed:.2f} s malgré le pool occupé")
+
+
+def test_errors_propagate(server):
+    """Erreur de connexion : l'exception de requests remonte à l'appelant"""
+    print("\n[TEST] HTTP - Erreurs")
+    client = HTTPClient(hedging=True, retries=0)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.get("http://127.0.0.1:9/", timeout=1)
+    print("  [OK] ConnectionError")
+
+
+if __name__ == "__main__":
+    for test in (test_connections_reused, test_retry_on_unavailable, test_circuit_breaker,
+                 test_read_timeout_not_counted_as_failure,
+                 test_slow_request_is_hedged, test_hedge_budget_and_opt_out, test_primaries_never_queue,
+                 test_errors_propagate):
+        httpd = _start_server()
+        try:
+            test(httpd)
+        finally:
+            _stop_server(httpd)
+    print("\n[OK] Tous les tests du client HTTP réussis !")
@@ -0,0 +1,130 @@
+"""Tests unitaires pour le classifieur d'intentions (n-grammes hachés + softmax)"""
+import sys
+import os
+from functools import lru_cache
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from backend.app.intent_classifier import (
+    ClassifierToolDetector,
+    IntentClassifier,
+    create_detector,
+    hash_ngrams,
+    train_default,
+)
+from backend.app.intent_corpus import LABELED_MESSAGES, TOOL_LABELS
+from backend.app.normalized_message import NormalizedMessage
+from backend.app.tool_detector import ToolDetector
+
+
+@lru_cache(maxsize=None)
+def _model() -> IntentClassifier:
+    return train_default()
+
+
+def test_hash_ngrams():
+    """Hachage déterministe, indépendant du lot, accents et casse ignorés"""
+    print("\n[TEST] IntentClassifier - N-grammes hachés")
+    features = hash_ngrams(["Prix du gazole à Rennes ?", "bonjour", ""], n_features=1024)
+    assert features.n_rows == 3
+    assert features.cols.min() >= 0 and features.cols.max() < 1024
+    norms = np.sqrt(np.bincount(features.rows, weights=features.values.astype(np.float64) ** 2))
+    assert np.allclose(norms, 1.0)
+
+    alone = hash_ngrams(["bonjour"], n_features=1024)
+    in_batch = features.rows == 1
+    assert np.array_equal(alone.cols, features.cols[in_batch])
+    assert np.allclose(alone.values, features.values[in_batch])
+
+    folded = hash_ngrams(["PRIX du gazole a rennes"], n_features=1024)
+    first = features.rows == 0
+    assert np.array_equal(folded.cols, features.cols[first])
+    print(f"  [OK] {len(features.cols)} n-grammes pour 3 messages")
+
+
+def test_train_and_predict():
+    """Le modèle entraîné sur le corpus le restitue et classe par lots"""
+    print("\n[TEST] IntentClassifier - Entraînement sur le corpus")
+    model = _model()
+    assert set(model.labels) == set(TOOL_LABELS)
+    messages, tools = zip(*LABELED_MESSAGES)
+    predictions = model.predict(messages)
+    accuracy = np.mean([tool == expected for (tool, _), expected in zip(predictions, tools)])
+    assert accuracy > 0.95, f"précision sur le corpus: {accuracy:.1%}"
+
+    proba = model.predict_proba(["prix du parking à la gare", "bonjour"])
+    assert proba.shape == (2, len(model.labels))
+    assert np.allclose(proba.sum(axis=1), 1.0)
+    assert model.predict([]) == []
+
+    message = "Combien de temps pour aller à Villejean ?"
+    assert model.classify(NormalizedMessage(message)) == model.classify(message)
+    print(f"  [OK] précision sur le corpus {accuracy:.1%}")
+
+
+def test_held_out_messages():
+    """Formulations absentes du corpus, dont celles que les mots-clés orientent mal"""
+    print("\n[TEST] IntentClassifier - Messages hors corpus")
+    model = _model()
+    test_cases = [
+        ("quel est le tarif du parking Colombier ?", "get_parking_status"),
+        ("quelle route pour aller au Thabor ?", "estimate_drive_time"),
+        ("le gazole le moins cher à Betton", "get_cheapest_station"),
+        ("y a des bouchons à Beaulieu ?", "get_traffic_status"),
+        ("salut, ça va ?", None),
+    ]
+    for message, expected in test_cases:
+        tool, confidence = model.classify(message)
+        print(f"  '{message}' -> {tool} ({confidence:.2f}) | règles: {ToolDetector().detect(message)}")
+        assert tool == expected, f"Expected {expected}, got {tool}"
+
+
+def test_save_load_roundtrip(tmp_path):
+    """Modèle enregistré puis rechargé : mêmes probabilités, classe None conservée"""
+    print("\n[TEST] IntentClassifier - Persistance")
+    model = _model()
+    path = str(tmp_path / "intent_model.npz")
+    model.save(path)
+    loaded = IntentClassifier.load(path)
+    assert loaded.labels == model.labels and None in loaded.labels
+    assert loaded.ngram_range == model.ngram_range
+    messages = ["prix du gazole", "où me garer ?", "merci"]
+    assert np.allclose(loaded.predict_proba(messages), model.predict_proba(messages))
+    print("  [OK] save / load")
+
+
+def test_detector_backends():
+    """Sélection du détecteur et repli sur les règles sous le seuil de confiance"""
+    print("\n[TEST] IntentClassifier - Choix du détecteur")
+    assert isinstance(create_detector("rules"), ToolDetector)
+    try:
+        create_detector("inconnu")
+        assert False, "backend inconnu accepté"
+    except ValueError:
+        pass
+
+    model, rules = _model(), ToolDetector()
+    message = "Bouchons rue de Saint-Malo ?"
+    strict = ClassifierToolDetector(model, rules, min_confidence=1.1, fallback=True)
+    assert strict.detect(message) == rules.detect(message)
+    assert strict.detect_all(message) == rules.detect_all(message)
+
+    always = ClassifierToolDetector(model, rules, min_confidence=1.1, fallback=False)
+    assert always.detect(message) == model.classify(message)[0]
+    assert always.detect_batch([message, "bonjour"]) == [tool for tool, _ in model.predict([message, "bonjour"])]
+    intents = dict(always.detect_intents("trafic et parkings près de la gare"))
+    assert set(intents) == {"get_traffic_status", "get_parking_status"}
+    assert intents["get_parking_status"].original == "parkings près de la gare"
+    print("  [OK] rules / classifier / auto")
+
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_hash_ngrams()
+    test_train_and_predict()
+    test_held_out_messages()
+    test_save_load_roundtrip(pathlib.Path(tempfile.mkdtemp()))
+    test_detector_backends()
+    print("\n[OK] Tous les tests du classifieur d'intentions réussis !")
@@ -0,0 +1,63 @@
+"""Tests unitaires pour les isochrones (zone atteignable en N minutes)"""
+import sys
+import os
+import math
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from backend.app.tools.isochrone import IsochroneBuilder, places_within
+
+CENTRE = (48.1113, -1.6800)
+
+
+class FakeTableScraper:
+    """Durée proportionnelle à la distance (30 km/h), l'est étant inaccessible"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_table(self, origin, destinations, deadline=None):
+        self.calls += 1
+        durations = []
+        for lat, lon in destinations:
+            km = math.hypot((lat - origin[0]) * 110.574, (lon - origin[1]) * 74.0)
+            durations.append(None if lon > origin[1] + 0.02 else km / 30 * 3600)
+        return {"success": True, "durations_seconds": durations, "distances_km": [None] * len(destinations)}
+
+
+def test_reachable_area_shape_and_cache():
+    """La zone couvre les points proches, exclut les lointains, et est mise en cache"""
+    scraper = FakeTableScraper()
+    builder = IsochroneBuilder(scraper, grid_size=21)
+    print("\n[TEST] Isochrone - Zone atteignable")
+
+    area = builder.reachable_area(CENTRE, 10)
+    assert area["success"] and area["reached_points"] < area["sampled_points"]
+    polygon = area["polygon"]
+    # ~5 km à 30 km/h en 10 min
+    places = [
+        {"name": "proche", "lat": 48.1200, "lon": -1.6900},
+        {"name": "loin", "lat": 48.1900, "lon": -1.6800},
+        {"name": "est", "lat": 48.1113, "lon": -1.6200},
+        {"name": "sans position", "lat": None, "lon": None},
+    ]
+    assert [p["name"] for p in places_within(polygon, places)] == ["proche"]
+
+    # Origine voisine (~100 m) : même isochrone, pas de nouvelle matrice
+    builder.reachable_area((48.1120, -1.6805), 10)
+    assert scraper.calls == 1
+    builder.reachable_area(CENTRE, 20)
+    assert scraper.calls == 2
+
+
+def test_reachable_area_limits():
+    """Durée nulle refusée, durée excessive plafonnée"""
+    builder = IsochroneBuilder(FakeTableScraper(), grid_size=5)
+    assert not builder.reachable_area(CENTRE, 0)["success"]
+    assert builder.reachable_area(CENTRE, 240)["minutes"] == 30
+
+
+if __name__ == "__main__":
+    test_reachable_area_shape_and_cache()
+    test_reachable_area_limits()
+    print("\n[OK] Tous les tests isochrone réussis !")
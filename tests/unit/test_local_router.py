@@ -0,0 +1,195 @@
+"""Tests unitaires pour le routage local (graphe CSR + A* bidirectionnel)"""
+import sys
+import os
+import heapq
+import math
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from backend.app.tools.local_router import LocalRoadGraph, _equirect_m, build_graph_from_osm
+from backend.app.tools.route_cache import RouteCache
+from backend.app.tools.route_scraper import RouteScraper
+
+
+def _grid_graph(size=12, seed=7):
+    """Grille size x size autour de Rennes, arcs à double sens de durées aléatoires"""
+    rng = np.random.default_rng(seed)
+    step = 0.002
+    lat = np.repeat(48.10 + step * np.arange(size), size)
+    lon = np.tile(-1.70 + step * np.arange(size), size)
+    src, dst = [], []
+    for r in range(size):
+        for c in range(size):
+            u = r * size + c
+            for v in ([u + 1] if c + 1 < size else []) + ([u + size] if r + 1 < size else []):
+                src += [u, v]
+                dst += [v, u]
+    src, dst = np.array(src), np.array(dst)
+    length = 6371000.0 * np.radians(step) * 0.7 * np.ones(len(src))
+    # Vitesses entre 15 et 70 km/h, avec quelques sens uniques plus lents
+    time = length / (rng.uniform(15, 70, len(src)) / 3.6)
+    return LocalRoadGraph.from_edges(lat, lon, src, dst, length, time)
+
+
+def _dijkstra(graph, source, target):
+    dist = {source: 0.0}
+    heap = [(0.0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if u == target:
+            return d
+        if d > dist[u]:
+            continue
+        for e in range(graph.indptr[u], graph.indptr[u + 1]):
+            v = int(graph.indices[e])
+            nd = d + float(graph.edge_time[e])
+            if nd < dist.get(v, math.inf):
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+    return None
+
+
+def test_bidirectional_astar_matches_dijkstra():
+    """L'A* bidirectionnel trouve la même durée optimale que Dijkstra"""
+    graph = _grid_graph()
+    print("\n[TEST] LocalRoadGraph - A* vs Dijkstra")
+    rng = np.random.default_rng(0)
+    for source, target in rng.integers(0, graph.node_count, size=(40, 2)):
+        nodes, edges, duration = graph.shortest_path(int(source), int(target))
+        assert abs(duration - _dijkstra(graph, int(source), int(target))) < 1e-3
+        # Le chemin est contigu et sa durée correspond à la somme de ses arcs
+        assert nodes[0] == source and nodes[-1] == target
+        assert all(graph.edge_src[e] == a and graph.indices[e] == b for e, a, b in zip(edges, nodes, nodes[1:]))
+        assert abs(float(graph.edge_time[edges].sum()) - duration) < 1e-2
+
+
+def test_nearest_node_matches_brute_force():
+    """L'index spatial des nœuds donne le même nœud qu'un parcours complet"""
+    graph = _grid_graph()
+    print("\n[TEST] LocalRoadGraph - Nœud le plus proche")
+    rng = np.random.default_rng(1)
+    for lat, lon in zip(rng.uniform(48.099, 48.123, 50), rng.uniform(-1.701, -1.677, 50)):
+        node, gap = graph.nearest_node(lat, lon)
+        distances = _equirect_m(lat, lon, graph.node_lat, graph.node_lon)
+        assert abs(gap - distances.min()) < 1.0 and distances[node] - distances.min() < 1.0
+    assert graph.nearest_node(48.5, -1.2) is None
+    assert graph.nearest_node(48.5, -1.2, max_m=100_000) is not None
+
+
+def test_route_shape_and_unreachable(tmp_path):
+    """Même format que OSRM ; un nœud isolé ou un point hors graphe échoue proprement"""
+    graph = _grid_graph(size=4)
+    path = str(tmp_path / "graph.npz")
+    graph.save(path)
+    graph = LocalRoadGraph.load(path)
+
+    route = graph.route((48.1001, -1.7001), (48.1061, -1.6941))
+    assert route["success"] and route["source"] == "local"
+    assert list(route["coordinates"][0]) == [graph.node_lon[0], graph.node_lat[0]]
+    assert route["distance_km"] > 0 and route["duration_seconds"] > 0
+
+    assert not graph.route((48.5, -1.2), (48.1061, -1.6941))["success"]
+
+    lone = LocalRoadGraph.from_edges([48.10, 48.11, 48.12], [-1.7, -1.7, -1.7], [0], [1], [1000.0], [60.0])
+    assert lone.shortest_path(0, 2) is None
+    # Sens unique : 1 -> 0 impossible
+    assert lone.shortest_path(1, 0) is None
+
+
+def test_build_graph_from_osm(tmp_path):
+    """Conversion OSM XML : voies carrossables, sens uniques, maxspeed"""
+    osm = tmp_path / "extract.osm"
+    osm.write_text("""<?xml version="1.0" encoding="UTF-8"?>
+<osm version="0.6">
+  <node id="1" lat="48.1000" lon="-1.7000"/>
+  <node id="2" lat="48.1010" lon="-1.7000"/>
+  <node id="3" lat="48.1020" lon="-1.7000"/>
+  <node id="4" lat="48.1030" lon="-1.7000"/>
+  <way id="10"><nd ref="1"/><nd ref="2"/><nd ref="3"/><tag k="highway" v="residential"/></way>
+  <way id="11"><nd ref="3"/><nd ref="2"/><tag k="highway" v="primary"/><tag k="oneway" v="yes"/><tag k="maxspeed" v="50"/></way>
+  <way id="12"><nd ref="3"/><nd ref="4"/><tag k="highway" v="footway"/></way>
+</osm>""", encoding="utf-8")
+
+    graph = build_graph_from_osm(str(osm))
+    print("\n[TEST] LocalRoadGraph - Conversion OSM")
+    assert graph.node_count == 3  # le nœud du chemin piéton est ignoré
+    assert len(graph.indices) == 5  # 2 x 2 arcs résidentiels + 1 sens unique
+    # 3 -> 2 emprunte la voie à 50 km/h plutôt que la rue à 30 km/h
+    _, _, duration = graph.shortest_path(2, 1)
+    assert abs(duration - float(graph.edge_length[0]) / (50 / 3.6)) < 0.5
+
+
+def test_route_scraper_prefers_local_graph():
+    """RouteScraper utilise le graphe local et ne se replie sur OSRM qu'en cas d'échec"""
+    scraper = RouteScraper(cache=RouteCache(), local_graph=_grid_graph(size=4))
+    osrm_calls = []
+    scraper._fetch_osrm_route = lambda o, d, detail, deadline=None: osrm_calls.append(1) or {"success": True, "source": "osrm"}
+
+    assert scraper.get_route((48.1001, -1.7001), (48.1061, -1.6941))["source"] == "local"
+    assert scraper.get_route((48.5, -1.2), (48.1061, -1.6941))["source"] == "osrm"
+    assert len(osrm_calls) == 1
+
+
+def test_route_detail_levels():
+    """Résumé sans géométrie, géométrie simplifiée, annotations par arête en complet"""
+    graph = _grid_graph(size=8)
+    origin, destination = (48.1001, -1.7001), (48.1141, -1.6861)
+    summary = graph.route(origin, destination, detail="summary")
+    simplified = graph.route(origin, destination, detail="simplified")
+    full = graph.route(origin, destination, detail="full")
+
+    assert len(summary["coordinates"]) == 0
+    assert summary["duration_seconds"] == full["duration_seconds"]
+    assert 2 <= len(simplified["coordinates"]) <= len(full["coordinates"])
+    assert len(full["annotations"]["duration"]) == len(full["coordinates"]) - 1
+    assert abs(sum(full["annotations"]["duration"]) - full["duration_seconds"]) < 1
+
+
+def test_table_matches_shortest_paths():
+    """La matrice locale donne les mêmes durées que les itinéraires un à un"""
+    graph = _grid_graph(size=6)
+    scraper = RouteScraper(cache=RouteCache(), local_graph=graph)
+    origin = (48.1001, -1.7001)
+    destinations = [(48.1061, -1.6941), (48.1101, -1.6901), (48.5, -1.2)]
+
+    table = scraper.get_table(origin, destinations)
+    print("\n[TEST] RouteScraper - Matrice de temps de trajet")
+    assert table["success"] and table["source"] == "local"
+    for dest, duration, distance in zip(destinations[:2], table["durations_seconds"], table["distances_km"]):
+        route = graph.route(origin, dest)
+        assert abs(duration - route["duration_seconds"]) < 1
+        assert abs(distance - route["distance_km"]) < 0.02
+    # Destination hors graphe : pas de valeur plutôt qu'un échec global
+    assert table["durations_seconds"][2] is None
+
+
+def test_table_osrm_chunks():
+    """Sans graphe local, les destinations sont envoyées à OSRM par lots"""
+    scraper = RouteScraper(cache=RouteCache(), backend="osrm")
+    scraper.table_chunk_size = 2
+    batches = []
+
+    def fake_table(origin, destinations, deadline=None):
+        batches.append(len(destinations))
+        return {"success": True, "durations_seconds": [60.0] * len(destinations),
+                "distances_km": [1.0] * len(destinations)}
+
+    scraper._fetch_osrm_table = fake_table
+    table = scraper.get_table((48.1, -1.7), [(48.11, -1.69)] * 5)
+    assert batches == [2, 2, 1]
+    assert table["source"] == "osrm" and len(table["durations_seconds"]) == 5
+
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_bidirectional_astar_matches_dijkstra()
+    test_nearest_node_matches_brute_force()
+    test_route_shape_and_unreachable(pathlib.Path(tempfile.mkdtemp()))
+    test_build_graph_from_osm(pathlib.Path(tempfile.mkdtemp()))
+    test_route_scraper_prefers_local_graph()
+    test_route_detail_levels()
+    test_table_matches_shortest_paths()
+    test_table_osrm_chunks()
+    print("\n[OK] Tous les tests du routage local réussis !")
@@ -0,0 +1,62 @@
+"""Tests unitaires pour la matrice précalculée des temps de trajet entre lieux"""
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from backend.app.rennes_locations import (
+    LOCATION_COORDS, LOCATION_NAMES, RENNES_LOCATIONS, find_location_fuzzy, get_location_id,
+)
+from backend.app.tools.location_matrix import LocationMatrix
+
+
+class FakeTableScraper:
+    """get_table déterministe : durée = 100 s par km (à vol d'oiseau grossier)"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_table(self, origin, destinations):
+        self.calls += 1
+        if origin == LOCATION_COORDS[1]:
+            return {"success": False, "error": "OSRM indisponible"}
+        km = [abs(origin[0] - d[0]) * 111 + abs(origin[1] - d[1]) * 74 for d in destinations]
+        return {"success": True, "durations_seconds": [k * 100 for k in km], "distances_km": km}
+
+
+def test_canonical_location_ids():
+    """Les alias d'un même lieu partagent un identifiant ; une position GPS n'en a pas"""
+    print("\n[TEST] LocationMatrix - Identifiants canoniques")
+    assert len(LOCATION_COORDS) == len(set(RENNES_LOCATIONS.values()))
+    assert get_location_id(find_location_fuzzy("rennes 2")) == get_location_id(find_location_fuzzy("campus villejean"))
+    assert get_location_id(find_location_fuzzy("gare")) != get_location_id(find_location_fuzzy("rennes 2"))
+    assert LOCATION_NAMES[get_location_id(RENNES_LOCATIONS['centre ville'])] == 'rennes'
+    assert get_location_id((48.11111, -1.66666)) is None
+
+
+def test_build_lookup_and_persistence(tmp_path):
+    """Une requête de matrice par origine, lecture O(1), lignes en échec à NaN"""
+    scraper = FakeTableScraper()
+    matrix = LocationMatrix.build(scraper)
+    assert scraper.calls == len(LOCATION_COORDS)
+    assert matrix.durations.dtype == np.float32 and matrix.durations.shape == (len(LOCATION_COORDS),) * 2
+
+    path = str(tmp_path / "matrix.npz")
+    matrix.save(path)
+    matrix = LocationMatrix.load(path)
+
+    gare = get_location_id(RENNES_LOCATIONS['gare'])
+    rennes2 = get_location_id(RENNES_LOCATIONS['rennes 2'])
+    duration_s, distance_km = matrix.lookup(gare, rennes2)
+    assert abs(duration_s - distance_km * 100) < 1
+    assert matrix.lookup(gare, gare) == (0.0, 0.0)
+    assert matrix.lookup(1, gare) is None
+
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_canonical_location_ids()
+    test_build_lookup_and_persistence(pathlib.Path(tempfile.mkdtemp()))
+    print("\n[OK] Tous les tests de la matrice des lieux réussis !")
@@ -0,0 +1,129 @@
+"""Tests unitaires pour MCPSimulator (plusieurs demandes, exécution parallèle)"""
+import sys
+import os
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from backend.app.deadline import Deadline
+from backend.app.mcp_sim import DecisionCache, MCPSimulator
+
+
+class SlowExecutor:
+    """Remplace ToolExecutor : chaque outil attend `delay` secondes"""
+
+    def __init__(self, delay=0.2, failing=()):
+        self.delay = delay
+        self.failing = set(failing)
+        self.calls = []
+        self.threads = set()
+
+    def execute(self, tool_name, params, user_location=None, deadline=None):
+        self.calls.append((tool_name, params, user_location))
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        if tool_name in self.failing:
+            raise RuntimeError("service indisponible")
+        return {"success": True, "tool": tool_name}
+
+
+def test_single_intent():
+    """Une seule demande : résultat inchangé, exécution dans le thread appelant"""
+    print("\n[TEST] MCPSimulator - Une demande")
+    executor = SlowExecutor(delay=0)
+    mcp = MCPSimulator(executor=executor)
+    result = mcp.process_message("Quel est le prix du gazole à Rennes ?")
+    assert result["tool"] == "search_fuel_prices"
+    assert result["result"] == {"success": True, "tool": "search_fuel_prices"}
+    assert [intent["tool"] for intent in result["intents"]] == ["search_fuel_prices"]
+    assert executor.threads == {threading.current_thread().name}
+
+    result = mcp.process_message("bonjour")
+    assert result["tool"] is None and result["intents"] == []
+    print("  [OK] une demande")
+
+
+def test_multi_intent_concurrent():
+    """Plusieurs demandes : paramètres par outil, latence de l'outil le plus lent"""
+    print("\n[TEST] MCPSimulator - Plusieurs demandes en parallèle")
+    executor = SlowExecutor(delay=0.2)
+    mcp = MCPSimulator(executor=executor)
+    location = (48.1173, -1.6778)
+
+    start = time.perf_counter()
+    result = mcp.process_message("combien de temps pour aller à la gare et y a-t-il des parkings ?", location)
+    elapsed = time.perf_counter() - start
+
+    tools = [intent["tool"] for intent in result["intents"]]
+    assert tools == ["estimate_drive_time", "get_parking_status"]
+    assert result["tool"] == "estimate_drive_time"
+    assert result["intents"][0]["params"]["destination_name"] == "gare"
+    assert all(intent["result"] == {"success": True, "tool": intent["tool"]} for intent in result["intents"])
+    assert all(call[2] == location for call in executor.calls)
+    assert elapsed < 0.35, f"exécution séquentielle ? {elapsed:.2f} s"
+    print(f"  [OK] {tools} en {elapsed:.2f} s")
+
+
+def test_multi_intent_failure_isolated():
+    """L'échec d'un outil n'empêche pas les autres de répondre"""
+    print("\n[TEST] MCPSimulator - Échec isolé")
+    mcp = MCPSimulator(executor=SlowExecutor(delay=0, failing={"get_traffic_status"}))
+    result = mcp.process_message("trafic et parkings près de la gare")
+    by_tool = {intent["tool"]: intent["result"] for intent in result["intents"]}
+    assert by_tool["get_traffic_status"] == {"success": False, "error": "service indisponible"}
+    assert by_tool["get_parking_status"]["success"]
+    print("  [OK] échec isolé")
+
+
+def test_multi_intent_deadline():
+    """Échéance atteinte : la réponse n'attend pas l'outil le plus lent"""
+    print("\n[TEST] MCPSimulator - Échéance")
+    executor = SlowExecutor(delay=0.5)
+    mcp = MCPSimulator(executor=executor)
+    start = time.perf_counter()
+    result = mcp.process_message("trafic et parkings près de la gare", deadline=Deadline(0.1))
+    elapsed = time.perf_counter() - start
+    assert elapsed < 0.3, f"échéance ignorée ? {elapsed:.2f} s"
+    for intent in result["intents"]:
+        assert not intent["result"]["success"] and intent["result"]["degraded"]
+        assert intent["tool"] in intent["result"]["degraded_reasons"][0]
+    print(f"  [OK] réponse en {elapsed:.2f} s")
+
+
+def test_decision_cache():
+    """Message répété : détection / extraction sautées, exécution refaite"""
+    print("\n[TEST] MCPSimulator - Cache des décisions")
+    executor = SlowExecutor(delay=0)
+    mcp = MCPSimulator(executor=executor)
+    detections = []
+    detect_intents = mcp.detector.detect_intents
+    mcp.detector.detect_intents = lambda message: detections.append(message) or detect_intents(message)
+
+    first = mcp.process_message("Parking  gare ?")
+    second = mcp.process_message(" Parking gare ? ")
+    assert len(detections) == 1 and len(executor.calls) == 2
+    assert second["tool"] == first["tool"] == "get_parking_status"
+    second["params"]["limit"] = 99
+    assert mcp.process_message("Parking gare ?")["params"] == first["params"]
+
+    # Casse conservée dans la clé : l'extraction s'en sert (noms propres)
+    mcp.process_message("parking gare ?")
+    assert len(detections) == 2
+    assert mcp.decisions.metrics() == {"entries": 2, "max_entries": mcp.decisions.max_entries,
+                                       "hits": 2, "misses": 2, "hit_rate": 0.5}
+
+    cache = DecisionCache(max_entries=2)
+    for key in ("a", "b", "a", "c"):
+        cache.put(key, ())
+    assert cache.get("b") is None and cache.get("a") == () and cache.get("c") == ()
+    print("  [OK] décisions mises en cache")
+
+
+if __name__ == "__main__":
+    test_single_intent()
+    test_multi_intent_concurrent()
+    test_multi_intent_failure_isolated()
+    test_multi_intent_deadline()
+    test_decision_cache()
+    print("\n[OK] Tous les tests MCPSimulator réussis !")
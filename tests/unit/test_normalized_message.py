@@ -0,0 +1,71 @@
+"""Tests unitaires pour NormalizedMessage (normalisation partagée détection / extraction)"""
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from backend.app.normalized_message import NormalizedMessage, fold_text
+from backend.app.param_extractor import ParamExtractor
+from backend.app.rennes_districts import find_district, match_district
+from backend.app.tool_detector import ToolDetector
+
+MESSAGES = [
+    ("Quel est le prix du gazole à Rennes ?", "search_fuel_prices"),
+    ("Combien de temps pour aller de la Gare à Villejean demain à 8h ?", "estimate_drive_time"),
+    ("à quelle heure partir entre 7h et 9h pour aller au CHU ?", "find_best_departure_time"),
+    ("Y a-t-il des bouchons à Cesson-Sévigné ?", "get_traffic_status"),
+    ("Bouchons rue de Saint-Malo ?", "get_traffic_status"),
+    ("Quels parkings puis-je atteindre en 10 minutes depuis République ?", "get_reachable_places"),
+]
+
+
+def test_normalized_forms():
+    """Formes minuscule, sans accents et tokenisée calculées une fois"""
+    print("\n[TEST] NormalizedMessage - Formes normalisées")
+    message = NormalizedMessage("Où est l'Hôtel-Dieu ?")
+    assert message.original == "Où est l'Hôtel-Dieu ?"
+    assert message.lower == "où est l'hôtel-dieu ?"
+    assert message.plain == "ou est l'hotel-dieu ?"
+    assert [token.text for token in message.tokens] == ['ou', 'est', 'l', 'hotel', 'dieu']
+    assert message.words == "ou est l hotel dieu"
+    assert fold_text("Cesson-Sévigné") == "cesson-sevigne"
+    assert NormalizedMessage.of(message) is message
+    print(f"  [OK] {message.plain!r} -> {message.words!r}")
+
+
+def test_offsets_to_original():
+    """Une position dans la forme normalisée renvoie au texte brut (noms propres)"""
+    print("\n[TEST] NormalizedMessage - Correspondance des positions")
+    message = NormalizedMessage("Où est l'Hôtel-Dieu ?")
+    token = message.tokens[3]
+    assert message.original_span(token.start, token.end) == "Hôtel"
+    assert message.to_original(0, 2) == (0, 2)
+    assert message.to_original(len(message.plain), len(message.plain)) == (len(message.original),) * 2
+
+    # Accent combinant (e + U+0301) : la forme normalisée est plus courte
+    message = NormalizedMessage("parking Re\u0301publique ?")
+    assert message.plain == "parking republique ?"
+    start = message.plain.index("republique")
+    assert message.original_span(start, start + len("republique")) == "Re\u0301publique"
+    print("  [OK] positions normalisées -> texte brut")
+
+
+def test_shared_message_same_results():
+    """Détection et extraction identiques sur un texte brut ou un message normalisé"""
+    print("\n[TEST] NormalizedMessage - Détection / extraction partagées")
+    detector, extractor = ToolDetector(), ParamExtractor()
+    for text, expected in MESSAGES:
+        message = NormalizedMessage(text)
+        tool = detector.detect(message)
+        assert tool == detector.detect(text) == expected, f"{text!r} -> {tool}"
+        assert detector.detect_all(message) == detector.detect_all(text)
+        assert extractor.extract(message, tool) == extractor.extract(text, tool)
+        assert match_district(message.words) == find_district(text)
+        print(f"  [OK] '{text}' -> {tool}")
+
+
+if __name__ == "__main__":
+    test_normalized_forms()
+    test_offsets_to_original()
+    test_shared_message_same_results()
+    print("\n[OK] Tous les tests NormalizedMessage réussis !")
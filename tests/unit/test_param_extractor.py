@@ -1,6 +1,7 @@
 """Tests unitaires pour la classe ParamExtractor"""
 import sys
 import os
+import time
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
 
@@ -71,8 +72,55 @@ def test_extract_location():
         print(f"  {status} '{message}' -> {location}")
 
 
+def test_extract_place_grammar():
+    """Grammaire des lieux : articles et mots d'arrêt reconnus comme mots entiers"""
+    extractor = ParamExtractor()
+    
+    test_cases = [
+        ("de l'hôtel-dieu à la gare", "estimate_drive_time", "hôtel-dieu", "gare"),
+        ("combien de temps pour aller au Lannion ?", "estimate_drive_time", "ma position", "Lannion"),
+        ("aller à Rennes en voiture", "estimate_drive_time", "ma position", "Rennes"),
+        ("entre la gare et les Halles ?", "estimate_drive_time", "la gare", "Halles"),
+        ("aller à la gare depuis ma position", "estimate_drive_time", "ma position", "gare"),
+        ("parkings en 10 minutes depuis la gare ?", "get_reachable_places", "gare", None),
+    ]
+    
+    print("\n[TEST] ParamExtractor - Grammaire des lieux")
+    for message, tool, expected_origin, expected_dest in test_cases:
+        params = extractor.extract(message, tool)
+        origin, dest = params.get("origin_name"), params.get("destination_name")
+        status = "[OK]" if (origin, dest) == (expected_origin, expected_dest) else "[FAIL]"
+        print(f"  {status} '{message}' -> {origin} / {dest}")
+        assert (origin, dest) == (expected_origin, expected_dest)
+
+
+def test_extract_linear_time_worst_case():
+    """Messages longs pathologiques : pas de retour arrière catastrophique"""
+    extractor = ParamExtractor()
+    
+    # Quadratiques (plusieurs secondes) avec l'ancienne cascade d'expressions régulières
+    worst_cases = [
+        ("aller à " * 2000 + "ma position", "estimate_drive_time"),
+        ("entre " * 3000, "estimate_drive_time"),
+        ("entre 8h" + " " * 15000 + "x", "find_best_departure_time"),
+        ("depuis gare" + " " * 15000 + ";", "get_reachable_places"),
+        ("depuis a " * 2000 + ";", "get_reachable_places"),
+    ]
+    
+    print("\n[TEST] ParamExtractor - Pire cas (temps linéaire)")
+    for message, tool in worst_cases:
+        start = time.perf_counter()
+        extractor.extract(message, tool)
+        elapsed = time.perf_counter() - start
+        status = "[OK]" if elapsed < 0.5 else "[FAIL]"
+        print(f"  {status} {len(message)} caractères ({tool}) -> {elapsed * 1000:.1f} ms")
+        assert elapsed < 0.5, f"{tool}: {elapsed:.2f}s pour {len(message)} caractères"
+
+
 if __name__ == "__main__":
     test_extract_fuel_type()
     test_extract_drive_time_params()
     test_extract_location()
+    test_extract_place_grammar()
+    test_extract_linear_time_worst_case()
     print("\n[OK] Tous les tests ParamExtractor réussis !")
@@ -0,0 +1,58 @@
+"""Tests unitaires pour le décodage de polylines et la simplification"""
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from backend.app.tools.polyline import (
+    decode_polyline, decode_polyline_py, encode_polyline, simplify_coordinates,
+)
+from backend.app.tools.route_cache import RouteCache
+
+
+def test_decode_matches_reference():
+    """Le décodeur vectorisé donne exactement le résultat du décodeur Python"""
+    print("\n[TEST] Polyline - Décodage vectorisé")
+    # Exemple de la documentation Google (précision 5)
+    sample = "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+    assert decode_polyline(sample, precision=5).tolist() == [[-120.2, 38.5], [-120.95, 40.7], [-126.453, 43.252]]
+
+    rng = np.random.default_rng(3)
+    route = np.cumsum(rng.normal(0, 0.01, (300, 2)), axis=0) + [-1.6778, 48.1173]
+    encoded = encode_polyline(route)
+    decoded = decode_polyline(encoded)
+    assert decoded.flags.c_contiguous and decoded.shape == (300, 2)
+    assert np.array_equal(decoded, np.array(decode_polyline_py(encoded)))
+    assert np.abs(decoded - route).max() < 1e-6
+    assert decode_polyline("").shape == (0, 2)
+
+
+def test_simplify_tolerance():
+    """Douglas-Peucker : points alignés supprimés, écart borné par la tolérance (m)"""
+    line = np.column_stack((np.linspace(-1.70, -1.66, 50), np.full(50, 48.11)))
+    line[25, 1] += 0.001  # détour de ~110 m au milieu
+    simplified = simplify_coordinates(line, 15.0)
+    assert len(simplified) == 5
+    assert simplified[0].tolist() == line[0].tolist() and simplified[-1].tolist() == line[-1].tolist()
+    assert len(simplify_coordinates(line, 200.0)) == 2
+
+
+def test_cache_persists_array_geometry(tmp_path):
+    """Les géométries NumPy du cache sont sauvegardées en JSON"""
+    path = str(tmp_path / "routes.json")
+    cache = RouteCache(storage_path=path)
+    coords = decode_polyline(encode_polyline([[-1.67, 48.10], [-1.70, 48.12]]))
+    cache.get_or_compute("k", lambda: {"success": True, "coordinates": coords})
+    cache.save()
+    reloaded = RouteCache(storage_path=path).get_or_compute("k", lambda: {"success": False})
+    assert np.allclose(reloaded["coordinates"], coords)
+
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_decode_matches_reference()
+    test_simplify_tolerance()
+    test_cache_persists_array_geometry(pathlib.Path(tempfile.mkdtemp()))
+    print("\n[OK] Tous les tests polyline réussis !")
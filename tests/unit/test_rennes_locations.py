@@ -0,0 +1,57 @@
+"""Tests unitaires pour l'index des lieux de Rennes"""
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from backend.app.rennes_locations import (
+    RENNES_LOCATIONS, LOCATION_INDEX, LocationTrie, find_location_fuzzy, get_suggestions,
+    suggest_locations,
+)
+
+
+def test_find_location_variants():
+    """Recherche exacte, sans accents et avec fautes de frappe"""
+    print("\n[TEST] Lieux - Recherche exacte / normalisée / floue")
+    gare = RENNES_LOCATIONS['gare']
+    assert find_location_fuzzy('Gare') == gare
+    assert find_location_fuzzy('garr') == gare
+    assert find_location_fuzzy('universite rennes 2') == RENNES_LOCATIONS['université rennes 2']
+    assert find_location_fuzzy('republique') == RENNES_LOCATIONS['république']
+    assert find_location_fuzzy('zzzzzz') is None
+
+
+def test_suggestions():
+    """Sous-chaînes d'abord, puis correspondances approchées"""
+    print("\n[TEST] Lieux - Suggestions")
+    suggestions = get_suggestions('parlem')
+    assert {'parlement', 'place du parlement'} <= set(suggestions)
+    assert LOCATION_INDEX.containing('ga') == [k for k in RENNES_LOCATIONS if 'ga' in k]
+    assert 'gare' in get_suggestions('garre')
+    assert get_suggestions('qqqqqq')  # lieux populaires par défaut
+
+
+def test_prefix_autocomplete():
+    """Autocomplétion : préfixe de n'importe quel mot, un alias par lieu, populaires d'abord"""
+    print("\n[TEST] Lieux - Autocomplétion par préfixe")
+    assert [s["name"] for s in suggest_locations("Univ")] == ['université rennes 1', 'université rennes 2']
+    assert [s["name"] for s in suggest_locations("repu")] == ['république']
+    assert suggest_locations("lices")[0]["name"] in ('lices', 'place des lices')
+    assert suggest_locations("gare")[0] == {"name": "gare", "latitude": 48.1039, "longitude": -1.6720}
+    assert suggest_locations("") == [] and suggest_locations("zzz") == []
+
+    trie = LocationTrie({'gare': (48.1039, -1.6720), 'gare sncf': (48.1039, -1.6720),
+                         'garenne': (48.0, -1.0), 'saint malo': (48.65, -2.03)},
+                        popular=['saint malo'], top_k=2)
+    assert trie.suggest("") == []
+    assert trie.suggest("ga") == ['gare', 'garenne']  # alias 'gare sncf' regroupé
+    assert trie.suggest("gare ") == ['gare sncf']
+    assert trie.suggest("ma") == ['saint malo']
+    assert trie.suggest("", limit=1) == [] and trie.suggest("g", limit=1) == ['gare']
+
+
+if __name__ == "__main__":
+    test_find_location_variants()
+    test_suggestions()
+    test_prefix_autocomplete()
+    print("\n[OK] Tous les tests lieux réussis !")
@@ -0,0 +1,74 @@
+"""Tests unitaires pour le géocodage inverse local"""
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from backend.app.gazetteer import Gazetteer
+from backend.app.reverse_geocoder import GridIndex, ReverseGeocoder, M_PER_DEG, lookup_district, reverse_lookup
+from backend.app.rennes_locations import LOCATION_COORDS, LOCATION_NAMES
+from backend.app.tools.traffic_scraper import TrafficScraper
+
+
+def test_grid_nearest_matches_brute_force():
+    """Le plus proche voisin par grille égale la recherche exhaustive"""
+    print("\n[TEST] Géocodage inverse - Plus proche voisin")
+    rng = np.random.default_rng(1)
+    lats = 48.11 + rng.normal(0, 0.05, 2000)
+    lons = -1.68 + rng.normal(0, 0.08, 2000)
+    grid = GridIndex(lats, lons, cell_deg=0.005)
+
+    for lat, lon in zip(48.11 + rng.normal(0, 0.06, 200), -1.68 + rng.normal(0, 0.09, 200)):
+        dist = np.hypot((lons - lon) * np.cos(np.radians(lat)), lats - lat) * M_PER_DEG
+        found = grid.nearest(lat, lon, max_m=5000)
+        if dist.min() > 5000:
+            assert found is None
+            continue
+        idx, distance_m = found
+        assert abs(distance_m - dist.min()) < 1e-6 and dist[idx] == dist.min()
+
+    assert grid.nearest(47.0, -3.0, max_m=1000) is None
+    assert GridIndex([], []).nearest(48.11, -1.68, 1000) is None
+
+
+def test_lookup_place_district_and_address():
+    """Lieu connu + quartier, puis adresse exacte quand un gazetteer est chargé"""
+    print("\n[TEST] Géocodage inverse - Lieu, adresse, quartier")
+    near_gare = reverse_lookup(48.1040, -1.6722)
+    assert near_gare["place"] == "gare" and near_gare["district"] == "Sud-Gare"
+    assert near_gare["label"] == "près de gare (Sud-Gare)"
+
+    outside = reverse_lookup(47.0, -3.0)
+    assert outside["place"] is None and outside["district"] is None
+    assert outside["label"] == "47.00000, -3.00000"
+    assert lookup_district(48.1040, -1.6722) == "Sud-Gare" and lookup_district(47.0, -3.0) is None
+
+    gazetteer = Gazetteer.from_streets({
+        ("rue de la paix rennes", "Rue de la Paix, 35000 Rennes"): [(1, 48.1110, -1.6790), (12, 48.1120, -1.6800)],
+    })
+    geocoder = ReverseGeocoder(LOCATION_COORDS, LOCATION_NAMES, gazetteer)
+    result = geocoder.lookup(48.11195, -1.68005)
+    assert result["address"] == "12 Rue de la Paix, 35000 Rennes"
+    assert result["label"] == "12 Rue de la Paix, 35000 Rennes (Centre)"
+    assert geocoder.lookup(48.1040, -1.6722)["address"] is None  # adresse trop éloignée
+
+
+def test_traffic_labels_use_local_district(monkeypatch):
+    """Trafic : quartier local même sans réponse Nominatim"""
+    print("\n[TEST] Géocodage inverse - Libellés trafic")
+    scraper = TrafficScraper()
+    monkeypatch.setattr(scraper, "fetch_snapshot", lambda deadline=None: {
+        "segments": [{"troncon": "Boulevard Solférino", "lat": 48.1040, "lon": -1.6722, "status": "congestion"}],
+        "total_monitored": 1,
+    })
+    monkeypatch.setattr(scraper, "_reverse_geocode", lambda lat, lon, timeout=5: {})
+    road = scraper.get_traffic_status()["roads"][0]
+    assert road["street"] == "Boulevard Solférino" and road["area"] == "Sud-Gare"
+
+
+if __name__ == "__main__":
+    test_grid_nearest_matches_brute_force()
+    test_lookup_place_district_and_address()
+    print("\n[OK] Tous les tests de géocodage inverse réussis !")
@@ -0,0 +1,171 @@
+"""Tests unitaires pour le cache d'itinéraires"""
+import sys
+import os
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from backend.app.tools.route_cache import RouteCache
+from backend.app.tools.route_scraper import RouteScraper
+
+
+GARE = (48.1039, -1.6720)
+RENNES_2 = (48.1238, -1.7080)
+
+
+def _route(**extra):
+    return {"success": True, "distance_km": 4.1, "duration_seconds": 600, "duration_minutes": 10.0,
+            "coordinates": [[-1.672, 48.1039], [-1.708, 48.1238]], **extra}
+
+
+def test_grid_snapping():
+    """Deux positions distantes de quelques mètres partagent la même clé"""
+    cache = RouteCache(grid_deg=0.001)
+    print("\n[TEST] RouteCache - Grid snapping")
+    assert cache.key_for(GARE, RENNES_2) == cache.key_for((48.10392, -1.67198), (48.12381, -1.70803))
+    assert cache.key_for(GARE, RENNES_2) != cache.key_for(RENNES_2, GARE)
+
+
+def test_hit_miss_and_ttl():
+    """Test des succès/échecs de cache et de l'expiration"""
+    cache = RouteCache(ttl_s=0.05)
+    calls = []
+    compute = lambda: calls.append(1) or _route()
+
+    cache.get_or_compute("k", compute)
+    cache.get_or_compute("k", compute)
+    assert len(calls) == 1
+    time.sleep(0.06)
+    cache.get_or_compute("k", compute)
+    assert len(calls) == 2
+
+    metrics = cache.metrics()
+    print("\n[TEST] RouteCache - Metrics")
+    print(f"  {metrics}")
+    assert metrics["hits"] == 1 and metrics["misses"] == 2
+
+
+def test_errors_not_cached_and_lru_eviction():
+    """Les erreurs OSRM ne sont pas conservées, les entrées anciennes sont évincées"""
+    cache = RouteCache(max_entries=2)
+    cache.get_or_compute("err", lambda: {"success": False, "error": "Timeout OSRM"})
+    assert cache.metrics()["entries"] == 0
+
+    for key in ("a", "b", "c"):
+        cache.get_or_compute(key, _route)
+    calls = []
+    cache.get_or_compute("a", lambda: calls.append(1) or _route())
+    assert calls == [1]  # "a" a été évincé
+
+
+def test_single_flight():
+    """Les appels concurrents sur une même clé partagent un seul calcul"""
+    cache = RouteCache()
+    calls = []
+    release = threading.Event()
+
+    def slow_compute():
+        calls.append(1)
+        release.wait(1)
+        return _route()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", slow_compute))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+
+    print("\n[TEST] RouteCache - Single flight")
+    assert len(calls) == 1
+    assert len(results) == 5
+    assert cache.metrics()["coalesced"] == 4
+
+
+def test_persistence(tmp_path):
+    """Le cache survit à un redémarrage"""
+    path = str(tmp_path / "routes.json")
+    cache = RouteCache(storage_path=path)
+    cache.get_or_compute("k", _route)
+    cache.save()
+
+    reloaded = RouteCache(storage_path=path)
+    route = reloaded.get_or_compute("k", lambda: {"success": False})
+    assert route["success"]
+    # Même type qu'un résultat frais : tableau NumPy (n, 2) en lecture seule
+    assert isinstance(route["coordinates"], np.ndarray) and route["coordinates"].shape == (2, 2)
+    assert not route["coordinates"].flags.writeable
+    assert reloaded._entries["k"][0] == cache._entries["k"][0]  # Expiration d'origine conservée
+
+
+def test_route_scraper_uses_cache():
+    """RouteScraper ne rappelle pas OSRM pour un trajet déjà calculé"""
+    scraper = RouteScraper(cache=RouteCache())
+    calls = []
+    scraper._fetch_route = lambda o, d, detail, deadline=None: calls.append(1) or _route(origin=o, destination=d)
+
+    scraper.get_route(GARE, RENNES_2)
+    second = scraper.get_route((48.10391, -1.67201), RENNES_2)
+    assert len(calls) == 1
+    assert second["origin"] == (48.10391, -1.67201)
+
+
+def test_detail_levels_cached_separately(monkeypatch):
+    """Chaque niveau de détail a sa requête OSRM et son entrée de cache"""
+    scraper = RouteScraper(cache=RouteCache(), backend="osrm")
+    requested = []
+
+    class FakeResponse:
+        def __init__(self, params):
+            self.params = params
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            route = {"distance": 4100, "duration": 600}
+            if self.params["overview"] != "false":
+                route["geometry"] = "_ibE_ibE_ibE_ibE"
+            if "annotations" in self.params:
+                route["legs"] = [{"annotation": {"duration": [600], "distance": [4100]}}]
+            return {"code": "Ok", "routes": [route]}
+
+    def fake_get(url, params, timeout):
+        requested.append(params)
+        return FakeResponse(params)
+
+    monkeypatch.setattr("backend.app.tools.route_scraper.http_client.get", fake_get)
+    print("\n[TEST] RouteScraper - Niveaux de détail")
+
+    summary = scraper.get_route(GARE, RENNES_2, detail="summary")
+    assert requested[-1]["overview"] == "false" and "annotations" not in requested[-1]
+    assert len(summary["coordinates"]) == 0 and summary["duration_minutes"] == 10.0
+
+    full = scraper.get_route(GARE, RENNES_2, detail="full")
+    assert requested[-1]["overview"] == "full" and requested[-1]["geometries"] == "polyline6"
+    assert full["annotations"]["duration"] == [600] and len(full["coordinates"]) == 2
+
+    scraper.get_route(GARE, RENNES_2, detail="summary")
+    assert len(requested) == 2
+
+    try:
+        scraper.get_route(GARE, RENNES_2, detail="minimal")
+        assert False, "niveau inconnu accepté"
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_grid_snapping()
+    test_hit_miss_and_ttl()
+    test_errors_not_cached_and_lru_eviction()
+    test_single_flight()
+    test_persistence(pathlib.Path(tempfile.mkdtemp()))
+    test_route_scraper_uses_cache()
+    print("\n[OK] Tous les tests du cache d'itinéraires réussis !")
@@ -0,0 +1,117 @@
+"""Tests unitaires pour SingleFlight et le regroupement des appels d'outils"""
+import sys
+import os
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from backend.app.deadline import Deadline
+from backend.app.singleflight import SingleFlight
+from backend.app.tool_executor import ToolExecutor
+
+
+def _run_concurrently(target, count=5):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(target())) for _ in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_single_flight_shares_result():
+    """Appels simultanés sur une clé : une exécution, résultat partagé"""
+    print("\n[TEST] SingleFlight - Résultat partagé")
+    flight = SingleFlight()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"success": True}
+
+    results = _run_concurrently(lambda: flight.do("k", slow))
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert all(result == {"success": True} for result, _ in results)
+    assert flight.metrics() == {"in_flight": 0, "executions": 1, "coalesced": 4, "coalesced_rate": 0.8}
+
+    # Calcul terminé : rien n'est conservé
+    flight.do("k", slow)
+    assert len(calls) == 2
+    print("  [OK] 1 exécution pour 5 appels")
+
+
+def test_single_flight_errors_and_timeout():
+    """L'exception atteint tous les appelants ; un appelant pressé abandonne l'attente"""
+    print("\n[TEST] SingleFlight - Erreurs et délai d'attente")
+    flight = SingleFlight()
+
+    def failing():
+        time.sleep(0.1)
+        raise ValueError("amont indisponible")
+
+    def call():
+        try:
+            flight.do("k", failing)
+        except ValueError as e:
+            return str(e)
+
+    assert _run_concurrently(call, 3) == ["amont indisponible"] * 3
+
+    release = threading.Event()
+    leader = threading.Thread(target=lambda: flight.do("slow", lambda: release.wait(1)))
+    leader.start()
+    time.sleep(0.02)
+    try:
+        flight.do("slow", lambda: None, timeout=0.05)
+        assert False, "attente non bornée"
+    except TimeoutError:
+        pass
+    release.set()
+    leader.join()
+    print("  [OK] erreurs propagées, attente bornée")
+
+
+def test_tool_executor_coalesces_identical_calls():
+    """ToolExecutor : mêmes outil, paramètres et position arrondie -> un appel amont"""
+    print("\n[TEST] SingleFlight - Regroupement des outils")
+    executor = ToolExecutor()
+    calls = []
+
+    def fake_parking(params, user_location=None, deadline=None):
+        calls.append(user_location)
+        time.sleep(0.1)
+        return {"success": True, "parkings": []}
+
+    executor.tools["get_parking_status"] = fake_parking
+    results = _run_concurrently(
+        lambda: executor.execute("get_parking_status", {"ville": "Rennes"}, (48.11731, -1.67781))
+    )
+    assert len(calls) == 1 and len(results) == 5
+    assert all(result == {"success": True, "parkings": []} for result in results)
+    assert len({id(result) for result in results}) == 5
+
+    key = ToolExecutor.call_key
+    assert key("t", {"a": 1, "b": 2}, (48.11731, -1.67781)) == key("t", {"b": 2, "a": 1}, (48.11734, -1.67779))
+    assert key("t", {"a": 1}, (48.1173, -1.6778)) != key("t", {"a": 1}, (48.1190, -1.6778))
+    assert key("t", {"a": 1}) != key("u", {"a": 1})
+
+    # Appel rejoint au-delà de l'échéance : réponse dégradée sans attendre
+    executor.tools["get_parking_status"] = lambda params, user_location=None, deadline=None: time.sleep(0.3) or {}
+    leader = threading.Thread(target=lambda: executor.execute("get_parking_status", {}))
+    leader.start()
+    time.sleep(0.02)
+    late = executor.execute("get_parking_status", {}, deadline=Deadline(0.05))
+    leader.join()
+    assert late["degraded"] and not late["success"]
+    print("  [OK] 5 appels, 1 exécution")
+
+
+if __name__ == "__main__":
+    test_single_flight_shares_result()
+    test_single_flight_errors_and_timeout()
+    test_tool_executor_coalesces_identical_calls()
+    print("\n[OK] Tous les tests SingleFlight réussis !")
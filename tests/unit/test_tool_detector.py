@@ -4,6 +4,7 @@ import os
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
 
+from backend.app.keyword_matcher import KeywordMatcher
 from backend.app.tool_detector import ToolDetector
 
 
@@ -33,6 +34,7 @@ def test_detect_drive_time_query():
         ("combien de temps pour aller à la gare ?", "estimate_drive_time"),
         ("de la gare à rennes 2", "estimate_drive_time"),
         ("combien de temps en partant de ma position ?", "estimate_drive_time"),
+        ("à quelle heure partir pour aller au chu ?", "find_best_departure_time"),
     ]
     
     print("\n[TEST] ToolDetector - Drive time queries")
@@ -77,9 +79,133 @@ def test_detect_parking_query():
         assert result == expected, f"Expected {expected}, got {result}"
 
 
+def test_detect_reachable_query():
+    """Test de détection des requêtes d'isochrone ("en N minutes")"""
+    detector = ToolDetector()
+    
+    test_cases = [
+        ("quels parkings puis-je atteindre en 10 minutes ?", "get_reachable_places"),
+        ("stations essence à moins de 15 min de la gare", "get_reachable_places"),
+        ("prix du gazole", "search_fuel_prices"),
+        ("où sont les parkings ?", "get_parking_status"),
+    ]
+    
+    print("\n[TEST] ToolDetector - Reachable places queries")
+    for message, expected in test_cases:
+        result = detector.detect(message)
+        status = "[OK]" if result == expected else "[FAIL]"
+        print(f"  {status} '{message}' -> {result}")
+        assert result == expected, f"Expected {expected}, got {result}"
+
+
+def test_keyword_word_boundaries():
+    """Mots-clés sur frontières de mots : plus de correspondances accidentelles"""
+    detector = ToolDetector()
+    
+    test_cases = [
+        ("où stationner près de la gare ?", "get_parking_status"),  # 'station' dans 'stationner'
+        ("la ruelle est bloquée ?", None),  # 'rue' dans 'ruelle'
+        ("accidents sur la rocade ?", "get_traffic_status"),
+        ("essence la moins chère", "get_cheapest_station"),
+    ]
+    
+    print("\n[TEST] ToolDetector - Frontières de mots")
+    for message, expected in test_cases:
+        result = detector.detect(message)
+        status = "[OK]" if result == expected else "[FAIL]"
+        print(f"  {status} '{message}' -> {result}")
+        assert result == expected, f"Expected {expected}, got {result}"
+
+
+def test_word_boundaries_regressions():
+    """Messages que la recherche par sous-chaîne routait déjà correctement"""
+    detector = ToolDetector()
+    
+    test_cases = [
+        ("trajet entre Cleunay et Bruz", "estimate_drive_time"),
+        ("distance entre Bruz et Betton", "estimate_drive_time"),
+        ("trajet entre le CHU et la place des Lices", "estimate_drive_time"),
+        ("entre la gare et rennes 2", "estimate_drive_time"),
+        ("pour aller au CHU ?", "estimate_drive_time"),
+        ("combien de minutes pour aller au Colombier ?", "estimate_drive_time"),
+        ("temps pour rejoindre la rocade depuis le centre", "estimate_drive_time"),
+        ("ça bouchonne à la gare ?", "get_traffic_status"),
+        ("est-ce que ça bouchonne porte de Saint-Malo ?", "get_traffic_status"),
+        ("quelles rues sont saturées en ce moment ?", "get_traffic_status"),
+        ("bouchons entre 7h et 9h ?", "get_traffic_status"),
+        ("parkings entre la gare et le centre", "get_parking_status"),
+    ]
+    
+    print("\n[TEST] ToolDetector - Régressions des frontières de mots")
+    for message, expected in test_cases:
+        result = detector.detect(message)
+        status = "[OK]" if result == expected else "[FAIL]"
+        print(f"  {status} '{message}' -> {result}")
+        assert result == expected, f"Expected {expected}, got {result}"
+
+
+def test_keyword_matcher_positions():
+    """Automate d'Aho-Corasick : toutes les occurrences, chevauchantes, avec positions"""
+    print("\n[TEST] KeywordMatcher - Occurrences et positions")
+    matcher = KeywordMatcher({'a': ['temps', 'temps de trajet', 'de'], 'b': ['trajet', 'km']})
+    text = "temps de trajets 10km"
+    found = [(m.category, m.keyword, text[m.start:m.end]) for m in matcher.find_all(text)]
+    assert found == [
+        ('a', 'temps', 'temps'), ('a', 'de', 'de'),
+        ('a', 'temps de trajet', 'temps de trajets'), ('b', 'trajet', 'trajets'), ('b', 'km', 'km'),
+    ]
+    assert matcher.categories("detrajet") == set()
+    
+    # Radical ("bouchon*") : toute fin de mot, jamais au milieu d'un mot
+    matcher = KeywordMatcher({'traffic': ['bouchon*']})
+    text = "ca bouchonne, des bouchons, debouchonner"
+    assert [text[m.start:m.end] for m in matcher.find_all(text)] == ['bouchonne', 'bouchons']
+    
+    detected = ToolDetector().detect_all("Combien de temps pour aller à la gare ?")
+    assert {'drive', 'drive_only', 'drive_anchor'} <= set(detected)
+    assert [(m.start, m.end) for m in detected['drive_only']] == [(0, 16), (22, 29)]
+
+
+
+def test_detect_intents():
+    """Plusieurs demandes dans un message, une seule par famille d'outils"""
+    detector = ToolDetector()
+    
+    test_cases = [
+        ("trafic et parkings près de la gare", ["get_traffic_status", "get_parking_status"]),
+        ("combien de temps pour aller à la gare et y a-t-il des places de parking ?",
+         ["estimate_drive_time", "get_parking_status"]),
+        ("compare le gazole et le sp95", ["compare_fuel_prices"]),
+        ("entre 7h et 9h, quand partir pour la gare ?", ["find_best_departure_time"]),
+        ("quel est le prix du gazole ?", ["search_fuel_prices"]),
+        ("bonjour et merci", []),
+    ]
+    
+    print("\n[TEST] ToolDetector - Plusieurs demandes")
+    for message, expected in test_cases:
+        intents = detector.detect_intents(message)
+        result = [tool for tool, _ in intents]
+        status = "[OK]" if result == expected else "[FAIL]"
+        print(f"  {status} '{message}' -> {result}")
+        assert result == expected, f"Expected {expected}, got {result}"
+        assert result[:1] == [t for t in [detector.detect(message)] if t]
+    
+    # Chaque demande garde les propositions qui ne relèvent pas d'une autre
+    intents = dict(detector.detect_intents("Bouchons à Villejean et parkings près de la Gare ?"))
+    assert intents["get_traffic_status"].original == "Bouchons à Villejean"
+    assert intents["get_parking_status"].original == "parkings près de la Gare"
+    intents = dict(detector.detect_intents("entre 7h et 9h quand partir pour la gare ; et le prix du gazole"))
+    assert intents["find_best_departure_time"].original == "entre 7h et 9h quand partir pour la gare"
+
+
 if __name__ == "__main__":
     test_detect_fuel_query()
     test_detect_drive_time_query()
     test_detect_traffic_query()
     test_detect_parking_query()
+    test_detect_reachable_query()
+    test_keyword_word_boundaries()
+    test_word_boundaries_regressions()
+    test_keyword_matcher_positions()
+    test_detect_intents()
     print("\n[OK] Tous les tests ToolDetector réussis !")
@@ -0,0 +1,58 @@
+"""Tests unitaires pour le diff d'instantanés et le flux de changements de trafic"""
+import sys
+import os
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from backend.app.tools.traffic_scraper import TrafficScraper
+from backend.app.tools.traffic_changes import TrafficChangeFeed
+
+
+def _snapshot(**statuses):
+    return {
+        "timestamp": datetime(2026, 1, 5, 8, 0),
+        "segments": [
+            {"id": seg_id, "troncon": seg_id.capitalize(), "lat": 48.11, "lon": -1.67, "status": status}
+            for seg_id, status in statuses.items()
+        ],
+        "total_monitored": len(statuses),
+    }
+
+
+def test_diff_snapshots():
+    """Test des transitions détectées entre deux instantanés"""
+    before = _snapshot(rocade="fluide", verdun="congestion", brest="denso", lorient="fluide")
+    after = _snapshot(rocade="incident", verdun="fluide", lorient="fluide", nantes="denso")
+
+    changes = TrafficScraper.diff_snapshots(before, after)
+    by_segment = {c["segment_id"]: c for c in changes}
+
+    print("\n[TEST] TrafficScraper - diff_snapshots")
+    for c in changes:
+        print(f"  {c['type']}: {c['street']} {c['from']} -> {c['to']}")
+    assert by_segment["rocade"]["type"] == "new_incident"
+    assert by_segment["verdun"]["type"] == "status_change"
+    assert by_segment["verdun"]["to"] == "fluide"
+    assert by_segment["brest"]["type"] == "segment_cleared"
+    assert "lorient" not in by_segment  # inchangé
+    assert "nantes" not in by_segment  # nouveau tronçon sans incident
+
+
+def test_change_feed_sequence():
+    """Les changements sont numérotés et relus à partir d'un identifiant"""
+    feed = TrafficChangeFeed()
+    assert feed.ingest_snapshot(_snapshot(rocade="fluide")) == 0  # référence
+    assert feed.ingest_snapshot(_snapshot(rocade="congestion")) == 1
+    assert feed.ingest_snapshot(_snapshot(rocade="incident")) == 1
+
+    print("\n[TEST] TrafficChangeFeed - events_since")
+    assert [e["id"] for e in feed.events_since(0)] == [1, 2]
+    assert [e["to"] for e in feed.events_since(1)] == ["incident"]
+    assert feed.events_since(feed.last_id) == []
+
+
+if __name__ == "__main__":
+    test_diff_snapshots()
+    test_change_feed_sequence()
+    print("\n[OK] Tous les tests du flux de trafic réussis !")
@@ -0,0 +1,73 @@
+"""Tests unitaires pour l'index des quartiers et les agrégats de trafic par secteur"""
+import sys
+import os
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from backend.app.rennes_districts import DistrictIndex, find_district
+from backend.app.tools.traffic_districts import TrafficDistrictAggregator
+
+
+def test_locate_district():
+    """Test du rattachement d'une coordonnée à un secteur"""
+    index = DistrictIndex.from_centers()
+    print("\n[TEST] DistrictIndex - locate")
+    assert index.locate(48.1238, -1.7080) == "Villejean - Beauregard"
+    assert index.locate(48.0250, -1.7500) == "Bruz"
+    assert index.locate(47.2184, -1.5536) is None  # Nantes, hors métropole
+
+    located = index.locate_many([48.1238, 47.2184], [-1.7080, -1.5536])
+    assert located[0] == index.names.index("Villejean - Beauregard")
+    assert located[1] == -1
+
+
+def test_find_district():
+    """Test de la détection d'un secteur dans un message"""
+    test_cases = [
+        ("Comment est la circulation à Villejean ?", "Villejean - Beauregard"),
+        ("trafic vers Cesson-Sévigné", "Cesson-Sévigné"),
+        ("bouchons au Blosne", "Le Blosne"),
+        ("quel est le trafic ?", None),
+    ]
+    print("\n[TEST] find_district")
+    for message, expected in test_cases:
+        result = find_district(message)
+        print(f"  '{message}' -> {result}")
+        assert result == expected
+
+
+def test_aggregate_snapshot_per_district():
+    """Les comptes et pires tronçons sont précalculés à l'ingestion"""
+    aggregator = TrafficDistrictAggregator(DistrictIndex.from_centers())
+    snapshot = {
+        "timestamp": datetime.now(),
+        "segments": [
+            {"id": "a", "troncon": "Bd de Verdun", "lat": 48.1240, "lon": -1.7070, "status": "fluide"},
+            {"id": "b", "troncon": "Rue de Saint-Malo", "lat": 48.1260, "lon": -1.7060, "status": "congestion"},
+            {"id": "c", "troncon": "Av. Winston Churchill", "lat": 48.1275, "lon": -1.7075, "status": "incident"},
+            {"id": "d", "troncon": "Route de Lorient", "lat": 48.0250, "lon": -1.7500, "status": "denso"},
+            {"id": "e", "troncon": "Sans position", "lat": None, "lon": None, "status": "incident"},
+        ],
+        "total_monitored": 5,
+    }
+    aggregator.ingest_snapshot(snapshot)
+
+    result = aggregator.get_district_status("Villejean - Beauregard")
+    print("\n[TEST] TrafficDistrictAggregator")
+    print(f"  {result['summary']}")
+    assert result["success"]
+    assert result["counts"] == {"fluide": 1, "denso": 0, "congestion": 1, "incident": 1}
+    assert [r["street"] for r in result["roads"]] == ["Av. Winston Churchill", "Rue de Saint-Malo"]
+    assert result["roads"][0]["priority"] == "critique"
+
+    calm = aggregator.get_district_status("Pacé")
+    assert calm["success"] and calm["roads"] == []
+    assert aggregator.is_fresh(60)
+
+
+if __name__ == "__main__":
+    test_locate_district()
+    test_find_district()
+    test_aggregate_snapshot_per_district()
+    print("\n[OK] Tous les tests d'agrégats par quartier réussis !")
@@ -0,0 +1,185 @@
+"""Tests unitaires pour l'historique du trafic et les prévisions de temps de trajet"""
+import sys
+import os
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from backend.app.tools.traffic_history import TrafficHistory, bucket_of, BUCKETS_PER_WEEK
+from backend.app.tools.drive_time_estimator import DriveTimeEstimator
+from backend.app.tool_executor import ToolExecutor
+
+
+MONDAY_8AM = datetime(2026, 1, 5, 8, 0)
+
+
+def _snapshot(moment, status, lat=48.1100, lon=-1.6700):
+    return {
+        "timestamp": moment,
+        "segments": [
+            {"id": "rocade@1", "troncon": "Rocade Nord", "lat": lat, "lon": lon, "status": status},
+        ],
+        "total_monitored": 1,
+    }
+
+
+def _fake_route(origin, destination, detail="full", deadline=None):
+    # Ligne droite est-ouest passant par le tronçon "Rocade Nord"
+    return {
+        "success": True,
+        "distance_km": 3.0,
+        "duration_seconds": 600,
+        "duration_minutes": 10.0,
+        "coordinates": [[-1.6900, 48.1100], [-1.6720, 48.1100], [-1.6680, 48.1100], [-1.6500, 48.1100]],
+        "origin": origin,
+        "destination": destination,
+    }
+
+
+def test_bucket_of():
+    """Test du calcul des tranches de 15 minutes"""
+    print("\n[TEST] TrafficHistory - Buckets")
+    assert bucket_of(datetime(2026, 1, 5, 0, 0)) == 0  # lundi minuit
+    assert bucket_of(datetime(2026, 1, 5, 8, 14)) == 32
+    assert bucket_of(datetime(2026, 1, 11, 23, 59)) == BUCKETS_PER_WEEK - 1  # dimanche soir
+
+
+def test_record_snapshot_probabilities():
+    """Test de l'agrégation des instantanés en probabilités par statut"""
+    history = TrafficHistory(capacity=8, min_record_interval_s=0)
+    for week, status in enumerate(["congestion", "congestion", "fluide", "denso"]):
+        history.record_snapshot(_snapshot(MONDAY_8AM + timedelta(weeks=week), status))
+
+    probas, samples = history.status_probabilities([bucket_of(MONDAY_8AM)])
+    print("\n[TEST] TrafficHistory - Probabilities")
+    print(f"  probas={probas[0, 0]}, samples={samples[0, 0]}")
+    assert history.size == 1
+    assert samples[0, 0] == 4
+    assert abs(probas[0, 0, 2] - 0.5) < 1e-6  # congestion 2/4
+
+
+def test_record_snapshot_rate_limit():
+    """Deux instantanés trop rapprochés ne comptent qu'une fois"""
+    history = TrafficHistory(capacity=8, min_record_interval_s=300)
+    assert history.record_snapshot(_snapshot(MONDAY_8AM, "congestion")) == 1
+    assert history.record_snapshot(_snapshot(MONDAY_8AM + timedelta(minutes=1), "congestion")) == 0
+    _, samples = history.status_probabilities([bucket_of(MONDAY_8AM)])
+    assert samples[0, 0] == 1
+
+
+def test_history_save_load(tmp_path):
+    """Test de la persistance des profils"""
+    path = str(tmp_path / "history.npz")
+    history = TrafficHistory(capacity=8, storage_path=path, min_record_interval_s=0)
+    history.record_snapshot(_snapshot(MONDAY_8AM, "incident"))
+    history.save()
+
+    reloaded = TrafficHistory(capacity=8, storage_path=path)
+    probas, _ = reloaded.status_probabilities([bucket_of(MONDAY_8AM)])
+    assert reloaded.size == 1
+    assert probas[0, 0, 3] == 1.0
+
+
+def test_predict_drive_time_from_history():
+    """La prévision applique le multiplicateur du tronçon longé par l'itinéraire"""
+    history = TrafficHistory(capacity=8, min_record_interval_s=0)
+    history.record_snapshot(_snapshot(MONDAY_8AM, "congestion"))
+
+    estimator = DriveTimeEstimator(traffic_history=history)
+    estimator.route_scraper.get_route = _fake_route
+
+    rush = estimator.estimate_drive_time((48.11, -1.69), (48.11, -1.65), departure_time=MONDAY_8AM)
+    night = estimator.estimate_drive_time((48.11, -1.69), (48.11, -1.65), departure_time=MONDAY_8AM.replace(hour=3))
+
+    print("\n[TEST] DriveTimeEstimator - Prediction")
+    print(f"  8h: {rush['duration_estimated_minutes']} min, 3h: {night['duration_estimated_minutes']} min")
+    assert rush["success"] and night["success"]
+    assert rush["duration_estimated_minutes"] > rush["duration_base_minutes"]
+    assert rush["affected_roads"][0]["street"] == "Rocade Nord"
+    assert night["duration_estimated_minutes"] == night["duration_base_minutes"]
+    assert "warning" in night
+
+
+def test_route_segments_split_long_edge():
+    """Une arête longue est répartie entre tous les tronçons qu'elle longe"""
+    history = TrafficHistory(capacity=8, min_record_interval_s=0)
+    history.record_snapshot({
+        "timestamp": MONDAY_8AM,
+        "segments": [
+            {"id": "ouest@1", "troncon": "Ouest", "lat": 48.1100, "lon": -1.6850, "status": "congestion"},
+            {"id": "est@1", "troncon": "Est", "lat": 48.1100, "lon": -1.6550, "status": "congestion"},
+        ],
+        "total_monitored": 2,
+    })
+    estimator = DriveTimeEstimator(traffic_history=history)
+
+    # Une seule arête de ~3 km : son milieu est à plus de 1 km des deux tronçons
+    rows, shares = estimator._route_segments([[-1.6900, 48.1100], [-1.6500, 48.1100]])
+
+    print("\n[TEST] DriveTimeEstimator - Arête longue")
+    print(f"  tronçons={[history.segment_label(r) for r in rows]} parts={shares.round(2).tolist()}")
+    assert sorted(history.segment_label(r) for r in rows) == ["Est", "Ouest"]
+    assert abs(shares[0] - shares[1]) < 0.05
+    assert 0.5 < shares.sum() < 0.7
+
+
+def test_best_departure_time_single_route_call():
+    """Le balayage de 48 créneaux ne calcule l'itinéraire qu'une fois"""
+    history = TrafficHistory(capacity=8, min_record_interval_s=0)
+    history.record_snapshot(_snapshot(MONDAY_8AM, "congestion"))
+    history.record_snapshot(_snapshot(MONDAY_8AM.replace(hour=9), "fluide"))
+
+    calls = []
+    estimator = DriveTimeEstimator(traffic_history=history)
+    estimator.route_scraper.get_route = lambda o, d, detail, deadline=None: calls.append((o, d, detail)) or _fake_route(o, d)
+
+    result = estimator.best_departure_time((48.11, -1.69), (48.11, -1.65), MONDAY_8AM, slots=48)
+
+    print("\n[TEST] DriveTimeEstimator - Best departure")
+    print(f"  best={result['best_departure']} worst={result['worst_departure']}")
+    assert result["success"]
+    assert len(calls) == 1
+    assert len(result["slots"]) == 48
+    assert result["worst_departure"] == "2026-01-05 08:00"
+    assert result["best_departure"] == "2026-01-05 08:15"
+    assert result["best_duration_minutes"] < result["worst_duration_minutes"]
+
+
+def test_resolve_departure_time():
+    """Test de la conversion heure/jour extraits -> datetime"""
+    now = datetime(2026, 1, 5, 10, 0)  # lundi
+    resolve = ToolExecutor._resolve_departure_time
+    assert resolve({}, now) is None
+    assert resolve({'departure_time': '17:30'}, now) == datetime(2026, 1, 5, 17, 30)
+    assert resolve({'departure_time': '08:00'}, now) == datetime(2026, 1, 6, 8, 0)
+    assert resolve({'departure_time': '08:00', 'departure_day': 'demain'}, now) == datetime(2026, 1, 6, 8, 0)
+    assert resolve({'departure_time': '08:00', 'departure_day': 'mercredi'}, now) == datetime(2026, 1, 7, 8, 0)
+
+
+def test_resolve_departure_window():
+    """La fin de fenêtre suit le jour résolu pour le début"""
+    resolve = ToolExecutor._resolve_departure_window
+    now = datetime(2026, 1, 5, 8, 0)  # lundi, 8h : "entre 7h et 9h" vise demain
+    assert resolve({'window_start': '07:00', 'window_end': '09:00'}, now) == (
+        datetime(2026, 1, 6, 7, 0), datetime(2026, 1, 6, 9, 0))
+    assert resolve({'window_start': '17:00', 'window_end': '19:00'}, now) == (
+        datetime(2026, 1, 5, 17, 0), datetime(2026, 1, 5, 19, 0))
+    assert resolve({'window_start': '22:00', 'window_end': '02:00'}, now) == (
+        datetime(2026, 1, 5, 22, 0), datetime(2026, 1, 6, 2, 0))
+    assert resolve({'window_start': '07:00', 'window_end': '09:00', 'departure_day': 'mercredi'}, now) == (
+        datetime(2026, 1, 7, 7, 0), datetime(2026, 1, 7, 9, 0))
+    assert resolve({}, datetime(2026, 1, 5, 8, 7)) == (datetime(2026, 1, 5, 8, 15), datetime(2026, 1, 5, 20, 15))
+
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_bucket_of()
+    test_record_snapshot_probabilities()
+    test_record_snapshot_rate_limit()
+    test_history_save_load(pathlib.Path(tempfile.mkdtemp()))
+    test_predict_drive_time_from_history()
+    test_route_segments_split_long_edge()
+    test_best_departure_time_single_route_call()
+    test_resolve_departure_time()
+    test_resolve_departure_window()
+    print("\n[OK] Tous les tests d'historique trafic réussis !")